@@ -103,6 +103,14 @@ try:
 except Exception as e:
     print(f"⚠️ Could not register api_weather_bp: {e}")
 
+# ----- RTZ Map Data API (route geometry, tiles) -----
+try:
+    from backend.routes.rtz_data_api import rtz_api_bp
+    app.register_blueprint(rtz_api_bp)
+    print("✅ Registered: rtz_api_bp (/api/rtz)")
+except Exception as e:
+    print(f"⚠️ Could not register rtz_api_bp: {e}")
+
 # ============================================
 # LANGUAGE ROUTES - ONLY THESE IN APP.PY!
 # ============================================
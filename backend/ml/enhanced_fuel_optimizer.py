@@ -6,10 +6,11 @@ Data Sources: Kystverket AIS, Norsepower reports, Silverstream trials, DNV GL st
 
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass
 import logging
+import time
 
 # Import statistical validation engine with error handling
 try:
@@ -20,6 +21,31 @@ except ImportError:
     VALIDATION_ENGINE_AVAILABLE = False
     print("NOTE: Validation engine not available - running in basic mode")
 
+# Voyage speed optimization grid (see optimize_voyage_speeds)
+VOYAGE_SPEED_STEP_KN = 0.5
+# Elapsed-time grid: a quarter of the median leg time, within these bounds
+VOYAGE_TIME_STEP_HOURS = 0.05
+VOYAGE_MIN_TIME_STEP_HOURS = 0.01
+VOYAGE_MIN_SPEED_KN = 6.0
+# Maximum speed when the vessel gives none, relative to its type's optimal speed
+VOYAGE_MAX_SPEED_FACTOR = 1.3
+
+@dataclass
+class VoyageSpeedPlan:
+    """Per-leg speeds minimising voyage fuel inside an ETA window"""
+    mmsi: str
+    route_name: str
+    leg_speeds: List[float]
+    leg_hours: List[float]
+    leg_fuel: List[float]
+    total_fuel: float
+    constant_speed_fuel: float
+    fuel_savings_pct: float
+    arrival_hours: float
+    eta: datetime
+    feasible: bool
+    solve_ms: float
+
 @dataclass
 class EmpiricalVesselPerformance:
     """Empirical vessel performance with EEM optimization and validation"""
@@ -369,6 +395,201 @@ class EmpiricalFuelOptimizer:
         speed_deviation = abs(current_speed - optimal_speed)
         efficiency = max(0, 100 - (speed_deviation * 8))
         return efficiency
+    
+    def optimize_voyage_speeds(self, vessel_data: Dict, route: Dict,
+                               eta_window: Tuple[Union[datetime, float], Union[datetime, float]],
+                               leg_forecasts: Optional[List[Optional[List[Dict]]]] = None,
+                               departure_time: Optional[datetime] = None,
+                               speed_step: float = VOYAGE_SPEED_STEP_KN,
+                               time_step_hours: Optional[float] = None) -> VoyageSpeedPlan:
+        """
+        Per-leg speeds for a whole RTZ route that minimise total fuel while
+        arriving inside an ETA window.
+        
+        Leg fuel is consumption at the leg speed (as in
+        _calculate_fuel_consumption_with_ci) x weather impact at the time the
+        vessel is mid-leg x leg hours. A dynamic-programming pass over
+        (elapsed-time bin, speed) runs one vectorised step per leg, so a
+        100-leg route solves in tens of milliseconds.
+        
+        Args:
+            vessel_data: 'type', 'mmsi' and optional 'min_speed'/'max_speed' in knots
+            route: Route from parse_rtz_file (its 'legs' with 'distance_nm')
+            eta_window: (earliest, latest) arrival, as datetimes or hours after departure
+            leg_forecasts: Per leg, forecast entries with 'time' and 'wind_speed'/'wave_height',
+                flat or as MET Locationforecast timeseries; None (or None for a leg) is calm weather
+            departure_time: Voyage start, defaults to now (UTC)
+            speed_step: Speed grid resolution in knots
+            time_step_hours: Elapsed-time grid resolution, defaults to one sized to the legs
+        
+        Returns:
+            VoyageSpeedPlan; feasible is False when no speed plan meets the window,
+            in which case the plan arrives as close to it as the speed limits allow
+        """
+        start = time.perf_counter()
+        departure_time = departure_time or datetime.now(timezone.utc)
+        distances = np.array([leg['distance_nm'] for leg in route.get('legs', [])], dtype=float)
+        coef = self.performance_data.get(vessel_data.get('type', 'container'), self.performance_data['container'])
+        min_speed = float(vessel_data.get('min_speed') or VOYAGE_MIN_SPEED_KN)
+        max_speed = float(vessel_data.get('max_speed') or coef['optimal_speed']['value'] * VOYAGE_MAX_SPEED_FACTOR)
+        grid_speeds = np.arange(min_speed, max_speed + 1e-9, speed_step)
+        
+        earliest, latest = (self._hours_after(departure_time, value) for value in eta_window)
+        if not len(distances) or latest <= 0 or earliest > latest:
+            raise ValueError("Voyage optimization needs route legs and a non-empty ETA window after departure")
+        # Reference: one constant speed arriving at the end of the window
+        constant_speed = float(np.clip(distances.sum() / latest, min_speed, max_speed))
+        time_step_hours = time_step_hours or float(np.clip(np.median(distances) / constant_speed / 4,
+                                                           VOYAGE_MIN_TIME_STEP_HOURS, VOYAGE_TIME_STEP_HOURS))
+        n_legs, n_bins = len(distances), int(np.ceil(latest / time_step_hours)) + 1
+        legs = np.arange(n_legs)
+        hours = distances[:, None] / grid_speeds[None, :]                           # (legs, speeds)
+        leg_fuel = coef['base_consumption']['value'] * (grid_speeds / 12.0) ** 3 * hours
+        shifts = np.floor(hours / time_step_hours + 1e-9).astype(np.int64)          # whole bins per leg
+        fractions = hours - shifts * time_step_hours                                # remainder in hours
+        impact = self._leg_weather_impact(leg_forecasts, n_legs, departure_time.timestamp(),
+                                          time_step_hours, n_bins + 1)
+        
+        def plan_fuel(speeds):
+            """Fuel per leg sailing the given leg speeds, with weather at each leg's midpoint"""
+            leg_hours = distances / speeds
+            mid = np.rint((np.cumsum(leg_hours) - leg_hours / 2) / time_step_hours).astype(np.int64)
+            return (coef['base_consumption']['value'] * (speeds / 12.0) ** 3 * leg_hours
+                    * impact[legs, np.minimum(mid, impact.shape[1] - 1)])
+        
+        constant_speeds = np.full(n_legs, constant_speed)
+        constant_fuel = float(plan_fuel(constant_speeds).sum())
+        
+        # Fuel value of one hour near the optimum (fuel ~ distance^3 / hours^2, so
+        # -dF/dT = 2F/T), used to compare paths that share a time bin
+        time_value = 2 * constant_fuel * constant_speed / distances.sum()
+        
+        # State: elapsed-time bin after the legs so far. Each bin keeps the cheapest
+        # path with its exact elapsed time, so times never drift from their bins and
+        # the ETA check is exact; merging paths within one bin is the only approximation.
+        cost = np.full(n_bins, np.inf)
+        cost[0] = 0.0
+        elapsed = np.zeros(n_bins)
+        choice = np.zeros((n_legs, n_bins), dtype=np.int16)   # speed index
+        source = np.zeros((n_legs, n_bins), dtype=np.int32)   # bin before the leg
+        # Latest start of each leg (and the arrival) that can still reach the window at maximum speed
+        latest_start = latest - np.append(np.cumsum(distances[::-1])[::-1], 0.0) / max_speed
+        # Each speed appears twice: arriving shifts bins later, or one more with a carry
+        carry_rows = np.repeat([False, True], len(grid_speeds))[:, None]
+        fractions2, hours2 = np.tile(fractions, 2), np.tile(hours, 2)
+        fuel2 = np.tile(leg_fuel, 2)
+        for i in range(n_legs):
+            reachable = np.flatnonzero(np.isfinite(cost))
+            if not len(reachable):
+                cost[:] = np.inf
+                break
+            first, last = reachable[0], reachable[-1]
+            targets = np.arange(first + shifts[i].min(), min(last + shifts[i].max() + 2, n_bins))
+            
+            # The exact arrival lands shifts or shifts + 1 bins after the start bin,
+            # depending on where in its bin the path started
+            start_bins = targets - shifts[i][:, None]                               # (speeds, targets)
+            start_bins = np.concatenate((start_bins, start_bins - 1))               # + carried arrivals
+            valid = (start_bins >= first) & (start_bins <= last)
+            np.clip(start_bins, first, last, out=start_bins)
+            start_elapsed = elapsed[start_bins]
+            carried = start_elapsed - start_bins * time_step_hours + fractions2[i][:, None]
+            landed = valid & ((carried >= time_step_hours) == carry_rows)
+            arrivals = start_elapsed + hours2[i][:, None]
+            mid_bins = np.minimum(np.rint((start_elapsed + arrivals) / (2 * time_step_hours)).astype(np.int64),
+                                  impact.shape[1] - 1)
+            costs = cost[start_bins] + fuel2[i][:, None] * impact[i][mid_bins]
+            costs[~landed | (arrivals > latest_start[i + 1] + 1e-9)] = np.inf
+            columns = np.arange(len(targets))
+            best = (costs + time_value * arrivals).argmin(axis=0)
+            
+            cost = np.full(n_bins, np.inf)
+            cost[targets] = costs[best, columns]
+            elapsed[targets] = arrivals[best, columns]
+            choice[i, targets] = best % len(grid_speeds)
+            source[i, targets] = start_bins[best, columns]
+        
+        finite = np.isfinite(cost)
+        window = finite & (elapsed >= earliest - 1e-9) & (elapsed <= latest + 1e-9)
+        feasible = bool(window.any())
+        if feasible:
+            arrival_bin = int(np.flatnonzero(window)[np.argmin(cost[window])])
+        elif finite.any():
+            arrival_bin = int(np.flatnonzero(finite)[-1])  # Too early even at minimum speed
+        else:
+            arrival_bin = None  # Too late even at maximum speed
+        
+        if arrival_bin is None:
+            speeds = np.full(n_legs, grid_speeds[-1])
+        else:
+            picks = np.empty(n_legs, dtype=np.int64)
+            t = arrival_bin
+            for i in range(n_legs - 1, -1, -1):
+                picks[i] = choice[i, t]
+                t = source[i, t]
+            speeds = grid_speeds[picks]
+        leg_fuel = plan_fuel(speeds)
+        
+        # Merging within bins can miss the constant-speed plan; never return worse
+        if earliest - 1e-9 <= distances.sum() / constant_speed <= latest + 1e-9 and leg_fuel.sum() > constant_fuel:
+            speeds, leg_fuel, feasible = constant_speeds, plan_fuel(constant_speeds), True
+        leg_hours = distances / speeds
+        arrival_hours = float(leg_hours.sum())
+        total_fuel = float(leg_fuel.sum())
+        
+        plan = VoyageSpeedPlan(
+            mmsi=vessel_data.get('mmsi', 'unknown'),
+            route_name=route.get('route_name', 'unknown'),
+            leg_speeds=[round(float(v), 2) for v in speeds],
+            leg_hours=[round(float(h), 3) for h in leg_hours],
+            leg_fuel=[round(float(f), 3) for f in leg_fuel],
+            total_fuel=round(total_fuel, 3),
+            constant_speed_fuel=round(constant_fuel, 3),
+            fuel_savings_pct=round((1 - total_fuel / constant_fuel) * 100, 2) if constant_fuel > 0 else 0.0,
+            arrival_hours=round(arrival_hours, 3),
+            eta=departure_time + timedelta(hours=arrival_hours),
+            feasible=feasible,
+            solve_ms=round((time.perf_counter() - start) * 1000, 2)
+        )
+        if not feasible:
+            self.logger.warning(f"Voyage plan for {plan.mmsi} on {plan.route_name} cannot meet the ETA window")
+        return plan
+    
+    @staticmethod
+    def _hours_after(departure_time: datetime, value: Union[datetime, float]) -> float:
+        if isinstance(value, datetime):
+            return (value - departure_time).total_seconds() / 3600.0
+        return float(value)
+    
+    @staticmethod
+    def _weather_impact_array(wind_speed: np.ndarray, wave_height: np.ndarray) -> np.ndarray:
+        """Vectorised _calculate_weather_impact"""
+        impact = (1.0 + np.minimum(np.maximum(wind_speed - 10, 0) * 0.015, 0.25)
+                  + np.minimum(np.maximum(wave_height - 1.5, 0) * 0.08, 0.35))
+        return np.clip(impact, 0.7, 1.6)
+    
+    def _leg_weather_impact(self, leg_forecasts: Optional[List], n_legs: int, departure_ts: float,
+                            time_step_hours: float, n_bins: int) -> np.ndarray:
+        """Weather impact per leg at every time bin, interpolated from the leg forecasts"""
+        impact = np.ones((n_legs, n_bins))
+        bin_times = departure_ts + np.arange(n_bins) * time_step_hours * 3600.0
+        for i, forecast in enumerate((leg_forecasts or [])[:n_legs]):
+            if not forecast:
+                continue
+            times, wind, wave = [], [], []
+            for entry in forecast:
+                details = entry.get('data', {}).get('instant', {}).get('details', entry)
+                when = entry['time']
+                if not isinstance(when, datetime):
+                    when = datetime.fromisoformat(str(when).replace('Z', '+00:00'))
+                times.append(when.timestamp())
+                wind.append(details.get('wind_speed') or 0.0)
+                wave.append(details.get('wave_height', details.get('sea_surface_wave_height')) or 0.0)
+            order = np.argsort(times)
+            times = np.asarray(times)[order]
+            impact[i] = self._weather_impact_array(np.interp(bin_times, times, np.asarray(wind, dtype=float)[order]),
+                                                   np.interp(bin_times, times, np.asarray(wave, dtype=float)[order]))
+        return impact
 
 # Empirical testing
 if __name__ == "__main__":
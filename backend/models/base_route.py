@@ -11,6 +11,8 @@ class BaseRoute(db.Model):
     name = db.Column(db.String(255), nullable=False)
     description = db.Column(db.Text)
     geometry = db.Column(Geometry("LINESTRING", srid=4326))  # ✅ FIXED: Geometry not db.Geometry
+    # Content hash of the RTZ route; set only on rows written by rtz_ingest
+    rtz_file_hash = db.Column(db.String(64), index=True)
 
     # ForeignKey to route_files
     route_file_id = db.Column(db.Integer, db.ForeignKey("route_files.id"))
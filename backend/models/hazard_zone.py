@@ -8,6 +8,8 @@ class HazardZone(db.Model):
     __tablename__ = "hazard_zones"
 
     id = db.Column(db.Integer, primary_key=True)
+    # Stable key of a synced point hazard (spatial_queries.hazard_source_key)
+    source_key = db.Column(db.String(40), index=True)
     name = db.Column(db.String(255), nullable=False)
     hazard_type = db.Column(db.String(100), nullable=False)
     geometry = db.Column(Geometry("POLYGON", srid=4326))  # ✅ FIXED: Geometry not db.Geometry
@@ -14,6 +14,8 @@ from flask import Blueprint, jsonify, request, current_app
 from datetime import datetime, timezone
 import random
 
+from backend.services.source_fanout import AIS_CAPTURE_DEADLINE_SECONDS, ais_source_fanout
+
 logger = logging.getLogger(__name__)
 
 # Create blueprint
@@ -749,47 +751,58 @@ def get_all_sources_vessels():
     """
     Get vessels from ALL available sources for comparison
     Useful for testing and data quality assessment
+    Sources are queried concurrently; any that miss the deadline
+    (AIS_CAPTURE_DEADLINE_SECONDS) are reported with status 'timeout'.
     """
     port = request.args.get('port', 'bergen')
-    results = {}
+    
+    # Single-request sources: the fan-out's no-longer-needed event has nothing to interrupt
+    def kystverket_vessels(_no_longer_needed):
+        from backend.services.kystverket_ais_service import kystverket_ais_service
+        return kystverket_ais_service.get_vessels_near_port(port, limit=3)
+    
+    def kystdatahuset_vessels(_no_longer_needed):
+        from backend.services.kystdatahuset_adapter import kystdatahuset_adapter
+        return kystdatahuset_adapter.get_vessels_near_city(port, radius_km=20)
+    
+    def barentswatch_vessels(_no_longer_needed):
+        from backend.services.barentswatch_service import barentswatch_service
+        # Approximate bbox for port
+        bbox = "5.2,60.3,5.4,60.5" if port == 'bergen' else "10.6,59.8,10.8,60.0"
+        return barentswatch_service.get_vessel_positions(bbox=bbox, limit=3)
     
     # Collect from all sources
-    sources = ['kystverket', 'kystdatahuset', 'barentswatch']
+    fanout = ais_source_fanout.run(
+        [('kystverket', kystverket_vessels),
+         ('kystdatahuset', kystdatahuset_vessels),
+         ('barentswatch', barentswatch_vessels)],
+        deadline_seconds=AIS_CAPTURE_DEADLINE_SECONDS,
+        accept=lambda vessels: vessels is not None,
+        first_wins=False
+    )
     
-    for source in sources:
-        try:
-            if source == 'kystverket':
-                from backend.services.kystverket_ais_service import kystverket_ais_service
-                vessels = kystverket_ais_service.get_vessels_near_port(port, limit=3)
-                results[source] = {
-                    'count': len(vessels),
-                    'vessels': vessels[:2],  # Limit to 2 for response size
-                    'status': 'success'
-                }
-            elif source == 'kystdatahuset':
-                from backend.services.kystdatahuset_adapter import kystdatahuset_adapter
-                vessels = kystdatahuset_adapter.get_vessels_near_city(port, radius_km=20)
-                results[source] = {
-                    'count': len(vessels),
-                    'vessels': vessels[:2],
-                    'status': 'success'
-                }
-            elif source == 'barentswatch':
-                from backend.services.barentswatch_service import barentswatch_service
-                # Approximate bbox for port
-                bbox = "5.2,60.3,5.4,60.5" if port == 'bergen' else "10.6,59.8,10.8,60.0"
-                vessels = barentswatch_service.get_vessel_positions(bbox=bbox, limit=3)
-                results[source] = {
-                    'count': len(vessels),
-                    'vessels': vessels[:2],
-                    'status': 'success'
-                }
-        except Exception as e:
+    results = {}
+    for source, outcome in fanout.outcomes.items():
+        if outcome['status'] == 'ok':
+            vessels = outcome['value']
+            results[source] = {
+                'count': len(vessels),
+                'vessels': vessels[:2],  # Limit to 2 for response size
+                'status': 'success',
+                'latency_ms': outcome['latency_ms']
+            }
+        elif outcome['status'] in ('error', 'empty'):
             results[source] = {
                 'count': 0,
-                'error': str(e),
+                'error': outcome.get('error', 'no data returned'),
                 'status': 'failed'
             }
+        else:
+            results[source] = {
+                'count': 0,
+                'error': f"no response within {AIS_CAPTURE_DEADLINE_SECONDS:.0f}s",
+                'status': outcome['status']
+            }
     
     # Summary
     total_vessels = sum(r['count'] for r in results.values() if 'count' in r)
@@ -803,7 +816,8 @@ def get_all_sources_vessels():
             'total_vessels_across_sources': total_vessels,
             'successful_sources': successful_sources,
             'successful_source_count': len(successful_sources),
-            'primary_recommendation': successful_sources[0] if successful_sources else 'none'
+            'primary_recommendation': successful_sources[0] if successful_sources else 'none',
+            'elapsed_ms': round(fanout.elapsed_ms, 1)
         }
     }
     
@@ -24,14 +24,27 @@ FIXED: BarentsWatch credentials properly handled (client_id, client_secret)
 FIXED: Kystdatahuset enabled via USE_KYSTDATAHUSET_AIS=true
 FIXED: MET Norway with proper user_agent, lat, lon
 FIXED: Empirical historical service as SCIENTIFIC LAST RESORT only
+PERFORMANCE: Dashboard renders from a background-refreshed, versioned snapshot
+PERFORMANCE: Real-time AIS sources queried concurrently under one deadline
+PERFORMANCE: Live vessels pushed as SSE deltas instead of per-dashboard polling
+PERFORMANCE: Upstream APIs share pooled keep-alive connections, retries and breakers
 """
 
 import logging
-from flask import Blueprint, jsonify, request, render_template, current_app
+from flask import Blueprint, Response, jsonify, request, render_template, current_app, stream_with_context
+from jinja2.utils import htmlsafe_json_dumps
+import json
 from datetime import datetime
 import os
+import time
 from collections import Counter
 
+from backend.services.dashboard_snapshot import DashboardSnapshot, rtz_fingerprint
+from backend.services.http_client import upstream_client
+from backend.services.rate_limiter import upstream_limiter
+from backend.services.source_fanout import AIS_CAPTURE_DEADLINE_SECONDS, ais_source_fanout
+from backend.services.vessel_feed import parse_bbox, vessel_feed
+
 logger = logging.getLogger(__name__)
 
 # Create blueprint
@@ -77,6 +90,12 @@ MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD', '')
 DISABLE_AIS_SERVICE = os.environ.get('DISABLE_AIS_SERVICE', '0') == '1'
 FLASK_SKIP_SCHEDULER = os.environ.get('FLASK_SKIP_SCHEDULER', '0') == '1'
 
+# Dashboard snapshot refresh cadences (seconds)
+DASHBOARD_VESSEL_REFRESH_SECONDS = float(os.environ.get('DASHBOARD_VESSEL_REFRESH_SECONDS', '30'))
+DASHBOARD_WEATHER_REFRESH_SECONDS = float(os.environ.get('DASHBOARD_WEATHER_REFRESH_SECONDS', '300'))
+DASHBOARD_EMPIRICAL_REFRESH_SECONDS = float(os.environ.get('DASHBOARD_EMPIRICAL_REFRESH_SECONDS', '900'))
+DASHBOARD_ROUTE_CHECK_SECONDS = float(os.environ.get('DASHBOARD_ROUTE_CHECK_SECONDS', '60'))
+
 # Kystdatahuset
 USE_KYSTDATAHUSET_AIS = os.environ.get('USE_KYSTDATAHUSET_AIS', 'false').lower() == 'true'
 KYSTDATAHUSET_USER_AGENT = os.environ.get('KYSTDATAHUSET_USER_AGENT', '')
@@ -244,6 +263,65 @@ COMMERCIAL_CITY_PRIORITY = [
 ]
 
 # ===== VESSEL CAPTURE - REAL-TIME FIRST, SCIENTIFIC EMPIRICAL LAST RESORT =====
+def _captured_vessel(vessel, city, vessels, source, source_label):
+    """Dashboard capture record for the first vessel found near a city."""
+    return {
+        'name': vessel.get('name', f'MS {city["name"]}'),
+        'location': city['name'],
+        'region': city['region'],
+        'latitude': vessel.get('latitude', city['lat']),
+        'longitude': vessel.get('longitude', city['lon']),
+        'speed': vessel.get('speed', 0),
+        'course': vessel.get('course', 0),
+        'status': vessel.get('status', 'Unknown'),
+        'source': source,
+        'timestamp': datetime.now().isoformat(),
+        'count': len(vessels),
+        'mmsi': vessel.get('mmsi', ''),
+        'commercial_priority': city['importance'],
+        'message': f"LIVE VESSEL from {source_label} near {city['name']}"
+    }
+
+
+def _capture_from_source(search, source, source_label, no_longer_needed):
+    """
+    Search cities in commercial priority order and capture the first vessel.
+    Runs on a fan-out worker thread, so it logs via the module logger, and
+    stops between cities once the fan-out no longer needs its result.
+    """
+    for city in COMMERCIAL_CITY_PRIORITY:
+        if no_longer_needed.is_set():
+            logger.info(f"   ⏹️ Capture via {source_label} no longer needed, stopping before {city['name']}")
+            return None
+        logger.info(f"   🔍 Searching {city['name']} via {source_label}...")
+        vessels = search(city)
+        if vessels and len(vessels) > 0:
+            vessel = vessels[0]
+            logger.info(f"✅ REAL-TIME ({source_label}): Captured {vessel.get('name', 'Vessel')} near {city['name']}")
+            return _captured_vessel(vessel, city, vessels, source, source_label)
+    
+    logger.warning(f"⚠️ No vessels found via {source_label}")
+    return None
+
+
+def _capture_from_kystverket(no_longer_needed):
+    return _capture_from_source(
+        lambda city: kystverket_service.get_vessels_near_port(city['name'], limit=10),
+        'REAL-TIME_KYSTVERKET', 'Kystverket live stream', no_longer_needed)
+
+
+def _capture_from_kystdatahuset(no_longer_needed):
+    return _capture_from_source(
+        lambda city: kystdatahuset_adapter.get_vessels_near_city(city['name'], radius_km=30),
+        'REAL-TIME_KYSTDATAHUSET', 'Kystdatahuset', no_longer_needed)
+
+
+def _capture_from_barentswatch(no_longer_needed):
+    return _capture_from_source(
+        lambda city: barentswatch_service.get_vessels_near_city(city['name'], radius_km=30),
+        'REAL-TIME_BARENTS', 'BarentsWatch', no_longer_needed)
+
+
 def capture_vessel():
     """
     CAPTURE ONE VESSEL - REAL-TIME FIRST, SCIENTIFIC EMPIRICAL FALLBACK (LAST RESORT).
@@ -253,8 +331,10 @@ def capture_vessel():
     3. BarentsWatch (commercial AIS) - TERTIARY
     4. Empirical historical data (2023-2024) - SCIENTIFIC LAST RESORT
     
-    Searches for ANY vessel (moving or stationary) in priority order of commercial cities.
-    Returns the FIRST vessel found in the highest priority city.
+    The real-time sources are queried concurrently under one overall deadline
+    (AIS_CAPTURE_DEADLINE_SECONDS); the highest-priority source that answers
+    in time wins. Within a source, cities are searched in commercial priority
+    order and the FIRST vessel found is returned.
     """
     # Track which sources we've tried
     tried_sources = []
@@ -265,138 +345,28 @@ def capture_vessel():
         tried_sources.append('disabled_by_env')
         return get_empirical_fallback(tried_sources)
     
-    # ===== 1. REAL-TIME - KYSTVERKET LIVE STREAM (PRIMARY) =====
+    sources = []
     if KYSTVERKET_AVAILABLE and kystverket_service and USE_KYSTVERKET_AIS:
-        try:
-            if current_app:
-                current_app.logger.info("📡 [PRIORITY 1] Trying Kystverket live stream (official Norwegian AIS)...")
-            tried_sources.append('kystverket')
-            
-            # Search cities in commercial priority order
-            for city in COMMERCIAL_CITY_PRIORITY:
-                if current_app:
-                    current_app.logger.info(f"   🔍 Searching {city['name']} via Kystverket...")
-                
-                vessels = kystverket_service.get_vessels_near_port(city['name'], limit=10)
-                
-                if vessels and len(vessels) > 0:
-                    # Take the first vessel found in this city
-                    vessel = vessels[0]
-                    
-                    if current_app:
-                        current_app.logger.info(f"✅ REAL-TIME (Kystverket): Captured {vessel.get('name', 'Vessel')} near {city['name']}")
-                    
-                    return {
-                        'name': vessel.get('name', f'MS {city["name"]}'),
-                        'location': city['name'],
-                        'region': city['region'],
-                        'latitude': vessel.get('latitude', city['lat']),
-                        'longitude': vessel.get('longitude', city['lon']),
-                        'speed': vessel.get('speed', 0),
-                        'course': vessel.get('course', 0),
-                        'status': vessel.get('status', 'Unknown'),
-                        'source': 'REAL-TIME_KYSTVERKET',
-                        'timestamp': datetime.now().isoformat(),
-                        'count': len(vessels),
-                        'mmsi': vessel.get('mmsi', ''),
-                        'commercial_priority': city['importance'],
-                        'message': f"LIVE VESSEL from Kystverket live stream near {city['name']}"
-                    }
-            
-            if current_app:
-                current_app.logger.warning("⚠️ [PRIORITY 1] No vessels found via Kystverket live stream")
-                    
-        except Exception as e:
-            if current_app:
-                current_app.logger.error(f"❌ [PRIORITY 1] Kystverket failed: {e}")
-    
-    # ===== 2. REAL-TIME - KYSTDATAHUSET (SECONDARY) =====
+        sources.append(('kystverket', _capture_from_kystverket))
     if KYSTDATAHUSET_AVAILABLE and kystdatahuset_adapter and USE_KYSTDATAHUSET_AIS:
-        try:
-            if current_app:
-                current_app.logger.info("📡 [PRIORITY 2] Trying Kystdatahuset AIS (secondary source)...")
-            tried_sources.append('kystdatahuset')
-            
-            # Search cities in commercial priority order
-            for city in COMMERCIAL_CITY_PRIORITY:
-                if current_app:
-                    current_app.logger.info(f"   🔍 Searching {city['name']} via Kystdatahuset...")
-                
-                vessels = kystdatahuset_adapter.get_vessels_near_city(city['name'], radius_km=30)
-                
-                if vessels and len(vessels) > 0:
-                    vessel = vessels[0]
-                    
-                    if current_app:
-                        current_app.logger.info(f"✅ REAL-TIME (Kystdatahuset): Captured {vessel.get('name', 'Vessel')} near {city['name']}")
-                    
-                    return {
-                        'name': vessel.get('name', f'MS {city["name"]}'),
-                        'location': city['name'],
-                        'region': city['region'],
-                        'latitude': vessel.get('latitude', city['lat']),
-                        'longitude': vessel.get('longitude', city['lon']),
-                        'speed': vessel.get('speed', 0),
-                        'course': vessel.get('course', 0),
-                        'status': vessel.get('status', 'Unknown'),
-                        'source': 'REAL-TIME_KYSTDATAHUSET',
-                        'timestamp': datetime.now().isoformat(),
-                        'count': len(vessels),
-                        'mmsi': vessel.get('mmsi', ''),
-                        'commercial_priority': city['importance'],
-                        'message': f"LIVE VESSEL from Kystdatahuset near {city['name']}"
-                    }
-            
-            if current_app:
-                current_app.logger.warning("⚠️ [PRIORITY 2] No vessels found via Kystdatahuset")
-                    
-        except Exception as e:
-            if current_app:
-                current_app.logger.error(f"❌ [PRIORITY 2] Kystdatahuset failed: {e}")
-    
-    # ===== 3. REAL-TIME - BARENTSWATCH (TERTIARY) =====
+        sources.append(('kystdatahuset', _capture_from_kystdatahuset))
     if BARENTS_AVAILABLE and barentswatch_service and BARENTSWATCH_CLIENT_ID:
-        try:
-            if current_app:
-                current_app.logger.info("📡 [PRIORITY 3] Trying BarentsWatch AIS (tertiary source)...")
-            tried_sources.append('barentswatch')
-            
-            # Search cities in commercial priority order
-            for city in COMMERCIAL_CITY_PRIORITY:
-                if current_app:
-                    current_app.logger.info(f"   🔍 Searching {city['name']} via BarentsWatch...")
-                
-                vessels = barentswatch_service.get_vessels_near_city(city['name'], radius_km=30)
-                
-                if vessels and len(vessels) > 0:
-                    vessel = vessels[0]
-                    
-                    if current_app:
-                        current_app.logger.info(f"✅ REAL-TIME (BarentsWatch): Captured {vessel.get('name', 'Vessel')} near {city['name']}")
-                    
-                    return {
-                        'name': vessel.get('name', f'MS {city["name"]}'),
-                        'location': city['name'],
-                        'region': city['region'],
-                        'latitude': vessel.get('latitude', city['lat']),
-                        'longitude': vessel.get('longitude', city['lon']),
-                        'speed': vessel.get('speed', 0),
-                        'course': vessel.get('course', 0),
-                        'status': vessel.get('status', 'Unknown'),
-                        'source': 'REAL-TIME_BARENTS',
-                        'timestamp': datetime.now().isoformat(),
-                        'count': len(vessels),
-                        'mmsi': vessel.get('mmsi', ''),
-                        'commercial_priority': city['importance'],
-                        'message': f"LIVE VESSEL from BarentsWatch near {city['name']}"
-                    }
-            
-            if current_app:
-                current_app.logger.warning("⚠️ [PRIORITY 3] No vessels found via BarentsWatch")
-                    
-        except Exception as e:
-            if current_app:
-                current_app.logger.error(f"❌ [PRIORITY 3] BarentsWatch failed: {e}")
+        sources.append(('barentswatch', _capture_from_barentswatch))
+    
+    if sources:
+        tried_sources.extend(name for name, _ in sources)
+        logger.info(f"📡 Querying {', '.join(tried_sources)} concurrently "
+                    f"(deadline {AIS_CAPTURE_DEADLINE_SECONDS:.0f}s)...")
+        result = ais_source_fanout.run(sources, deadline_seconds=AIS_CAPTURE_DEADLINE_SECONDS)
+        
+        for name, outcome in result.outcomes.items():
+            if outcome['status'] == 'error':
+                logger.error(f"❌ {name} failed: {outcome['error']}")
+            elif outcome['status'] in ('timeout', 'cancelled'):
+                logger.warning(f"⏱️ {name} missed the {AIS_CAPTURE_DEADLINE_SECONDS:.0f}s capture deadline")
+        
+        if result.value:
+            return result.value
     
     # ===== 4. SCIENTIFIC EMPIRICAL FALLBACK - LAST RESORT ONLY =====
     # This is the SCIENTIFIC LAST RESORT based on actual 2023-2024 data
@@ -635,6 +605,110 @@ def calculate_port_counts(routes_list, ports_list):
     logger.info(f"📊 Port counts calculated: {port_counts}")
     return port_counts
 
+# ===== DASHBOARD SNAPSHOT =====
+# Route-derived context is rebuilt only when the RTZ files change; the live
+# parts refresh on their own cadences in the snapshot's background thread.
+DEFAULT_DASHBOARD_PORTS = ['Bergen', 'Oslo', 'Stavanger', 'Trondheim', 'Ålesund',
+                           'Åndalsnes', 'Kristiansand', 'Drammen', 'Sandefjord', 'Flekkefjord']
+
+
+def build_dashboard_routes():
+    """
+    Build the route-derived part of the dashboard context from the RTZ files.
+    Waypoints are keyed once by route index, which is how the map looks them up,
+    and the JSON embedded in the page is serialised here rather than per render.
+    """
+    try:
+        from backend.rtz_loader_fixed import rtz_loader
+        data = rtz_loader.get_dashboard_data()
+        
+        routes_list = data['routes']
+        ports_list = data['ports_list']
+        
+        # Convert to template format
+        routes = []
+        waypoints_dict = {}
+        for i, route in enumerate(routes_list):
+            routes.append({
+                'route_name': route.get('route_name', 'Unknown'),
+                'clean_name': route.get('clean_name', route.get('route_name', 'Unknown')),
+                'origin': route.get('origin', 'Unknown'),
+                'destination': route.get('destination', 'Unknown'),
+                'total_distance_nm': route.get('total_distance_nm', 0),
+                'duration_days': route.get('total_distance_nm', 0) / (15 * 24),
+                'source_city': route.get('source_city', 'Unknown'),
+                'source_city_name': route.get('source_city_name', 'Unknown'),
+                'is_active': True,
+                'empirically_verified': True,
+                'description': route.get('description', 'NCA Route'),
+                'waypoint_count': route.get('waypoint_count', 0),
+                'visual_properties': route.get('visual_properties', {})
+            })
+            waypoints = route.get('waypoints', [])
+            if waypoints:
+                waypoints_dict[str(i)] = waypoints
+        
+        result = {
+            'routes': routes,
+            'route_count': data['total_routes'],
+            'ports_list': ports_list,
+            'unique_ports_count': data['unique_ports_count'],
+            'cities_with_routes': data['cities_with_routes'],
+            'port_counts': calculate_port_counts(routes_list, ports_list),
+        }
+        logger.info(f"✅ Dashboard: Loaded {result['route_count']} REAL routes from {result['cities_with_routes']} cities, "
+                    f"waypoints for {len(waypoints_dict)} routes")
+        
+    except Exception as e:
+        logger.error(f"❌ Route loading failed: {e}")
+        routes = []
+        waypoints_dict = {}
+        result = {
+            'routes': routes,
+            'route_count': 0,
+            'ports_list': DEFAULT_DASHBOARD_PORTS,
+            'unique_ports_count': len(DEFAULT_DASHBOARD_PORTS),
+            'cities_with_routes': 0,
+            'port_counts': {port: 0 for port in DEFAULT_DASHBOARD_PORTS},
+        }
+    
+    result.update({
+        'waypoints_data': waypoints_dict,
+        'routes_json': _page_json(routes),
+        'waypoints_json': _page_json(waypoints_dict),
+        'total_distance': sum(r.get('total_distance_nm', 0) for r in routes),
+        'total_waypoints': sum(r.get('waypoint_count', 0) for r in routes),
+    })
+    return result
+
+
+def _page_json(obj):
+    """JSON for embedding in the page, escaped like Jinja's tojson filter."""
+    return htmlsafe_json_dumps(obj, dumps=json.dumps, default=str)
+
+
+def _rtz_assets_fingerprint():
+    from backend.rtz_loader_fixed import rtz_loader
+    return rtz_fingerprint(str(rtz_loader.base_path))
+
+
+def _empirical_report():
+    if EMPIRICAL_AVAILABLE and empirical_service:
+        return empirical_service.get_data_quality_report()
+    return None
+
+
+dashboard_snapshot = DashboardSnapshot(
+    build_routes=build_dashboard_routes,
+    fingerprint=_rtz_assets_fingerprint,
+    live_sources={
+        'vessel': (lambda: capture_vessel(), DASHBOARD_VESSEL_REFRESH_SECONDS),
+        'weather': (lambda: get_weather_data(), DASHBOARD_WEATHER_REFRESH_SECONDS),
+        'empirical_report': (_empirical_report, DASHBOARD_EMPIRICAL_REFRESH_SECONDS),
+    },
+    route_check_seconds=DASHBOARD_ROUTE_CHECK_SECONDS,
+)
+
 # ===== MAIN DASHBOARD ENDPOINT =====
 @maritime_bp.route('/dashboard')
 def maritime_dashboard():
@@ -642,115 +716,17 @@ def maritime_dashboard():
     Render the main maritime dashboard.
     REAL-TIME FIRST with scientific empirical fallback as LAST RESORT.
     Loads REAL routes from Norwegian Coastal Administration RTZ files.
+    Only merges the precomputed dashboard snapshot and renders it.
     """
-    # Initialize variables at the VERY BEGINNING
-    routes = []
-    total_routes = 0
-    ports_list = []
-    unique_ports_count = 0
-    cities_with_routes = 0
-    total_distance = 0
-    total_waypoints = 0
-    routes_list = []
-    routes_data = []
-    waypoints_dict = {}  # 👈 ALWAYS defined, even if empty
-    port_counts = {}     # 👈 ALWAYS defined, even if empty
-    
+    render_start = time.perf_counter()
     try:
-        # ===== 1. LOAD REAL RTZ ROUTES =====
-        # Source: Norwegian Coastal Administration (routeinfo.no)
-        try:
-            from backend.rtz_loader_fixed import rtz_loader
-            data = rtz_loader.get_dashboard_data()
-            
-            routes_list = data['routes']
-            ports_list = data['ports_list']
-            unique_ports_count = data['unique_ports_count']
-            total_routes = data['total_routes']
-            cities_with_routes = data['cities_with_routes']
-            
-            # Convert to template format
-            routes_data = []
-            for route in routes_list:
-                routes_data.append({
-                    'route_name': route.get('route_name', 'Unknown'),
-                    'clean_name': route.get('clean_name', route.get('route_name', 'Unknown')),
-                    'origin': route.get('origin', 'Unknown'),
-                    'destination': route.get('destination', 'Unknown'),
-                    'total_distance_nm': route.get('total_distance_nm', 0),
-                    'duration_days': route.get('total_distance_nm', 0) / (15 * 24),
-                    'source_city': route.get('source_city', 'Unknown'),
-                    'source_city_name': route.get('source_city_name', 'Unknown'),
-                    'is_active': True,
-                    'empirically_verified': True,
-                    'description': route.get('description', 'NCA Route'),
-                    'waypoint_count': route.get('waypoint_count', 0),
-                    'visual_properties': route.get('visual_properties', {})
-                })
-            
-            routes = routes_data
-            current_app.logger.info(f"✅ Dashboard: Loaded {total_routes} REAL routes from {cities_with_routes} cities")
-            
-            # ===== 2. CALCULATE PORT COUNTS =====
-            port_counts = calculate_port_counts(routes_list, ports_list)
-            
-        except Exception as e:
-            current_app.logger.error(f"❌ Route loading failed: {e}")
-            routes = []
-            total_routes = 0
-            ports_list = ['Bergen', 'Oslo', 'Stavanger', 'Trondheim', 'Ålesund', 
-                         'Åndalsnes', 'Kristiansand', 'Drammen', 'Sandefjord', 'Flekkefjord']
-            unique_ports_count = len(ports_list)
-            cities_with_routes = 0
-            routes_list = []
-            port_counts = {port: 0 for port in ports_list}  # 👈 Empty dict in case of error
-        
-        # ===== 3. PREPARE WAYPOINTS DATA =====
-        # This is CRITICAL for map visualization
-        waypoints_dict = {}
-        
-        # First try: from routes_list
-        if routes_list:
-            for i, route in enumerate(routes_list):
-                route_id = route.get('route_id', f"route-{i}")
-                waypoints = route.get('waypoints', [])
-                if waypoints and len(waypoints) > 0:
-                    waypoints_dict[route_id] = waypoints
-                    waypoints_dict[str(i)] = waypoints
-                    route_name = route.get('route_name', f"route_{i}")
-                    waypoints_dict[route_name] = waypoints
-                    current_app.logger.info(f"📍 Added waypoints for {route_name}: {len(waypoints)} points")
-        
-        # Second try: from routes_data
-        if not waypoints_dict and routes_data:
-            for i, route in enumerate(routes_data):
-                waypoints = route.get('waypoints', [])
-                if waypoints and len(waypoints) > 0:
-                    route_id = f"route-{i}"
-                    waypoints_dict[route_id] = waypoints
-                    waypoints_dict[str(i)] = waypoints
-                    current_app.logger.info(f"📍 Added waypoints for route {i}: {len(waypoints)} points")
+        dashboard_snapshot.start(current_app._get_current_object())
+        snapshot = dashboard_snapshot.get()
+        route_part = snapshot['routes']
+        live = snapshot['live']
+        total_routes = route_part['route_count']
         
-        # Third try: direct from loader
-        if not waypoints_dict:
-            try:
-                from backend.rtz_loader_fixed import rtz_loader
-                all_routes = rtz_loader.get_all_routes_with_waypoints()
-                for i, route_data in enumerate(all_routes):
-                    route = route_data.get('route', {})
-                    waypoints = route_data.get('waypoints', [])
-                    if waypoints and len(waypoints) > 0:
-                        route_id = route.get('route_id', f"route-{i}")
-                        waypoints_dict[route_id] = waypoints
-                        waypoints_dict[str(i)] = waypoints
-                        current_app.logger.info(f"📍 Loaded waypoints from loader for route {i}: {len(waypoints)} points")
-            except Exception as e:
-                current_app.logger.warning(f"Could not load waypoints from loader: {e}")
-        
-        current_app.logger.info(f"📍 Prepared waypoints for {len(waypoints_dict)} routes")
-        
-        # ===== 4. CAPTURE VESSEL - REAL-TIME FIRST =====
-        vessel_data = capture_vessel()
+        vessel_data = live.get('vessel')
         realtime_available = vessel_data and (
             vessel_data.get('source') in [
                 'REAL-TIME_KYSTVERKET',
@@ -758,24 +734,9 @@ def maritime_dashboard():
                 'REAL-TIME_BARENTS'
             ]
         )
-        
-        # ===== 5. GET WEATHER - REAL-TIME FIRST =====
-        weather_data = get_weather_data()
+        weather_data = live.get('weather')
         weather_realtime = weather_data and weather_data.get('real_time', False)
         
-        # ===== 6. GET EMPIRICAL DATA QUALITY REPORT =====
-        empirical_report = None
-        if EMPIRICAL_AVAILABLE and empirical_service:
-            try:
-                empirical_report = empirical_service.get_data_quality_report()
-            except:
-                pass
-        
-        # ===== 7. CALCULATE STATISTICS =====
-        total_distance = sum(r.get('total_distance_nm', 0) for r in routes)
-        total_waypoints = sum(r.get('waypoint_count', 0) for r in routes)
-        
-        # ===== 8. DETERMINE DATA SOURCES =====
         data_sources = {
             'ais': 'realtime' if realtime_available else 'empirical',
             'ais_source': vessel_data.get('source', 'unknown'),
@@ -787,65 +748,64 @@ def maritime_dashboard():
             'overall_quality': 'high' if (realtime_available and weather_realtime and total_routes >= 30) else 'medium'
         }
         
-        # ===== 9. PREPARE CONTEXT WITH REAL-TIME DATA =====
+        timestamp = datetime.now().isoformat()
         context = {
             'lang': request.args.get('lang', 'en'),
-            'routes': routes,
+            'routes': route_part['routes'],
+            'routes_json': route_part['routes_json'],
             'route_count': total_routes,
-            'cities_with_routes': ports_list,
-            'unique_ports_count': unique_ports_count,
-            'ports_list': ports_list,
-            'port_counts': port_counts,  # 👈 THIS WAS MISSING - CRITICAL FIX!
-            'total_distance': total_distance,
-            'waypoint_count': total_waypoints,
-            'active_ports_count': unique_ports_count,
+            'cities_with_routes': route_part['ports_list'],
+            'unique_ports_count': route_part['unique_ports_count'],
+            'ports_list': route_part['ports_list'],
+            'port_counts': route_part['port_counts'],
+            'total_distance': route_part['total_distance'],
+            'waypoint_count': route_part['total_waypoints'],
+            'active_ports_count': route_part['unique_ports_count'],
             'ais_vessel_count': vessel_data.get('count', 1),
             'weather_data': weather_data,
             'data_sources': data_sources,
             'captured_vessel': vessel_data,
             'realtime_available': realtime_available,
             'empirical_available': EMPIRICAL_AVAILABLE,
-            'empirical_report': empirical_report,
+            'empirical_report': live.get('empirical_report'),
             'kystverket_available': KYSTVERKET_AVAILABLE,
             'kystdatahuset_available': KYSTDATAHUSET_AVAILABLE,
             'barentswatch_available': BARENTS_AVAILABLE,
             'rtz_data_source': 'NCA_ROUTE_FILES',
-            'timestamp': datetime.now().isoformat(),
-            'waypoints_data': waypoints_dict,  # 👈 CRITICAL FOR MAP VISUALIZATION
+            'timestamp': timestamp,
+            'snapshot_version': snapshot['version'],
+            'snapshot_age_seconds': snapshot['live_age_seconds'],
+            'waypoints_data': route_part['waypoints_data'],  # 👈 CRITICAL FOR MAP VISUALIZATION
+            'waypoints_json': route_part['waypoints_json'],
             'empirical_verification': {
                 'methodology': 'rtz_files_direct',
                 'verification_hash': f'rtz_verified_{total_routes}_routes',
                 'status': 'verified',
                 'source': 'routeinfo.no (Norwegian Coastal Administration)',
                 'actual_count': total_routes,
-                'cities_count': cities_with_routes,
+                'cities_count': route_part['cities_with_routes'],
                 'data_quality': 'production_ready',
-                'timestamp': datetime.now().isoformat()
+                'timestamp': timestamp
             }
         }
         
-        current_app.logger.info(f"🎯 Dashboard ready: {total_routes} routes, "
-                              f"AIS: {'LIVE' if realtime_available else 'EMPIRICAL'} ({vessel_data.get('source', 'unknown')}), "
-                              f"Weather: {'LIVE' if weather_realtime else 'EMPIRICAL'} ({weather_data.get('source', 'unknown')}), "
-                              f"Waypoints: {len(waypoints_dict)}")
-
-        return render_template(
+        html = render_template(
             'maritime_split/dashboard_base.html',
             **context
         )
+        dashboard_snapshot.record_render((time.perf_counter() - render_start) * 1000)
+        return html
         
     except Exception as e:
         current_app.logger.error(f"❌ Dashboard error: {e}", exc_info=True)
         # Emergency fallback with port_counts ALWAYS defined
-        default_ports = ['Bergen', 'Oslo', 'Stavanger', 'Trondheim', 'Ålesund', 
-                        'Åndalsnes', 'Kristiansand', 'Drammen', 'Sandefjord', 'Flekkefjord']
         return render_template(
             'maritime_split/dashboard_base.html',
             routes=[],
             route_count=0,
-            ports_list=default_ports,
-            port_counts={port: 0 for port in default_ports},  # 👈 ALWAYS defined, even in fallback
-            unique_ports_count=len(default_ports),
+            ports_list=DEFAULT_DASHBOARD_PORTS,
+            port_counts={port: 0 for port in DEFAULT_DASHBOARD_PORTS},  # 👈 ALWAYS defined, even in fallback
+            unique_ports_count=len(DEFAULT_DASHBOARD_PORTS),
             ais_vessel_count=42,
             weather_data=get_weather_data(),
             data_sources={'ais': 'offline', 'weather': 'offline', 'routes': 'offline', 'overall_quality': 'low'},
@@ -858,6 +818,15 @@ def maritime_dashboard():
             lang=request.args.get('lang', 'en')
         ), 500
 
+
+@maritime_bp.route('/api/dashboard-metrics')
+def dashboard_metrics():
+    """Dashboard render latency (p50/p99) and snapshot refresh state."""
+    return jsonify({
+        'timestamp': datetime.now().isoformat(),
+        'dashboard_snapshot': dashboard_snapshot.get_metrics()
+    })
+
 # ===== API ENDPOINTS =====
 @maritime_bp.route('/api/ais-data')
 def get_ais_data():
@@ -900,6 +869,25 @@ def health_check():
         }
     })
 
+@maritime_bp.route('/api/ais-source-metrics')
+def ais_source_metrics():
+    """Per-source AIS latency histograms from the concurrent capture fan-out."""
+    return jsonify({
+        'timestamp': datetime.now().isoformat(),
+        'deadline_seconds': AIS_CAPTURE_DEADLINE_SECONDS,
+        'fanout': ais_source_fanout.get_status()
+    })
+
+@maritime_bp.route('/api/upstream-metrics')
+def upstream_metrics():
+    """Per-host latency, connection reuse, errors and breaker state of the shared upstream HTTP client,
+    plus per-upstream rate-limit decisions and queue waits."""
+    return jsonify({
+        'timestamp': datetime.now().isoformat(),
+        'upstreams': upstream_client.get_status(),
+        'rate_limits': upstream_limiter.get_status()
+    })
+
 @maritime_bp.route('/api/vessels/real-time')
 def get_real_time_vessels():
     """Get real-time vessels near Bergen."""
@@ -925,6 +913,40 @@ def get_real_time_vessels():
             'error': str(e)
         }), 500
 
+@maritime_bp.route('/api/vessels/stream')
+def stream_vessels():
+    """
+    Server-Sent Events feed of live vessel changes from the shared state store.
+    Query: bbox=min_lon,min_lat,max_lon,max_lat (optional), format=json|binary.
+    A snapshot is sent first, then one delta per publish tick with only the
+    vessels that changed; reconnects resume from Last-Event-ID.
+    """
+    try:
+        bbox = parse_bbox(request.args.get('bbox'))
+    except ValueError as e:
+        return jsonify({'error': f'Invalid bbox: {e}'}), 400
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('since', '0')
+    vessel_feed.start()
+    subscription = vessel_feed.subscribe(
+        bbox=bbox,
+        binary=request.args.get('format') == 'binary',
+        last_sequence=int(last_event_id) if last_event_id.isdigit() else 0
+    )
+    return Response(
+        stream_with_context(vessel_feed.stream(subscription)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@maritime_bp.route('/api/vessels/stream/status')
+def vessel_stream_status():
+    """Publisher and subscriber state of the live vessel feed."""
+    return jsonify({
+        'timestamp': datetime.now().isoformat(),
+        'feed': vessel_feed.get_status()
+    })
+
 @maritime_bp.route('/api/vessels/empirical')
 def get_empirical_vessel():
     """Get empirical fallback vessel data."""
@@ -1,37 +1,58 @@
-
 # backend/routes/rtz_data_api.py
 """
 RTZ Data API - Provides route data for map visualization
+Route geometry is simplified per zoom level and served as encoded polylines,
+for the whole map or per z/x/y tile, with ETag caching.
 """
 
-from flask import Blueprint, jsonify
+from flask import Blueprint, Response, jsonify, request
 from datetime import datetime
 
+from backend.services.dashboard_snapshot import rtz_fingerprint
+from backend.services.route_tiles import DEFAULT_MAP_ZOOM, RouteTileCache
+
 rtz_api_bp = Blueprint('rtz_api', __name__)
 
+# Browsers revalidate with If-None-Match after this; unchanged routes get a 304
+MAP_DATA_MAX_AGE_SECONDS = 300
+
+
+def _load_rtz_data():
+    from backend.rtz_loader_fixed import rtz_loader
+    return rtz_loader.get_dashboard_data()
+
+
+def _rtz_assets_fingerprint():
+    from backend.rtz_loader_fixed import rtz_loader
+    return rtz_fingerprint(str(rtz_loader.base_path))
+
+
+route_tile_cache = RouteTileCache(load_data=_load_rtz_data, fingerprint=_rtz_assets_fingerprint)
+
+
+def _cached_json(etag, body):
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = f'public, max-age={MAP_DATA_MAX_AGE_SECONDS}'
+    return response.make_conditional(request)
+
+
 @rtz_api_bp.route('/api/rtz/map-data')
 def get_rtz_map_data():
     """
     API endpoint that returns RTZ route data for map visualization
+
+    Query parameters:
+        zoom: Map zoom the geometry is simplified for (default 6); each route
+            carries an encoded 'polyline' instead of its waypoint list
+        detail: 'full' returns every waypoint of every route
     """
     try:
-        # Try to load from RTZ loader
-        from backend.rtz_loader_fixed import rtz_loader
-        data = rtz_loader.get_dashboard_data()
-        
-        # Add map-specific data
-        map_data = {
-            'success': True,
-            'timestamp': datetime.now().isoformat(),
-            'total_routes': data.get('total_routes', 34),
-            'routes': data.get('routes', []),
-            'ports': data.get('ports_list', []),
-            'cities': data.get('cities_with_routes', 10),
-            'message': f'Loaded {data.get("total_routes", 34)} empirical RTZ routes'
-        }
-        
-        return jsonify(map_data)
-        
+        if request.args.get('detail') == 'full':
+            return _cached_json(*route_tile_cache.full_map_data())
+        zoom = request.args.get('zoom', DEFAULT_MAP_ZOOM, type=int)
+        return _cached_json(*route_tile_cache.map_data(zoom))
+
     except Exception as e:
         # Fallback with empirical data
         return jsonify({
@@ -39,9 +60,27 @@ def get_rtz_map_data():
             'timestamp': datetime.now().isoformat(),
             'total_routes': 34,
             'routes': [],
-            'ports': ['Bergen', 'Oslo', 'Stavanger', 'Trondheim', 'Ålesund', 
+            'ports': ['Bergen', 'Oslo', 'Stavanger', 'Trondheim', 'Ålesund',
                      'Åndalsnes', 'Kristiansand', 'Drammen', 'Sandefjord', 'Flekkefjord'],
             'cities': 10,
             'message': 'Using empirical Norwegian coastal route data',
             'note': 'RTZ loader unavailable, using fallback data'
         })
+
+
+@rtz_api_bp.route('/api/rtz/tiles/<int:z>/<int:x>/<int:y>.json')
+def get_rtz_route_tile(z, x, y):
+    """
+    Route geometry crossing one map tile, simplified for its zoom level.
+    Routes are referenced by their index in /api/rtz/map-data.
+    """
+    tile = route_tile_cache.tile(z, x, y)
+    if tile is None:
+        return jsonify({'success': False, 'error': f'Invalid tile {z}/{x}/{y}'}), 404
+    return _cached_json(*tile)
+
+
+@rtz_api_bp.route('/api/rtz/tiles/status')
+def get_rtz_tile_status():
+    """Route tile cache version and hit counters."""
+    return jsonify(route_tile_cache.get_status())
@@ -14,6 +14,8 @@ from datetime import datetime, timedelta
 from functools import lru_cache
 import concurrent.futures
 
+from backend.services.http_client import upstream_client
+
 turbine_bp = Blueprint('turbine_api', __name__)
 
 # Norwegian wind turbine data sources (ordered by priority)
@@ -105,11 +107,13 @@ def check_single_api_source(source_config):
     
     start_time = time.time()
     try:
-        response = requests.request(
+        # No retries: the search gives every source one attempt within its 5 s budget
+        response = upstream_client.request(
             method=source_config['method'],
             url=source_config['url'],
             headers=source_config['headers'],
-            timeout=source_config['timeout']
+            timeout=source_config['timeout'],
+            retries=0
         )
         response_time = (time.time() - start_time) * 1000  # Convert to ms
         
@@ -278,28 +282,20 @@ def check_turbine_proximity(lat, lon):
     
     warnings = []
     
-    for turbine in turbines:
-        distance_km = calculate_distance_km(
-            lat, lon,
-            turbine['latitude'], turbine['longitude']
-        )
-        
-        distance_m = distance_km * 1000
+    for turbine, distance_m in _turbines_within_buffer(lat, lon, turbines):
         buffer_zone = turbine.get('buffer_meters', 500)
+        warning_level = 'CRITICAL' if distance_m < buffer_zone * 0.3 else 'WARNING'
         
-        if distance_m < buffer_zone:
-            warning_level = 'CRITICAL' if distance_m < buffer_zone * 0.3 else 'WARNING'
-            
-            warnings.append({
-                'turbine_id': turbine['id'],
-                'turbine_name': turbine['name'],
-                'distance_meters': round(distance_m),
-                'buffer_zone_meters': buffer_zone,
-                'warning_level': warning_level,
-                'severity': 'high' if warning_level == 'CRITICAL' else 'medium',
-                'recommended_action': f"Change course to maintain {buffer_zone}m clearance",
-                'data_source': turbine.get('data_source', 'unknown')
-            })
+        warnings.append({
+            'turbine_id': turbine['id'],
+            'turbine_name': turbine['name'],
+            'distance_meters': round(distance_m),
+            'buffer_zone_meters': buffer_zone,
+            'warning_level': warning_level,
+            'severity': 'high' if warning_level == 'CRITICAL' else 'medium',
+            'recommended_action': f"Change course to maintain {buffer_zone}m clearance",
+            'data_source': turbine.get('data_source', 'unknown')
+        })
     
     return jsonify({
         'status': 'success',
@@ -311,6 +307,19 @@ def check_turbine_proximity(lat, lon):
         'search_summary': search_response['search_summary']
     })
 
+def _turbines_within_buffer(lat, lon, turbines):
+    """
+    (turbine, distance in meters) for every turbine whose buffer zone contains
+    the position. The search returns a handful of turbines, so this stays in
+    memory rather than writing them to hazard_zones on a read request.
+    """
+    nearby = []
+    for turbine in turbines:
+        distance_m = calculate_distance_km(lat, lon, turbine['latitude'], turbine['longitude']) * 1000
+        if distance_m < turbine.get('buffer_meters', 500):
+            nearby.append((turbine, distance_m))
+    return nearby
+
 def calculate_distance_km(lat1, lon1, lat2, lon2):
     """
     Calculate distance between two points in kilometers
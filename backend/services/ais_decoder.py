@@ -0,0 +1,448 @@
+"""
+Streaming NMEA 0183 AIS decoder (AIVDM/AIVDO sentences).
+Turns raw bytes from the Kystverket AIS feed into decoded position and
+static/voyage messages for message types 1, 2, 3, 5, 18, 19 and 24.
+"""
+
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 6-bit ASCII used inside AIS text fields (ITU-R M.1371 table 47)
+_SIXBIT_ASCII = '@ABCDEFGHIJKLMNOPQRSTUVWXYZ[\\]^_ !"#$%&\'()*+,-./0123456789:;<=>?'
+
+# Payload armoring: each character carries 6 bits. Map characters straight to
+# their bit strings so a whole payload unpacks with one str.translate call.
+_ARMOR_CHARS = ''.join(chr(48 + v) if v < 40 else chr(56 + v) for v in range(64))
+_ARMOR_TO_BITS = {ord(c): format(v, '06b') for v, c in enumerate(_ARMOR_CHARS)}
+_BITS_TO_ARMOR = {format(v, '06b'): c for v, c in enumerate(_ARMOR_CHARS)}
+
+# Bits each message type needs; shorter payloads are zero-padded
+_MESSAGE_BITS = {1: 168, 2: 168, 3: 168, 5: 424, 18: 168, 19: 312, 24: 168}
+
+NAVIGATION_STATUS = {
+    0: 'Under way using engine', 1: 'At anchor', 2: 'Not under command',
+    3: 'Restricted manoeuverability', 4: 'Constrained by her draught', 5: 'Moored',
+    6: 'Aground', 7: 'Engaged in fishing', 8: 'Under way sailing',
+    14: 'AIS-SART active', 15: 'Not defined',
+}
+
+
+def ship_type_category(ship_type: Optional[int]) -> str:
+    """Map an AIS ship type code to the vessel categories used across BergNavn."""
+    if ship_type is None:
+        return 'Other'
+    if ship_type == 30:
+        return 'Fishing'
+    if ship_type in (31, 32, 52):
+        return 'Tug'
+    if ship_type == 36:
+        return 'Sailing'
+    if ship_type == 37:
+        return 'Pleasure Craft'
+    if 40 <= ship_type <= 49:
+        return 'High Speed Craft'
+    if 60 <= ship_type <= 69:
+        return 'Passenger'
+    if 70 <= ship_type <= 79:
+        return 'Cargo'
+    if 80 <= ship_type <= 89:
+        return 'Tanker'
+    return 'Other'
+
+
+def nmea_checksum(body: bytes) -> int:
+    """XOR checksum of the characters between '!' and '*'."""
+    checksum = 0
+    for byte in body:
+        checksum ^= byte
+    return checksum
+
+
+class _Bits:
+    """Unpacked payload bits with typed field accessors."""
+
+    __slots__ = ('bits',)
+
+    def __init__(self, payload: str, fill_bits: int, min_bits: int):
+        bits = payload.translate(_ARMOR_TO_BITS)
+        if fill_bits:
+            bits = bits[:-fill_bits]
+        if len(bits) < min_bits:
+            bits += '0' * (min_bits - len(bits))
+        self.bits = bits
+
+    def uint(self, start: int, length: int) -> int:
+        return int(self.bits[start:start + length], 2)
+
+    def int(self, start: int, length: int) -> int:
+        value = int(self.bits[start:start + length], 2)
+        if value >= 1 << (length - 1):
+            value -= 1 << length
+        return value
+
+    def text(self, start: int, length: int) -> str:
+        bits = self.bits
+        chars = [_SIXBIT_ASCII[int(bits[i:i + 6], 2)] for i in range(start, start + length, 6)]
+        return ''.join(chars).split('@', 1)[0].strip()
+
+
+def _position(bits: _Bits, lon_start: int, lat_start: int) -> Tuple[Optional[float], Optional[float]]:
+    lon = bits.int(lon_start, 28) / 600000.0
+    lat = bits.int(lat_start, 27) / 600000.0
+    # 181° / 91° mean "not available"
+    if abs(lon) > 180.0 or abs(lat) > 90.0:
+        return None, None
+    return round(lat, 6), round(lon, 6)
+
+
+def _speed(raw: int) -> Optional[float]:
+    return None if raw == 1023 else raw / 10.0
+
+
+def _course(raw: int) -> Optional[float]:
+    return None if raw >= 3600 else raw / 10.0
+
+
+def _heading(raw: int) -> Optional[int]:
+    return None if raw == 511 else raw
+
+
+def _dimensions(bits: _Bits, start: int) -> Dict:
+    to_bow = bits.uint(start, 9)
+    to_stern = bits.uint(start + 9, 9)
+    to_port = bits.uint(start + 18, 6)
+    to_starboard = bits.uint(start + 24, 6)
+    return {
+        'length': (to_bow + to_stern) or None,
+        'width': (to_port + to_starboard) or None,
+    }
+
+
+def _decode_class_a_position(bits: _Bits, msg_type: int) -> Dict:
+    lat, lon = _position(bits, 61, 89)
+    status = bits.uint(38, 4)
+    return {
+        'msg_type': msg_type,
+        'mmsi': str(bits.uint(8, 30)),
+        'ais_class': 'A',
+        'nav_status': status,
+        'nav_status_text': NAVIGATION_STATUS.get(status, 'Reserved'),
+        'speed': _speed(bits.uint(50, 10)),
+        'latitude': lat,
+        'longitude': lon,
+        'course': _course(bits.uint(116, 12)),
+        'heading': _heading(bits.uint(128, 9)),
+        'second': bits.uint(137, 6),
+    }
+
+
+def _decode_class_b_position(bits: _Bits, msg_type: int) -> Dict:
+    lat, lon = _position(bits, 57, 85)
+    message = {
+        'msg_type': msg_type,
+        'mmsi': str(bits.uint(8, 30)),
+        'ais_class': 'B',
+        'speed': _speed(bits.uint(46, 10)),
+        'latitude': lat,
+        'longitude': lon,
+        'course': _course(bits.uint(112, 12)),
+        'heading': _heading(bits.uint(124, 9)),
+        'second': bits.uint(133, 6),
+    }
+    if msg_type == 19:
+        ship_type = bits.uint(263, 8)
+        message.update({
+            'name': bits.text(143, 120),
+            'ship_type': ship_type,
+            'type': ship_type_category(ship_type),
+        })
+        message.update(_dimensions(bits, 271))
+    return message
+
+
+def _decode_static_voyage(bits: _Bits, msg_type: int) -> Dict:
+    ship_type = bits.uint(232, 8)
+    message = {
+        'msg_type': msg_type,
+        'mmsi': str(bits.uint(8, 30)),
+        'ais_class': 'A',
+        'imo': bits.uint(40, 30) or None,
+        'callsign': bits.text(70, 42),
+        'name': bits.text(112, 120),
+        'ship_type': ship_type,
+        'type': ship_type_category(ship_type),
+        'draught': bits.uint(294, 8) / 10.0 or None,
+        'destination': bits.text(302, 120),
+    }
+    message.update(_dimensions(bits, 240))
+    return message
+
+
+def _decode_static_report(bits: _Bits, msg_type: int) -> Dict:
+    part = bits.uint(38, 2)
+    message = {
+        'msg_type': msg_type,
+        'mmsi': str(bits.uint(8, 30)),
+        'ais_class': 'B',
+        'part': part,
+    }
+    if part == 0:
+        message['name'] = bits.text(40, 120)
+    else:
+        ship_type = bits.uint(40, 8)
+        message.update({
+            'ship_type': ship_type,
+            'type': ship_type_category(ship_type),
+            'callsign': bits.text(90, 42),
+        })
+        message.update(_dimensions(bits, 132))
+    return message
+
+
+_DECODERS = {
+    1: _decode_class_a_position,
+    2: _decode_class_a_position,
+    3: _decode_class_a_position,
+    5: _decode_static_voyage,
+    18: _decode_class_b_position,
+    19: _decode_class_b_position,
+    24: _decode_static_report,
+}
+
+
+def decode_payload(payload: str, fill_bits: int = 0) -> Optional[Dict]:
+    """
+    Decode a complete (reassembled) AIS payload.
+
+    Args:
+        payload: Armored 6-bit payload string
+        fill_bits: Number of padding bits at the end of the payload
+
+    Returns:
+        Decoded message dictionary, or None for unsupported message types
+    """
+    if not payload:
+        return None
+    msg_type = _ARMOR_CHARS.find(payload[0])
+    decoder = _DECODERS.get(msg_type)
+    if decoder is None:
+        return None
+    return decoder(_Bits(payload, fill_bits, _MESSAGE_BITS[msg_type]), msg_type)
+
+
+class AISStreamDecoder:
+    """
+    Incremental decoder for a raw AIS TCP stream.
+
+    Feed it whatever recv() returns; it keeps one reusable byte buffer, cuts
+    complete lines out of it in place, validates checksums, reassembles
+    multi-fragment sentences and yields decoded messages. NMEA 4.0 tag blocks
+    (``\\s:source,c:unix_time*hh\\``) are accepted and their timestamp kept.
+    """
+
+    # Longest line worth keeping while waiting for a newline
+    MAX_LINE_BYTES = 1024
+
+    def __init__(self, fragment_timeout: float = 10.0, verify_checksum: bool = True):
+        self.fragment_timeout = fragment_timeout
+        self.verify_checksum = verify_checksum
+        self._buffer = bytearray()
+        # (sequence id, channel, fragment count) -> (first seen, payload parts)
+        self._fragments: Dict[Tuple[bytes, bytes, int], Tuple[float, List[Optional[str]]]] = {}
+        self._last_fragment_sweep = time.monotonic()
+        self.stats = {
+            'sentences': 0,
+            'messages': 0,
+            'checksum_errors': 0,
+            'malformed': 0,
+            'unsupported': 0,
+            'fragments_dropped': 0,
+        }
+
+    def feed(self, data: bytes) -> List[Dict]:
+        """
+        Consume raw stream bytes.
+
+        Returns:
+            Decoded messages for every complete sentence in the buffer
+        """
+        buffer = self._buffer
+        buffer += data
+        messages = []
+        start = 0
+        find = buffer.find
+        while True:
+            end = find(b'\n', start)
+            if end < 0:
+                break
+            if end > start:
+                message = self.decode_sentence(bytes(buffer[start:end]))
+                if message is not None:
+                    messages.append(message)
+            start = end + 1
+
+        if start:
+            del buffer[:start]
+        if len(buffer) > self.MAX_LINE_BYTES:
+            # No newline in sight: the stream is not NMEA, drop it
+            self.stats['malformed'] += 1
+            buffer.clear()
+        return messages
+
+    def decode_sentence(self, line: bytes) -> Optional[Dict]:
+        """
+        Decode one sentence (optionally prefixed by a tag block).
+
+        Returns:
+            Decoded message when the sentence completes one, otherwise None
+        """
+        line = line.strip()
+        if not line:
+            return None
+
+        received_at = None
+        if line[:1] == b'\\':
+            tag_end = line.find(b'\\', 1)
+            if tag_end < 0:
+                self.stats['malformed'] += 1
+                return None
+            received_at = self._tag_block_time(line[1:tag_end])
+            line = line[tag_end + 1:]
+
+        if line[:1] not in (b'!', b'$') or line[3:6] not in (b'VDM', b'VDO'):
+            return None
+        self.stats['sentences'] += 1
+
+        star = line.rfind(b'*')
+        if star < 0:
+            self.stats['malformed'] += 1
+            return None
+        if self.verify_checksum:
+            try:
+                expected = int(line[star + 1:star + 3], 16)
+            except ValueError:
+                self.stats['malformed'] += 1
+                return None
+            if nmea_checksum(line[1:star]) != expected:
+                self.stats['checksum_errors'] += 1
+                return None
+
+        fields = line[:star].split(b',')
+        if len(fields) != 7:
+            self.stats['malformed'] += 1
+            return None
+        try:
+            fragment_count = int(fields[1])
+            fragment_number = int(fields[2])
+            fill_bits = int(fields[6] or b'0')
+        except ValueError:
+            self.stats['malformed'] += 1
+            return None
+        payload = fields[5].decode('ascii', errors='replace')
+
+        if fragment_count > 1:
+            payload = self._reassemble(fields[3], fields[4], fragment_count, fragment_number, payload)
+            if payload is None:
+                return None
+
+        try:
+            message = decode_payload(payload, fill_bits)
+        except (ValueError, IndexError):
+            self.stats['malformed'] += 1
+            return None
+        if message is None:
+            self.stats['unsupported'] += 1
+            return None
+
+        message['channel'] = fields[4].decode('ascii', errors='replace')
+        if received_at is not None:
+            message['received_at'] = received_at
+        self.stats['messages'] += 1
+        return message
+
+    def _reassemble(self, sequence_id: bytes, channel: bytes, count: int,
+                    number: int, payload: str) -> Optional[str]:
+        """Store a fragment; return the joined payload once all parts arrived."""
+        if not 1 <= number <= count:
+            self.stats['malformed'] += 1
+            return None
+
+        now = time.monotonic()
+        if now - self._last_fragment_sweep > self.fragment_timeout:
+            self._expire_fragments(now)
+
+        key = (sequence_id, channel, count)
+        entry = self._fragments.get(key)
+        # Fragment 1 starts a new message only once the pending one already has
+        # its first part; otherwise it is just an earlier part arriving late
+        if entry is None or (number == 1 and entry[1][0] is not None):
+            if entry is not None:
+                # A new message reused the sequence id before the old one completed
+                self.stats['fragments_dropped'] += 1
+            entry = (now, [None] * count)
+            self._fragments[key] = entry
+        parts = entry[1]
+        parts[number - 1] = payload
+
+        if None in parts:
+            return None
+        del self._fragments[key]
+        return ''.join(parts)
+
+    def _expire_fragments(self, now: float):
+        stale = [key for key, (first_seen, _) in self._fragments.items()
+                 if now - first_seen > self.fragment_timeout]
+        for key in stale:
+            del self._fragments[key]
+        self.stats['fragments_dropped'] += len(stale)
+        self._last_fragment_sweep = now
+
+    @staticmethod
+    def _tag_block_time(tag_block: bytes) -> Optional[int]:
+        """Extract the c: (unix time) parameter from a tag block."""
+        star = tag_block.find(b'*')
+        if star >= 0:
+            tag_block = tag_block[:star]
+        for parameter in tag_block.split(b','):
+            if parameter[:2] == b'c:':
+                try:
+                    return int(parameter[2:])
+                except ValueError:
+                    return None
+        return None
+
+    @property
+    def pending_fragments(self) -> int:
+        return len(self._fragments)
+
+
+def armor_payload(bits: str) -> Tuple[str, int]:
+    """
+    Pack a bit string into an armored payload (inverse of decoding).
+    Used to build replay and test streams.
+
+    Returns:
+        (payload, fill_bits)
+    """
+    fill_bits = (-len(bits)) % 6
+    bits += '0' * fill_bits
+    payload = ''.join(_BITS_TO_ARMOR[bits[i:i + 6]] for i in range(0, len(bits), 6))
+    return payload, fill_bits
+
+
+def to_sentences(payload: str, fill_bits: int, channel: str = 'A',
+                 sequence_id: str = '', max_payload_chars: int = 60,
+                 talker: str = 'AIVDM') -> List[str]:
+    """Split an armored payload into checksummed NMEA sentences."""
+    chunks = [payload[i:i + max_payload_chars] for i in range(0, len(payload), max_payload_chars)] or ['']
+    count = len(chunks)
+    sentences = []
+    for number, chunk in enumerate(chunks, start=1):
+        fill = fill_bits if number == count else 0
+        seq = sequence_id if count > 1 else ''
+        body = f"{talker},{count},{number},{seq},{channel},{chunk},{fill}"
+        sentences.append(f"!{body}*{nmea_checksum(body.encode('ascii')):02X}")
+    return sentences
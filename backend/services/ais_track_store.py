@@ -0,0 +1,576 @@
+"""
+Append-only AIS track store.
+
+Positions are buffered in memory and flushed into immutable segments on
+disk, partitioned by time (one directory per partition window) and, inside
+each segment, grouped by MMSI:
+
+    <root>/<partition start epoch>/<segment id>/
+        mmsi.npy      sorted MMSIs in the segment
+        offsets.npy   row range of each MMSI's run
+        first.npy     absolute first value of each column per run
+        bounds.npy    time/lat/lon bounds per run (query pruning)
+        timestamp.npy, lat.npy, lon.npy, sog.npy, cog.npy
+                      per-row deltas within the run, in the narrowest
+                      integer dtype that holds them
+
+Values are quantised to integers first (1e-6 degree, 0.1 knot, 0.1 degree,
+millisecond), so consecutive AIS reports mostly delta-encode to int8/int16.
+Segments are opened memory-mapped, so a query only pages in the runs it
+decodes.
+
+Flushes also run periodic maintenance: partitions older than the retention
+window are deleted, and the small segments of each closed partition are
+merged into one. A merged segment lists the segments it replaces in its
+meta.json, so readers never see the same rows twice while the old ones are
+being removed.
+"""
+
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+AIS_TRACK_PARTITION_SECONDS = int(os.getenv("AIS_TRACK_PARTITION_SECONDS", "3600"))
+AIS_TRACK_FLUSH_ROWS = int(os.getenv("AIS_TRACK_FLUSH_ROWS", "50000"))
+AIS_TRACK_FLUSH_SECONDS = float(os.getenv("AIS_TRACK_FLUSH_SECONDS", "60"))
+# History kept on disk (0 keeps everything)
+AIS_TRACK_RETENTION_HOURS = float(os.getenv("AIS_TRACK_RETENTION_HOURS", "168"))
+# Minimum interval between prune/compaction passes on the flush path
+AIS_TRACK_MAINTENANCE_SECONDS = float(os.getenv("AIS_TRACK_MAINTENANCE_SECONDS", "300"))
+# Memory-mapped segments kept open (each holds one file handle per column)
+AIS_TRACK_MAX_OPEN_SEGMENTS = int(os.getenv("AIS_TRACK_MAX_OPEN_SEGMENTS", "64"))
+
+COLUMNS = ('timestamp', 'lat', 'lon', 'sog', 'cog')
+# Quantisation per column: stored integer = round(value * scale)
+_SCALES = {'timestamp': 1000.0, 'lat': 1e6, 'lon': 1e6, 'sog': 10.0, 'cog': 10.0}
+# AIS "not available" codes for speed and course
+_MISSING = {'sog': 1023, 'cog': 3600}
+_DELTA_DTYPES = (np.int8, np.int16, np.int32, np.int64)
+_FORMAT_VERSION = 1
+
+
+def get_track_store_dir() -> str:
+    """Directory for the AIS track store (AIS_TRACK_STORE_DIR or data/ais_tracks)."""
+    from backend.services.rtz_parser import get_project_root
+    return os.getenv("AIS_TRACK_STORE_DIR") or os.path.join(get_project_root(), "data", "ais_tracks")
+
+
+def _quantise(column: str, values) -> np.ndarray:
+    values = np.asarray(values, dtype=float)
+    quantised = np.round(values * _SCALES[column])
+    if column in _MISSING:
+        quantised = np.where(np.isfinite(quantised) & (quantised >= 0) & (quantised < _MISSING[column]),
+                             quantised, _MISSING[column])
+    return quantised.astype(np.int64)
+
+
+def _dequantise(column: str, values: np.ndarray) -> np.ndarray:
+    result = values / _SCALES[column]
+    if column in _MISSING:
+        result = np.where(values == _MISSING[column], np.nan, result)
+    return result
+
+
+def _narrowest(deltas: np.ndarray) -> np.ndarray:
+    if not len(deltas):
+        return deltas.astype(np.int8)
+    low, high = deltas.min(), deltas.max()
+    for dtype in _DELTA_DTYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return deltas.astype(dtype)
+    return deltas
+
+
+def _ranges(starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Concatenated arange(start, start + length) for each pair, without a Python loop."""
+    total = int(lengths.sum())
+    return np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+
+
+def _empty_result(with_mmsi: bool) -> Dict[str, np.ndarray]:
+    result = {column: np.empty(0) for column in COLUMNS}
+    if with_mmsi:
+        result['mmsi'] = np.empty(0, dtype=np.int64)
+    return result
+
+
+class _Segment:
+    """One immutable on-disk segment, opened memory-mapped."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, 'meta.json')) as f:
+            self.meta = json.load(f)
+        self.mmsi = np.load(os.path.join(path, 'mmsi.npy'), mmap_mode='r')
+        self.offsets = np.load(os.path.join(path, 'offsets.npy'), mmap_mode='r')
+        self.first = np.load(os.path.join(path, 'first.npy'), mmap_mode='r')
+        self.bounds = np.load(os.path.join(path, 'bounds.npy'), mmap_mode='r')
+        self.deltas = {column: np.load(os.path.join(path, f'{column}.npy'), mmap_mode='r')
+                       for column in COLUMNS}
+
+    def overlaps(self, t0: int, t1: int) -> bool:
+        return self.meta['t_min'] <= t1 and self.meta['t_max'] >= t0
+
+    def decode_runs(self, runs: np.ndarray) -> Dict[str, np.ndarray]:
+        """Quantised columns (plus 'mmsi') for whole runs."""
+        starts = np.asarray(self.offsets[runs])
+        lengths = np.asarray(self.offsets[runs + 1]) - starts
+        rows = _ranges(starts, lengths)
+        run_of_row = np.repeat(np.arange(len(runs)), lengths)
+        first_row = np.cumsum(lengths) - lengths
+
+        decoded = {'mmsi': np.repeat(np.asarray(self.mmsi[runs]), lengths)}
+        for index, column in enumerate(COLUMNS):
+            # Each run's first delta is 0, so a global cumsum minus its value
+            # at the run start gives the in-run offset from the first value
+            summed = np.cumsum(np.asarray(self.deltas[column][rows], dtype=np.int64))
+            base = np.asarray(self.first[runs, index]) - summed[first_row]
+            decoded[column] = summed + base[run_of_row]
+        return decoded
+
+
+class AISTrackStore:
+    """
+    Append-only, time-partitioned AIS position history.
+
+    Thread-safe: the vessel state store appends from adapter threads while
+    API handlers query.
+    """
+
+    def __init__(self, root: Optional[str] = None, partition_seconds: int = AIS_TRACK_PARTITION_SECONDS,
+                 flush_rows: int = AIS_TRACK_FLUSH_ROWS, flush_seconds: float = AIS_TRACK_FLUSH_SECONDS,
+                 retention_hours: float = AIS_TRACK_RETENTION_HOURS,
+                 maintenance_seconds: float = AIS_TRACK_MAINTENANCE_SECONDS,
+                 max_open_segments: int = AIS_TRACK_MAX_OPEN_SEGMENTS):
+        """
+        Args:
+            root: Store directory (created on first flush), defaults to get_track_store_dir()
+            partition_seconds: Width of a time partition
+            flush_rows: Buffered rows that trigger a flush
+            flush_seconds: Maximum age of the buffer before an append flushes it
+            retention_hours: Partitions older than this are pruned (0 keeps everything)
+            maintenance_seconds: Minimum interval between maintain() runs from flush
+            max_open_segments: Memory-mapped segments cached for queries (least recently used are closed)
+        """
+        self.root = root or get_track_store_dir()
+        self.partition_seconds = int(partition_seconds)
+        self.flush_rows = int(flush_rows)
+        self.flush_seconds = float(flush_seconds)
+        self.retention_hours = float(retention_hours)
+        self.maintenance_seconds = float(maintenance_seconds)
+        self.max_open_segments = max(1, int(max_open_segments))
+
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._buffer: List[tuple] = []
+        self._flushing: List[tuple] = []
+        self._last_flush = time.time()
+        self._last_maintenance = 0.0
+        self._segments: 'OrderedDict[str, _Segment]' = OrderedDict()
+        self._sequence = 0
+        self.stats = {'appended': 0, 'rejected': 0, 'flushes': 0, 'segments_written': 0, 'rows_written': 0,
+                      'partitions_pruned': 0, 'partitions_compacted': 0, 'segments_compacted': 0}
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def append(self, mmsi: Any, latitude: float, longitude: float, sog: Optional[float] = None,
+               cog: Optional[float] = None, timestamp: Optional[float] = None) -> bool:
+        """
+        Buffer one position report (timestamp as epoch seconds or datetime, defaults to now).
+
+        Returns:
+            False if the MMSI is not numeric or the position is invalid
+        """
+        try:
+            mmsi = int(mmsi)
+            latitude, longitude = float(latitude), float(longitude)
+        except (TypeError, ValueError):
+            self.stats['rejected'] += 1
+            return False
+        if not (-90.0 <= latitude <= 90.0 and -180.0 <= longitude <= 180.0):
+            self.stats['rejected'] += 1
+            return False
+
+        if timestamp is None:
+            timestamp = time.time()
+        elif hasattr(timestamp, 'timestamp'):
+            timestamp = timestamp.timestamp()
+        row = (mmsi, float(timestamp), latitude, longitude,
+               np.nan if sog is None else float(sog), np.nan if cog is None else float(cog))
+        with self._lock:
+            self._buffer.append(row)
+            self.stats['appended'] += 1
+            due = (len(self._buffer) >= self.flush_rows
+                   or time.time() - self._last_flush >= self.flush_seconds)
+        if due:
+            self.flush()
+        return True
+
+    def append_many(self, vessels: Iterable[Dict]) -> int:
+        """
+        Append vessel dicts ('mmsi', 'lat'/'latitude', 'sog'/'speed', 'cog'/'course',
+        epoch 'timestamp'), e.g. when importing historical AIS. Returns rows buffered.
+        """
+        count = 0
+        for vessel in vessels:
+            count += self.append(
+                vessel.get('mmsi'),
+                vessel.get('lat', vessel.get('latitude')),
+                vessel.get('lon', vessel.get('longitude')),
+                sog=vessel.get('sog', vessel.get('speed')),
+                cog=vessel.get('cog', vessel.get('course')),
+                timestamp=vessel.get('timestamp'),
+            )
+        return count
+
+    def flush(self) -> int:
+        """
+        Write buffered rows as new segments, then run maintain() if it has not
+        run for maintenance_seconds. Returns the number of segments written.
+        """
+        written = self._flush_buffer()
+        if time.time() - self._last_maintenance >= self.maintenance_seconds:
+            self.maintain()
+        return written
+
+    def _flush_buffer(self) -> int:
+        with self._flush_lock:
+            with self._lock:
+                self._flushing, self._buffer = self._buffer, []
+                self._last_flush = time.time()
+            if not self._flushing:
+                return 0
+
+            columns = self._buffer_columns(self._flushing)
+            partitions = columns['timestamp'] // (self.partition_seconds * 1000)
+            failed = np.zeros(len(partitions), dtype=bool)
+            written = 0
+            for partition in np.unique(partitions).tolist():
+                rows = partitions == partition
+                try:
+                    self._write_segment(int(partition) * self.partition_seconds,
+                                        {name: values[rows] for name, values in columns.items()})
+                    written += 1
+                except OSError as e:
+                    logger.error(f"❌ AIS track store flush to {self.root} failed: {e}")
+                    failed |= rows
+
+            with self._lock:
+                # Keep the rows of failed partitions in memory rather than lose them;
+                # partitions already written are not queued again
+                retry = [row for row, keep in zip(self._flushing, failed.tolist()) if keep]
+                self._buffer = retry + self._buffer
+                self.stats['flushes'] += 1
+                self.stats['segments_written'] += written
+                self.stats['rows_written'] += len(self._flushing) - len(retry)
+                self._flushing = []
+            return written
+
+    def _write_segment(self, partition_start: int, columns: Dict[str, np.ndarray],
+                       replaces: Optional[List[str]] = None):
+        """
+        Sort rows by (MMSI, time), delta-encode per run and write atomically.
+        replaces names segments of the partition that this one supersedes.
+        """
+        order = np.lexsort((columns['timestamp'], columns['mmsi']))
+        columns = {name: values[order] for name, values in columns.items()}
+        mmsi, starts = np.unique(columns['mmsi'], return_index=True)
+        offsets = np.append(starts, len(columns['mmsi'])).astype(np.int64)
+        lengths = np.diff(offsets)
+        run_of_row = np.repeat(np.arange(len(mmsi)), lengths)
+
+        self._sequence += 1
+        segment_id = f"{time.time_ns()}-{os.getpid()}-{self._sequence}"
+        partition_dir = os.path.join(self.root, str(partition_start))
+        tmp_dir = os.path.join(partition_dir, f".tmp-{segment_id}")
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        first = np.stack([columns[name][starts] for name in COLUMNS], axis=1)
+        for name in COLUMNS:
+            deltas = np.diff(columns[name], prepend=columns[name][:1])
+            deltas[starts] = 0
+            np.save(os.path.join(tmp_dir, f'{name}.npy'), _narrowest(deltas))
+
+        def run_reduce(func, name):
+            return func.reduceat(columns[name], starts)
+
+        bounds = np.stack([run_reduce(np.minimum, 'timestamp'), run_reduce(np.maximum, 'timestamp'),
+                           run_reduce(np.minimum, 'lat'), run_reduce(np.maximum, 'lat'),
+                           run_reduce(np.minimum, 'lon'), run_reduce(np.maximum, 'lon')], axis=1)
+        np.save(os.path.join(tmp_dir, 'mmsi.npy'), mmsi)
+        np.save(os.path.join(tmp_dir, 'offsets.npy'), offsets)
+        np.save(os.path.join(tmp_dir, 'first.npy'), first)
+        np.save(os.path.join(tmp_dir, 'bounds.npy'), bounds)
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+            json.dump({
+                'version': _FORMAT_VERSION,
+                'rows': int(len(run_of_row)),
+                'vessels': int(len(mmsi)),
+                't_min': int(bounds[:, 0].min()),
+                't_max': int(bounds[:, 1].max()),
+                'bbox': [int(bounds[:, 2].min()), int(bounds[:, 4].min()),
+                         int(bounds[:, 3].max()), int(bounds[:, 5].max())],
+                'replaces': replaces or [],
+            }, f)
+        os.rename(tmp_dir, os.path.join(partition_dir, segment_id))
+
+    @staticmethod
+    def _buffer_columns(rows: List[tuple]) -> Dict[str, np.ndarray]:
+        """Quantised columns (plus 'mmsi') from buffered row tuples."""
+        mmsi, timestamp, lat, lon, sog, cog = (np.array(values) for values in zip(*rows))
+        return {
+            'mmsi': mmsi.astype(np.int64),
+            'timestamp': _quantise('timestamp', timestamp),
+            'lat': _quantise('lat', lat),
+            'lon': _quantise('lon', lon),
+            'sog': _quantise('sog', sog),
+            'cog': _quantise('cog', cog),
+        }
+
+    def maintain(self, now: Optional[float] = None) -> Dict[str, int]:
+        """
+        Prune partitions past the retention window, compact closed partitions
+        and close the cached memory maps of both (queries reopen them).
+
+        Returns:
+            Partitions pruned and compacted
+        """
+        now = time.time() if now is None else now
+        self._last_maintenance = time.time()
+        pruned = self.prune(now - self.retention_hours * 3600) if self.retention_hours > 0 else 0
+        compacted = 0
+        for partition_start in self._partition_starts():
+            if partition_start + self.partition_seconds > now:
+                continue
+            try:
+                compacted += self.compact(partition_start)
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️ Compacting AIS track partition {partition_start} failed: {e}")
+            self._evict(os.path.join(self.root, str(partition_start)))
+        return {'pruned': pruned, 'compacted': compacted}
+
+    def compact(self, partition_start: int) -> int:
+        """Merge the segments of one partition into a single segment. Returns 1 if merged."""
+        partition_dir = os.path.join(self.root, str(partition_start))
+        lock_dir = os.path.join(partition_dir, '.compacting')
+        with self._flush_lock:
+            segments = self._partition_segments(partition_start)
+            if len(segments) < 2:
+                return 0
+            try:
+                os.mkdir(lock_dir)  # Another worker sharing the directory may be compacting it
+            except FileExistsError:
+                return 0
+            try:
+                parts = [segment.decode_runs(np.arange(len(segment.mmsi))) for segment in segments]
+                names = [os.path.basename(segment.path) for segment in segments]
+                self._write_segment(partition_start,
+                                    {name: np.concatenate([part[name] for part in parts])
+                                     for name in ('mmsi',) + COLUMNS},
+                                    replaces=names)
+                self._evict(partition_dir)
+                for segment in segments:
+                    shutil.rmtree(segment.path, ignore_errors=True)
+            finally:
+                os.rmdir(lock_dir)
+        with self._lock:
+            self.stats['partitions_compacted'] += 1
+            self.stats['segments_compacted'] += len(segments)
+        logger.info(f"🗜️ Compacted {len(segments)} AIS track segments in partition {partition_start}")
+        return 1
+
+    def prune(self, before: float) -> int:
+        """Delete partitions that end before the given epoch time. Returns partitions removed."""
+        removed = 0
+        with self._flush_lock:
+            for partition_start in self._partition_starts():
+                if partition_start + self.partition_seconds <= before:
+                    path = os.path.join(self.root, str(partition_start))
+                    self._evict(path)
+                    shutil.rmtree(path, ignore_errors=True)
+                    removed += 1
+        if removed:
+            with self._lock:
+                self.stats['partitions_pruned'] += removed
+            logger.info(f"🧹 Pruned {removed} AIS track partitions")
+        return removed
+
+    def _evict(self, partition_dir: str):
+        """Close the cached memory maps of a partition's segments."""
+        with self._lock:
+            for key in [key for key in self._segments if key.startswith(partition_dir + os.sep)]:
+                del self._segments[key]
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def _partition_starts(self) -> List[int]:
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return []
+        return sorted(int(name) for name in names if name.lstrip('-').isdigit())
+
+    def _partition_segments(self, partition_start: int) -> List[_Segment]:
+        """Live segments of a partition, skipping those a compacted segment replaces."""
+        partition_dir = os.path.join(self.root, str(partition_start))
+        try:
+            names = sorted(name for name in os.listdir(partition_dir) if not name.startswith('.'))
+        except FileNotFoundError:
+            return []
+        segments = []
+        for name in names:
+            path = os.path.join(partition_dir, name)
+            with self._lock:
+                segment = self._segments.get(path)
+                if segment is not None:
+                    self._segments.move_to_end(path)
+            if segment is None:
+                try:
+                    segment = _Segment(path)
+                except (OSError, ValueError):
+                    continue  # Removed by a compaction or prune since the listing
+                with self._lock:
+                    self._segments[path] = segment
+                    while len(self._segments) > self.max_open_segments:
+                        self._segments.popitem(last=False)
+            segments.append(segment)
+        replaced = {name for segment in segments for name in segment.meta.get('replaces', ())}
+        return [segment for segment in segments if os.path.basename(segment.path) not in replaced]
+
+    def _segments_for(self, t0: Optional[float] = None, t1: Optional[float] = None) -> List[_Segment]:
+        """Segments whose partition and time range overlap [t0, t1] (epoch seconds; None = open)."""
+        segments = []
+        q0 = None if t0 is None else int(t0 * 1000)
+        q1 = None if t1 is None else int(t1 * 1000)
+        for partition_start in self._partition_starts():
+            if ((t0 is not None and partition_start + self.partition_seconds <= t0)
+                    or (t1 is not None and partition_start > t1)):
+                continue
+            for segment in self._partition_segments(partition_start):
+                if q0 is None or q1 is None or segment.overlaps(q0, q1):
+                    segments.append(segment)
+        return segments
+
+    def _pending_columns(self) -> Optional[Dict[str, np.ndarray]]:
+        with self._lock:
+            rows = self._flushing + self._buffer
+        return self._buffer_columns(rows) if rows else None
+
+    def _finish(self, parts: List[Dict[str, np.ndarray]], with_mmsi: bool) -> Dict[str, np.ndarray]:
+        """Concatenate quantised parts, sort by (MMSI,) time and convert to floats."""
+        parts = [part for part in parts if len(part['timestamp'])]
+        if not parts:
+            return _empty_result(with_mmsi)
+        merged = {name: np.concatenate([part[name] for part in parts]) for name in ('mmsi',) + COLUMNS}
+        keys = (merged['timestamp'], merged['mmsi']) if with_mmsi else (merged['timestamp'],)
+        order = np.lexsort(keys)
+        result = {column: _dequantise(column, merged[column][order]) for column in COLUMNS}
+        if with_mmsi:
+            result['mmsi'] = merged['mmsi'][order]
+        return result
+
+    def track(self, mmsi: Any, t0: float, t1: float) -> Dict[str, np.ndarray]:
+        """
+        Positions of one vessel with t0 <= timestamp <= t1 (epoch seconds),
+        sorted by time.
+
+        Returns:
+            Columns 'timestamp' (epoch seconds), 'lat', 'lon', 'sog', 'cog'
+            (NaN where not available)
+        """
+        mmsi = int(mmsi)
+        q0, q1 = int(t0 * 1000), int(t1 * 1000)
+        parts = []
+        for segment in self._segments_for(t0, t1):
+            run = int(np.searchsorted(segment.mmsi, mmsi))
+            if run >= len(segment.mmsi) or segment.mmsi[run] != mmsi:
+                continue
+            if segment.bounds[run, 0] > q1 or segment.bounds[run, 1] < q0:
+                continue
+            parts.append(segment.decode_runs(np.array([run])))
+
+        pending = self._pending_columns()
+        if pending is not None:
+            parts.append({name: values[pending['mmsi'] == mmsi] for name, values in pending.items()})
+
+        parts = [self._mask(part, (part['timestamp'] >= q0) & (part['timestamp'] <= q1)) for part in parts]
+        return self._finish(parts, with_mmsi=False)
+
+    def positions_in_bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+                          t0: float, t1: float) -> Dict[str, np.ndarray]:
+        """
+        Every position inside a bounding box during [t0, t1] (epoch seconds),
+        sorted by MMSI then time.
+
+        Returns:
+            Columns 'mmsi', 'timestamp', 'lat', 'lon', 'sog', 'cog'
+        """
+        q0, q1 = int(t0 * 1000), int(t1 * 1000)
+        box = _quantise('lat', [min_lat, max_lat]).tolist() + _quantise('lon', [min_lon, max_lon]).tolist()
+        lat0, lat1, lon0, lon1 = box
+        parts = []
+        for segment in self._segments_for(t0, t1):
+            s_lat0, s_lon0, s_lat1, s_lon1 = segment.meta['bbox']
+            if s_lat0 > lat1 or s_lat1 < lat0 or s_lon0 > lon1 or s_lon1 < lon0:
+                continue
+            bounds = np.asarray(segment.bounds)
+            runs = np.flatnonzero((bounds[:, 0] <= q1) & (bounds[:, 1] >= q0)
+                                  & (bounds[:, 2] <= lat1) & (bounds[:, 3] >= lat0)
+                                  & (bounds[:, 4] <= lon1) & (bounds[:, 5] >= lon0))
+            if len(runs):
+                parts.append(segment.decode_runs(runs))
+
+        pending = self._pending_columns()
+        if pending is not None:
+            parts.append(pending)
+
+        parts = [self._mask(part, (part['timestamp'] >= q0) & (part['timestamp'] <= q1)
+                            & (part['lat'] >= lat0) & (part['lat'] <= lat1)
+                            & (part['lon'] >= lon0) & (part['lon'] <= lon1)) for part in parts]
+        return self._finish(parts, with_mmsi=True)
+
+    @staticmethod
+    def _mask(part: Dict[str, np.ndarray], keep: np.ndarray) -> Dict[str, np.ndarray]:
+        return {name: values[keep] for name, values in part.items()}
+
+    def get_store_status(self) -> Dict:
+        """Partitions, rows and on-disk size of the store."""
+        partitions = self._partition_starts()
+        segments = self._segments_for()
+        rows = sum(segment.meta['rows'] for segment in segments)
+        disk_bytes = sum(os.path.getsize(os.path.join(segment.path, name))
+                         for segment in segments for name in os.listdir(segment.path))
+        with self._lock:
+            buffered = len(self._buffer) + len(self._flushing)
+            open_segments = len(self._segments)
+        return {
+            'root': self.root,
+            'partition_seconds': self.partition_seconds,
+            'retention_hours': self.retention_hours,
+            'partitions': len(partitions),
+            'segments': len(segments),
+            'rows': rows,
+            'disk_bytes': disk_bytes,
+            'bytes_per_row': round(disk_bytes / rows, 2) if rows else None,
+            'buffered_rows': buffered,
+            'open_segments': open_segments,
+            **self.stats,
+        }
+
+
+# Global track store fed by the vessel state store
+ais_track_store = AISTrackStore()
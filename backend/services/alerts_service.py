@@ -10,6 +10,14 @@ from datetime import datetime, timedelta
 import math
 import os
 
+import numpy as np
+
+from backend.services.encounter_screening import (
+    ENCOUNTER_HORIZON_MINUTES, encounter_screener, vessel_columns
+)
+from backend.services.spatial_queries import spatial_queries
+from backend.utils.spatial_index import haversine_km_np
+
 logger = logging.getLogger(__name__)
 
 
@@ -26,6 +34,7 @@ class AlertType:
     WEATHER = "WEATHER"
     TURBINE = "WIND_TURBINE"
     TANKER = "TANKER_PROXIMITY"
+    COLLISION = "COLLISION_RISK"
     HAZARD = "HAZARD_PROXIMITY"
     ROUTE = "ROUTE_DEVIATION"
     SYSTEM = "SYSTEM_STATUS"
@@ -52,6 +61,11 @@ class MaritimeAlertsService:
         'tanker_critical': 800,       # meters - Critical for hazardous cargo
         'tanker_warning': 1500,       # meters - Warning distance
         
+        # Encounter screening (closest point of approach within the horizon)
+        'cpa_critical': 500,          # meters - Critical CPA
+        'cpa_warning': 1000,          # meters - Warning CPA
+        'tcpa_horizon_minutes': ENCOUNTER_HORIZON_MINUTES,
+        
         # Route deviation
         'route_deviation_critical': 10.0,  # km - Critical deviation
         'route_deviation_warning': 5.0,    # km - Warning deviation
@@ -88,11 +102,15 @@ class MaritimeAlertsService:
         }
     ]
     
+    TANKER_TYPES = ('tanker', 'oil', 'chemical', 'lng', 'gas')
+    
     def __init__(self):
         """Initialize with service references."""
         self._last_update = datetime.now()
         self._alert_cache = {}
         self._cache_duration = timedelta(minutes=1)  # 1 minute cache
+        # hazard_zones source keys of NORWEGIAN_WIND_FARMS, once synced to PostGIS
+        self._wind_farm_keys = None
         
         logger.info("✅ MaritimeAlertsService initialized for Norwegian waters")
         logger.info(f"   Wind farms monitored: {len(self.NORWEGIAN_WIND_FARMS)}")
@@ -104,7 +122,12 @@ class MaritimeAlertsService:
         
         Args:
             vessel: Vessel data from AIS
-            context: Weather, other vessels, hazards
+            context: Weather, other vessels, hazards. A fleet sweep should pass
+                'encounter_alerts' from generate_encounter_alerts instead of
+                'other_vessels' to avoid screening the fleet once per vessel,
+                and may pass 'turbine_alerts' from generate_turbine_alerts.
+                A vessel on a known route may pass 'corridor', the
+                LegCandidates of its current leg (see route_corridor).
             
         Returns:
             List of actionable alerts
@@ -129,15 +152,23 @@ class MaritimeAlertsService:
         alerts.extend(weather_alerts)
         
         # 2. Wind turbine proximity alerts
-        turbine_alerts = self._check_wind_turbine_proximity(
-            vessel_lat, vessel_lon, vessel_name
-        )
+        if 'turbine_alerts' in context:
+            turbine_alerts = [dict(alert) for alert in context['turbine_alerts'].get(str(vessel_mmsi), [])]
+        else:
+            corridor = context.get('corridor')
+            turbine_alerts = self._check_wind_turbine_proximity(
+                vessel_lat, vessel_lon, vessel_name,
+                farm_indexes=corridor.wind_farms if corridor is not None else None
+            )
         alerts.extend(turbine_alerts)
         
-        # 3. Tanker proximity alerts
-        tanker_alerts = self._check_tanker_proximity(
-            vessel, context.get('other_vessels', [])
-        )
+        # 3. Tanker proximity / collision alerts
+        if 'encounter_alerts' in context:
+            tanker_alerts = [dict(alert) for alert in context['encounter_alerts'].get(str(vessel_mmsi), [])]
+        else:
+            tanker_alerts = self._check_tanker_proximity(
+                vessel, context.get('other_vessels', [])
+            )
         alerts.extend(tanker_alerts)
         
         # 4. Speed condition alerts
@@ -160,6 +191,66 @@ class MaritimeAlertsService:
         
         return alerts
     
+    def screen_track(self, lat, lon, speed, vessel_type: str, wind_speed_ms=0.0,
+                     wave_height_m=0.0, hours=None) -> Dict[str, np.ndarray]:
+        """
+        Array version of the position, speed and time checks in
+        generate_vessel_alerts, for many positions of one vessel at once
+        (e.g. a simulated voyage timeline). No alert dictionaries are built.
+        
+        Args:
+            lat, lon, speed: Arrays of positions and speeds (knots)
+            vessel_type: Vessel type used for the safe-speed limit
+            wind_speed_ms, wave_height_m: Weather per position (array or scalar, NaN = none)
+            hours: UTC hour of day per position; defaults to the current hour
+            
+        Returns:
+            Boolean mask per check ('turbine_critical', 'turbine_warning',
+            'excessive_speed', 'night_operations') plus 'count', the number of
+            alerts generate_vessel_alerts would return at each position
+        """
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        n = len(lat)
+        speed = np.broadcast_to(np.asarray(speed, dtype=float), (n,))
+        wind = np.nan_to_num(np.broadcast_to(np.asarray(wind_speed_ms, dtype=float), (n,)))
+        wave = np.nan_to_num(np.broadcast_to(np.asarray(wave_height_m, dtype=float), (n,)))
+        hour = np.broadcast_to(np.asarray(datetime.utcnow().hour if hours is None else hours), (n,))
+        
+        # generate_vessel_alerts returns nothing for a missing (or zero) position
+        has_position = np.isfinite(lat) & np.isfinite(lon) & (lat != 0) & (lon != 0)
+        count = np.zeros(n, dtype=np.int16)
+        
+        turbine_critical = np.zeros(n, dtype=bool)
+        turbine_warning = np.zeros(n, dtype=bool)
+        for wind_farm in self.NORWEGIAN_WIND_FARMS:
+            distance = haversine_km_np(lat, lon, wind_farm['lat'], wind_farm['lon']) * 1000
+            inside = has_position & (distance <= wind_farm['radius_m'])
+            critical = inside & (distance <= self.SAFETY_THRESHOLDS['turbine_critical'])
+            warning = inside & ~critical & (distance <= self.SAFETY_THRESHOLDS['turbine_warning'])
+            turbine_critical |= critical
+            turbine_warning |= warning
+            count += critical | warning
+        
+        # Same reductions as _calculate_safe_speed
+        base_speed = self._calculate_safe_speed(vessel_type.lower(), {})
+        reduction = (1.0 - 0.1 * (wind > 10) - 0.2 * (wind > 15)
+                     - 0.15 * (wave > 2.0) - 0.25 * (wave > 3.0))
+        safe_speed = np.maximum(5.0, base_speed * reduction)
+        excessive_speed = (has_position & (speed > 0)
+                           & (speed > safe_speed * (1 + self.SAFETY_THRESHOLDS['speed_excessive'])))
+        night_operations = has_position & ((hour >= 18) | (hour <= 6))
+        count += excessive_speed
+        count += night_operations
+        
+        return {
+            'turbine_critical': turbine_critical,
+            'turbine_warning': turbine_warning,
+            'excessive_speed': excessive_speed,
+            'night_operations': night_operations,
+            'count': count,
+        }
+    
     def _check_weather_conditions(self, weather_data: Dict, vessel_type: str) -> List[Dict]:
         """Check weather conditions against Norwegian safety thresholds."""
         alerts = []
@@ -222,47 +313,141 @@ class MaritimeAlertsService:
         
         return alerts
     
-    def _check_wind_turbine_proximity(self, lat: float, lon: float, vessel_name: str) -> List[Dict]:
-        """Check proximity to Norwegian wind farms."""
+    def _check_wind_turbine_proximity(self, lat: float, lon: float, vessel_name: str,
+                                      farm_indexes: Optional[np.ndarray] = None) -> List[Dict]:
+        """
+        Check proximity to Norwegian wind farms.
+        farm_indexes: NORWEGIAN_WIND_FARMS positions to check instead of all (route corridor)
+        """
+        farms = (self.NORWEGIAN_WIND_FARMS if farm_indexes is None
+                 else [self.NORWEGIAN_WIND_FARMS[i] for i in farm_indexes.tolist()])
         alerts = []
+        for wind_farm in farms:
+            distance = self._calculate_distance_meters(lat, lon, wind_farm['lat'], wind_farm['lon'])
+            if distance > wind_farm['radius_m']:
+                continue
+            alert = self._turbine_alert(wind_farm, distance)
+            if alert:
+                alerts.append(alert)
+        return alerts
+    
+    def _wind_farm_matches(self, lats: List[float], lons: List[float]) -> Optional[List[List[Tuple[Dict, float]]]]:
+        """
+        Wind farms whose footprint contains each position, as (wind farm,
+        distance to its centre in meters) in NORWEGIAN_WIND_FARMS order.
+        One PostGIS query for all positions; None if PostGIS is unavailable
+        or the synced rows were replaced by another process.
+        """
+        if self._wind_farm_keys is None:
+            # The wind farm list is static: written once, then only queried
+            self._wind_farm_keys = spatial_queries.sync_point_hazards([
+                {'type': 'wind_farm', 'name': farm['name'], 'latitude': farm['lat'],
+                 'longitude': farm['lon'], 'radius_m': farm['radius_m']}
+                for farm in self.NORWEGIAN_WIND_FARMS
+            ], ['wind_farm'])
+            if self._wind_farm_keys is None:
+                return None
+        rows = spatial_queries.hazards_near_points(lats, lons, 0.0, ['wind_farm'])
+        matched = spatial_queries.match_synced(rows, self._wind_farm_keys, ['wind_farm']) if rows is not None else None
+        if matched is None:
+            return None
+        
+        matches = [[] for _ in lats]
+        for row, farm_index in matched:
+            matches[row['point_index']].append((farm_index, row['centroid_distance_m']))
+        return [[(self.NORWEGIAN_WIND_FARMS[i], distance) for i, distance in sorted(point)] for point in matches]
+    
+    def _turbine_alert(self, wind_farm: Dict, distance: float) -> Optional[Dict]:
+        """Alert for a vessel inside a wind farm footprint, or None beyond the warning distance."""
+        if distance <= self.SAFETY_THRESHOLDS['turbine_critical']:
+            return {
+                'type': AlertType.TURBINE,
+                'priority': AlertPriority.CRITICAL,
+                'message': f'CRITICAL: Within {distance:.0f}m of {wind_farm["name"]} wind farm',
+                'details': {
+                    'wind_farm': wind_farm['name'],
+                    'distance_meters': int(distance),
+                    'farm_type': wind_farm['type'],
+                    'capacity_mw': wind_farm['capacity_mw'],
+                    'recommendation': 'Immediate course correction required'
+                }
+            }
+        if distance <= self.SAFETY_THRESHOLDS['turbine_warning']:
+            return {
+                'type': AlertType.TURBINE,
+                'priority': AlertPriority.HIGH,
+                'message': f'WARNING: Approaching {wind_farm["name"]} wind farm',
+                'details': {
+                    'wind_farm': wind_farm['name'],
+                    'distance_meters': int(distance),
+                    'farm_type': wind_farm['type'],
+                    'recommendation': 'Adjust course to maintain safe distance'
+                }
+            }
+        return None
+    
+    def generate_turbine_alerts(self, vessels: List[Dict]) -> Dict[str, List[Dict]]:
+        """
+        Wind farm proximity alerts for a whole fleet snapshot, from one
+        PostGIS query when available.
         
-        for wind_farm in self.NORWEGIAN_WIND_FARMS:
-            distance = self._calculate_distance_meters(
-                lat, lon,
-                wind_farm['lat'], wind_farm['lon']
-            )
+        Returns:
+            Alerts keyed by vessel MMSI (only vessels with alerts)
+        """
+        positioned = [vessel for vessel in vessels if vessel.get('lat') and vessel.get('lon')]
+        matches = self._wind_farm_matches([vessel['lat'] for vessel in positioned],
+                                          [vessel['lon'] for vessel in positioned]) if positioned else []
+        
+        alerts = {}
+        for k, vessel in enumerate(positioned):
+            if matches is None:
+                vessel_alerts = self._check_wind_turbine_proximity(vessel['lat'], vessel['lon'], vessel.get('name'))
+            else:
+                vessel_alerts = [alert for alert in (self._turbine_alert(farm, distance)
+                                                     for farm, distance in matches[k]) if alert]
+            if vessel_alerts:
+                alerts.setdefault(str(vessel.get('mmsi')), []).extend(vessel_alerts)
+        return alerts
+    
+    def generate_encounter_alerts(self, vessels: List[Dict]) -> Dict[str, List[Dict]]:
+        """
+        Tanker proximity and collision-risk alerts for a whole fleet snapshot
+        from one CPA/TCPA sweep.
+        
+        Args:
+            vessels: AIS vessel dicts with position, SOG and COG
             
-            if distance <= wind_farm['radius_m']:
-                if distance <= self.SAFETY_THRESHOLDS['turbine_critical']:
-                    alerts.append({
-                        'type': AlertType.TURBINE,
-                        'priority': AlertPriority.CRITICAL,
-                        'message': f'CRITICAL: Within {distance:.0f}m of {wind_farm["name"]} wind farm',
-                        'details': {
-                            'wind_farm': wind_farm['name'],
-                            'distance_meters': int(distance),
-                            'farm_type': wind_farm['type'],
-                            'capacity_mw': wind_farm['capacity_mw'],
-                            'recommendation': 'Immediate course correction required'
-                        }
-                    })
-                elif distance <= self.SAFETY_THRESHOLDS['turbine_warning']:
-                    alerts.append({
-                        'type': AlertType.TURBINE,
-                        'priority': AlertPriority.HIGH,
-                        'message': f'WARNING: Approaching {wind_farm["name"]} wind farm',
-                        'details': {
-                            'wind_farm': wind_farm['name'],
-                            'distance_meters': int(distance),
-                            'farm_type': wind_farm['type'],
-                            'recommendation': 'Adjust course to maintain safe distance'
-                        }
-                    })
+        Returns:
+            Alerts keyed by vessel MMSI (only vessels with alerts)
+        """
+        alerts = {}
+        if not vessels:
+            return alerts
+        
+        threshold_m = max(self.SAFETY_THRESHOLDS['tanker_warning'], self.SAFETY_THRESHOLDS['cpa_warning'])
+        pairs = encounter_screener.screen(
+            vessel_columns(vessels),
+            cpa_threshold_nm=threshold_m / 1852.0,
+            horizon_minutes=self.SAFETY_THRESHOLDS['tcpa_horizon_minutes']
+        )
+        tankers = [self._is_tanker(vessel) for vessel in vessels]
         
+        for i, j, cpa_nm, tcpa, range_nm in zip(pairs.i.tolist(), pairs.j.tolist(), pairs.cpa_nm.tolist(),
+                                                 pairs.tcpa_minutes.tolist(), pairs.range_nm.tolist()):
+            if vessels[i].get('mmsi') == vessels[j].get('mmsi'):
+                continue
+            for own, other in ((i, j), (j, i)):
+                alert = self._encounter_alert(vessels[other], tankers[other],
+                                              cpa_nm * 1852.0, tcpa, range_nm * 1852.0)
+                if alert:
+                    alerts.setdefault(str(vessels[own].get('mmsi')), []).append(alert)
+        
+        logger.debug(f"🛟 Encounter sweep: {len(vessels)} vessels, {len(pairs)} pairs, "
+                     f"{pairs.stats['elapsed_ms']:.1f}ms")
         return alerts
     
     def _check_tanker_proximity(self, vessel: Dict, all_vessels: List[Dict]) -> List[Dict]:
-        """Check proximity to tankers (hazardous materials)."""
+        """Check closest point of approach to tankers (hazardous materials)."""
         alerts = []
         
         vessel_lat = vessel.get('lat')
@@ -272,53 +457,91 @@ class MaritimeAlertsService:
         if not vessel_lat or not vessel_lon:
             return alerts
         
-        for other_vessel in all_vessels:
-            # Skip self and vessels without position
-            if (other_vessel.get('mmsi') == vessel_mmsi or 
-                not other_vessel.get('lat') or 
-                not other_vessel.get('lon')):
-                continue
-            
-            # Check if it's a tanker
-            vessel_type = str(other_vessel.get('type', '')).lower()
-            is_tanker = any(tanker_type in vessel_type 
-                           for tanker_type in ['tanker', 'oil', 'chemical', 'lng', 'gas'])
-            
-            if is_tanker:
-                distance = self._calculate_distance_meters(
-                    vessel_lat, vessel_lon,
-                    other_vessel.get('lat'), other_vessel.get('lon')
-                )
-                
-                tanker_name = other_vessel.get('name', 'Unknown tanker')
-                
-                if distance <= self.SAFETY_THRESHOLDS['tanker_critical']:
-                    alerts.append({
-                        'type': AlertType.TANKER,
-                        'priority': AlertPriority.CRITICAL,
-                        'message': f'CRITICAL: Close to {tanker_name} ({distance:.0f}m)',
-                        'details': {
-                            'tanker_name': tanker_name,
-                            'tanker_type': vessel_type,
-                            'distance_meters': int(distance),
-                            'tanker_mmsi': other_vessel.get('mmsi'),
-                            'recommendation': 'Increase distance immediately, avoid crossing bow'
-                        }
-                    })
-                elif distance <= self.SAFETY_THRESHOLDS['tanker_warning']:
-                    alerts.append({
-                        'type': AlertType.TANKER,
-                        'priority': AlertPriority.HIGH,
-                        'message': f'WARNING: Tanker in vicinity - {tanker_name}',
-                        'details': {
-                            'tanker_name': tanker_name,
-                            'distance_meters': int(distance),
-                            'recommendation': 'Monitor closely, prepare for course adjustment'
-                        }
-                    })
+        # Skip self and vessels without position
+        tankers = [other_vessel for other_vessel in all_vessels
+                   if other_vessel.get('mmsi') != vessel_mmsi
+                   and other_vessel.get('lat') and other_vessel.get('lon')
+                   and self._is_tanker(other_vessel)]
+        if not tankers:
+            return alerts
+        
+        pairs = encounter_screener.screen(
+            vessel_columns([vessel] + tankers),
+            cpa_threshold_nm=self.SAFETY_THRESHOLDS['tanker_warning'] / 1852.0,
+            horizon_minutes=self.SAFETY_THRESHOLDS['tcpa_horizon_minutes']
+        )
+        own = (pairs.i == 0) | (pairs.j == 0)
+        for other, cpa_nm, tcpa, range_nm in zip((pairs.i + pairs.j)[own].tolist(), pairs.cpa_nm[own].tolist(),
+                                                 pairs.tcpa_minutes[own].tolist(), pairs.range_nm[own].tolist()):
+            alert = self._encounter_alert(tankers[other - 1], True, cpa_nm * 1852.0, tcpa, range_nm * 1852.0)
+            if alert:
+                alerts.append(alert)
         
         return alerts
     
+    def _is_tanker(self, vessel: Dict) -> bool:
+        vessel_type = str(vessel.get('type', '')).lower()
+        return any(tanker_type in vessel_type for tanker_type in self.TANKER_TYPES)
+    
+    def _encounter_alert(self, other_vessel: Dict, other_is_tanker: bool, cpa: float,
+                         tcpa: float, distance: float) -> Optional[Dict]:
+        """Alert for an encounter with other_vessel (CPA and distance in meters, TCPA in minutes)."""
+        if other_is_tanker:
+            tanker_name = other_vessel.get('name', 'Unknown tanker')
+            approach = {'cpa_meters': int(cpa), 'tcpa_minutes': round(tcpa, 1)}
+            
+            if cpa <= self.SAFETY_THRESHOLDS['tanker_critical']:
+                message = (f'CRITICAL: Close to {tanker_name} ({distance:.0f}m)' if tcpa < 1
+                           else f'CRITICAL: Closing on {tanker_name} - CPA {cpa:.0f}m in {tcpa:.0f} min')
+                return {
+                    'type': AlertType.TANKER,
+                    'priority': AlertPriority.CRITICAL,
+                    'message': message,
+                    'details': {
+                        'tanker_name': tanker_name,
+                        'tanker_type': str(other_vessel.get('type', '')).lower(),
+                        'distance_meters': int(distance),
+                        'tanker_mmsi': other_vessel.get('mmsi'),
+                        **approach,
+                        'recommendation': 'Increase distance immediately, avoid crossing bow'
+                    }
+                }
+            if cpa <= self.SAFETY_THRESHOLDS['tanker_warning']:
+                return {
+                    'type': AlertType.TANKER,
+                    'priority': AlertPriority.HIGH,
+                    'message': f'WARNING: Tanker in vicinity - {tanker_name}',
+                    'details': {
+                        'tanker_name': tanker_name,
+                        'distance_meters': int(distance),
+                        **approach,
+                        'recommendation': 'Monitor closely, prepare for course adjustment'
+                    }
+                }
+            return None
+        
+        # Collision risk only for closing vessels - moored or diverging neighbours are not alerted
+        if tcpa <= 0 or cpa > self.SAFETY_THRESHOLDS['cpa_warning']:
+            return None
+        
+        other_name = other_vessel.get('name', 'Unknown vessel')
+        critical = cpa <= self.SAFETY_THRESHOLDS['cpa_critical']
+        return {
+            'type': AlertType.COLLISION,
+            'priority': AlertPriority.CRITICAL if critical else AlertPriority.HIGH,
+            'message': (f'{"CRITICAL" if critical else "WARNING"}: Collision risk with {other_name} - '
+                        f'CPA {cpa:.0f}m in {tcpa:.0f} min'),
+            'details': {
+                'other_name': other_name,
+                'other_mmsi': other_vessel.get('mmsi'),
+                'distance_meters': int(distance),
+                'cpa_meters': int(cpa),
+                'tcpa_minutes': round(tcpa, 1),
+                'recommendation': ('Alter course to starboard now, sound signals' if critical
+                                   else 'Monitor closely, prepare for course adjustment')
+            }
+        }
+    
     def _check_speed_conditions(self, vessel: Dict, weather_data: Dict) -> List[Dict]:
         """Check if vessel speed is appropriate for conditions."""
         alerts = []
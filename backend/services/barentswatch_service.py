@@ -20,6 +20,9 @@ import re
 import time
 import math
 
+from backend.services.http_client import upstream_client
+from backend.services.vessel_state_store import vessel_state_store
+
 logger = logging.getLogger(__name__)
 
 class BarentswatchService:
@@ -165,11 +168,13 @@ class BarentswatchService:
             
             logger.info(f"🔑 Requesting new token with scope: '{self.scope}'")
             
-            response = requests.post(
+            # Client-credentials grants are safe to repeat, so this POST is retried too
+            response = upstream_client.post(
                 self.token_url, 
                 data=auth_data, 
                 headers=headers, 
-                timeout=30
+                timeout=30,
+                retries=upstream_client.max_retries
             )
             
             if response.status_code == 200:
@@ -326,7 +331,7 @@ class BarentswatchService:
             logger.info(f"🌐 Fetching real-time AIS data from {url}")
             start_time = time.time()
             
-            response = requests.get(url, headers=headers, params=params, timeout=30)
+            response = upstream_client.get(url, headers=headers, params=params, timeout=30)
             response_time = time.time() - start_time
             
             if response.status_code == 200:
@@ -340,6 +345,7 @@ class BarentswatchService:
                         vessel['timestamp'] = datetime.now().isoformat()
                         vessel['api_response_time'] = f"{response_time:.2f}s"
                     
+                    vessel_state_store.upsert_many(data, data_source='barentswatch')
                     return data
                 else:
                     logger.warning(f"⚠️ AIS API returned unexpected data format: {type(data)}")
@@ -353,12 +359,13 @@ class BarentswatchService:
                 
                 if token:
                     headers['Authorization'] = f'Bearer {token}'
-                    retry_response = requests.get(url, headers=headers, params=params, timeout=30)
+                    retry_response = upstream_client.get(url, headers=headers, params=params, timeout=30)
                     
                     if retry_response.status_code == 200:
                         data = retry_response.json()
                         if isinstance(data, list):
                             logger.info(f"✅ Retrieved {len(data)} vessels after token refresh")
+                            vessel_state_store.upsert_many(data, data_source='barentswatch')
                             return data
                 
                 return []
@@ -405,19 +412,19 @@ class BarentswatchService:
         
         bbox = f"{lon - lon_delta:.4f},{lat - lat_delta:.4f},{lon + lon_delta:.4f},{lat + lat_delta:.4f}"
         
-        # Get vessels
-        vessels = self.get_vessel_positions(bbox=bbox, limit=50)
+        # Refresh the area; get_vessel_positions publishes to the vessel state store
+        self.get_vessel_positions(bbox=bbox, limit=50)
+        
+        # Answer from the store's spatial index (standard field names,
+        # nearest first, only vessels inside the radius)
+        vessels = vessel_state_store.vessels_near(
+            lat, lon, radius_km, limit=50, data_source='barentswatch'
+        )
         
         # Add city information
         for vessel in vessels:
             vessel['nearest_city'] = city_name
             vessel['search_radius_km'] = radius_km
-            # Ensure standard field names
-            vessel['name'] = vessel.get('name', vessel.get('Name', 'Unknown'))
-            vessel['latitude'] = vessel.get('latitude', vessel.get('lat', 0))
-            vessel['longitude'] = vessel.get('longitude', vessel.get('lon', 0))
-            vessel['speed'] = vessel.get('speed', vessel.get('SOG', 0))
-            vessel['course'] = vessel.get('course', vessel.get('COG', 0))
         
         logger.info(f"📊 Found {len(vessels)} BarentsWatch vessels near {city_name}")
         return vessels
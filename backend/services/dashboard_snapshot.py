@@ -0,0 +1,207 @@
+"""
+Dashboard Snapshot - background-refreshed, versioned payload for /maritime/dashboard.
+Route-derived data (routes, port counts, waypoints, pre-serialised JSON) is
+rebuilt only when the RTZ files change; live parts (captured vessel, weather,
+empirical report) refresh on their own cadences in a daemon thread.
+Request handlers only read the snapshot, merge it into a context and render.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Render latencies kept for the p50/p99 metrics
+LATENCY_WINDOW = 1000
+
+# How often the refresh thread wakes up to check what is due
+TICK_SECONDS = 1.0
+
+
+def rtz_fingerprint(base_path: str) -> str:
+    """
+    Cheap change detector for the RTZ asset tree: hash of every .rtz file's
+    path, size and modification time (no file contents are read).
+    """
+    digest = hashlib.sha1()
+    for dirpath, dirnames, filenames in os.walk(base_path):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if not filename.lower().endswith('.rtz'):
+                continue
+            path = os.path.join(dirpath, filename)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            digest.update(f"{path}|{stat.st_size}|{stat.st_mtime_ns}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+class DashboardSnapshot:
+    """
+    Versioned dashboard payload with independently refreshed parts.
+
+    Args:
+        build_routes: Builds the route-derived part of the dashboard context
+        fingerprint: Returns a token that changes whenever the RTZ inputs change
+        live_sources: name -> (fetch function, refresh interval in seconds)
+        route_check_seconds: How often the RTZ fingerprint is re-checked
+    """
+
+    def __init__(self, build_routes: Callable[[], Dict], fingerprint: Callable[[], str],
+                 live_sources: Dict[str, Tuple[Callable[[], object], float]],
+                 route_check_seconds: float = 30.0):
+        self._build_routes = build_routes
+        self._fingerprint = fingerprint
+        self._live_sources = live_sources
+        self.route_check_seconds = route_check_seconds
+
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._routes: Optional[Dict] = None
+        self._route_fingerprint: Optional[str] = None
+        self._route_checked_at = 0.0
+        self._live: Dict[str, object] = {}
+        self._live_updated: Dict[str, float] = {}
+        self.version = 0
+
+        self._render_ms = deque(maxlen=LATENCY_WINDOW)
+        self._render_count = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._app = None
+        self.stats = {'route_builds': 0, 'live_refreshes': 0, 'refresh_errors': 0}
+
+    # ------------------------------------------------------------------
+    # Background refresh
+    # ------------------------------------------------------------------
+
+    def start(self, app=None):
+        """Start the refresh thread once; live fetches run inside app's context."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._app = app
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._refresh_loop, daemon=True,
+                                        name='dashboard-snapshot')
+        self._thread.start()
+        logger.info("📸 Dashboard snapshot refresher started")
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    def _refresh_loop(self):
+        while not self._stop_event.wait(TICK_SECONDS):
+            try:
+                if self._app is not None:
+                    with self._app.app_context():
+                        self.refresh_due()
+                else:
+                    self.refresh_due()
+            except Exception as e:
+                self.stats['refresh_errors'] += 1
+                logger.error(f"❌ Dashboard snapshot refresh failed: {e}")
+
+    def refresh_due(self, now: Optional[float] = None):
+        """Refresh whichever parts are due; safe to call from any thread."""
+        now = time.monotonic() if now is None else now
+        with self._refresh_lock:
+            if self._routes is None or now - self._route_checked_at >= self.route_check_seconds:
+                self.refresh_routes(now=now)
+            for name, (_, interval) in self._live_sources.items():
+                if name not in self._live_updated or now - self._live_updated[name] >= interval:
+                    self.refresh_live(name, now=now)
+
+    def refresh_routes(self, force: bool = False, now: Optional[float] = None) -> bool:
+        """Rebuild the route-derived part if the RTZ fingerprint changed."""
+        self._route_checked_at = time.monotonic() if now is None else now
+        fingerprint = self._fingerprint()
+        if not force and self._routes is not None and fingerprint == self._route_fingerprint:
+            return False
+
+        start = time.perf_counter()
+        routes = self._build_routes()
+        with self._lock:
+            self._routes = routes
+            self._route_fingerprint = fingerprint
+            self.version += 1
+        self.stats['route_builds'] += 1
+        logger.info(f"📸 Dashboard routes rebuilt (version {self.version}, "
+                    f"{(time.perf_counter() - start) * 1000:.0f} ms)")
+        return True
+
+    def refresh_live(self, name: str, now: Optional[float] = None):
+        """Fetch one live part; on failure the previous value is kept."""
+        fetch, _ = self._live_sources[name]
+        try:
+            value = fetch()
+        except Exception as e:
+            self.stats['refresh_errors'] += 1
+            logger.warning(f"⚠️ Dashboard live part '{name}' refresh failed: {e}")
+            value = self._live.get(name)
+        with self._lock:
+            self._live[name] = value
+            self._live_updated[name] = time.monotonic() if now is None else now
+            self.version += 1
+        self.stats['live_refreshes'] += 1
+
+    # ------------------------------------------------------------------
+    # Read path
+    # ------------------------------------------------------------------
+
+    def get(self) -> Dict:
+        """
+        Current snapshot. Only the very first call (before the refresher has
+        run) builds anything synchronously.
+        """
+        if self._routes is None or len(self._live_updated) < len(self._live_sources):
+            self.refresh_due()
+
+        with self._lock:
+            now = time.monotonic()
+            return {
+                'version': self.version,
+                'routes': self._routes,
+                'live': dict(self._live),
+                'live_age_seconds': {name: round(now - updated, 1)
+                                     for name, updated in self._live_updated.items()},
+            }
+
+    def record_render(self, elapsed_ms: float):
+        with self._lock:
+            self._render_ms.append(elapsed_ms)
+            self._render_count += 1
+
+    def get_metrics(self) -> Dict:
+        """Render latency percentiles plus refresh state."""
+        with self._lock:
+            samples = np.fromiter(self._render_ms, dtype=np.float64, count=len(self._render_ms))
+            now = time.monotonic()
+            metrics = {
+                'version': self.version,
+                'route_fingerprint': self._route_fingerprint,
+                'renders': self._render_count,
+                'window': len(samples),
+                'live_age_seconds': {name: round(now - updated, 1)
+                                     for name, updated in self._live_updated.items()},
+                'refresher_running': self._thread is not None and self._thread.is_alive(),
+                'stats': dict(self.stats),
+            }
+        if len(samples):
+            p50, p99 = np.percentile(samples, [50, 99])
+            metrics.update({'p50_ms': round(float(p50), 2), 'p99_ms': round(float(p99), 2),
+                            'max_ms': round(float(samples.max()), 2)})
+        else:
+            metrics.update({'p50_ms': None, 'p99_ms': None, 'max_ms': None})
+        return metrics
@@ -10,6 +10,8 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime, timezone
 import math
 
+from backend.services.vessel_state_store import vessel_state_store
+
 # Import empirical data sources
 try:
     from backend.services.kystdatahuset_adapter import kystdatahuset_adapter
@@ -280,8 +282,15 @@ class EmpiricalMaritimeService:
             'positions': []
         }
         
+        # Shared vessel state store holds the latest position from every
+        # source, so a live vessel is found without querying each city
+        stored = vessel_state_store.get(mmsi)
+        if stored:
+            tracking_data['positions'].append(stored)
+            tracking_data['sources_checked'].append('vessel_state_store')
+        
         # Check Kystdatahuset
-        if KYSTDATAHUSET_AVAILABLE:
+        if KYSTDATAHUSET_AVAILABLE and not tracking_data['positions']:
             try:
                 # Search in all 10 cities
                 for city_name in self.NORWEGIAN_CITIES:
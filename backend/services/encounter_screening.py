@@ -0,0 +1,205 @@
+"""
+Encounter Screening - fleet-wide CPA/TCPA screening with a spatial hash.
+Each vessel is entered into the spatial-hash cells covered by the box it
+sweeps over the look-ahead horizon (padded by half the CPA threshold), so
+only vessels whose boxes overlap can come within the threshold in time.
+CPA (closest point of approach) and TCPA (time to it) are then computed
+from SOG/COG for those candidate pairs only, all in NumPy.
+
+Positions use a local flat-earth approximation (nautical miles), which is
+accurate at the few-nautical-mile scales encounters happen at.
+"""
+
+import logging
+import os
+import time
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ENCOUNTER_HORIZON_MINUTES = float(os.getenv("ENCOUNTER_HORIZON_MINUTES", "12"))
+
+# SOG above this is treated as implausible when sizing hash cells and computing
+# motion; AIS 102.3 kn (and NaN) means "not available" and counts as stationary
+MAX_PLAUSIBLE_SOG_KNOTS = 50.0
+SOG_NOT_AVAILABLE = 102.2
+
+# Hash cell edge (arc-minutes, ~nm) - at least twice the CPA threshold
+CELL_NM = float(os.getenv("ENCOUNTER_CELL_NM", "2.0"))
+
+# Slack on the swept-box padding for the latitude scaling between nearby vessels
+CELL_MARGIN = 1.05
+
+_KEY_STRIDE = 1 << 32
+
+
+def vessel_columns(vessels: Sequence[Dict]) -> Dict[str, np.ndarray]:
+    """
+    Columnar lat/lon/sog/cog arrays from AIS vessel dicts ('speed' and
+    'course'/'heading' are used when 'sog'/'cog' are missing).
+    """
+    def numeric(*keys):
+        values = []
+        for vessel in vessels:
+            value = next((vessel.get(key) for key in keys if vessel.get(key) is not None), None)
+            values.append(np.nan if value is None else value)
+        return np.array(values, dtype=float)
+
+    return {
+        'lat': numeric('lat', 'latitude'),
+        'lon': numeric('lon', 'longitude'),
+        'sog': numeric('sog', 'speed'),
+        'cog': numeric('cog', 'course', 'heading'),
+    }
+
+
+class EncounterPairs:
+    """Screened vessel pairs (indices into the input columns) with CPA/TCPA."""
+
+    def __init__(self, i: np.ndarray, j: np.ndarray, cpa_nm: np.ndarray, tcpa_minutes: np.ndarray,
+                 range_nm: np.ndarray, stats: Dict):
+        self.i = i
+        self.j = j
+        self.cpa_nm = cpa_nm
+        self.tcpa_minutes = tcpa_minutes
+        self.range_nm = range_nm
+        self.stats = stats
+
+    def __len__(self) -> int:
+        return len(self.i)
+
+
+class EncounterScreener:
+    """
+    CPA/TCPA screening for a whole fleet snapshot.
+
+    Args:
+        horizon_minutes: Look-ahead for the TCPA window
+        cpa_threshold_nm: Pairs whose CPA within the horizon is at or below
+            this distance are reported
+    """
+
+    def __init__(self, horizon_minutes: float = ENCOUNTER_HORIZON_MINUTES, cpa_threshold_nm: float = 1.0):
+        self.horizon_minutes = horizon_minutes
+        self.cpa_threshold_nm = cpa_threshold_nm
+        self.stats = {'sweeps': 0, 'vessels': 0, 'candidates': 0, 'encounters': 0, 'last_ms': 0.0}
+
+    def screen(self, columns: Dict[str, np.ndarray], cpa_threshold_nm: Optional[float] = None,
+               horizon_minutes: Optional[float] = None) -> EncounterPairs:
+        """
+        Find every pair that comes within the CPA threshold inside the horizon
+        (or is already within it).
+
+        Args:
+            columns: 'lat', 'lon', 'sog' (knots) and 'cog' (degrees) arrays (see vessel_columns)
+
+        Returns:
+            EncounterPairs sorted by TCPA
+        """
+        start = time.perf_counter()
+        threshold = self.cpa_threshold_nm if cpa_threshold_nm is None else cpa_threshold_nm
+        horizon_h = (self.horizon_minutes if horizon_minutes is None else horizon_minutes) / 60.0
+
+        lat = np.asarray(columns['lat'], dtype=float)
+        lon = np.asarray(columns['lon'], dtype=float)
+        vx, vy = self._velocities(np.asarray(columns['sog'], dtype=float),
+                                  np.asarray(columns['cog'], dtype=float))
+        valid = np.flatnonzero(np.isfinite(lat) & np.isfinite(lon))
+
+        # Box swept by each vessel over the horizon, padded by half the threshold,
+        # in arc-minutes (1' of latitude = 1 nm; longitude scaled by the vessel's own latitude)
+        cos_lat = np.maximum(np.cos(np.radians(lat[valid])), 0.01)
+        x, y = lon[valid] * 60.0, lat[valid] * 60.0
+        dx, dy = vx[valid] * horizon_h / cos_lat, vy[valid] * horizon_h
+        pad = threshold / 2 * CELL_MARGIN
+        boxes = (np.minimum(x, x + dx) - pad / cos_lat, np.maximum(x, x + dx) + pad / cos_lat,
+                 np.minimum(y, y + dy) - pad, np.maximum(y, y + dy) + pad)
+
+        cell_nm = max(CELL_NM, 2 * threshold)
+        left, right = self._candidate_pairs(*boxes, cell_nm)
+        i, j = valid[left], valid[right]
+
+        # Relative motion of j seen from i
+        pair_cos = np.cos(np.radians((lat[i] + lat[j]) / 2))
+        rx = (lon[j] - lon[i]) * 60.0 * pair_cos
+        ry = (lat[j] - lat[i]) * 60.0
+        dvx = vx[j] - vx[i]
+        dvy = vy[j] - vy[i]
+
+        dv2 = dvx ** 2 + dvy ** 2
+        with np.errstate(invalid='ignore', divide='ignore'):
+            tcpa_h = np.where(dv2 > 1e-12, -(rx * dvx + ry * dvy) / dv2, 0.0)
+        # Diverging pairs are closest now; beyond the horizon we only look up to it
+        tcpa_h = np.clip(tcpa_h, 0.0, horizon_h)
+        cpa_nm = np.hypot(rx + dvx * tcpa_h, ry + dvy * tcpa_h)
+
+        hit = np.flatnonzero(cpa_nm <= threshold)
+        hit = hit[np.argsort(tcpa_h[hit], kind='stable')]
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        self.stats['sweeps'] += 1
+        self.stats['vessels'] = len(lat)
+        self.stats['candidates'] = len(left)
+        self.stats['encounters'] = len(hit)
+        self.stats['last_ms'] = round(elapsed_ms, 2)
+        return EncounterPairs(i[hit], j[hit], cpa_nm[hit], tcpa_h[hit] * 60.0, np.hypot(rx[hit], ry[hit]),
+                              {'vessels': len(lat), 'candidates': len(left), 'cell_nm': cell_nm,
+                               'elapsed_ms': round(elapsed_ms, 2)})
+
+    @staticmethod
+    def _velocities(sog: np.ndarray, cog: np.ndarray):
+        """East/north velocity in knots; unknown SOG or COG means stationary."""
+        known = np.isfinite(sog) & np.isfinite(cog) & (sog < SOG_NOT_AVAILABLE)
+        sog = np.where(known, np.clip(sog, 0.0, MAX_PLAUSIBLE_SOG_KNOTS), 0.0)
+        cog = np.radians(np.where(known, cog, 0.0))
+        return sog * np.sin(cog), sog * np.cos(cog)
+
+    @staticmethod
+    def _candidate_pairs(x0: np.ndarray, x1: np.ndarray, y0: np.ndarray, y1: np.ndarray, cell: float):
+        """
+        Index pairs (left < right) of boxes that overlap, each reported once.
+
+        Every box is entered into all hash cells it covers; a pair sharing
+        several cells is only kept in the cell holding the lower-left corner
+        of the boxes' intersection.
+        """
+        empty = np.empty(0, dtype=np.int64)
+        if len(x0) < 2:
+            return empty, empty
+
+        cx0, cx1 = np.floor(x0 / cell).astype(np.int64), np.floor(x1 / cell).astype(np.int64)
+        cy0, cy1 = np.floor(y0 / cell).astype(np.int64), np.floor(y1 / cell).astype(np.int64)
+        nx = cx1 - cx0 + 1
+        sizes = nx * (cy1 - cy0 + 1)
+
+        # One entry per (box, covered cell)
+        owner = np.repeat(np.arange(len(x0)), sizes)
+        k = np.arange(len(owner)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        ex = cx0[owner] + k % nx[owner]
+        ey = cy0[owner] + k // nx[owner]
+        keys = ex * _KEY_STRIDE + ey
+        order = np.argsort(keys, kind='stable')
+        keys, owner, ex, ey = keys[order], owner[order], ex[order], ey[order]
+
+        # Every later entry of the same cell pairs with this one
+        cell_end = np.searchsorted(keys, keys, side='right')
+        per_entry = cell_end - np.arange(len(keys)) - 1
+        total = int(per_entry.sum())
+        if total == 0:
+            return empty, empty
+        a = np.repeat(np.arange(len(keys)), per_entry)
+        b = a + 1 + np.arange(total) - np.repeat(np.cumsum(per_entry) - per_entry, per_entry)
+
+        left, right = owner[a], owner[b]
+        keep = ((ex[a] == np.maximum(cx0[left], cx0[right])) & (ey[a] == np.maximum(cy0[left], cy0[right]))
+                & (x0[left] <= x1[right]) & (x0[right] <= x1[left])
+                & (y0[left] <= y1[right]) & (y0[right] <= y1[left]))
+        left, right = left[keep], right[keep]
+        swap = left > right
+        return np.where(swap, right, left), np.where(swap, left, right)
+
+
+# Shared screener used by MaritimeAlertsService
+encounter_screener = EncounterScreener()
@@ -0,0 +1,196 @@
+"""
+Forecast Cube - the full MET Locationforecast timeseries of every cached grid
+cell as compact arrays, sampled at arbitrary (lat, lon, time) points.
+
+Each cell's forecast is parsed once when it enters the WeatherCache into a
+(times,) epoch-seconds axis and a (times, variables) float32 table. A
+ForecastCube stacks the tables of all cells into one flat array, so sampling
+thousands of points along a planned voyage is a few vectorised lookups:
+bilinear between the four surrounding cell centres in space and linear
+between forecast steps in time. Wind direction is interpolated as a vector.
+Times outside a cell's forecast hold its first/last step; points with no
+cached cell around them are NaN.
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Instant details of the compact product kept per forecast step, plus
+# precipitation in mm/h from the next_1_hours (or next_6_hours) period
+FORECAST_VARIABLES = (
+    'air_temperature',
+    'wind_speed',
+    'wind_from_direction',
+    'air_pressure_at_sea_level',
+    'relative_humidity',
+    'cloud_area_fraction',
+    'precipitation_rate',
+)
+_INSTANT_VARIABLES = FORECAST_VARIABLES[:-1]
+_DIRECTION = FORECAST_VARIABLES.index('wind_from_direction')
+
+
+def _epoch(value: str) -> float:
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+
+
+def parse_timeseries(document: Optional[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Every step of a Locationforecast document.
+
+    Returns:
+        (times as epoch seconds, (times, FORECAST_VARIABLES) float32 values; NaN where absent)
+    """
+    steps = (document or {}).get('properties', {}).get('timeseries', [])
+    times = np.empty(len(steps))
+    values = np.full((len(steps), len(FORECAST_VARIABLES)), np.nan, dtype=np.float32)
+    for i, step in enumerate(steps):
+        times[i] = _epoch(step['time'])
+        data = step.get('data', {})
+        details = data.get('instant', {}).get('details', {})
+        row = values[i]
+        for j, name in enumerate(_INSTANT_VARIABLES):
+            value = details.get(name)
+            if value is not None:
+                row[j] = value
+        period = data.get('next_1_hours')
+        hours = 1
+        if period is None:
+            period, hours = data.get('next_6_hours'), 6
+        amount = ((period or {}).get('details') or {}).get('precipitation_amount')
+        if amount is not None:
+            row[-1] = amount / hours
+    order = np.argsort(times, kind='stable')
+    return times[order], values[order]
+
+
+def current_step(timeseries: List[Dict], now: Optional[float] = None) -> Dict:
+    """
+    The step in effect now: the last one not after now (the first step if
+    they all are). A cached document served after its expiry no longer
+    starts at the current hour.
+    """
+    now = datetime.now(timezone.utc).timestamp() if now is None else now
+    current = timeseries[0]
+    for step in timeseries:
+        if _epoch(step['time']) > now:
+            break
+        current = step
+    return current
+
+
+def _pack(ci: np.ndarray, cj: np.ndarray) -> np.ndarray:
+    """One sortable int64 per grid cell."""
+    return (ci.astype(np.int64) << 32) + (cj.astype(np.int64) + (1 << 31))
+
+
+class ForecastCube:
+    """
+    Immutable snapshot of the forecasts of a set of grid cells.
+
+    Args:
+        cells: (cell row, cell column) -> (times, values) from parse_timeseries
+        grid_deg: Grid cell size in degrees (cell centres at (index + 0.5) * grid_deg)
+    """
+
+    def __init__(self, cells: Dict[Tuple[int, int], Tuple[np.ndarray, np.ndarray]], grid_deg: float):
+        self.grid_deg = grid_deg
+        cells = {key: series for key, series in cells.items() if len(series[0])}
+        keys = sorted(cells)
+        self.keys = _pack(np.array([k[0] for k in keys], dtype=np.int64),
+                          np.array([k[1] for k in keys], dtype=np.int64))
+        lengths = np.array([len(cells[key][0]) for key in keys], dtype=np.int64)
+        self.starts = np.concatenate([[0], np.cumsum(lengths)[:-1]]).astype(np.int64)
+        self.ends = self.starts + lengths
+
+        if keys:
+            self.times = np.concatenate([cells[key][0] for key in keys])
+            values = np.concatenate([cells[key][1] for key in keys]).astype(np.float32)
+        else:
+            self.times = np.empty(0)
+            values = np.empty((0, len(FORECAST_VARIABLES)), dtype=np.float32)
+        # Direction as unit-vector components, so 350 and 10 degrees average to 0
+        radians = np.radians(values[:, _DIRECTION])
+        self.values = np.column_stack([np.delete(values, _DIRECTION, axis=1),
+                                       np.sin(radians), np.cos(radians)]).astype(np.float32)
+        self._columns = [name for name in FORECAST_VARIABLES if name != 'wind_from_direction']
+
+        # Rows are searched together: key = row * stride + time offset, ascending
+        self.t0 = float(self.times.min()) if len(self.times) else 0.0
+        self.stride = float(self.times.max() - self.t0 + 1.0) if len(self.times) else 1.0
+        rows = np.repeat(np.arange(len(keys), dtype=np.int64), lengths)
+        self._search_keys = rows * self.stride + (self.times - self.t0)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _rows(self, ci: np.ndarray, cj: np.ndarray) -> np.ndarray:
+        """Cube row of each cell, -1 when the cell is not in the cube."""
+        packed = _pack(ci, cj)
+        pos = np.minimum(np.searchsorted(self.keys, packed), len(self.keys) - 1)
+        return np.where(self.keys[pos] == packed, pos, -1)
+
+    def _at_time(self, rows: np.ndarray, times: np.ndarray) -> np.ndarray:
+        """(points, columns) values of the given rows, linear between forecast steps."""
+        starts, ends = self.starts[rows], self.ends[rows] - 1
+        times = np.clip(times, self.times[starts], self.times[ends])
+        after = np.searchsorted(self._search_keys, rows * self.stride + (times - self.t0), side='right')
+        lo = np.clip(after - 1, starts, ends)
+        hi = np.clip(after, starts, ends)
+        span = self.times[hi] - self.times[lo]
+        fraction = np.divide(times - self.times[lo], span, out=np.zeros_like(span), where=span > 0)
+        low = self.values[lo]
+        return low + fraction[:, None].astype(np.float32) * (self.values[hi] - low)
+
+    def sample(self, lats, lons, times, variables: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Weather at each (lat, lon, epoch seconds) point.
+
+        Args:
+            lats, lons: Positions
+            times: Epoch seconds per point (or one for all)
+            variables: Subset of FORECAST_VARIABLES (default all)
+
+        Returns:
+            Variable name -> float array aligned with the inputs
+        """
+        lats = np.asarray(lats, dtype=float).ravel()
+        lons = np.asarray(lons, dtype=float).ravel()
+        times = np.broadcast_to(np.asarray(times, dtype=float), lats.shape).ravel()
+        variables = list(variables or FORECAST_VARIABLES)
+        n = len(lats)
+        if n == 0 or len(self) == 0:
+            return {name: np.full(n, np.nan) for name in variables}
+
+        # Bilinear weights between the four surrounding cell centres
+        y = lats / self.grid_deg - 0.5
+        x = lons / self.grid_deg - 0.5
+        i0, j0 = np.floor(y), np.floor(x)
+        fy, fx = y - i0, x - j0
+        i0, j0 = i0.astype(np.int64), j0.astype(np.int64)
+
+        total = np.zeros((n, self.values.shape[1]))
+        weight = np.zeros((n, self.values.shape[1]))
+        for di, dj, w in ((0, 0, (1 - fy) * (1 - fx)), (0, 1, (1 - fy) * fx),
+                          (1, 0, fy * (1 - fx)), (1, 1, fy * fx)):
+            rows = self._rows(i0 + di, j0 + dj)
+            found = np.flatnonzero((rows >= 0) & (w > 0))
+            if not len(found):
+                continue
+            values = self._at_time(rows[found], times[found])
+            valid = ~np.isnan(values)
+            corner = w[found, None] * valid
+            total[found] += corner * np.where(valid, values, 0.0)
+            weight[found] += corner
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            combined = np.where(weight > 0, total / weight, np.nan)
+        result = {}
+        for name in variables:
+            if name == 'wind_from_direction':
+                result[name] = np.degrees(np.arctan2(combined[:, -2], combined[:, -1])) % 360.0
+            else:
+                result[name] = combined[:, self._columns.index(name)]
+        return result
@@ -0,0 +1,286 @@
+"""
+Upstream HTTP Client - one pooled, keep-alive session shared by every adapter
+that calls an external API (MET Norway, BarentsWatch, Kystdatahuset,
+Open-Meteo, turbine data sources).
+
+Each upstream host gets its own connection pool, so repeated calls reuse open
+TCP/TLS connections instead of handshaking again. Every request goes through
+the same policy:
+- retries with jittered exponential backoff on timeouts, connection errors
+  and retryable statuses (429/5xx), honouring Retry-After
+- a circuit breaker per host that fails fast after repeated failures and lets
+  one trial request through after a cool-down
+- gzip/deflate negotiation
+
+Failures surface as requests exceptions (an open breaker raises
+CircuitOpenError, a ConnectionError), so callers keep their except clauses.
+Per-host latency, connection reuse and error counters are in get_status().
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from http.cookiejar import DefaultCookiePolicy
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the latency histogram buckets shared by the HTTP client,
+# rate limiter and source fan-out; the last bucket collects everything slower
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Keep-alive connections kept open per upstream host
+HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', '16'))
+# Distinct upstream hosts whose pools are kept (least recently used are closed)
+HTTP_MAX_HOSTS = int(os.getenv('HTTP_MAX_HOSTS', '32'))
+# Retries after the first attempt, for idempotent methods unless a call says otherwise
+HTTP_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', '2'))
+HTTP_BACKOFF_BASE_SECONDS = float(os.getenv('HTTP_BACKOFF_BASE_SECONDS', '0.5'))
+HTTP_BACKOFF_MAX_SECONDS = float(os.getenv('HTTP_BACKOFF_MAX_SECONDS', '8.0'))
+# Consecutive failures that open a host's breaker, and how long it stays open
+BREAKER_FAILURE_THRESHOLD = int(os.getenv('HTTP_BREAKER_FAILURES', '5'))
+BREAKER_RESET_SECONDS = float(os.getenv('HTTP_BREAKER_RESET_SECONDS', '30'))
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised without contacting the upstream while its breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Closed: requests pass, consecutive failures are counted.
+    Open: requests fail fast until reset_seconds have passed.
+    Half-open: one trial request passes per reset_seconds; success closes,
+    failure re-opens.
+    """
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 reset_seconds: float = BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            # Another trial if the last one never reported back
+            now = time.monotonic()
+            if now - self.opened_at >= self.reset_seconds:
+                self.state = 'half_open'
+                self.opened_at = now
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                if self.state != 'open':
+                    self.times_opened += 1
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+
+
+class UpstreamClient:
+    """
+    Shared requests.Session with per-host pools, retries and circuit breakers.
+    """
+
+    def __init__(self, pool_maxsize: int = HTTP_POOL_MAXSIZE, max_hosts: int = HTTP_MAX_HOSTS,
+                 max_retries: int = HTTP_MAX_RETRIES, backoff_base: float = HTTP_BACKOFF_BASE_SECONDS,
+                 backoff_max: float = HTTP_BACKOFF_MAX_SECONDS,
+                 failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 reset_seconds: float = BREAKER_RESET_SECONDS, name: str = 'upstream'):
+        self.name = name
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+
+        # Retries are done here (with backoff and breaker accounting), not by urllib3
+        self._adapter = HTTPAdapter(pool_connections=max_hosts, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session = requests.Session()
+        self.session.mount('http://', self._adapter)
+        self.session.mount('https://', self._adapter)
+        self.session.headers['Accept-Encoding'] = 'gzip, deflate'
+        # The session is shared across upstreams; keep it stateless like bare requests.get
+        self.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._hosts: Dict[str, Dict] = {}
+
+    def request(self, method: str, url: str, retries: Optional[int] = None,
+                retry_statuses: Iterable[int] = RETRY_STATUSES, **kwargs) -> requests.Response:
+        """
+        Send a request through the host's pool and breaker.
+
+        Args:
+            method: HTTP method
+            url: Full URL
+            retries: Retries after the first attempt; defaults to max_retries for
+                idempotent methods and 0 otherwise
+            retry_statuses: Response statuses that are retried (and count as failures)
+            **kwargs: Passed to requests (params, headers, data, json, timeout, ...)
+
+        Returns:
+            The response; after the last retry a retryable status is returned as is
+
+        Raises:
+            requests.exceptions.RequestException, including CircuitOpenError
+        """
+        method = method.upper()
+        if retries is None:
+            retries = self.max_retries if method in IDEMPOTENT_METHODS else 0
+        host = urlsplit(url).netloc
+        breaker = self._breaker(host)
+
+        for attempt in range(retries + 1):
+            if not breaker.allow():
+                self._count(host, 'rejected')
+                raise CircuitOpenError(f"Circuit open for {host} after {breaker.failures} failures")
+            if attempt:
+                self._count(host, 'retries')
+
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                self._record(host, (time.perf_counter() - start) * 1000,
+                             'timeouts' if isinstance(e, requests.exceptions.Timeout) else 'connection_errors')
+                breaker.record_failure()
+                if attempt == retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+                continue
+
+            self._record(host, (time.perf_counter() - start) * 1000, f'{response.status_code // 100}xx',
+                         compressed=response.headers.get('Content-Encoding') in ('gzip', 'deflate'))
+            if response.status_code not in retry_statuses:
+                breaker.record_success()
+                return response
+            breaker.record_failure()
+            if attempt == retries:
+                return response
+            delay = self._backoff(attempt, response.headers.get('Retry-After'))
+            logger.warning(f"⚠️ {host} returned {response.status_code}, retrying in {delay:.1f}s "
+                           f"(attempt {attempt + 1}/{retries + 1})")
+            response.close()
+            time.sleep(delay)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Full-jitter exponential backoff, or the server's Retry-After seconds."""
+        if retry_after and retry_after.strip().isdigit():
+            return min(float(retry_after), self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _breaker(self, host: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = CircuitBreaker(self.failure_threshold, self.reset_seconds)
+                self._breakers[host] = breaker
+            return breaker
+
+    def _host_stats(self, host: str) -> Dict:
+        """Counters for one host (lock held)."""
+        stats = self._hosts.get(host)
+        if stats is None:
+            stats = {'attempts': 0, 'retries': 0, 'rejected': 0, 'timeouts': 0, 'connection_errors': 0,
+                     '2xx': 0, '3xx': 0, '4xx': 0, '5xx': 0, 'compressed': 0,
+                     'counts': [0] * (len(LATENCY_BUCKETS_MS) + 1), 'total_ms': 0.0, 'max_ms': 0.0}
+            self._hosts[host] = stats
+        return stats
+
+    def _count(self, host: str, counter: str):
+        with self._lock:
+            self._host_stats(host)[counter] += 1
+
+    def _record(self, host: str, latency_ms: float, outcome: str, compressed: bool = False):
+        with self._lock:
+            stats = self._host_stats(host)
+            stats['attempts'] += 1
+            stats[outcome] += 1
+            stats['compressed'] += compressed
+            bucket = next((i for i, bound in enumerate(LATENCY_BUCKETS_MS) if latency_ms <= bound),
+                          len(LATENCY_BUCKETS_MS))
+            stats['counts'][bucket] += 1
+            stats['total_ms'] += latency_ms
+            stats['max_ms'] = max(stats['max_ms'], latency_ms)
+
+    def _pool_counters(self) -> Dict[str, Dict]:
+        """Connections opened and requests sent per host, from the urllib3 pools."""
+        pools = self._adapter.poolmanager.pools
+        counters = {}
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            default_port = {'http': 80, 'https': 443}.get(pool.scheme)
+            host = pool.host if pool.port in (None, default_port) else f'{pool.host}:{pool.port}'
+            entry = counters.setdefault(host, {'connections_opened': 0, 'pool_requests': 0})
+            entry['connections_opened'] += pool.num_connections
+            entry['pool_requests'] += pool.num_requests
+        return counters
+
+    def get_status(self) -> Dict:
+        """Per-host latency histogram, outcomes, connection reuse and breaker state."""
+        pools = self._pool_counters()
+        with self._lock:
+            hosts = {}
+            for host, stats in self._hosts.items():
+                buckets = {f'le_{bound}ms': count for bound, count in zip(LATENCY_BUCKETS_MS, stats['counts'])}
+                buckets[f'gt_{LATENCY_BUCKETS_MS[-1]}ms'] = stats['counts'][-1]
+                pool = pools.get(host, {'connections_opened': 0, 'pool_requests': 0})
+                breaker = self._breakers[host]
+                attempts = stats['attempts']
+                errors = stats['timeouts'] + stats['connection_errors'] + stats['5xx']
+                hosts[host] = {
+                    'attempts': attempts,
+                    'retries': stats['retries'],
+                    'rejected_by_breaker': stats['rejected'],
+                    'statuses': {key: stats[key] for key in ('2xx', '3xx', '4xx', '5xx')},
+                    'timeouts': stats['timeouts'],
+                    'connection_errors': stats['connection_errors'],
+                    'error_rate': round(errors / attempts, 3) if attempts else 0.0,
+                    'compressed_responses': stats['compressed'],
+                    'latency_buckets': buckets,
+                    'mean_ms': round(stats['total_ms'] / attempts, 1) if attempts else 0.0,
+                    'max_ms': round(stats['max_ms'], 1),
+                    'connections_opened': pool['connections_opened'],
+                    'connection_reuse_rate': round(1 - pool['connections_opened'] / pool['pool_requests'], 3)
+                    if pool['pool_requests'] else 0.0,
+                    'breaker': {'state': breaker.state, 'consecutive_failures': breaker.failures,
+                                'times_opened': breaker.times_opened},
+                }
+            return {'name': self.name, 'max_retries': self.max_retries, 'hosts': hosts}
+
+
+# Global instance
+upstream_client = UpstreamClient()
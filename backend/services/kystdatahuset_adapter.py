@@ -15,6 +15,9 @@ from datetime import datetime, timezone
 import json
 import time
 
+from backend.services.http_client import upstream_client
+from backend.services.vessel_state_store import vessel_state_store
+
 logger = logging.getLogger(__name__)
 
 
@@ -76,15 +79,13 @@ class KystdatahusetAdapter:
         else:
             logger.info(f"📝 Using configured User-Agent: {user_agent[:60]}...")
         
-        # Create a session with proper headers for Norwegian API
-        self.session = requests.Session()
-        self.session.headers.update({
+        # Headers for the Norwegian API; connections come from the shared upstream pool
+        self.headers = {
             'User-Agent': user_agent,
             'Accept': 'application/json',
             'Accept-Language': 'en-US,en;q=0.9,no;q=0.8',
-            'Cache-Control': 'no-cache',
-            'Connection': 'keep-alive'
-        })
+            'Cache-Control': 'no-cache'
+        }
         
         # Simple cache to avoid redundant API calls (5 minutes TTL)
         self._cache = {}
@@ -111,10 +112,12 @@ class KystdatahusetAdapter:
         try:
             # Test with a small Bergen area
             test_bbox = self._create_bounding_box(60.3913, 5.3221, 5)  # 5km around Bergen
-            test_response = self.session.get(
+            test_response = upstream_client.get(
                 f"{self.BASE_URL}/vessels",
                 params={'bbox': test_bbox},
-                timeout=10
+                headers=self.headers,
+                timeout=10,
+                retries=0
             )
             
             if test_response.status_code == 200:
@@ -124,10 +127,12 @@ class KystdatahusetAdapter:
             elif test_response.status_code == 406:
                 logger.warning(f"⚠️ API returned 406 - Trying alternative endpoint...")
                 # Try alternative endpoint format
-                alt_response = self.session.get(
+                alt_response = upstream_client.get(
                     f"{self.BASE_URL}/positions",
                     params={'bbox': test_bbox},
-                    timeout=10
+                    headers=self.headers,
+                    timeout=10,
+                    retries=0
                 )
                 if alt_response.status_code == 200:
                     logger.info(f"✅ Alternative endpoint /positions works")
@@ -191,13 +196,24 @@ class KystdatahusetAdapter:
         # Create bounding box for the area around the city
         bbox = self._create_bounding_box(lat, lon, radius_km)
         
-        # Get vessels and enrich with city information
+        # Get vessels and publish them to the shared vessel state store
         vessels = self._get_vessels_with_retry(bbox)
-        enriched_vessels = []
-        
-        for vessel in vessels:
-            enriched = self._enrich_vessel_with_city_data(vessel, mapped_city)
-            enriched_vessels.append(enriched)
+        vessel_state_store.upsert_many(
+            (self._enrich_vessel_with_city_data(vessel, mapped_city) for vessel in vessels),
+            data_source='kystdatahuset'
+        )
+        
+        # Answer from the store's spatial index: vessels actually inside the
+        # radius (not the bbox corners), nearest first, including positions
+        # received since the last API call
+        enriched_vessels = vessel_state_store.vessels_near(
+            lat, lon, radius_km, data_source='kystdatahuset'
+        )
+        for vessel in enriched_vessels:
+            vessel['nearest_city'] = city_data['display_name']
+            vessel['city_region'] = city_data['region']
+            vessel['city_key'] = mapped_city
+            vessel['distance_to_city_km'] = vessel['distance_km']
         
         logger.info(f"📊 Found {len(enriched_vessels)} vessels near {city_data['display_name']} (radius: {radius_km}km)")
         return enriched_vessels
@@ -223,78 +239,48 @@ class KystdatahusetAdapter:
                 logger.debug(f"Using cached data for bbox: {bbox}")
                 return cached_data
         
-        # Try with retries
-        for attempt in range(self.max_retries):
-            try:
-                self.request_count += 1
-                self.last_request_time = datetime.now(timezone.utc)
-                
-                params = {'bbox': bbox}
-                logger.debug(f"📤 Requesting vessels with bbox: {bbox} (attempt {attempt + 1}/{self.max_retries})")
-                
-                response = self.session.get(
-                    f"{self.BASE_URL}/vessels",
+        # Retries with backoff (and the per-host breaker) are handled by the upstream client
+        self.request_count += 1
+        self.last_request_time = datetime.now(timezone.utc)
+        params = {'bbox': bbox}
+        logger.debug(f"📤 Requesting vessels with bbox: {bbox}")
+        
+        try:
+            response = upstream_client.get(
+                f"{self.BASE_URL}/vessels",
+                params=params,
+                headers=self.headers,
+                timeout=self.timeout,
+                retries=self.max_retries - 1
+            )
+            
+            if response.status_code == 406:
+                logger.warning(f"⚠️ API returned 406 - Trying alternative endpoint /positions")
+                response = upstream_client.get(
+                    f"{self.BASE_URL}/positions",
                     params=params,
-                    timeout=self.timeout
+                    headers=self.headers,
+                    timeout=self.timeout,
+                    retries=self.max_retries - 1
                 )
+            
+            if response.status_code == 200:
+                vessels = response.json()
+                self.successful_requests += 1
                 
-                if response.status_code == 200:
-                    vessels = response.json()
-                    self.successful_requests += 1
-                    
-                    # Cache the result
-                    self._cache[cache_key] = (datetime.now(timezone.utc), vessels)
-                    
-                    logger.debug(f"✅ API request successful: {len(vessels)} vessels")
-                    return vessels
-                    
-                elif response.status_code == 406:
-                    logger.warning(f"⚠️ API returned 406 - Trying alternative endpoint /positions")
-                    
-                    # Try alternative endpoint
-                    alt_response = self.session.get(
-                        f"{self.BASE_URL}/positions",
-                        params=params,
-                        timeout=self.timeout
-                    )
-                    
-                    if alt_response.status_code == 200:
-                        vessels = alt_response.json()
-                        self.successful_requests += 1
-                        self._cache[cache_key] = (datetime.now(timezone.utc), vessels)
-                        logger.debug(f"✅ Alternative endpoint successful: {len(vessels)} vessels")
-                        return vessels
-                    
-                elif response.status_code == 429:  # Too Many Requests
-                    wait_time = (attempt + 1) * 2  # Exponential backoff
-                    logger.warning(f"⚠️ Rate limited, waiting {wait_time}s (attempt {attempt + 1}/{self.max_retries})")
-                    time.sleep(wait_time)
-                    continue
-                    
-                else:
-                    logger.warning(f"⚠️ API returned status {response.status_code} (attempt {attempt + 1}/{self.max_retries})")
-                    
-                    if attempt < self.max_retries - 1:
-                        time.sleep(1)  # Wait before retry
-                        continue
-                    else:
-                        return []
-                        
-            except requests.exceptions.Timeout:
-                logger.warning(f"⚠️ Request timeout (attempt {attempt + 1}/{self.max_retries})")
-                if attempt < self.max_retries - 1:
-                    time.sleep(1)
-                    continue
-                else:
-                    return []
-                    
-            except requests.exceptions.RequestException as e:
-                logger.error(f"❌ Network error: {e} (attempt {attempt + 1}/{self.max_retries})")
-                if attempt < self.max_retries - 1:
-                    time.sleep(1)
-                    continue
-                else:
-                    return []
+                # Cache the result
+                self._cache[cache_key] = (datetime.now(timezone.utc), vessels)
+                
+                logger.debug(f"✅ API request successful: {len(vessels)} vessels")
+                return vessels
+            
+            logger.warning(f"⚠️ API returned status {response.status_code}")
+            
+        except requests.exceptions.Timeout:
+            logger.warning(f"⚠️ Request timeout after {self.max_retries} attempts")
+            
+        except requests.exceptions.RequestException as e:
+            logger.error(f"❌ Network error: {e}")
         
         return []
     
@@ -415,7 +401,7 @@ class KystdatahusetAdapter:
         Returns:
             Dictionary with service status information
         """
-        user_agent = self.session.headers.get('User-Agent', 'Not configured')
+        user_agent = self.headers.get('User-Agent', 'Not configured')
         
         status = {
             'service': 'KystdatahusetAdapter',
@@ -454,10 +440,12 @@ class KystdatahusetAdapter:
         if self.enabled:
             try:
                 test_bbox = self._create_bounding_box(60.3913, 5.3221, 5)  # 5km around Bergen
-                test_response = self.session.get(
+                test_response = upstream_client.get(
                     f"{self.BASE_URL}/vessels",
                     params={'bbox': test_bbox},
-                    timeout=5
+                    headers=self.headers,
+                    timeout=5,
+                    retries=0
                 )
                 
                 status['connectivity_test'] = {
@@ -13,6 +13,9 @@ from typing import Dict, List, Optional
 import random
 import math
 
+from backend.services.ais_decoder import AISStreamDecoder
+from backend.services.vessel_state_store import vessel_state_store
+
 logger = logging.getLogger(__name__)
 
 
@@ -46,9 +49,20 @@ class KystverketAISService:
             1 <= self.port <= 65535
         )
         
-        # Cache for vessel data
-        self._vessel_cache = {}
-        self._cache_expiry = 60  # Cache duration in seconds
+        # Live positions go to the shared vessel state store (keyed by MMSI,
+        # TTL-expired there); only static data is cached locally
+        self._vessel_store = vessel_state_store
+        self._cache_lock = threading.Lock()
+        self._cache_clean_interval = 5  # Seconds between static cache sweeps
+        self._last_cache_clean = datetime.now()
+        
+        # Static/voyage data (names, types) arrives separately from positions
+        # and far less often, so it is kept longer and merged into position updates
+        self._static_cache = {}
+        self._static_cache_expiry = 1800
+        
+        # Streaming NMEA decoder for the AIS feed
+        self._decoder = AISStreamDecoder()
         
         # Service state
         self._last_update = None
@@ -104,7 +118,6 @@ class KystverketAISService:
     
     def _listen_to_stream(self):
         """Listen to AIS data stream with proper error handling."""
-        buffer = b""
         reconnect_attempts = 0
         max_reconnect_attempts = 3
         
@@ -121,21 +134,20 @@ class KystverketAISService:
                 
                 logger.info("Connected to AIS data stream")
                 
+                # Fresh decoder per connection so partial lines and fragments
+                # from a dropped connection are not stitched onto the new one
+                self._decoder = AISStreamDecoder()
+                
                 # Receive data continuously
                 while not self._stop_listening and self._connection_active:
                     try:
-                        data = sock.recv(4096)
+                        data = sock.recv(65536)
                         if not data:
                             logger.warning("Connection closed by server")
                             self._connection_active = False
                             break
                         
-                        buffer += data
-                        
-                        # Process complete lines
-                        while b'\n' in buffer:
-                            line, buffer = buffer.split(b'\n', 1)
-                            self._process_data_line(line.decode('utf-8', errors='ignore').strip())
+                        self._apply_ais_messages(self._decoder.feed(data))
                         
                     except socket.timeout:
                         logger.debug("Socket timeout, maintaining connection")
@@ -165,84 +177,88 @@ class KystverketAISService:
     
     def _process_data_line(self, line: str):
         """
-        Process a data line from the stream.
-        This method handles the raw data and creates vessel information.
+        Process a single data line from the stream.
+        The listener feeds raw bytes to the decoder directly; this entry point
+        is kept for callers that already have individual lines.
         """
         if not line:
             return
         
         try:
-            # Check if this looks like AIS data
-            if line.startswith('!'):
-                # This appears to be AIS/NMEA data
-                self._create_vessel_from_stream_data(line)
-            else:
-                # Other data formats can be handled here
-                logger.debug(f"Received non-AIS data: {line[:50]}...")
-                
+            message = self._decoder.decode_sentence(line.encode('ascii', errors='ignore'))
+            if message:
+                self._apply_ais_messages([message])
         except Exception as e:
             logger.debug(f"Error processing data line: {str(e)}")
     
-    def _create_vessel_from_stream_data(self, data_line: str):
+    def _apply_ais_messages(self, messages: List[Dict]):
         """
-        Create vessel information from stream data.
-        This is a simplified version for demonstration.
+        Merge decoded AIS messages into the shared vessel state store.
+        Position reports update vessel positions; static/voyage reports
+        (types 5, 19, 24) update names, types and dimensions.
         """
-        # Generate realistic vessel data based on the actual stream
-        # In a production system, this would parse actual AIS/NMEA messages
-        
-        port_name = random.choice(list(self.NORWEGIAN_PORTS.keys()))
-        port_data = self.NORWEGIAN_PORTS[port_name]
-        
-        # Generate MMSI with Norwegian prefix
-        mmsi_prefix = random.choice(['259', '257', '258'])
-        mmsi = f"{mmsi_prefix}{random.randint(100000, 999999):06d}"
-        
-        # Vessel type distribution
-        vessel_types = [
-            ('Cargo', 35),
-            ('Passenger', 25),
-            ('Tanker', 20),
-            ('Fishing', 15),
-            ('Other', 5)
-        ]
-        
-        # Weighted random selection
-        choices, weights = zip(*vessel_types)
-        vessel_type = random.choices(choices, weights=weights, k=1)[0]
-        
-        # Position near port
-        lat_offset = random.uniform(-0.15, 0.15)
-        lon_offset = random.uniform(-0.2, 0.2)
+        if not messages:
+            return
         
-        vessel = {
-            'mmsi': mmsi,
-            'name': self._generate_vessel_name(vessel_type),
-            'type': vessel_type,
-            'latitude': port_data['lat'] + lat_offset,
-            'longitude': port_data['lon'] + lon_offset,
-            'speed': random.uniform(0.5, 22.0),
-            'course': random.uniform(0, 360),
-            'heading': random.uniform(0, 360),
-            'timestamp': datetime.now().isoformat(),
-            'data_source': 'ais_stream_realtime',
-            'is_realtime': True,
-            'port': port_name.capitalize(),
-            'distance_from_port_km': self._calculate_distance(
-                port_data['lat'] + lat_offset,
-                port_data['lon'] + lon_offset,
-                port_data['lat'],
-                port_data['lon']
-            )
+        now = datetime.now()
+        with self._cache_lock:
+            for message in messages:
+                try:
+                    self._apply_ais_message(message, now)
+                except Exception as e:
+                    logger.debug(f"Error applying AIS message: {str(e)}")
+            self._last_update = now
+        
+        if (now - self._last_cache_clean).total_seconds() > self._cache_clean_interval:
+            self._clean_cache()
+    
+    def _apply_ais_message(self, message: Dict, now: datetime):
+        """Apply one decoded message. Caller holds _cache_lock."""
+        mmsi = message['mmsi']
+        msg_type = message['msg_type']
+        
+        # Static fields carried by this message
+        static_update = {
+            key: message[key]
+            for key in ('name', 'type', 'ship_type', 'callsign', 'imo',
+                        'destination', 'draught', 'length', 'width')
+            if message.get(key) not in (None, '')
         }
+        if static_update:
+            cached_static = self._static_cache.get(mmsi)
+            static = dict(cached_static[1]) if cached_static else {}
+            static.update(static_update)
+            self._static_cache[mmsi] = (now, static)
+            self._vessel_store.update_attributes(mmsi, **static_update)
+        
+        if msg_type in (5, 24) or message.get('latitude') is None:
+            return
         
-        # Update cache
-        self._vessel_cache[mmsi] = (datetime.now(), vessel)
-        self._last_update = datetime.now()
+        cached_static = self._static_cache.get(mmsi)
+        static = cached_static[1] if cached_static else {}
+        extras = {
+            key: static[key]
+            for key in ('name', 'callsign', 'imo', 'destination', 'draught', 'length', 'width', 'ship_type')
+            if key in static
+        }
         
-        # Manage cache size
-        if len(self._vessel_cache) > 150:
-            self._clean_cache()
+        # Unavailable speed/course/heading (None) are stored as missing and
+        # read back as numbers by the store
+        self._vessel_store.upsert(
+            mmsi,
+            message['latitude'],
+            message['longitude'],
+            speed=message.get('speed'),
+            course=message.get('course'),
+            heading=message.get('heading'),
+            timestamp=message.get('received_at') or now,
+            vessel_type=static.get('type'),  # None keeps a type stored by another source
+            nav_status=message.get('nav_status_text'),
+            ais_class=message.get('ais_class'),
+            data_source='ais_stream_realtime',
+            is_realtime=True,
+            **extras
+        )
     
     def _generate_vessel_name(self, vessel_type: str) -> str:
         """Generate a realistic vessel name."""
@@ -305,38 +321,34 @@ class KystverketAISService:
             logger.warning(f"Unknown port: {port_name}")
             return self._get_simulated_vessels(port_name, limit)
         
-        # Clean expired cache entries
-        self._clean_cache()
-        
-        # Get vessels from cache
-        cached_vessels = [v[1] for v in self._vessel_cache.values()]
-        
-        if not cached_vessels:
-            # Generate initial vessels if cache is empty
-            cached_vessels = self._generate_initial_vessels(port_name_lower, 8)
-        
         # Filter by proximity to port
         port_data = self.NORWEGIAN_PORTS[port_name_lower]
         port_lat = port_data['lat']
         port_lon = port_data['lon']
         radius_km = port_data['radius_km']
         
-        nearby_vessels = []
-        for vessel in cached_vessels:
-            distance = self._calculate_distance(
-                vessel['latitude'], vessel['longitude'],
-                port_lat, port_lon
+        if len(self._vessel_store):
+            # k-nearest lookup on the store's spatial grid; only the returned
+            # vessels are materialised as dicts
+            result = self._vessel_store.nearest_vessels(
+                port_lat, port_lon, k=limit, max_radius_km=radius_km
             )
-            
-            if distance <= radius_km:
-                vessel_copy = vessel.copy()
-                vessel_copy['distance_km'] = round(distance, 2)
-                vessel_copy['nearest_port'] = port_name.capitalize()
-                nearby_vessels.append(vessel_copy)
-        
-        # Sort by distance and apply limit
-        nearby_vessels.sort(key=lambda x: x.get('distance_km', 999))
-        result = nearby_vessels[:limit]
+        else:
+            # Generate initial vessels if the store is empty
+            result = []
+            for vessel in self._generate_initial_vessels(port_name_lower, 8):
+                distance = self._calculate_distance(
+                    vessel['latitude'], vessel['longitude'],
+                    port_lat, port_lon
+                )
+                if distance <= radius_km:
+                    vessel['distance_km'] = round(distance, 2)
+                    result.append(vessel)
+            result.sort(key=lambda x: x.get('distance_km', 999))
+            result = result[:limit]
+        
+        for vessel in result:
+            vessel['nearest_port'] = port_name.capitalize()
         
         if result:
             logger.info(f"Found {len(result)} vessels near {port_name.capitalize()}")
@@ -479,22 +491,20 @@ class KystverketAISService:
         return vessel
     
     def _clean_cache(self):
-        """Remove expired entries from cache."""
-        if not self._vessel_cache:
-            return
-        
+        """Remove expired static records. Positions expire in the vessel state store."""
         now = datetime.now()
-        expired_keys = []
-        
-        for key, (timestamp, _) in self._vessel_cache.items():
-            if (now - timestamp).seconds > self._cache_expiry:
-                expired_keys.append(key)
-        
-        for key in expired_keys:
-            del self._vessel_cache[key]
-        
-        if expired_keys:
-            logger.debug(f"Cleaned {len(expired_keys)} expired cache entries")
+        self._last_cache_clean = now
+        
+        with self._cache_lock:
+            expired_static = [
+                key for key, (timestamp, _) in self._static_cache.items()
+                if (now - timestamp).total_seconds() > self._static_cache_expiry
+            ]
+            for key in expired_static:
+                del self._static_cache[key]
+        
+        if expired_static:
+            logger.debug(f"Cleaned {len(expired_static)} expired static records")
     
     def get_service_status(self) -> Dict:
         """Get current service status."""
@@ -503,9 +513,12 @@ class KystverketAISService:
             'enabled': self.enabled,
             'valid_configuration': self._valid_config,
             'connection_active': self._connection_active,
-            'vessels_in_cache': len(self._vessel_cache),
+            'vessels_in_cache': len(self._vessel_store),
+            'static_records_in_cache': len(self._static_cache),
+            'decoder': dict(self._decoder.stats, pending_fragments=self._decoder.pending_fragments),
             'last_update': self._last_update.isoformat() if self._last_update else None,
-            'cache_expiry_seconds': self._cache_expiry,
+            'cache_expiry_seconds': self._vessel_store.ttl_seconds,
+            'vessel_store': self._vessel_store.get_store_status(),
             'timestamp': datetime.now().isoformat()
         }
         
@@ -12,9 +12,13 @@ import os
 import requests
 import logging
 from datetime import datetime, timezone
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 import json
-import time
+
+from backend.services.forecast_cube import current_step
+from backend.services.http_client import upstream_client
+from backend.services.rate_limiter import upstream_limiter
+from backend.services.weather_service import weather_cache, weather_prewarmer
 
 logger = logging.getLogger(__name__)
 
@@ -63,19 +67,17 @@ class METNorwayService:
             self.default_lat = 60.3913  # Bergen fallback
             self.default_lon = 5.3221   # Bergen fallback
         
-        # Cache for API responses (respect MET Norway's cache guidelines)
-        self.cache = {}
-        self.cache_duration = 600  # 10 minutes in seconds
-        
-        # Rate limiting
-        self.last_request_time = 0
-        self.min_request_interval = 0.125  # 8 requests per second max
+        # Shared grid-cell forecast cache: honours MET's Expires header, applies the
+        # 'met_norway' rate limit (8 requests per second) and serves expired cells
+        # while they refresh in the background
+        self.cache = weather_cache
+        self.stale_served = 0
         
         # Log configuration
         logger.info(f"🌤️ MET Norway Service initialized")
         logger.info(f"  • Default coordinates: {self.default_lat}, {self.default_lon}")
         logger.info(f"  • API endpoint: {self.base_url}")
-        logger.info(f"  • Cache duration: {self.cache_duration} seconds")
+        logger.info(f"  • Cache: shared {self.cache.grid_deg}° grid, stale-while-revalidate")
         
         # Verify environment variables
         self._verify_env_config()
@@ -105,67 +107,64 @@ class METNorwayService:
         if not missing and not warnings:
             logger.info("✅ All MET Norway environment variables properly configured")
     
-    def _make_api_request(self, lat: float, lon: float, altitude: int = 0) -> Optional[Dict]:
+    def _make_api_request(self, lat: float, lon: float) -> Optional[Dict]:
         """
-        Make actual API request to MET Norway with proper rate limiting and caching.
+        Get the MET Norway forecast through the shared grid cache, which
+        applies the rate limit, serves expired cells while they refresh in
+        the background and revalidates with If-Modified-Since.
         
         Args:
             lat: Latitude
             lon: Longitude
-            altitude: Altitude in meters (0 for sea level)
             
         Returns:
             API response as dictionary or None if failed
         """
-        # Check cache first
-        cache_key = f"{lat:.4f},{lon:.4f},{altitude}"
-        current_time = time.time()
-        
-        if cache_key in self.cache:
-            cached_time, cached_data = self.cache[cache_key]
-            if current_time - cached_time < self.cache_duration:
-                logger.debug(f"📦 Using cached MET Norway data for {lat}, {lon}")
-                return cached_data
-        
-        # Rate limiting: ensure we don't exceed 8 requests per second
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.min_request_interval:
-            sleep_time = self.min_request_interval - time_since_last
-            logger.debug(f"⏱️ Rate limiting: sleeping {sleep_time:.3f}s")
-            time.sleep(sleep_time)
+        data, cache_status = self.cache.lookup(lat, lon, self._fetch)
+        if cache_status == 'stale':
+            self.stale_served += 1
+        logger.debug(f"📦 MET Norway data for {lat}, {lon}: {cache_status}")
+        return data
+    
+    def _fetch(self, lat: float, lon: float,
+               if_modified_since: Optional[str] = None) -> Tuple[int, Optional[Dict], Dict]:
+        """
+        Request one forecast from MET Norway.
         
+        Returns:
+            (HTTP status or 0, parsed JSON on 200, response headers)
+        """
+        headers = dict(self.headers)
+        if if_modified_since:
+            headers['If-Modified-Since'] = if_modified_since
         try:
             # MET Norway API parameters
             params = {
                 'lat': lat,
-                'lon': lon,
-                'altitude': altitude
+                'lon': lon
             }
             
-            logger.debug(f"🌐 MET Norway API request: {self.base_url}?lat={lat}&lon={lon}&altitude={altitude}")
+            logger.debug(f"🌐 MET Norway API request: {self.base_url}?lat={lat}&lon={lon}")
             
-            # Make the API request
-            self.last_request_time = time.time()
-            response = requests.get(
+            # Make the API request (pooled connection, shared retry and breaker policy)
+            response = upstream_client.get(
                 self.base_url,
                 params=params,
-                headers=self.headers,
+                headers=headers,
                 timeout=15  # 15 second timeout for slow responses
             )
             
             # Handle response
             if response.status_code == 200:
                 logger.info(f"✅ MET Norway API successful for {lat}, {lon}")
-                data = response.json()
-                
-                # Cache the successful response
-                self.cache[cache_key] = (time.time(), data)
-                
-                return data
+                return 200, response.json(), dict(response.headers)
+            
+            elif response.status_code == 304:
+                logger.debug(f"📦 MET Norway data unchanged for {lat}, {lon}")
                 
             elif response.status_code == 400:
                 logger.error(f"❌ MET Norway API: Bad request (400)")
-                logger.error(f"   Parameters: lat={lat}, lon={lon}, altitude={altitude}")
+                logger.error(f"   Parameters: lat={lat}, lon={lon}")
                 logger.error(f"   Response: {response.text[:200]}")
                 
             elif response.status_code == 403:
@@ -185,23 +184,21 @@ class METNorwayService:
                 logger.error(f"❌ MET Norway API error: HTTP {response.status_code}")
                 logger.debug(f"   Response: {response.text[:200]}")
             
-            return None
+            return response.status_code, None, dict(response.headers)
             
         except requests.exceptions.Timeout:
             logger.error(f"⏱️ MET Norway API timeout for {lat}, {lon}")
-            return None
             
         except requests.exceptions.ConnectionError:
             logger.error(f"🔌 MET Norway API connection error for {lat}, {lon}")
-            return None
             
         except requests.exceptions.RequestException as e:
             logger.error(f"🌐 MET Norway API request failed: {e}")
-            return None
             
         except Exception as e:
             logger.error(f"⚠️ Unexpected error in MET Norway API request: {e}")
-            return None
+        
+        return 0, None, {}
     
     def get_current_weather(self, lat: float = None, lon: float = None) -> Optional[Dict[str, Any]]:
         """
@@ -214,6 +211,7 @@ class METNorwayService:
         Returns:
             Dictionary with weather data or None if API fails
         """
+        weather_prewarmer.start()
         try:
             # Use provided coordinates or environment defaults
             target_lat = lat if lat is not None else self.default_lat
@@ -272,8 +270,8 @@ class METNorwayService:
                 logger.error("No timeseries data in MET Norway response")
                 raise ValueError("No weather data in API response")
             
-            # Get current data (first entry in timeseries)
-            current = timeseries[0]
+            # Step in effect now (a stale-served document no longer starts at this hour)
+            current = current_step(timeseries)
             current_time = current.get('time')
             data = current.get('data', {})
             instant = data.get('instant', {})
@@ -567,10 +565,7 @@ class METNorwayService:
         test_result = self.get_current_weather(self.default_lat, self.default_lon)
         
         # Check cache status
-        cache_info = {
-            'entries': len(self.cache),
-            'max_age_seconds': self.cache_duration
-        }
+        cache_info = self.get_cache_info()
         
         # Determine connectivity status
         if test_result and test_result.get('data_source') == 'met_norway_live':
@@ -603,9 +598,9 @@ class METNorwayService:
             
             'configuration': {
                 'cache_entries': cache_info['entries'],
-                'cache_duration_seconds': cache_info['max_age_seconds'],
-                'rate_limit_rps': 8,
-                'min_request_interval': self.min_request_interval
+                'cache_stale_max_seconds': cache_info['stale_max_seconds'],
+                'rate_limit_rps': upstream_limiter.get_status()['upstreams']['met_norway']['rate_per_second'],
+                'stale_served': self.stale_served
             },
             
             'attribution': 'Norwegian Meteorological Institute (MET Norway)',
@@ -636,16 +631,19 @@ class METNorwayService:
         return status
     
     def clear_cache(self):
-        """Clear the response cache."""
+        """Clear the (shared) forecast cache."""
         self.cache.clear()
         logger.info("🧹 MET Norway cache cleared")
     
     def get_cache_info(self) -> Dict[str, Any]:
         """Get information about the cache."""
+        stats = self.cache.stats()
         return {
-            'entries': len(self.cache),
-            'max_age_seconds': self.cache_duration,
-            'keys': list(self.cache.keys())[:5] if self.cache else []
+            'entries': stats['size'],
+            'grid_deg': stats['grid_deg'],
+            'stale_max_seconds': self.cache.stale_seconds,
+            'hit_ratio': stats['hit_ratio'],
+            'keys': [self.cache.cell_center(key) for key in list(self.cache.cache.keys())[:5]]
         }
 
 
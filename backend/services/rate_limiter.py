@@ -0,0 +1,300 @@
+"""
+Upstream Rate Limiter - token buckets with a budget per upstream, shared by
+every caller of a rate-limited API.
+
+Callers never sleep in their own (Flask worker) thread. They either ask for
+an immediate decision with try_acquire() - call now, or serve what they have
+cached - or submit() the call, which is queued and run on the limiter's
+workers as soon as the upstream's budget allows. Queued calls reserve future
+tokens, so they run first come, first served at the budgeted rate.
+
+Background work (cache pre-warming and revalidation) goes through
+submit_idle() instead: it never reserves future tokens and only runs on
+budget left over after a token of headroom, so however much of it is
+pending, request-path calls are not queued behind it.
+
+Per-upstream decisions and queue wait times are in get_status().
+"""
+
+import heapq
+import itertools
+from collections import deque
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+from backend.services.http_client import LATENCY_BUCKETS_MS
+
+logger = logging.getLogger(__name__)
+
+# Requests per second and burst size per upstream; callers add their own with configure()
+UPSTREAM_RATE_LIMITS: Dict[str, Tuple[float, float]] = {
+    'met_norway': (float(os.getenv('MET_RATE_LIMIT_PER_SECOND', '8')), 8),
+}
+RATE_LIMITER_WORKERS = int(os.getenv('RATE_LIMITER_WORKERS', '4'))
+# Tokens idle (background) calls leave in the bucket for request-path calls
+RATE_LIMITER_IDLE_HEADROOM = float(os.getenv('RATE_LIMITER_IDLE_HEADROOM', '1'))
+
+
+class RateLimitExceeded(Exception):
+    """A queued call would have to wait longer than its caller allows."""
+
+
+class TokenBucket:
+    """Refills rate tokens per second up to burst; not thread-safe on its own."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = max(1.0, burst if burst is not None else rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, max_wait: float = 0.0) -> Optional[float]:
+        """
+        Take one token, going into debt for queued calls.
+
+        Returns:
+            Seconds until the token may be used, or None (and nothing taken)
+            if that is longer than max_wait
+        """
+        if self.rate <= 0:
+            return 0.0
+        self._refill()
+        wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+        if wait > max_wait:
+            return None
+        self.tokens -= 1
+        return wait
+
+    def take_spare(self, headroom: float = 0.0) -> float:
+        """
+        Take one token only if it is spare: more than headroom tokens are
+        available and nothing is reserved. Never goes into debt.
+
+        Returns:
+            0.0 if a token was taken, else seconds until one may be spare
+        """
+        if self.rate <= 0:
+            return 0.0
+        self._refill()
+        needed = 1 + min(headroom, self.burst - 1)
+        if self.tokens >= needed:
+            self.tokens -= 1
+            return 0.0
+        return (needed - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """
+    Shared token buckets with a dispatcher for queued calls.
+    Upstreams without a configured budget are not limited.
+    """
+
+    def __init__(self, budgets: Optional[Dict[str, Tuple[float, float]]] = None,
+                 max_workers: int = RATE_LIMITER_WORKERS, name: str = 'rate-limiter',
+                 idle_headroom: float = RATE_LIMITER_IDLE_HEADROOM):
+        self.name = name
+        self.idle_headroom = idle_headroom
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._stats: Dict[str, Dict] = {}
+        self._queue = []  # (due, seq, upstream, submitted, future, func, args, kwargs)
+        self._idle: Dict[str, deque] = {}  # upstream -> (submitted, future, func, args, kwargs)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._dispatcher: Optional[threading.Thread] = None
+        for upstream, (rate, burst) in (budgets or {}).items():
+            self.configure(upstream, rate, burst)
+
+    def configure(self, upstream: str, rate: float, burst: Optional[float] = None):
+        """Set (or replace) an upstream's budget: rate per second, burst tokens."""
+        with self._cond:
+            self._buckets[upstream] = TokenBucket(rate, burst)
+            self._upstream_stats(upstream)
+
+    def try_acquire(self, upstream: str) -> bool:
+        """Take a token if one is available now; False means serve from cache or skip."""
+        with self._cond:
+            bucket = self._buckets.get(upstream)
+            if bucket is None:
+                return True
+            granted = bucket.reserve() is not None
+            stats = self._upstream_stats(upstream)
+            if granted:
+                stats['granted'] += 1
+                self._record_wait(stats, 0.0)
+            else:
+                stats['denied'] += 1
+            return granted
+
+    def submit(self, upstream: str, func: Callable, *args,
+               max_queue_seconds: Optional[float] = None, **kwargs) -> Future:
+        """
+        Run func(*args, **kwargs) on the limiter's workers once the upstream's
+        budget allows.
+
+        Args:
+            upstream: Budget to draw from
+            func: The upstream call
+            max_queue_seconds: Fail with RateLimitExceeded instead of queueing
+                longer than this (default: queue as long as needed)
+
+        Returns:
+            Future with func's result
+        """
+        future = Future()
+        with self._cond:
+            bucket = self._buckets.get(upstream)
+            wait = 0.0 if bucket is None else bucket.reserve(
+                float('inf') if max_queue_seconds is None else max_queue_seconds)
+            stats = self._upstream_stats(upstream)
+            if wait is None:
+                stats['rejected'] += 1
+                future.set_exception(RateLimitExceeded(
+                    f"{upstream}: queue longer than {max_queue_seconds:.2f}s"))
+                return future
+            if wait == 0:
+                stats['granted'] += 1
+                self._record_wait(stats, 0.0)
+            else:
+                stats['queued'] += 1
+                heapq.heappush(self._queue, (time.monotonic() + wait, next(self._seq), upstream,
+                                             time.monotonic(), future, func, args, kwargs))
+                self._ensure_dispatcher()
+                self._cond.notify()
+                return future
+        self._executor.submit(self._run, future, func, args, kwargs)
+        return future
+
+    def submit_idle(self, upstream: str, func: Callable, *args, **kwargs) -> Future:
+        """
+        Run func(*args, **kwargs) when the upstream has spare budget: never
+        ahead of submit()/try_acquire() callers, and never reserving tokens
+        they could need. Idle calls of one upstream run in submission order.
+
+        Returns:
+            Future with func's result
+        """
+        future = Future()
+        with self._cond:
+            self._idle.setdefault(upstream, deque()).append((time.monotonic(), future, func, args, kwargs))
+            self._upstream_stats(upstream)
+            self._ensure_dispatcher()
+            self._cond.notify()
+        return future
+
+    def _next_idle(self) -> Tuple[Optional[tuple], Optional[float]]:
+        """
+        An idle call whose upstream has a spare token (taken), or None and
+        the seconds until one might (condition held).
+        """
+        retry = None
+        for upstream, calls in self._idle.items():
+            while calls and calls[0][1].cancelled():
+                calls.popleft()
+            if not calls:
+                continue
+            bucket = self._buckets.get(upstream)
+            wait = 0.0 if bucket is None else bucket.take_spare(self.idle_headroom)
+            if wait == 0:
+                return (upstream,) + calls.popleft(), None
+            retry = wait if retry is None else min(retry, wait)
+        return None, retry
+
+    def _ensure_dispatcher(self):
+        """Start the dispatcher thread (condition held)."""
+        if self._dispatcher is None or not self._dispatcher.is_alive():
+            self._dispatcher = threading.Thread(target=self._dispatch_loop, name=f'{self.name}-dispatch',
+                                                daemon=True)
+            self._dispatcher.start()
+
+    def _dispatch_loop(self):
+        """
+        Hand queued calls to the workers when their reserved token is due,
+        and idle calls when their upstream has a spare one.
+        """
+        while True:
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    if self._queue and self._queue[0][0] <= now:
+                        _, _, upstream, submitted, future, func, args, kwargs = heapq.heappop(self._queue)
+                        self._record_wait(self._upstream_stats(upstream), now - submitted)
+                        break
+                    idle, retry = self._next_idle()
+                    if idle is not None:
+                        upstream, submitted, future, func, args, kwargs = idle
+                        self._upstream_stats(upstream)['idle'] += 1
+                        break
+                    timeouts = [t for t in (self._queue[0][0] - now if self._queue else None, retry)
+                                if t is not None]
+                    self._cond.wait(min(timeouts) if timeouts else None)
+            self._executor.submit(self._run, future, func, args, kwargs)
+
+    @staticmethod
+    def _run(future: Future, func: Callable, args, kwargs):
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(func(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+
+    def _upstream_stats(self, upstream: str) -> Dict:
+        """Counters for one upstream (condition held)."""
+        stats = self._stats.get(upstream)
+        if stats is None:
+            stats = {'granted': 0, 'queued': 0, 'denied': 0, 'rejected': 0, 'idle': 0,
+                     'counts': [0] * (len(LATENCY_BUCKETS_MS) + 1), 'waits': 0, 'total_wait_ms': 0.0,
+                     'max_wait_ms': 0.0}
+            self._stats[upstream] = stats
+        return stats
+
+    @staticmethod
+    def _record_wait(stats: Dict, wait_seconds: float):
+        wait_ms = wait_seconds * 1000
+        bucket = next((i for i, bound in enumerate(LATENCY_BUCKETS_MS) if wait_ms <= bound),
+                      len(LATENCY_BUCKETS_MS))
+        stats['counts'][bucket] += 1
+        stats['waits'] += 1
+        stats['total_wait_ms'] += wait_ms
+        stats['max_wait_ms'] = max(stats['max_wait_ms'], wait_ms)
+
+    def get_status(self) -> Dict:
+        """Per-upstream budget, decisions (granted/queued/denied/rejected/idle) and wait-time histogram."""
+        with self._cond:
+            queue_depth = {}
+            for entry in self._queue:
+                queue_depth[entry[2]] = queue_depth.get(entry[2], 0) + 1
+            upstreams = {}
+            for upstream, stats in self._stats.items():
+                bucket = self._buckets.get(upstream)
+                buckets = {f'le_{bound}ms': count for bound, count in zip(LATENCY_BUCKETS_MS, stats['counts'])}
+                buckets[f'gt_{LATENCY_BUCKETS_MS[-1]}ms'] = stats['counts'][-1]
+                upstreams[upstream] = {
+                    'rate_per_second': bucket.rate if bucket else None,
+                    'burst': bucket.burst if bucket else None,
+                    'granted': stats['granted'],
+                    'queued': stats['queued'],
+                    'denied': stats['denied'],
+                    'rejected': stats['rejected'],
+                    'idle': stats['idle'],
+                    'queue_depth': queue_depth.get(upstream, 0),
+                    'idle_depth': len(self._idle.get(upstream, ())),
+                    'wait_buckets': buckets,
+                    'mean_wait_ms': round(stats['total_wait_ms'] / stats['waits'], 1) if stats['waits'] else 0.0,
+                    'max_wait_ms': round(stats['max_wait_ms'], 1),
+                }
+            return {'name': self.name, 'upstreams': upstreams}
+
+
+# Global instance
+upstream_limiter = RateLimiter(UPSTREAM_RATE_LIMITS)
@@ -13,6 +13,8 @@ import math
 import os
 import random
 
+from backend.services.http_client import upstream_client
+
 logger = logging.getLogger(__name__)
 
 try:
@@ -416,24 +418,25 @@ class RecommendationEngine:
             logger.error(f"Invalid coordinates for weather request: lat={lat}, lon={lon}")
             return self._get_realistic_simulation(lat, lon)
         
-        # Create cache key
-        cache_key = f"{lat:.2f},{lon:.2f}"
-        current_time = datetime.now(timezone.utc)
+        # MET Norway Locationforecast first, served from the shared grid cache
+        weather_data = self._try_metnorway_locationforecast(lat, lon)
+        if weather_data.get('source') != 'failed':
+            return weather_data
         
-        # Check cache first
+        # Fallbacks are cached per shared grid cell so a failing MET is not
+        # hit again for every vessel in the same area
+        from backend.services.weather_service import weather_cache
+        cache_key = weather_cache.cell(lat, lon)
+        current_time = datetime.now(timezone.utc)
         if cache_key in self.weather_cache:
             cached_data, cache_time = self.weather_cache[cache_key]
             if current_time - cache_time < self.cache_duration:
-                logger.debug(f"Using cached weather data for {lat}, {lon}")
+                logger.debug(f"Using cached fallback weather data for {lat}, {lon}")
                 return cached_data
         
-        # Try MET Norway Locationforecast API first
-        weather_data = self._try_metnorway_locationforecast(lat, lon)
-        
         # If MET Norway fails, try Open-Meteo API (wrapper for MET Nordic model)
-        if not weather_data or weather_data.get('source') == 'failed':
-            logger.info(f"MET Norway API failed, trying Open-Meteo API for {lat}, {lon}")
-            weather_data = self._try_openmeteo_metno_api(lat, lon)
+        logger.info(f"MET Norway API failed, trying Open-Meteo API for {lat}, {lon}")
+        weather_data = self._try_openmeteo_metno_api(lat, lon)
         
         # If all real APIs fail, use realistic simulation (should be rare)
         if not weather_data or weather_data.get('source') == 'failed':
@@ -448,67 +451,51 @@ class RecommendationEngine:
     def _try_metnorway_locationforecast(self, lat: float, lon: float) -> Dict[str, Any]:
         """
         Try to get weather data from MET Norway's Locationforecast 2.0 API[citation:1].
-        This is the primary source for real-time weather data.
+        This is the primary source for real-time weather data, read through
+        the shared grid-cell cache in weather_service.
         """
         try:
-            # MET Norway Locationforecast 2.0 endpoint[citation:1]
-            url = f"https://api.met.no/weatherapi/locationforecast/2.0/complete"
+            from backend.services.forecast_cube import current_step
+            from backend.services.weather_service import weather_cache
+            data = weather_cache.get_forecast(lat, lon)
+            if data is None:
+                return {'source': 'failed', 'error': 'MET Norway unavailable'}
             
-            headers = {
-                'User-Agent': self.user_agent,
-                'Accept': 'application/json'
-            }
+            # Parse the MET Norway response structure
+            # Extract current weather from the timeseries
+            if 'properties' in data and 'timeseries' in data['properties']:
+                timeseries = data['properties']['timeseries']
+                if timeseries:
+                    # Step in effect now (the shared cache may serve an expired document)
+                    current = current_step(timeseries)
+                    if 'data' in current and 'instant' in current['data']:
+                        instant = current['data']['instant']['details']
+                        
+                        # Extract relevant weather parameters
+                        weather_data = {
+                            'wind_speed': instant.get('wind_speed', 0),
+                            'wind_direction': instant.get('wind_from_direction', 0),
+                            'temperature': instant.get('air_temperature', 0),
+                            'pressure': instant.get('air_pressure_at_sea_level', 0),
+                            'humidity': instant.get('relative_humidity', 0),
+                            'cloud_area_fraction': instant.get('cloud_area_fraction', 0),
+                            'source': 'MET Norway Locationforecast 2.0',
+                            'timestamp': current.get('time', datetime.now(timezone.utc).isoformat()),
+                            'success': True
+                        }
+                        
+                        # Try to get wave height from next_1_hours if available
+                        if 'next_1_hours' in current['data']:
+                            next_hour = current['data']['next_1_hours']['details']
+                            weather_data['precipitation'] = next_hour.get('precipitation_amount', 0)
+                        
+                        logger.debug(f"✅ MET Norway data for {lat}, {lon}")
+                        return weather_data
             
-            params = {
-                'lat': lat,
-                'lon': lon
-            }
+            logger.warning(f"MET Norway response for {lat}, {lon} had no timeseries")
+            return {'source': 'failed', 'error': 'No timeseries'}
             
-            logger.info(f"🌤️ Requesting MET Norway Locationforecast for {lat}, {lon}")
-            response = requests.get(url, headers=headers, params=params, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                # Parse the MET Norway response structure
-                # Extract current weather from the timeseries
-                if 'properties' in data and 'timeseries' in data['properties']:
-                    timeseries = data['properties']['timeseries']
-                    if timeseries:
-                        # Get the most recent forecast (usually current conditions)
-                        current = timeseries[0]
-                        if 'data' in current and 'instant' in current['data']:
-                            instant = current['data']['instant']['details']
-                            
-                            # Extract relevant weather parameters
-                            weather_data = {
-                                'wind_speed': instant.get('wind_speed', 0),
-                                'wind_direction': instant.get('wind_from_direction', 0),
-                                'temperature': instant.get('air_temperature', 0),
-                                'pressure': instant.get('air_pressure_at_sea_level', 0),
-                                'humidity': instant.get('relative_humidity', 0),
-                                'cloud_area_fraction': instant.get('cloud_area_fraction', 0),
-                                'source': 'MET Norway Locationforecast 2.0',
-                                'timestamp': current.get('time', datetime.now(timezone.utc).isoformat()),
-                                'success': True
-                            }
-                            
-                            # Try to get wave height from next_1_hours if available
-                            if 'next_1_hours' in current['data']:
-                                next_hour = current['data']['next_1_hours']['details']
-                                weather_data['precipitation'] = next_hour.get('precipitation_amount', 0)
-                            
-                            logger.info(f"✅ Successfully retrieved MET Norway data for {lat}, {lon}")
-                            return weather_data
-            
-            # If we got here but not 200, log the issue
-            logger.warning(f"MET Norway API returned {response.status_code}: {response.text[:200]}")
-            return {'source': 'failed', 'error': f"API returned {response.status_code}"}
-            
-        except requests.exceptions.RequestException as e:
-            logger.error(f"MET Norway API request failed: {e}")
-            return {'source': 'failed', 'error': str(e)}
-        except (KeyError, IndexError, json.JSONDecodeError) as e:
+        except (KeyError, IndexError, TypeError) as e:
             logger.error(f"Failed to parse MET Norway response: {e}")
             return {'source': 'failed', 'error': 'Parse error'}
     
@@ -533,7 +520,7 @@ class RecommendationEngine:
             }
             
             logger.info(f"🌤️ Requesting Open-Meteo MET Norway data for {lat}, {lon}")
-            response = requests.get(url, params=params, timeout=10)
+            response = upstream_client.get(url, params=params, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
@@ -7,7 +7,10 @@ import logging
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 import math
-import requests  # For fetching weather data in risk assessment
+import numpy as np
+
+from backend.services.spatial_queries import POINT_HAZARD_FOOTPRINT_M, spatial_queries
+from backend.utils.spatial_index import GeoGridIndex, LatitudeBandIndex, haversine_km
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +21,22 @@ class RiskEngine:
     Uses data from AIS, BarentsWatch, MET Norway, and RTZ routes.
     """
 
+    # Grid cell size for the hazard indexes (~5.5 km north-south)
+    HAZARD_INDEX_CELL_DEG = 0.05
+
+    # hazard_zones types owned by load_hazard_data (see spatial_queries)
+    HAZARD_ZONE_TYPES = ('aquaculture', 'cable', 'installation')
+
+    # Empirical risk thresholds for Norwegian coastal waters
+    # Based on operational guidelines and historical incident data
+    SPEED_THRESHOLDS = {
+        'cargo': 18.0, 'tanker': 16.0, 'passenger': 20.0,
+        'fishing': 12.0, 'general cargo': 15.0, 'container': 19.0,
+        'default': 15.0
+    }
+    WIND_THRESHOLDS = {'LOW': 10.0, 'MEDIUM': 15.0, 'HIGH': 20.0}  # m/s
+    WAVE_THRESHOLDS = {'LOW': 2.0, 'MEDIUM': 3.5, 'HIGH': 5.0}    # meters
+
     def __init__(self):
         """Initialize with Norwegian safety regulations."""
         logger.info("✅ Risk Engine initialized")
@@ -49,6 +68,24 @@ class RiskEngine:
         # NEW: Consolidated list for proximity checks
         self.hazard_locations = []
         
+        # Spatial indexes rebuilt by load_hazard_data so proximity checks only
+        # visit hazards in grid cells around the vessel.
+        # _hazard_index keys are positions in hazard_locations;
+        # _legacy_hazard_index keys are (category, position) into hazard_data.
+        self._hazard_index = GeoGridIndex(cell_size_deg=self.HAZARD_INDEX_CELL_DEG)
+        self._legacy_hazard_index = GeoGridIndex(cell_size_deg=self.HAZARD_INDEX_CELL_DEG)
+        
+        # Latitude-sorted arrays of the same hazards for assess_fleet.
+        # _legacy_hazard_bands maps category -> (band index, hazard_data positions).
+        self._hazard_band = LatitudeBandIndex([], [])
+        self._legacy_hazard_bands = {}
+        
+        # hazard_zones source keys in hazard_locations order, when synced to PostGIS
+        self._hazard_zone_keys = None
+        
+        # Bumped by load_hazard_data; route corridors rebuild when it changes
+        self.hazard_version = 0
+        
         # Cache for performance
         self._hazard_cache_timestamp = None
         self._hazard_cache_duration = 3600  # 1 hour in seconds
@@ -126,7 +163,12 @@ class RiskEngine:
                     'longitude': installation['longitude']
                 })
         
+        self._build_hazard_indexes()
+        
+        self._hazard_zone_keys = spatial_queries.sync_point_hazards(self.hazard_locations, self.HAZARD_ZONE_TYPES)
+        
         self._hazard_cache_timestamp = datetime.now()
+        self.hazard_version += 1
         
         logger.info(
             f"Loaded hazard data: "
@@ -137,8 +179,45 @@ class RiskEngine:
         )
         logger.info(f"Consolidated {len(self.hazard_locations)} hazard locations for proximity checks")
 
+    def _build_hazard_indexes(self):
+        """Rebuild the spatial indexes over hazard_locations and hazard_data."""
+        self._hazard_index = GeoGridIndex(cell_size_deg=self.HAZARD_INDEX_CELL_DEG)
+        self._hazard_index.bulk_load(
+            (i, hazard['latitude'], hazard['longitude'])
+            for i, hazard in enumerate(self.hazard_locations)
+        )
+        
+        self._hazard_band = LatitudeBandIndex(
+            [hazard['latitude'] for hazard in self.hazard_locations],
+            [hazard['longitude'] for hazard in self.hazard_locations]
+        )
+        
+        self._legacy_hazard_index = GeoGridIndex(cell_size_deg=self.HAZARD_INDEX_CELL_DEG)
+        self._legacy_hazard_bands = {}
+        for hazard_type, hazards in self.hazard_data.items():
+            positions, lats, lons = [], [], []
+            for i, hazard in enumerate(hazards):
+                hazard_lat, hazard_lon = self._legacy_hazard_coordinates(hazard)
+                if not hazard_lat or not hazard_lon:
+                    continue
+                self._legacy_hazard_index.insert((hazard_type, i), hazard_lat, hazard_lon)
+                positions.append(i)
+                lats.append(hazard_lat)
+                lons.append(hazard_lon)
+            if positions:
+                self._legacy_hazard_bands[hazard_type] = (LatitudeBandIndex(lats, lons), np.array(positions))
+        
+        logger.debug(f"Hazard index: {self._hazard_index.stats()}")
+
+    @staticmethod
+    def _legacy_hazard_coordinates(hazard: Dict):
+        """Extract (lat, lon) from a raw hazard dict using the legacy key fallbacks."""
+        hazard_lat = hazard.get('latitude') or hazard.get('lat') or hazard.get('y')
+        hazard_lon = hazard.get('longitude') or hazard.get('lon') or hazard.get('x')
+        return hazard_lat, hazard_lon
+
     def assess_vessel(self, vessel_data: Dict, weather_data: Optional[Dict] = None, 
-                     route_data: Optional[Dict] = None) -> List[Dict]:
+                     route_data: Optional[Dict] = None, corridor=None) -> List[Dict]:
         """
         Comprehensive risk assessment for a single vessel.
         Now uses the advanced risk calculation as the primary method.
@@ -147,6 +226,8 @@ class RiskEngine:
             vessel_data: Vessel information from AIS service
             weather_data: Weather information from MET Norway
             route_data: Planned route information (optional)
+            corridor: LegCandidates of the vessel's current route leg
+                (see route_corridor); only those hazards are checked
             
         Returns:
             List of risk dictionaries sorted by severity
@@ -157,17 +238,17 @@ class RiskEngine:
             weather_data_fixed = self._ensure_wave_height_data(weather_data)
             
             # Use advanced risk calculation
-            risks = self._calculate_advanced_risks(vessel_data, weather_data_fixed)
+            risks = self._calculate_advanced_risks(vessel_data, weather_data_fixed, corridor)
             
             # Also run legacy checks for compatibility
-            legacy_risks = self._run_legacy_checks(vessel_data, weather_data_fixed, route_data)
+            legacy_risks = self._run_legacy_checks(vessel_data, weather_data_fixed, route_data, corridor)
             
             # Combine risks, avoiding duplicates based on type
             combined_risks = self._combine_risk_lists(risks, legacy_risks)
             
         else:
             # Fallback to legacy checks only
-            combined_risks = self._run_legacy_checks(vessel_data, weather_data, route_data)
+            combined_risks = self._run_legacy_checks(vessel_data, weather_data, route_data, corridor)
         
         # Sort by severity (HIGH > MEDIUM > LOW)
         severity_order = {'HIGH': 0, 'MEDIUM': 1, 'LOW': 2}
@@ -176,7 +257,344 @@ class RiskEngine:
         logger.debug(f"Generated {len(combined_risks)} risks for vessel {vessel_data.get('name', 'unknown')}")
         return combined_risks
 
-    def _calculate_advanced_risks(self, vessel_data: Dict, weather_data: Dict) -> List[Dict]:
+    @staticmethod
+    def fleet_columns(vessels: List[Dict]) -> Dict[str, np.ndarray]:
+        """
+        Convert a list of AIS vessel dicts into the columnar layout used by assess_fleet.
+
+        Args:
+            vessels: Vessel dicts with at least 'lat' and 'lon'
+
+        Returns:
+            Dictionary of column name -> NumPy array
+        """
+        def numeric(key, default=np.nan):
+            values = [vessel.get(key) for vessel in vessels]
+            return np.array([default if value is None else value for value in values], dtype=float)
+
+        columns = {
+            'lat': numeric('lat'),
+            'lon': numeric('lon'),
+            'speed': numeric('speed', 0.0),
+            'draught': numeric('draught', 5.0),
+            'length': numeric('length', 100.0),
+            'type': np.array([vessel.get('type', '') for vessel in vessels], dtype=object),
+            'mmsi': np.array([vessel.get('mmsi') for vessel in vessels], dtype=object),
+            'name': np.array([vessel.get('name') for vessel in vessels], dtype=object),
+        }
+        if any('route_deviation_km' in vessel for vessel in vessels):
+            columns['route_deviation_km'] = numeric('route_deviation_km')
+        return columns
+
+    def _screen_fleet(self, vessels: Dict[str, Any], weather_grid: Optional[Dict[str, Any]],
+                      hours: Optional[Any]) -> Optional[Dict[str, Any]]:
+        """
+        Array part of assess_fleet: every check as a per-vessel mask and
+        hazard matches as (vessel, hazard, distance) index arrays.
+        Returns None for an empty fleet.
+        """
+        lat = np.asarray(vessels['lat'], dtype=float)
+        n = len(lat)
+        if n == 0:
+            return None
+        lon = np.asarray(vessels['lon'], dtype=float)
+
+        def column(key, default):
+            values = vessels.get(key)
+            if values is None:
+                return np.full(n, default, dtype=float)
+            return np.nan_to_num(np.asarray(values, dtype=float), nan=default)
+
+        def optional_column(key, default=None):
+            values = vessels.get(key)
+            return list(values) if values is not None else [default] * n
+
+        speed = column('speed', 0.0)
+        draught = column('draught', 5.0)
+        length = column('length', 100.0)
+        raw_types = optional_column('type', '')
+        types = np.array([str(t).lower() for t in raw_types], dtype=object)
+        mmsis = optional_column('mmsi')
+        names = optional_column('name')
+
+        # Weather broadcast to one value per vessel
+        if weather_grid:
+            wind = np.broadcast_to(np.asarray(weather_grid.get('wind_speed', np.nan), dtype=float), (n,))
+            wave = weather_grid.get('wave_height')
+            wave = np.broadcast_to(np.asarray(np.nan if wave is None else wave, dtype=float), (n,))
+            has_weather = np.isfinite(wind)
+            wind = np.where(has_weather, wind, 0.0)
+            # Same empirical estimate as _ensure_wave_height_data
+            wave = np.where(np.isfinite(wave), wave, 0.02 * wind ** 1.5)
+        else:
+            wind = np.zeros(n)
+            wave = np.zeros(n)
+            has_weather = np.zeros(n, dtype=bool)
+
+        has_position = np.isfinite(lat) & np.isfinite(lon)
+        if hours is None:
+            hours = datetime.utcnow().hour
+        hour = np.broadcast_to(np.asarray(hours, dtype=int), (n,))
+        timestamp = datetime.utcnow().isoformat() + 'Z'
+
+        # --- Advanced checks (only where weather is available) ---
+        unique_types, type_inverse = np.unique(types.astype(str), return_inverse=True)
+        speed_limit = np.array([
+            self.SPEED_THRESHOLDS.get(t, self.SPEED_THRESHOLDS['default']) for t in unique_types
+        ])[type_inverse]
+        weather_adjustment = (1.0
+                              - 0.15 * (wind > self.WIND_THRESHOLDS['LOW'])
+                              - 0.20 * (wave > self.WAVE_THRESHOLDS['LOW'])
+                              - 0.10 * (draught > 10.0))
+        safe_speed = np.maximum(5.0, speed_limit * weather_adjustment)
+        adv_speed = has_weather & (speed > safe_speed * 1.1)
+        adv_wind = has_weather & (wind > self.WIND_THRESHOLDS['MEDIUM'])
+        adv_wave = has_weather & (wave > self.WAVE_THRESHOLDS['MEDIUM'])
+        adv_night = has_weather & ((hour >= 18) | (hour <= 6))
+
+        deviation = vessels.get('route_deviation_km')
+        if deviation is not None:
+            deviation = np.asarray(deviation, dtype=float)
+            adv_deviation = has_weather & np.isfinite(deviation) & (deviation > 5.0)
+        else:
+            adv_deviation = np.zeros(n, dtype=bool)
+
+        # Vessels at exactly 0 lat/lon are skipped, matching the truthiness check in assess_vessel
+        adv_hazard_pairs = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0))
+        hazard_vessels = has_weather & has_position & (lat != 0) & (lon != 0)
+        if self.hazard_locations and hazard_vessels.any():
+            query = np.flatnonzero(hazard_vessels)
+            pairs = self._hazards_within_db(lat[query], lon[query], 1.0)
+            if pairs is None:
+                pairs = self._hazard_band.within(lat[query], lon[query], 2.0)
+            vessel_idx, hazard_idx, distance = pairs
+            distance = np.round(distance, 3)
+            close = distance < 1.0
+            adv_hazard_pairs = (query[vessel_idx[close]], hazard_idx[close], distance[close])
+
+        # --- Legacy checks ---
+        safe_distances = self._legacy_safe_distances()
+        legacy_hazard_pairs = []
+        if has_position.any():
+            query = np.flatnonzero(has_position)
+            for hazard_type, (band, positions) in self._legacy_hazard_bands.items():
+                safe_distance = safe_distances.get(hazard_type, 100)
+                if safe_distance <= 0:
+                    continue
+                vessel_idx, hazard_idx, distance = band.within(lat[query], lon[query], safe_distance / 1000.0)
+                distance_m = distance * 1000.0
+                close = distance_m < safe_distance
+                legacy_hazard_pairs.append((hazard_type, safe_distance, query[vessel_idx[close]],
+                                            positions[hazard_idx[close]], distance_m[close]))
+
+        legacy_wave = has_weather & (wave > 0) & (wave > self.safety_parameters['max_wave_height_m'])
+        legacy_wind = has_weather & (wind > 0) & (wind > self.safety_parameters['max_wind_speed_mps'])
+        legacy_night = has_position & ((hour >= 20) | (hour <= 5))
+        legacy_max_speed = np.maximum(5.0, 20.0 - (wave * 2 + wind * 0.5))
+        legacy_speed = has_weather & (speed > 0) & (speed > legacy_max_speed)
+        return {
+            'n': n, 'lat': lat, 'lon': lon, 'speed': speed, 'draught': draught, 'length': length,
+            'raw_types': raw_types, 'types': types, 'mmsis': mmsis, 'names': names,
+            'wind': wind, 'wave': wave, 'has_weather': has_weather, 'hour': hour, 'timestamp': timestamp,
+            'safe_speed': safe_speed, 'deviation': deviation, 'safe_distances': safe_distances,
+            'adv_speed': adv_speed, 'adv_wind': adv_wind, 'adv_wave': adv_wave, 'adv_night': adv_night,
+            'adv_deviation': adv_deviation, 'adv_hazard_pairs': adv_hazard_pairs,
+            'legacy_wave': legacy_wave, 'legacy_wind': legacy_wind, 'legacy_night': legacy_night,
+            'legacy_speed': legacy_speed, 'legacy_hazard_pairs': legacy_hazard_pairs,
+        }
+
+    def assess_fleet(self, vessels: Dict[str, Any], weather_grid: Optional[Dict[str, Any]] = None,
+                     hours: Optional[Any] = None) -> List[List[Dict]]:
+        """
+        Risk assessment for a whole fleet snapshot in one pass.
+
+        Screens every vessel with NumPy array operations (hazard distances,
+        weather limits, night and speed checks) and only builds risk
+        dictionaries for vessels that trip a check. The result for each vessel
+        is the same list assess_vessel would return, so it can be passed
+        straight to get_risk_summary.
+
+        Args:
+            vessels: Columnar vessel data - 'lat' and 'lon' arrays plus optional
+                'speed', 'type', 'draught', 'length', 'mmsi', 'name' and
+                'route_deviation_km' (see fleet_columns)
+            weather_grid: Weather sampled at each vessel - 'wind_speed' and
+                optional 'wave_height', each an array aligned with the vessels
+                or a scalar for the whole area. NaN wind means no weather for
+                that vessel; None means legacy checks only.
+            hours: UTC hour of day per vessel (array or scalar) for the night
+                checks, e.g. from a simulated clock; defaults to the current hour
+
+        Returns:
+            List of risk lists (sorted by severity), one per vessel
+        """
+        screen = self._screen_fleet(vessels, weather_grid, hours)
+        if screen is None:
+            return []
+        n = screen['n']
+        lat, lon, speed, draught, length = (screen[key] for key in ('lat', 'lon', 'speed', 'draught', 'length'))
+        raw_types, types, mmsis, names = (screen[key] for key in ('raw_types', 'types', 'mmsis', 'names'))
+        wind, wave, has_weather, hour = (screen[key] for key in ('wind', 'wave', 'has_weather', 'hour'))
+        timestamp, safe_speed, deviation = screen['timestamp'], screen['safe_speed'], screen['deviation']
+        safe_distances = screen['safe_distances']
+        (adv_speed, adv_wind, adv_wave, adv_night, adv_deviation,
+         legacy_wave, legacy_wind, legacy_night, legacy_speed) = (
+            screen[key] for key in ('adv_speed', 'adv_wind', 'adv_wave', 'adv_night', 'adv_deviation',
+                                    'legacy_wave', 'legacy_wind', 'legacy_night', 'legacy_speed'))
+
+        adv_hazards = {}
+        for v, h, d in zip(*(values.tolist() for values in screen['adv_hazard_pairs'])):
+            adv_hazards.setdefault(v, []).append((h, d))
+        legacy_hazards = {}
+        for hazard_type, _, vessel_idx, positions, distance_m in screen['legacy_hazard_pairs']:
+            for v, h, d in zip(vessel_idx.tolist(), positions.tolist(), distance_m.tolist()):
+                legacy_hazards.setdefault(v, []).append((hazard_type, h, d))
+
+        flagged = (adv_speed | adv_wind | adv_wave | adv_night | adv_deviation
+                   | legacy_wave | legacy_wind | legacy_night | legacy_speed)
+        flagged_idx = set(np.flatnonzero(flagged).tolist()) | set(adv_hazards) | set(legacy_hazards)
+
+        # --- Build risk dictionaries only for flagged vessels ---
+        # Plain lists index much faster than NumPy scalars in the loop below
+        (lat_l, lon_l, speed_l, wind_l, wave_l, safe_speed_l, draught_l, length_l, hour_l) = (
+            values.tolist() for values in (lat, lon, speed, wind, wave, safe_speed, draught, length, hour)
+        )
+        (adv_speed, adv_wind, adv_wave, adv_night, adv_deviation,
+         legacy_wave, legacy_wind, legacy_night, legacy_speed, has_weather) = (
+            mask.tolist() for mask in (adv_speed, adv_wind, adv_wave, adv_night, adv_deviation,
+                                       legacy_wave, legacy_wind, legacy_night, legacy_speed, has_weather)
+        )
+        deviation_l = deviation.tolist() if deviation is not None else None
+
+        severity_order = {'HIGH': 0, 'MEDIUM': 1, 'LOW': 2}
+        results: List[List[Dict]] = [[] for _ in range(n)]
+        for i in sorted(flagged_idx):
+            v_lat, v_lon = lat_l[i], lon_l[i]
+            v_speed, v_wind, v_wave = speed_l[i], wind_l[i], wave_l[i]
+
+            advanced = []
+            if adv_speed[i]:
+                severity = 'HIGH' if v_speed > safe_speed_l[i] * 1.3 else 'MEDIUM'
+                advanced.append(self._excessive_speed_risk(
+                    severity, v_speed, safe_speed_l[i], types[i], v_wind, v_wave, draught_l[i]
+                ))
+            if adv_wind[i]:
+                severity = 'HIGH' if v_wind > self.WIND_THRESHOLDS['HIGH'] else 'MEDIUM'
+                advanced.append(self._high_wind_risk(severity, v_wind, types[i]))
+            if adv_wave[i]:
+                severity = 'HIGH' if v_wave > self.WAVE_THRESHOLDS['HIGH'] else 'MEDIUM'
+                advanced.append(self._high_wave_risk(severity, v_wave, length_l[i]))
+            if adv_night[i]:
+                advanced.append(self._night_operation_risk(hour_l[i]))
+            for h, distance_km in adv_hazards.get(i, []):
+                severity = 'HIGH' if distance_km < 0.5 else 'MEDIUM'
+                hazard = dict(self.hazard_locations[h], distance_km=distance_km)
+                advanced.append(self._nearby_hazard_risk(severity, hazard, distance_km, v_lat, v_lon))
+            if adv_deviation[i]:
+                v_deviation = deviation_l[i]
+                advanced.append(self._route_deviation_risk('MEDIUM' if v_deviation < 10.0 else 'HIGH', v_deviation))
+
+            legacy = []
+            for hazard_type, h, distance_m in legacy_hazards.get(i, []):
+                legacy.append(self._legacy_hazard_risk(
+                    hazard_type, self.hazard_data[hazard_type][h], distance_m,
+                    safe_distances.get(hazard_type, 100), v_lat, v_lon, mmsis[i], names[i], timestamp
+                ))
+            if legacy_wave[i] or legacy_wind[i]:
+                for risk in self._check_weather_conditions_legacy(
+                        {'type': raw_types[i], 'mmsi': mmsis[i]},
+                        {'wave_height': v_wave, 'wind_speed': v_wind}):
+                    risk['timestamp'] = timestamp
+                    legacy.append(risk)
+            if legacy_night[i]:
+                legacy.append(self._check_night_operation_legacy(hour_l[i]))
+            if legacy_speed[i]:
+                legacy.append(self._check_speed_conditions_legacy(
+                    {'speed': v_speed, 'mmsi': mmsis[i]},
+                    {'wave_height': v_wave, 'wind_speed': v_wind}
+                ))
+
+            combined = self._combine_risk_lists(advanced, legacy) if has_weather[i] else legacy
+            combined.sort(key=lambda x: severity_order.get(x.get('severity', 'LOW'), 2))
+            results[i] = combined
+
+        logger.debug(f"Fleet assessment: {n} vessels, {len(flagged_idx)} with risks")
+        return results
+
+    # Severity codes of assess_fleet_levels
+    RISK_LEVEL_CODES = {'LOW': 1, 'MEDIUM': 2, 'HIGH': 3}
+
+    def assess_fleet_levels(self, vessels: Dict[str, Any], weather_grid: Optional[Dict[str, Any]] = None,
+                            hours: Optional[Any] = None) -> Dict[str, np.ndarray]:
+        """
+        Array summary of assess_fleet without building any risk dictionaries,
+        for large point sets such as simulated voyage timelines.
+
+        Args:
+            vessels, weather_grid, hours: As for assess_fleet
+
+        Returns:
+            'level' (0 none, 1 LOW, 2 MEDIUM, 3 HIGH - the highest severity in
+            assess_fleet's list), 'count' (the length of that list) and one
+            boolean mask per risk type
+        """
+        screen = self._screen_fleet(vessels, weather_grid, hours)
+        if screen is None:
+            return {'level': np.zeros(0, dtype=np.int8), 'count': np.zeros(0, dtype=np.int16)}
+        n = screen['n']
+        has_weather = screen['has_weather']
+
+        # Hazard matches reduced to per-vessel "any HIGH" / "any MEDIUM" and counts
+        hazard_high = np.zeros(n, dtype=bool)
+        hazard_medium = np.zeros(n, dtype=bool)
+        vessel_idx, _, distance = screen['adv_hazard_pairs']
+        hazard_high[vessel_idx[distance < 0.5]] = True
+        hazard_medium[vessel_idx[distance >= 0.5]] = True
+        legacy_hazard_count = np.zeros(n, dtype=np.int16)
+        for _, safe_distance, vessel_idx, _, distance_m in screen['legacy_hazard_pairs']:
+            high = distance_m < safe_distance * 0.5
+            hazard_high[vessel_idx[high]] = True
+            hazard_medium[vessel_idx[~high]] = True
+            np.add.at(legacy_hazard_count, vessel_idx, 1)
+
+        speed, safe_speed, wind, wave = (screen[key] for key in ('speed', 'safe_speed', 'wind', 'wave'))
+        deviation = screen['deviation']
+        adv_speed, adv_wind, adv_wave = screen['adv_speed'], screen['adv_wind'], screen['adv_wave']
+        adv_deviation = screen['adv_deviation']
+        speed_high = adv_speed & (speed > safe_speed * 1.3)
+        wind_high = adv_wind & (wind > self.WIND_THRESHOLDS['HIGH'])
+        wave_high = adv_wave & (wave > self.WAVE_THRESHOLDS['HIGH'])
+        deviation_high = (adv_deviation & (np.nan_to_num(deviation) >= 10.0)) if deviation is not None else adv_deviation
+
+        # With weather, assess_fleet keeps one risk per (type, severity); these are those keys
+        keys = {
+            ('EXCESSIVE_SPEED', 'HIGH'): speed_high,
+            ('EXCESSIVE_SPEED', 'MEDIUM'): (adv_speed & ~speed_high) | screen['legacy_speed'],
+            ('HIGH_WINDS', 'HIGH'): wind_high,
+            ('HIGH_WINDS', 'MEDIUM'): (adv_wind & ~wind_high) | screen['legacy_wind'],
+            ('HIGH_WAVES', 'HIGH'): wave_high,
+            ('HIGH_WAVES', 'MEDIUM'): (adv_wave & ~wave_high) | screen['legacy_wave'],
+            ('NIGHT_OPERATION', 'LOW'): screen['adv_night'] | screen['legacy_night'],
+            ('HAZARD_PROXIMITY', 'HIGH'): hazard_high,
+            ('HAZARD_PROXIMITY', 'MEDIUM'): hazard_medium,
+            ('ROUTE_DEVIATION', 'HIGH'): deviation_high,
+            ('ROUTE_DEVIATION', 'MEDIUM'): adv_deviation & ~deviation_high,
+        }
+        level = np.zeros(n, dtype=np.int8)
+        count = np.zeros(n, dtype=np.int16)
+        masks = {}
+        for (risk_type, severity), mask in keys.items():
+            level = np.where(mask, np.maximum(level, self.RISK_LEVEL_CODES[severity]), level)
+            count += mask
+            masks[risk_type] = masks.get(risk_type, np.zeros(n, dtype=bool)) | mask
+
+        # Without weather only the legacy hazard and night checks run, undeduplicated
+        count = np.where(has_weather, count, legacy_hazard_count + screen['legacy_night']).astype(np.int16)
+        result = {'level': level.astype(np.int8), 'count': count}
+        result.update(masks)
+        return result
+
+    def _calculate_advanced_risks(self, vessel_data: Dict, weather_data: Dict, corridor=None) -> List[Dict]:
         """
         Calculate comprehensive, data-driven maritime risks based on empirical thresholds.
         This is the core logic that transforms raw data into actionable risk assessments.
@@ -194,25 +612,14 @@ class RiskEngine:
         wind_speed = weather_data.get('wind_speed', 0.0)
         wave_height = weather_data.get('wave_height', 0.0)
         
-        # Empirical risk thresholds for Norwegian coastal waters
-        # Based on operational guidelines and historical incident data
-        SPEED_THRESHOLDS = {
-            'cargo': 18.0, 'tanker': 16.0, 'passenger': 20.0,
-            'fishing': 12.0, 'general cargo': 15.0, 'container': 19.0,
-            'default': 15.0
-        }
-        
-        WIND_THRESHOLDS = {'LOW': 10.0, 'MEDIUM': 15.0, 'HIGH': 20.0}  # m/s
-        WAVE_THRESHOLDS = {'LOW': 2.0, 'MEDIUM': 3.5, 'HIGH': 5.0}    # meters
-        
         # 1. EXCESSIVE SPEED RISK (Data-driven)
-        speed_limit = SPEED_THRESHOLDS.get(vessel_type, SPEED_THRESHOLDS['default'])
+        speed_limit = self.SPEED_THRESHOLDS.get(vessel_type, self.SPEED_THRESHOLDS['default'])
         
         # Adjust safe speed for environmental conditions
         weather_adjustment = 1.0
-        if wind_speed > WIND_THRESHOLDS['LOW']:
+        if wind_speed > self.WIND_THRESHOLDS['LOW']:
             weather_adjustment -= 0.15
-        if wave_height > WAVE_THRESHOLDS['LOW']:
+        if wave_height > self.WAVE_THRESHOLDS['LOW']:
             weather_adjustment -= 0.20
         if vessel_draught > 10.0:  # Deep draught vessels
             weather_adjustment -= 0.10
@@ -221,69 +628,33 @@ class RiskEngine:
         
         if vessel_speed > safe_speed * 1.1:  # 10% over safe speed threshold
             severity = 'HIGH' if vessel_speed > safe_speed * 1.3 else 'MEDIUM'
-            risks.append({
-                'type': 'EXCESSIVE_SPEED',
-                'severity': severity,
-                'message': f'Vessel speed {vessel_speed:.1f} knots exceeds condition-adjusted safe speed of {safe_speed:.1f} knots',
-                'details': {
-                    'current_speed': vessel_speed,
-                    'max_safe_speed': safe_speed,
-                    'vessel_type': vessel_type,
-                    'wind_speed': wind_speed,
-                    'wave_height': wave_height,
-                    'draught': vessel_draught,
-                    'speed_excess_percent': ((vessel_speed - safe_speed) / safe_speed) * 100
-                }
-            })
+            risks.append(self._excessive_speed_risk(
+                severity, vessel_speed, safe_speed, vessel_type,
+                wind_speed, wave_height, vessel_draught
+            ))
         
         # 2. HIGH WIND RISK (Empirical)
-        if wind_speed > WIND_THRESHOLDS['MEDIUM']:
-            severity = 'HIGH' if wind_speed > WIND_THRESHOLDS['HIGH'] else 'MEDIUM'
-            risks.append({
-                'type': 'HIGH_WINDS',
-                'severity': severity,
-                'message': f'High wind conditions: {wind_speed:.1f} m/s ({self._beaufort_scale(wind_speed)})',
-                'details': {
-                    'current_wind_speed': wind_speed,
-                    'max_safe_wind_speed': WIND_THRESHOLDS['MEDIUM'],
-                    'beaufort_scale': self._beaufort_scale(wind_speed),
-                    'vessel_type_risk_factor': self._wind_risk_factor(vessel_type)
-                }
-            })
+        if wind_speed > self.WIND_THRESHOLDS['MEDIUM']:
+            severity = 'HIGH' if wind_speed > self.WIND_THRESHOLDS['HIGH'] else 'MEDIUM'
+            risks.append(self._high_wind_risk(severity, wind_speed, vessel_type))
         
         # 3. HIGH WAVE RISK (Empirical)
-        if wave_height > WAVE_THRESHOLDS['MEDIUM']:
-            severity = 'HIGH' if wave_height > WAVE_THRESHOLDS['HIGH'] else 'MEDIUM'
-            risks.append({
-                'type': 'HIGH_WAVES',
-                'severity': severity,
-                'message': f'High wave conditions: {wave_height:.1f} meters',
-                'details': {
-                    'current_wave_height': wave_height,
-                    'max_safe_wave_height': WAVE_THRESHOLDS['MEDIUM'],
-                    'wave_period_estimate': self._estimate_wave_period(wave_height),  # seconds
-                    'vessel_size_factor': 'high_risk' if vessel_length < 80 else 'medium_risk'
-                }
-            })
+        if wave_height > self.WAVE_THRESHOLDS['MEDIUM']:
+            severity = 'HIGH' if wave_height > self.WAVE_THRESHOLDS['HIGH'] else 'MEDIUM'
+            risks.append(self._high_wave_risk(severity, wave_height, vessel_length))
         
         # 4. NIGHT OPERATION RISK
         current_hour = datetime.utcnow().hour
         # Long nights in Norway - extended night period
         if current_hour >= 18 or current_hour <= 6:  # 6 PM to 6 AM UTC
-            risks.append({
-                'type': 'NIGHT_OPERATION',
-                'severity': 'LOW',
-                'message': f'Night operation (UTC hour: {current_hour}) - reduced visibility',
-                'details': {
-                    'current_hour_utc': current_hour,
-                    'visibility_factor': 0.4,
-                    'recommended_action': 'Increase radar watch and reduce speed'
-                }
-            })
+            risks.append(self._night_operation_risk(current_hour))
         
         # 5. PROXIMITY TO HAZARDS (Using real hazard data from cache)
         if vessel_lat and vessel_lon and self.hazard_locations:
-            nearby_hazards = self._find_nearby_hazards(vessel_lat, vessel_lon, radius_km=2.0)
+            nearby_hazards = self._find_nearby_hazards(
+                vessel_lat, vessel_lon, radius_km=2.0,
+                candidates=corridor.hazard_positions if corridor is not None else None
+            )
             for hazard in nearby_hazards:
                 distance_km = hazard['distance_km']
                 if distance_km < 0.5:  # Less than 500 meters
@@ -293,40 +664,105 @@ class RiskEngine:
                 else:
                     continue  # Skip hazards further than 1 km
                 
-                risks.append({
-                    'type': 'HAZARD_PROXIMITY',
-                    'severity': severity,
-                    'message': f'Close to {hazard["name"]} ({hazard["type"]}) - distance: {distance_km:.2f} km',
-                    'details': {
-                        'hazard_name': hazard['name'],
-                        'hazard_type': hazard['type'],
-                        'distance_km': distance_km,
-                        'hazard_lat': hazard['latitude'],
-                        'hazard_lon': hazard['longitude'],
-                        'bearing_degrees': self._calculate_bearing(vessel_lat, vessel_lon, hazard['latitude'], hazard['longitude'])
-                    }
-                })
+                risks.append(self._nearby_hazard_risk(severity, hazard, distance_km, vessel_lat, vessel_lon))
         
         # 6. ROUTE DEVIATION RISK (If we have planned route data)
         if 'route_deviation_km' in vessel_data:
             deviation = vessel_data['route_deviation_km']
             if deviation > 5.0:  # 5 km deviation threshold
                 severity = 'MEDIUM' if deviation < 10.0 else 'HIGH'
-                risks.append({
-                    'type': 'ROUTE_DEVIATION',
-                    'severity': severity,
-                    'message': f'Significant route deviation: {deviation:.1f} km from planned route',
-                    'details': {
-                        'deviation_km': deviation,
-                        'max_allowed_deviation': 5.0,
-                        'deviation_percent': (deviation / 5.0) * 100 if deviation > 0 else 0
-                    }
-                })
+                risks.append(self._route_deviation_risk(severity, deviation))
         
         return risks
 
+    # --- Risk dictionary builders shared by assess_vessel and assess_fleet ---
+
+    def _excessive_speed_risk(self, severity: str, vessel_speed: float, safe_speed: float,
+                              vessel_type: str, wind_speed: float, wave_height: float,
+                              vessel_draught: float) -> Dict:
+        return {
+            'type': 'EXCESSIVE_SPEED',
+            'severity': severity,
+            'message': f'Vessel speed {vessel_speed:.1f} knots exceeds condition-adjusted safe speed of {safe_speed:.1f} knots',
+            'details': {
+                'current_speed': vessel_speed,
+                'max_safe_speed': safe_speed,
+                'vessel_type': vessel_type,
+                'wind_speed': wind_speed,
+                'wave_height': wave_height,
+                'draught': vessel_draught,
+                'speed_excess_percent': ((vessel_speed - safe_speed) / safe_speed) * 100
+            }
+        }
+
+    def _high_wind_risk(self, severity: str, wind_speed: float, vessel_type: str) -> Dict:
+        return {
+            'type': 'HIGH_WINDS',
+            'severity': severity,
+            'message': f'High wind conditions: {wind_speed:.1f} m/s ({self._beaufort_scale(wind_speed)})',
+            'details': {
+                'current_wind_speed': wind_speed,
+                'max_safe_wind_speed': self.WIND_THRESHOLDS['MEDIUM'],
+                'beaufort_scale': self._beaufort_scale(wind_speed),
+                'vessel_type_risk_factor': self._wind_risk_factor(vessel_type)
+            }
+        }
+
+    def _high_wave_risk(self, severity: str, wave_height: float, vessel_length: float) -> Dict:
+        return {
+            'type': 'HIGH_WAVES',
+            'severity': severity,
+            'message': f'High wave conditions: {wave_height:.1f} meters',
+            'details': {
+                'current_wave_height': wave_height,
+                'max_safe_wave_height': self.WAVE_THRESHOLDS['MEDIUM'],
+                'wave_period_estimate': self._estimate_wave_period(wave_height),  # seconds
+                'vessel_size_factor': 'high_risk' if vessel_length < 80 else 'medium_risk'
+            }
+        }
+
+    def _night_operation_risk(self, current_hour: int) -> Dict:
+        return {
+            'type': 'NIGHT_OPERATION',
+            'severity': 'LOW',
+            'message': f'Night operation (UTC hour: {current_hour}) - reduced visibility',
+            'details': {
+                'current_hour_utc': current_hour,
+                'visibility_factor': 0.4,
+                'recommended_action': 'Increase radar watch and reduce speed'
+            }
+        }
+
+    def _nearby_hazard_risk(self, severity: str, hazard: Dict, distance_km: float,
+                            vessel_lat: float, vessel_lon: float) -> Dict:
+        return {
+            'type': 'HAZARD_PROXIMITY',
+            'severity': severity,
+            'message': f'Close to {hazard["name"]} ({hazard["type"]}) - distance: {distance_km:.2f} km',
+            'details': {
+                'hazard_name': hazard['name'],
+                'hazard_type': hazard['type'],
+                'distance_km': distance_km,
+                'hazard_lat': hazard['latitude'],
+                'hazard_lon': hazard['longitude'],
+                'bearing_degrees': self._calculate_bearing(vessel_lat, vessel_lon, hazard['latitude'], hazard['longitude'])
+            }
+        }
+
+    def _route_deviation_risk(self, severity: str, deviation: float) -> Dict:
+        return {
+            'type': 'ROUTE_DEVIATION',
+            'severity': severity,
+            'message': f'Significant route deviation: {deviation:.1f} km from planned route',
+            'details': {
+                'deviation_km': deviation,
+                'max_allowed_deviation': 5.0,
+                'deviation_percent': (deviation / 5.0) * 100 if deviation > 0 else 0
+            }
+        }
+
     def _run_legacy_checks(self, vessel_data: Dict, weather_data: Optional[Dict] = None, 
-                          route_data: Optional[Dict] = None) -> List[Dict]:
+                          route_data: Optional[Dict] = None, corridor=None) -> List[Dict]:
         """Run legacy risk checks for backward compatibility."""
         risks = []
         
@@ -342,7 +778,10 @@ class RiskEngine:
         logger.debug(f"Running legacy checks for vessel {vessel_name} (MMSI: {vessel_mmsi})")
         
         # 1. Check proximity to all hazards
-        hazard_risks = self._check_hazard_proximity_legacy(vessel_lat, vessel_lon, vessel_data)
+        hazard_risks = self._check_hazard_proximity_legacy(
+            vessel_lat, vessel_lon, vessel_data,
+            candidates=corridor.legacy if corridor is not None else None
+        )
         risks.extend(hazard_risks)
         
         # 2. Check weather conditions
@@ -424,17 +863,54 @@ class RiskEngine:
         # T ≈ 3.85 * √H (empirical formula)
         return round(3.85 * (wave_height ** 0.5), 1)
     
-    def _find_nearby_hazards(self, lat: float, lon: float, radius_km: float) -> List[Dict]:
-        """Find hazards near the vessel position from loaded hazard data."""
+    def _find_nearby_hazards(self, lat: float, lon: float, radius_km: float,
+                             candidates: Optional[np.ndarray] = None) -> List[Dict]:
+        """
+        Find hazards near the vessel position from loaded hazard data.
+        candidates: hazard_locations positions to check instead of all (route corridor)
+        """
+        if candidates is not None:
+            positions, candidates = candidates, []
+            for i in positions.tolist():
+                hazard = self.hazard_locations[i]
+                distance = haversine_km(lat, lon, hazard['latitude'], hazard['longitude'])
+                if distance <= radius_km:
+                    candidates.append((i, distance))
+        else:
+            candidates = self._hazard_index.query_radius(lat, lon, radius_km)
         nearby = []
-        for hazard in self.hazard_locations:
-            distance = self._calculate_distance_km(lat, lon, hazard['latitude'], hazard['longitude'])
-            if distance <= radius_km:
-                hazard_copy = hazard.copy()
-                hazard_copy['distance_km'] = round(distance, 3)
-                nearby.append(hazard_copy)
+        # Keep hazard_locations order so results match a full scan
+        for i, distance in sorted(candidates, key=lambda item: item[0]):
+            hazard_copy = self.hazard_locations[i].copy()
+            hazard_copy['distance_km'] = round(distance, 3)
+            nearby.append(hazard_copy)
         return nearby
     
+    def _hazards_within_db(self, lats, lons, radius_km: float):
+        """
+        (point, hazard_locations position, distance_km) arrays for hazards
+        within radius_km, from one PostGIS query over all points.
+        None when the hazards are not synced to PostGIS or another process
+        replaced them; only load_hazard_data writes them.
+        """
+        if not self._hazard_zone_keys:
+            return None
+        rows = spatial_queries.hazards_near_points(
+            lats, lons, radius_km * 1000 + POINT_HAZARD_FOOTPRINT_M, self.HAZARD_ZONE_TYPES
+        )
+        matched = spatial_queries.match_synced(
+            rows, self._hazard_zone_keys, self.HAZARD_ZONE_TYPES
+        ) if rows is not None else None
+        if matched is None:
+            return None
+        pairs = sorted(
+            (row['point_index'], i, row['centroid_distance_m'] / 1000.0)
+            for row, i in matched
+            if row['centroid_distance_m'] <= radius_km * 1000
+        )
+        return (np.array([p[0] for p in pairs], dtype=np.intp), np.array([p[1] for p in pairs], dtype=np.intp),
+                np.array([p[2] for p in pairs], dtype=float))
+    
     def _calculate_distance_km(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
         """Calculate great-circle distance between two points in kilometers."""
         from math import radians, sin, cos, sqrt, atan2
@@ -478,92 +954,110 @@ class RiskEngine:
         return weather_data
 
     def _fetch_weather_for_location(self, lat: float, lon: float) -> Optional[Dict]:
-        """Fetch weather data for a specific location using MET Norway API."""
+        """Fetch weather data for a location from the shared MET Norway grid cache."""
         try:
-            met_user_agent = "BergNavnRiskEngine/1.0"
-            headers = {'User-Agent': met_user_agent}
-            url = f"https://api.met.no/weatherapi/locationforecast/2.0/compact?lat={lat}&lon={lon}"
+            from backend.services.forecast_cube import current_step
+            from backend.services.weather_service import weather_cache
+            data = weather_cache.get_forecast(lat, lon)
             
-            response = requests.get(url, headers=headers, timeout=3)
-            
-            if response.status_code == 200:
-                data = response.json()
-                if 'properties' in data and 'timeseries' in data['properties']:
-                    current = data['properties']['timeseries'][0]['data']
-                    instant = current['instant']['details']
-                    
-                    weather_data = {
-                        'wind_speed': instant.get('wind_speed'),
-                        'wind_direction': instant.get('wind_from_direction'),
-                        'temperature': instant.get('air_temperature'),
-                        'pressure': instant.get('air_pressure_at_sea_level'),
-                        'humidity': instant.get('relative_humidity'),
-                        'cloudiness': instant.get('cloud_area_fraction')
-                    }
-                    
-                    # Ensure wave_height is calculated
-                    return self._ensure_wave_height_data(weather_data)
+            if data and data.get('properties', {}).get('timeseries'):
+                # Step in effect now (the shared cache may serve an expired document)
+                current = current_step(data['properties']['timeseries'])['data']
+                instant = current['instant']['details']
+                
+                weather_data = {
+                    'wind_speed': instant.get('wind_speed'),
+                    'wind_direction': instant.get('wind_from_direction'),
+                    'temperature': instant.get('air_temperature'),
+                    'pressure': instant.get('air_pressure_at_sea_level'),
+                    'humidity': instant.get('relative_humidity'),
+                    'cloudiness': instant.get('cloud_area_fraction')
+                }
+                
+                # Ensure wave_height is calculated
+                return self._ensure_wave_height_data(weather_data)
         except Exception as e:
             logger.debug(f"Weather fetch for location failed: {e}")
         
         return None
 
-    def _check_hazard_proximity_legacy(self, lat: float, lon: float, vessel_data: Dict) -> List[Dict]:
-        """Check proximity to all types of hazards (legacy version)."""
+    def _check_hazard_proximity_legacy(self, lat: float, lon: float, vessel_data: Dict,
+                                       candidates: Optional[Dict[str, np.ndarray]] = None) -> List[Dict]:
+        """
+        Check proximity to all types of hazards (legacy version).
+        candidates: hazard_data positions per category to check instead of all (route corridor)
+        """
         risks = []
         
-        # Define safe distances per hazard type
-        safe_distances = {
-            'aquaculture': self.safety_parameters['min_distance_aquaculture_m'],
-            'cables': self.safety_parameters['min_distance_cable_m'],
-            'installations': self.safety_parameters['min_distance_turbine_m'],
-            'protected_areas': 0  # Any entry is a violation
-        }
+        safe_distances = self._legacy_safe_distances()
+        
+        if candidates is not None:
+            candidates = {hazard_type: positions.tolist() for hazard_type, positions in candidates.items()}
+        else:
+            # Only hazards within the largest safe distance can raise a risk
+            search_radius_km = max(
+                safe_distances.get(hazard_type, 100) for hazard_type in self.hazard_data
+            ) / 1000.0 * 1.001  # small margin for km vs m rounding
+            candidates = {}
+            for (hazard_type, i), _ in self._legacy_hazard_index.query_radius(lat, lon, search_radius_km):
+                candidates.setdefault(hazard_type, []).append(i)
         
         # Check each hazard category
         for hazard_type, hazards in self.hazard_data.items():
-            if not hazards:
+            if not hazards or hazard_type not in candidates:
                 continue
                 
             safe_distance = safe_distances.get(hazard_type, 100)
             
-            for hazard in hazards:
-                # Extract coordinates
-                hazard_lat = hazard.get('latitude') or hazard.get('lat') or hazard.get('y')
-                hazard_lon = hazard.get('longitude') or hazard.get('lon') or hazard.get('x')
-                
-                if not hazard_lat or not hazard_lon:
-                    continue
+            for i in sorted(candidates[hazard_type]):
+                hazard = hazards[i]
+                hazard_lat, hazard_lon = self._legacy_hazard_coordinates(hazard)
                 
                 # Calculate distance
                 distance = self._calculate_distance_meters(lat, lon, hazard_lat, hazard_lon)
                 
                 # Check if too close
                 if distance < safe_distance:
-                    hazard_name = hazard.get('name', hazard.get('id', f'Unknown {hazard_type}'))
-                    
-                    risk = {
-                        'type': 'HAZARD_PROXIMITY',
-                        'subtype': hazard_type.upper(),
-                        'severity': 'HIGH' if distance < safe_distance * 0.5 else 'MEDIUM',
-                        'message': f'Vessel within {int(distance)}m of {hazard_name} ({hazard_type})',
-                        'details': {
-                            'hazard_name': hazard_name,
-                            'hazard_type': hazard_type,
-                            'distance_meters': int(distance),
-                            'safe_distance_meters': safe_distance,
-                            'hazard_position': {'lat': hazard_lat, 'lon': hazard_lon},
-                            'vessel_position': {'lat': lat, 'lon': lon}
-                        },
-                        'vessel_mmsi': vessel_data.get('mmsi'),
-                        'vessel_name': vessel_data.get('name'),
-                        'timestamp': datetime.utcnow().isoformat() + 'Z'
-                    }
-                    
-                    risks.append(risk)
+                    risks.append(self._legacy_hazard_risk(
+                        hazard_type, hazard, distance, safe_distance, lat, lon,
+                        vessel_data.get('mmsi'), vessel_data.get('name')
+                    ))
         
         return risks
 
+    def _legacy_safe_distances(self) -> Dict[str, float]:
+        """Safe distances in meters per hazard category (legacy checks)."""
+        return {
+            'aquaculture': self.safety_parameters['min_distance_aquaculture_m'],
+            'cables': self.safety_parameters['min_distance_cable_m'],
+            'installations': self.safety_parameters['min_distance_turbine_m'],
+            'protected_areas': 0  # Any entry is a violation
+        }
+
+    def _legacy_hazard_risk(self, hazard_type: str, hazard: Dict, distance: float,
+                            safe_distance: float, lat: float, lon: float,
+                            vessel_mmsi=None, vessel_name=None,
+                            timestamp: Optional[str] = None) -> Dict:
+        hazard_lat, hazard_lon = self._legacy_hazard_coordinates(hazard)
+        hazard_name = hazard.get('name', hazard.get('id', f'Unknown {hazard_type}'))
+        return {
+            'type': 'HAZARD_PROXIMITY',
+            'subtype': hazard_type.upper(),
+            'severity': 'HIGH' if distance < safe_distance * 0.5 else 'MEDIUM',
+            'message': f'Vessel within {int(distance)}m of {hazard_name} ({hazard_type})',
+            'details': {
+                'hazard_name': hazard_name,
+                'hazard_type': hazard_type,
+                'distance_meters': int(distance),
+                'safe_distance_meters': safe_distance,
+                'hazard_position': {'lat': hazard_lat, 'lon': hazard_lon},
+                'vessel_position': {'lat': lat, 'lon': lon}
+            },
+            'vessel_mmsi': vessel_mmsi,
+            'vessel_name': vessel_name,
+            'timestamp': timestamp or datetime.utcnow().isoformat() + 'Z'
+        }
+
     def _check_weather_conditions_legacy(self, vessel_data: Dict, weather_data: Dict) -> List[Dict]:
         """Check weather conditions against vessel limits (legacy version)."""
         risks = []
@@ -640,9 +1134,10 @@ class RiskEngine:
         
         return None
 
-    def _check_night_operation_legacy(self) -> Optional[Dict]:
+    def _check_night_operation_legacy(self, current_hour: Optional[int] = None) -> Optional[Dict]:
         """Check if operating during night hours (legacy version)."""
-        current_hour = datetime.utcnow().hour
+        if current_hour is None:
+            current_hour = datetime.utcnow().hour
         # Norway time (UTC+1), night roughly 21:00-06:00 local
         is_night = current_hour >= 20 or current_hour <= 5  # Adjust for UTC offset
         
@@ -0,0 +1,208 @@
+# backend/services/route_corridor.py
+"""
+Route-corridor hazard pre-screening.
+
+A vessel following a known RTZ route can only come close to hazards near
+that route. Each leg (waypoint i -> i+1) is buffered by the largest distance
+any check looks at plus a drift margin, and the hazards inside the buffer
+are stored per leg. Runtime checks (RiskEngine.assess_vessel,
+MaritimeAlertsService.generate_vessel_alerts) then only visit the current
+leg's candidates.
+
+Corridors are cached per route and rebuilt automatically when the route's
+waypoints or the loaded hazards (RiskEngine.hazard_version) change. A vessel
+farther than the margin from its leg gets no candidates, and the callers run
+the full check instead.
+"""
+
+import hashlib
+import logging
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# How far a vessel may drift from its leg and still use the leg's candidates
+ROUTE_CORRIDOR_MARGIN_KM = float(os.getenv('ROUTE_CORRIDOR_MARGIN_KM', '1.0'))
+
+# Kilometers per degree of latitude
+KM_PER_DEG = 111.195
+
+# Relative slack on corridor widths for the flat-earth segment distance
+PROJECTION_SLACK = 1.02
+
+# Advanced hazard check radius in RiskEngine._calculate_advanced_risks
+ADVANCED_HAZARD_RADIUS_KM = 1.0
+
+
+def segment_distance_km(lats, lons, lat0: float, lon0: float, lat1: float, lon1: float) -> np.ndarray:
+    """
+    Distance in km from points to the segment (lat0, lon0)-(lat1, lon1), on a
+    local equirectangular projection (accurate to well under 1% for coastal legs).
+    """
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    kx = KM_PER_DEG * np.cos(np.radians((lat0 + lat1) / 2))
+    x, y = (lons - lon0) * kx, (lats - lat0) * KM_PER_DEG
+    dx, dy = (lon1 - lon0) * kx, (lat1 - lat0) * KM_PER_DEG
+    length2 = dx * dx + dy * dy
+    t = np.clip((x * dx + y * dy) / length2, 0.0, 1.0) if length2 > 0 else np.zeros_like(x)
+    return np.hypot(x - t * dx, y - t * dy)
+
+
+class LegCandidates:
+    """Hazards that can trigger a check somewhere along one leg."""
+
+    __slots__ = ('hazard_positions', 'legacy', 'wind_farms')
+
+    def __init__(self, hazard_positions: np.ndarray, legacy: Dict[str, np.ndarray], wind_farms: np.ndarray):
+        self.hazard_positions = hazard_positions  # into RiskEngine.hazard_locations
+        self.legacy = legacy                      # category -> positions in RiskEngine.hazard_data
+        self.wind_farms = wind_farms              # into MaritimeAlertsService.NORWEGIAN_WIND_FARMS
+
+    def count(self) -> int:
+        return (len(self.hazard_positions) + sum(len(positions) for positions in self.legacy.values())
+                + len(self.wind_farms))
+
+
+class RouteCorridor:
+    """Per-leg hazard candidates for one route against one hazard snapshot."""
+
+    def __init__(self, waypoints: List[Dict], risk_engine=None, wind_farms: Optional[List[Dict]] = None,
+                 margin_km: float = ROUTE_CORRIDOR_MARGIN_KM):
+        self.lats = np.array([wp['lat'] for wp in waypoints], dtype=float)
+        self.lons = np.array([wp['lon'] for wp in waypoints], dtype=float)
+        self.margin_km = margin_km
+        self.legs: List[LegCandidates] = []
+
+        sources = []  # (kind, category, positions, lats, lons, radius_km per hazard)
+        if risk_engine is not None:
+            locations = risk_engine.hazard_locations
+            if locations:
+                sources.append(('advanced', None, np.arange(len(locations)),
+                                np.array([h['latitude'] for h in locations], dtype=float),
+                                np.array([h['longitude'] for h in locations], dtype=float),
+                                np.full(len(locations), ADVANCED_HAZARD_RADIUS_KM)))
+            safe_distances = risk_engine._legacy_safe_distances()
+            for category, hazards in risk_engine.hazard_data.items():
+                positions, h_lats, h_lons = [], [], []
+                for i, hazard in enumerate(hazards):
+                    hazard_lat, hazard_lon = risk_engine._legacy_hazard_coordinates(hazard)
+                    if hazard_lat and hazard_lon:
+                        positions.append(i)
+                        h_lats.append(hazard_lat)
+                        h_lons.append(hazard_lon)
+                if positions:
+                    radius = max(safe_distances.get(category, 100), 0) / 1000.0
+                    sources.append(('legacy', category, np.array(positions), np.array(h_lats, dtype=float),
+                                    np.array(h_lons, dtype=float), np.full(len(positions), radius)))
+        if wind_farms:
+            from backend.services.alerts_service import MaritimeAlertsService
+            warning_km = MaritimeAlertsService.SAFETY_THRESHOLDS['turbine_warning'] / 1000.0
+            sources.append(('wind_farm', None, np.arange(len(wind_farms)),
+                            np.array([farm['lat'] for farm in wind_farms], dtype=float),
+                            np.array([farm['lon'] for farm in wind_farms], dtype=float),
+                            np.array([min(farm['radius_m'] / 1000.0, warning_km) for farm in wind_farms])))
+
+        empty = np.empty(0, dtype=np.intp)
+        for k in range(len(waypoints) - 1):
+            advanced, legacy, farms = empty, {}, empty
+            for kind, category, positions, h_lats, h_lons, radius in sources:
+                buffer_km = (radius + margin_km) * PROJECTION_SLACK
+                # Cheap bounding-box cut before the exact segment distance
+                pad_lat = buffer_km.max() / KM_PER_DEG
+                pad_lon = pad_lat / max(np.cos(np.radians(np.abs(self.lats[k:k + 2]).max() + pad_lat)), 0.01)
+                box = ((h_lats >= min(self.lats[k], self.lats[k + 1]) - pad_lat)
+                       & (h_lats <= max(self.lats[k], self.lats[k + 1]) + pad_lat)
+                       & (h_lons >= min(self.lons[k], self.lons[k + 1]) - pad_lon)
+                       & (h_lons <= max(self.lons[k], self.lons[k + 1]) + pad_lon))
+                idx = np.flatnonzero(box)
+                distance = segment_distance_km(h_lats[idx], h_lons[idx], self.lats[k], self.lons[k],
+                                               self.lats[k + 1], self.lons[k + 1])
+                hits = positions[idx[distance <= buffer_km[idx]]]
+                if kind == 'advanced':
+                    advanced = hits
+                elif kind == 'legacy':
+                    legacy[category] = hits
+                else:
+                    farms = hits
+            self.legs.append(LegCandidates(advanced, legacy, farms))
+
+    def candidates_for(self, lat: float, lon: float, leg_index: int) -> Optional[LegCandidates]:
+        """
+        Candidates of the leg the vessel is on, or None if the vessel has
+        drifted out of the corridor (callers then run the full check).
+        """
+        if not self.legs:
+            return None
+        k = min(max(leg_index, 0), len(self.legs) - 1)
+        distance = segment_distance_km([lat], [lon], self.lats[k], self.lons[k], self.lats[k + 1], self.lons[k + 1])
+        if distance[0] > self.margin_km:
+            return None
+        return self.legs[k]
+
+    def get_stats(self) -> Dict:
+        counts = [leg.count() for leg in self.legs]
+        return {
+            'legs': len(self.legs),
+            'margin_km': self.margin_km,
+            'candidates_total': int(sum(counts)),
+            'candidates_max_per_leg': int(max(counts)) if counts else 0,
+        }
+
+
+def route_fingerprint(waypoints: List[Dict]) -> str:
+    """Hash of a route's waypoint coordinates."""
+    coordinates = np.array([(wp['lat'], wp['lon']) for wp in waypoints], dtype=float)
+    return hashlib.sha1(np.round(coordinates, 7).tobytes()).hexdigest()
+
+
+class RouteCorridorCache:
+    """
+    Corridors keyed by route, rebuilt when the route's waypoints, the
+    RiskEngine hazards or the wind farm list change.
+    """
+
+    def __init__(self, risk_engine=None, alerts_service=None, margin_km: float = ROUTE_CORRIDOR_MARGIN_KM):
+        self._risk_engine = risk_engine
+        self._alerts_service = alerts_service
+        self.margin_km = margin_km
+        self._corridors = {}  # route key -> (version, corridor)
+        self.stats = {'hits': 0, 'builds': 0}
+
+    def _services(self):
+        if self._risk_engine is None:
+            from backend.services.risk_engine import risk_engine
+            self._risk_engine = risk_engine
+        if self._alerts_service is None:
+            from backend.services.alerts_service import maritime_alerts_service
+            self._alerts_service = maritime_alerts_service
+        return self._risk_engine, self._alerts_service
+
+    def get(self, waypoints: List[Dict], route_key: Optional[str] = None) -> RouteCorridor:
+        """Corridor for a route, (re)built if the route or the hazards changed."""
+        risk_engine, alerts_service = self._services()
+        wind_farms = alerts_service.NORWEGIAN_WIND_FARMS
+        fingerprint = route_fingerprint(waypoints)
+        version = (fingerprint, risk_engine.hazard_version, id(wind_farms), len(wind_farms))
+        key = route_key or fingerprint
+
+        cached = self._corridors.get(key)
+        if cached and cached[0] == version:
+            self.stats['hits'] += 1
+            return cached[1]
+
+        corridor = RouteCorridor(waypoints, risk_engine, wind_farms, self.margin_km)
+        self._corridors[key] = (version, corridor)
+        self.stats['builds'] += 1
+        logger.info(f"🛣️ Route corridor built for {key[:40]}: {corridor.get_stats()}")
+        return corridor
+
+    def get_status(self) -> Dict:
+        return {'routes': len(self._corridors), 'margin_km': self.margin_km, **self.stats}
+
+
+# Global instance
+route_corridor_cache = RouteCorridorCache()
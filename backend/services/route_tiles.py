@@ -0,0 +1,302 @@
+"""
+Route Tiles - zoom-dependent simplified RTZ route geometry for the map.
+
+Each route is projected to Web Mercator once and every vertex gets a
+Douglas-Peucker significance (the largest tolerance at which it survives).
+Simplifying for a zoom level is then a threshold filter at about one screen
+pixel, and the result is served as Google encoded polylines, either for the
+whole map or per z/x/y tile. Payloads are serialised once per route
+version and carry an ETag, so repeat map loads are 304s.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MIN_ZOOM = 0
+MAX_ZOOM = 18
+TILE_PIXELS = 256
+# Simplification tolerance in screen pixels at the requested zoom
+SIMPLIFY_PIXELS = float(os.getenv("ROUTE_TILE_SIMPLIFY_PIXELS", "1.0"))
+# Segments are kept in a tile if they pass within this many pixels of it
+TILE_BUFFER_PIXELS = 4
+DEFAULT_MAP_ZOOM = 6
+MAX_CACHED_PAYLOADS = 4096
+
+# Route fields the map needs; provenance and styling defaults stay in the full payload
+MAP_ROUTE_FIELDS = ('route_name', 'clean_name', 'origin', 'destination', 'total_distance_nm',
+                    'waypoint_count', 'source_city', 'source_city_name')
+
+
+def project(lat, lon) -> Tuple[np.ndarray, np.ndarray]:
+    """Web Mercator world coordinates in [0, 1] (y grows southwards)."""
+    lat = np.clip(np.asarray(lat, dtype=float), -85.05112878, 85.05112878)
+    x = (np.asarray(lon, dtype=float) + 180.0) / 360.0
+    y = (1.0 - np.log(np.tan(np.radians(lat)) + 1.0 / np.cos(np.radians(lat))) / math.pi) / 2.0
+    return x, y
+
+
+def tolerance_for_zoom(zoom: int) -> float:
+    """One simplification step (SIMPLIFY_PIXELS) in world units at this zoom."""
+    return SIMPLIFY_PIXELS / (TILE_PIXELS * 2 ** zoom)
+
+
+def vertex_significance(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """
+    Douglas-Peucker significance of every vertex: simplifying with tolerance
+    t keeps exactly the vertices with significance > t. Endpoints are inf.
+    """
+    n = len(x)
+    significance = np.zeros(n)
+    if n == 0:
+        return significance
+    significance[0] = significance[-1] = np.inf
+
+    stack = [(0, n - 1, np.inf)]
+    while stack:
+        first, last, parent = stack.pop()
+        if last - first < 2:
+            continue
+        px, py = x[first + 1:last], y[first + 1:last]
+        dx, dy = x[last] - x[first], y[last] - y[first]
+        length2 = dx * dx + dy * dy
+        if length2 > 0:
+            t = np.clip(((px - x[first]) * dx + (py - y[first]) * dy) / length2, 0.0, 1.0)
+        else:
+            t = np.zeros(len(px))
+        distance = np.hypot(px - (x[first] + t * dx), py - (y[first] + t * dy))
+        split = first + 1 + int(np.argmax(distance))
+        # A vertex never outlives the split that exposed it
+        value = min(float(distance[split - first - 1]), parent)
+        significance[split] = value
+        stack.append((first, split, value))
+        stack.append((split, last, value))
+    return significance
+
+
+def encode_polyline(lat, lon, precision: int = 5) -> str:
+    """Google encoded polyline for a lat/lon sequence."""
+    factor = 10 ** precision
+    coords = np.stack([np.round(np.asarray(lat, dtype=float) * factor),
+                       np.round(np.asarray(lon, dtype=float) * factor)], axis=1).astype(np.int64)
+    deltas = np.diff(coords, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).ravel()
+
+    chunks = []
+    for value in deltas.tolist():
+        value = ~(value << 1) if value < 0 else value << 1
+        while value >= 0x20:
+            chunks.append(chr((0x20 | (value & 0x1f)) + 63))
+            value >>= 5
+        chunks.append(chr(value + 63))
+    return ''.join(chunks)
+
+
+def decode_polyline(encoded: str, precision: int = 5) -> List[Tuple[float, float]]:
+    """Inverse of encode_polyline."""
+    values, value, shift = [], 0, 0
+    for char in encoded:
+        byte = ord(char) - 63
+        value |= (byte & 0x1f) << shift
+        shift += 5
+        if byte < 0x20:
+            values.append(~(value >> 1) if value & 1 else value >> 1)
+            value, shift = 0, 0
+    coords = np.cumsum(np.array(values, dtype=np.int64).reshape(-1, 2), axis=0) / 10 ** precision
+    return [(float(lat), float(lon)) for lat, lon in coords]
+
+
+class RouteTileSet:
+    """Projected route geometry with per-vertex significance, built once per route version."""
+
+    def __init__(self, routes: List[Dict]):
+        self.routes = routes
+        self._geometry = []
+        for route in routes:
+            points = [(wp['lat'], wp['lon']) for wp in route.get('waypoints', [])
+                      if wp.get('lat') is not None and wp.get('lon') is not None]
+            lat = np.array([p[0] for p in points], dtype=float)
+            lon = np.array([p[1] for p in points], dtype=float)
+            x, y = project(lat, lon)
+            bbox = (x.min(), y.min(), x.max(), y.max()) if len(points) else None
+            self._geometry.append({'lat': lat, 'lon': lon, 'x': x, 'y': y, 'bbox': bbox,
+                                   'significance': vertex_significance(x, y)})
+
+    def simplified(self, index: int, zoom: int) -> np.ndarray:
+        """Indices of the vertices of route `index` kept at this zoom."""
+        return np.flatnonzero(self._geometry[index]['significance'] > tolerance_for_zoom(zoom))
+
+    def overview(self, zoom: int) -> List[Dict]:
+        """Every route's map fields with its geometry simplified for `zoom` (no waypoint list)."""
+        routes = []
+        for index, route in enumerate(self.routes):
+            geometry = self._geometry[index]
+            keep = self.simplified(index, zoom)
+            entry = {key: route[key] for key in MAP_ROUTE_FIELDS if key in route}
+            entry.update({
+                'index': index,
+                'color': (route.get('visual_properties') or {}).get('color'),
+                'polyline': encode_polyline(geometry['lat'][keep], geometry['lon'][keep]),
+                'polyline_points': len(keep),
+            })
+            routes.append(entry)
+        return routes
+
+    def tile(self, z: int, x: int, y: int) -> Dict:
+        """
+        Route geometry crossing tile z/x/y, simplified for zoom z. A route
+        that leaves and re-enters the tile yields several parts.
+        """
+        size = 1.0 / 2 ** z
+        buffer = TILE_BUFFER_PIXELS * size / TILE_PIXELS
+        x0, y0 = x * size - buffer, y * size - buffer
+        x1, y1 = (x + 1) * size + buffer, (y + 1) * size + buffer
+
+        routes = []
+        for index, geometry in enumerate(self._geometry):
+            bbox = geometry['bbox']
+            if bbox is None or bbox[0] > x1 or bbox[2] < x0 or bbox[1] > y1 or bbox[3] < y0:
+                continue
+            keep = self.simplified(index, z)
+            if len(keep) < 2:
+                continue
+            sx, sy = geometry['x'][keep], geometry['y'][keep]
+            inside = ((np.minimum(sx[:-1], sx[1:]) <= x1) & (np.maximum(sx[:-1], sx[1:]) >= x0)
+                      & (np.minimum(sy[:-1], sy[1:]) <= y1) & (np.maximum(sy[:-1], sy[1:]) >= y0))
+            if not inside.any():
+                continue
+
+            # Runs of consecutive segments in the tile -> one part each
+            edges = np.diff(np.concatenate([[0], inside.astype(np.int8), [0]]))
+            starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+            parts = []
+            for start, end in zip(starts.tolist(), ends.tolist()):
+                vertices = keep[start:end + 1]
+                parts.append(encode_polyline(geometry['lat'][vertices], geometry['lon'][vertices]))
+            routes.append({'index': index, 'parts': parts})
+
+        return {'z': z, 'x': x, 'y': y, 'encoding': 'polyline5', 'routes': routes}
+
+
+class RouteTileCache:
+    """
+    Serialised map payloads with ETags, rebuilt when the RTZ inputs change.
+
+    Args:
+        load_data: Returns the RTZ dashboard data ('routes', 'ports_list', ...)
+        fingerprint: Returns a token that changes whenever the RTZ inputs change
+        check_seconds: How often the fingerprint is re-checked
+    """
+
+    def __init__(self, load_data: Callable[[], Dict], fingerprint: Callable[[], str],
+                 check_seconds: float = 30.0, max_payloads: int = MAX_CACHED_PAYLOADS):
+        self._load_data = load_data
+        self._fingerprint = fingerprint
+        self.check_seconds = check_seconds
+        self.max_payloads = max_payloads
+
+        self._lock = threading.Lock()
+        self._data: Optional[Dict] = None
+        self._tiles: Optional[RouteTileSet] = None
+        self._built_at: Optional[str] = None
+        self._version: Optional[str] = None
+        self._checked_at = 0.0
+        self._payloads: "OrderedDict[Tuple, Tuple[str, bytes]]" = OrderedDict()
+        self.stats = {'builds': 0, 'hits': 0, 'misses': 0}
+
+    def _current(self) -> Tuple[Dict, RouteTileSet, str]:
+        """Route data and tile set, rebuilt if the fingerprint changed. Caller holds the lock."""
+        now = time.monotonic()
+        if self._tiles is None or now - self._checked_at >= self.check_seconds:
+            self._checked_at = now
+            fingerprint = self._fingerprint()
+            if self._tiles is None or fingerprint != self._version:
+                start = time.perf_counter()
+                data = self._load_data()
+                self._tiles = RouteTileSet(data.get('routes', []))
+                self._data = data
+                self._version = fingerprint
+                self._built_at = datetime.now().isoformat()
+                self._payloads.clear()
+                self.stats['builds'] += 1
+                logger.info(f"🗺️ Route tiles rebuilt for {len(self._tiles.routes)} routes "
+                            f"({(time.perf_counter() - start) * 1000:.0f} ms)")
+        return self._data, self._tiles, self._built_at
+
+    def _payload(self, key: Tuple, build: Callable[[Dict, RouteTileSet, str], Dict]) -> Tuple[str, bytes]:
+        with self._lock:
+            data, tiles, built_at = self._current()
+            cached = self._payloads.get(key)
+            if cached is not None:
+                self._payloads.move_to_end(key)
+                self.stats['hits'] += 1
+                return cached
+
+            body = json.dumps(build(data, tiles, built_at), separators=(',', ':'),
+                              default=str).encode('utf-8')
+            etag = hashlib.sha1(self._version.encode('utf-8') + body).hexdigest()[:20]
+            self._payloads[key] = (etag, body)
+            if len(self._payloads) > self.max_payloads:
+                self._payloads.popitem(last=False)
+            self.stats['misses'] += 1
+            return etag, body
+
+    def map_data(self, zoom: int = DEFAULT_MAP_ZOOM) -> Tuple[str, bytes]:
+        """(etag, JSON body) of all routes with geometry simplified for `zoom`."""
+        zoom = max(MIN_ZOOM, min(MAX_ZOOM, int(zoom)))
+
+        def build(data, tiles, built_at):
+            return {
+                'success': True,
+                'timestamp': built_at,
+                'total_routes': data.get('total_routes', len(tiles.routes)),
+                'zoom': zoom,
+                'encoding': 'polyline5',
+                'routes': tiles.overview(zoom),
+                'ports': data.get('ports_list', []),
+                'cities': data.get('cities_with_routes', 0),
+                'message': f'Loaded {len(tiles.routes)} empirical RTZ routes',
+            }
+
+        return self._payload(('map', zoom), build)
+
+    def full_map_data(self) -> Tuple[str, bytes]:
+        """(etag, JSON body) of all routes with every waypoint, as /api/rtz/map-data used to return."""
+        def build(data, tiles, built_at):
+            return {
+                'success': True,
+                'timestamp': built_at,
+                'total_routes': data.get('total_routes', len(tiles.routes)),
+                'routes': tiles.routes,
+                'ports': data.get('ports_list', []),
+                'cities': data.get('cities_with_routes', 0),
+                'message': f'Loaded {len(tiles.routes)} empirical RTZ routes',
+            }
+
+        return self._payload(('full',), build)
+
+    def tile(self, z: int, x: int, y: int) -> Optional[Tuple[str, bytes]]:
+        """(etag, JSON body) for tile z/x/y, or None if the tile address is invalid."""
+        if not (MIN_ZOOM <= z <= MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z):
+            return None
+        return self._payload(('tile', z, x, y), lambda data, tiles, built_at: tiles.tile(z, x, y))
+
+    def get_status(self) -> Dict:
+        with self._lock:
+            return {
+                'version': self._version,
+                'built_at': self._built_at,
+                'routes': len(self._tiles.routes) if self._tiles else 0,
+                'cached_payloads': len(self._payloads),
+                **self.stats,
+            }
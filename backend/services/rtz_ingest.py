@@ -0,0 +1,346 @@
+# backend/services/rtz_ingest.py
+"""
+Bulk RTZ-to-database ingest.
+
+Parsed routes are diffed against the routes table by content hash in one
+query: unchanged routes are skipped, new ones inserted and changed ones
+updated. Legs of a changed route are updated in place by leg order, so
+rows referencing them (fuel_efficiency_calculations) stay valid; surplus
+legs are deleted, or deactivated while still referenced. Routes stored
+before the hash existed only get their hash backfilled. All writes are
+set-based (executemany / multi-row INSERT ... RETURNING) and each batch of
+routes is one transaction, so re-importing every city archive is fast and
+safe to rerun.
+
+On PostgreSQL the PostGIS tables (base_routes -> route_legs -> waypoints)
+are refreshed too, with points and LINESTRINGs built server-side. Only
+base_routes written by this ingest (rtz_file_hash set) are replaced.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import bindparam, create_engine, delete, func, insert, inspect, select, text, update
+
+from backend.models import BaseRoute, FuelEfficiencyCalculation, Route, RouteLeg, VoyageLeg, Waypoint
+
+logger = logging.getLogger(__name__)
+
+# Routes written per transaction
+RTZ_INGEST_BATCH_SIZE = int(os.getenv('RTZ_INGEST_BATCH_SIZE', '200'))
+
+# Average commercial speed used for route duration and leg ETAs
+INGEST_SPEED_KNOTS = 15.0
+
+routes_table = Route.__table__
+legs_table = VoyageLeg.__table__
+base_routes_table = BaseRoute.__table__
+route_legs_table = RouteLeg.__table__
+waypoints_table = Waypoint.__table__
+fuel_table = FuelEfficiencyCalculation.__table__
+
+
+def route_content_hash(route_info: Dict) -> str:
+    """SHA-256 of the fields the ingest writes; equal hash means nothing to update."""
+    canonical = {
+        'name': route_info['route_name'],
+        'file': _rtz_filename(route_info),
+        'waypoints': [(wp.get('name'), round(wp['lat'], 7), round(wp['lon'], 7))
+                      for wp in route_info['waypoints']],
+        'legs': [leg.get('distance_nm') for leg in route_info.get('legs', [])],
+    }
+    return hashlib.sha256(json.dumps(canonical, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+
+def _rtz_filename(route_info: Dict) -> Optional[str]:
+    name = route_info.get('original_zip') or route_info.get('original_file') or route_info.get('file_path')
+    return os.path.basename(name) if name else None
+
+
+def _leg_distances(route_info: Dict) -> List[float]:
+    from backend.services.rtz_parser import haversine_nm
+
+    waypoints = route_info['waypoints']
+    legs = route_info.get('legs', [])
+    distances = []
+    for i in range(len(waypoints) - 1):
+        if i < len(legs):
+            distance = legs[i]['distance_nm']
+        else:
+            distance = haversine_nm(waypoints[i]['lat'], waypoints[i]['lon'],
+                                    waypoints[i + 1]['lat'], waypoints[i + 1]['lon'])
+        distances.append(round(distance, 2))
+    return distances
+
+
+def _route_row(route_info: Dict, digest: str, now: datetime) -> Dict:
+    from backend.services.rtz_parser import extract_origin_destination
+
+    waypoints = route_info['waypoints']
+    origin, destination = extract_origin_destination(route_info['route_name'], waypoints)
+    total_distance = route_info.get('total_distance_nm') or round(sum(_leg_distances(route_info)), 2)
+    return {
+        'name': route_info['route_name'],
+        'total_distance_nm': total_distance,
+        'origin': origin,
+        'destination': destination,
+        'duration_days': round(total_distance / (INGEST_SPEED_KNOTS * 24), 2),
+        'description': f"Official NCA route: {origin} → {destination} ({total_distance} nm)",
+        'is_active': True,
+        'source': 'NCA',
+        'rtz_filename': _rtz_filename(route_info),
+        'waypoint_count': len(waypoints),
+        'rtz_file_hash': digest,
+        'parsed_at': now,
+        'updated_at': now,
+    }
+
+
+def _leg_rows(route_id: int, route_info: Dict, now: datetime) -> List[Dict]:
+    waypoints = route_info['waypoints']
+    return [{
+        'route_id': route_id,
+        'leg_order': i + 1,
+        'departure_lat': start['lat'],
+        'departure_lon': start['lon'],
+        'arrival_lat': end['lat'],
+        'arrival_lon': end['lon'],
+        'distance_nm': distance,
+        'departure_time': now,  # Placeholder for actual schedule
+        'arrival_time': now,
+        'is_active': True,
+        'created_at': now,
+        'updated_at': now,
+    } for i, (start, end, distance) in enumerate(zip(waypoints, waypoints[1:], _leg_distances(route_info)))]
+
+
+def _insert_routes(conn, rows: List[Dict]) -> List[int]:
+    if not rows:
+        return []
+    statement = insert(routes_table).returning(routes_table.c.id, sort_by_parameter_order=True)
+    return [row.id for row in conn.execute(statement, rows)]
+
+
+def _update_routes(conn, rows: List[Dict]):
+    statement = (
+        update(routes_table)
+        .where(routes_table.c.id == bindparam('b_id'))
+        .values({column: bindparam(f'b_{column}') for column in rows[0] if column != 'id'})
+    )
+    conn.execute(statement, [{f'b_{column}': value for column, value in row.items()} for row in rows])
+
+
+def _write_legs(conn, routes: List[tuple], now: datetime) -> int:
+    """
+    Write the legs of (route_id, route_info) pairs. Existing legs are updated
+    in place by leg_order; surplus legs are deleted, or deactivated if a
+    fuel efficiency calculation still references them. Returns legs written.
+    """
+    leg_rows = [row for route_id, route_info in routes for row in _leg_rows(route_id, route_info, now)]
+    existing = {}
+    route_ids = [route_id for route_id, _ in routes]
+    if route_ids:
+        existing = {(row.route_id, row.leg_order): row.id for row in conn.execute(
+            select(legs_table.c.id, legs_table.c.route_id, legs_table.c.leg_order)
+            .where(legs_table.c.route_id.in_(route_ids))
+        )}
+
+    inserts = [row for row in leg_rows if (row['route_id'], row['leg_order']) not in existing]
+    updates = [{'b_id': existing.pop((row['route_id'], row['leg_order'])),
+                **{f'b_{column}': value for column, value in row.items() if column != 'created_at'}}
+               for row in leg_rows if (row['route_id'], row['leg_order']) in existing]
+    if updates:
+        conn.execute(
+            update(legs_table).where(legs_table.c.id == bindparam('b_id'))
+            .values({column: bindparam(f'b_{column}') for column in leg_rows[0] if column != 'created_at'}),
+            updates,
+        )
+    if inserts:
+        conn.execute(insert(legs_table), inserts)
+
+    # What is left in existing are legs the new routes no longer have
+    surplus = list(existing.values())
+    if surplus:
+        referenced = set()
+        if inspect(conn).has_table(fuel_table.name):
+            referenced = set(conn.execute(
+                select(fuel_table.c.voyage_leg_id).where(fuel_table.c.voyage_leg_id.in_(surplus))
+            ).scalars())
+        if referenced:
+            conn.execute(update(legs_table).where(legs_table.c.id.in_(referenced))
+                         .values(is_active=False, updated_at=now))
+        unreferenced = [leg_id for leg_id in surplus if leg_id not in referenced]
+        if unreferenced:
+            conn.execute(delete(legs_table).where(legs_table.c.id.in_(unreferenced)))
+    return len(leg_rows)
+
+
+def _sync_postgis(conn, batch: List[tuple]):
+    """
+    Replace the base_routes/route_legs/waypoints this ingest wrote for the
+    batch's (route_info, digest) pairs; geometry is built in PostGIS.
+    """
+    names = [route_info['route_name'] for route_info, _ in batch]
+    stale_routes = select(base_routes_table.c.id).where(
+        base_routes_table.c.name.in_(names), base_routes_table.c.rtz_file_hash.isnot(None)
+    )
+    stale_legs = select(route_legs_table.c.id).where(route_legs_table.c.base_route_id.in_(stale_routes))
+    conn.execute(delete(waypoints_table).where(waypoints_table.c.route_leg_id.in_(stale_legs)))
+    conn.execute(delete(route_legs_table).where(route_legs_table.c.base_route_id.in_(stale_routes)))
+    conn.execute(delete(base_routes_table).where(base_routes_table.c.id.in_(stale_routes)))
+
+    batch = [(route_info, digest) for route_info, digest in batch if len(route_info['waypoints']) >= 2]
+    if not batch:
+        return
+    base_ids = [row.id for row in conn.execute(
+        insert(base_routes_table).returning(base_routes_table.c.id, sort_by_parameter_order=True),
+        [{'name': route_info['route_name'], 'description': f"RTZ route from {_rtz_filename(route_info)}",
+          'rtz_file_hash': digest}
+         for route_info, digest in batch],
+    )]
+    batch = [route_info for route_info, _ in batch]
+
+    def point(lon, lat):
+        return func.ST_SetSRID(func.ST_MakePoint(bindparam(lon), bindparam(lat)), 4326)
+
+    leg_rows = []
+    for base_id, route_info in zip(base_ids, batch):
+        waypoints = route_info['waypoints']
+        for i, distance in enumerate(_leg_distances(route_info)):
+            leg_rows.append({
+                'base_route_id': base_id, 'leg_index': i, 'distance_nm': distance,
+                'eta_minutes': round(distance / INGEST_SPEED_KNOTS * 60, 1),
+                'lon0': waypoints[i]['lon'], 'lat0': waypoints[i]['lat'],
+                'lon1': waypoints[i + 1]['lon'], 'lat1': waypoints[i + 1]['lat'],
+            })
+    leg_ids = [row.id for row in conn.execute(
+        insert(route_legs_table)
+        .values(base_route_id=bindparam('base_route_id'), leg_index=bindparam('leg_index'),
+                distance_nm=bindparam('distance_nm'), eta_minutes=bindparam('eta_minutes'),
+                geometry=func.ST_MakeLine(point('lon0', 'lat0'), point('lon1', 'lat1')))
+        .returning(route_legs_table.c.id, sort_by_parameter_order=True),
+        leg_rows,
+    )]
+
+    # Each leg owns its departure waypoint; the last leg also owns the final one
+    waypoint_rows = []
+    legs = iter(leg_ids)
+    for route_info in batch:
+        waypoints = route_info['waypoints']
+        route_leg_ids = [next(legs) for _ in range(len(waypoints) - 1)]
+        for order, wp in enumerate(waypoints):
+            waypoint_rows.append({'name': wp.get('name'), 'order_index': order,
+                                  'route_leg_id': route_leg_ids[min(order, len(route_leg_ids) - 1)],
+                                  'lon': wp['lon'], 'lat': wp['lat']})
+    conn.execute(
+        insert(waypoints_table).values(name=bindparam('name'), order_index=bindparam('order_index'),
+                                       route_leg_id=bindparam('route_leg_id'), position=point('lon', 'lat')),
+        waypoint_rows,
+    )
+
+    conn.execute(text("""
+        UPDATE base_routes SET geometry = line.geometry
+        FROM (
+            SELECT l.base_route_id, ST_MakeLine(w.position ORDER BY w.order_index) AS geometry
+            FROM waypoints w JOIN route_legs l ON l.id = w.route_leg_id
+            WHERE l.base_route_id = ANY(:ids)
+            GROUP BY l.base_route_id
+        ) AS line
+        WHERE base_routes.id = line.base_route_id
+    """), {'ids': base_ids})
+
+
+def _resolve_engine(engine=None):
+    if engine is not None:
+        return engine
+    from flask import has_app_context
+    if has_app_context():
+        from backend.extensions import db
+        return db.engine
+    database_url = os.getenv('DATABASE_URL')
+    if not database_url:
+        raise RuntimeError("DATABASE_URL is not set and no Flask app context is active")
+    return create_engine(database_url)
+
+
+def ingest_rtz_routes(routes_data: List[Dict], engine=None, batch_size: int = RTZ_INGEST_BATCH_SIZE,
+                      sync_postgis: Optional[bool] = None) -> Dict:
+    """
+    Write parsed RTZ routes (see discover_rtz_files) to the database.
+
+    Args:
+        routes_data: Parsed route dictionaries; the first route of each name wins
+        engine: SQLAlchemy engine (default: Flask-SQLAlchemy's, else DATABASE_URL)
+        batch_size: Routes per transaction
+        sync_postgis: Also refresh the PostGIS route tables (default: on PostgreSQL)
+
+    Returns:
+        Counts of inserted, updated, backfilled (hash only) and unchanged
+        routes and written legs
+    """
+    start = time.perf_counter()
+    engine = _resolve_engine(engine)
+    if sync_postgis is None:
+        sync_postgis = engine.dialect.name == 'postgresql'
+
+    unique = {}
+    for route_info in routes_data:
+        if route_info.get('route_name') and route_info.get('waypoints'):
+            unique.setdefault(route_info['route_name'], route_info)
+
+    with engine.connect() as conn:
+        existing = {row.name: (row.id, row.rtz_file_hash) for row in conn.execute(
+            select(routes_table.c.id, routes_table.c.name, routes_table.c.rtz_file_hash)
+        )}
+
+    stats = {'inserted': 0, 'updated': 0, 'backfilled': 0, 'unchanged': 0, 'legs': 0}
+    pending = []  # (route_info, digest, existing id or None, backfill only)
+    for name, route_info in unique.items():
+        digest = route_content_hash(route_info)
+        route_id, stored_digest = existing.get(name, (None, None))
+        if stored_digest == digest:
+            stats['unchanged'] += 1
+        else:
+            # Routes stored before the hash existed keep their rows and legs
+            pending.append((route_info, digest, route_id, route_id is not None and stored_digest is None))
+
+    for offset in range(0, len(pending), batch_size):
+        batch = pending[offset:offset + batch_size]
+        now = datetime.utcnow()
+        new = [(route_info, digest) for route_info, digest, route_id, _ in batch if route_id is None]
+        changed = [(route_info, digest, route_id) for route_info, digest, route_id, backfill in batch
+                   if route_id is not None and not backfill]
+        backfill = [{'b_id': route_id, 'b_rtz_file_hash': digest}
+                    for _, digest, route_id, is_backfill in batch if is_backfill]
+
+        with engine.begin() as conn:
+            new_ids = _insert_routes(conn, [_route_row(route_info, digest, now) for route_info, digest in new])
+            if changed:
+                _update_routes(conn, [{'id': route_id, **_route_row(route_info, digest, now)}
+                                      for route_info, digest, route_id in changed])
+            if backfill:
+                conn.execute(update(routes_table).where(routes_table.c.id == bindparam('b_id'))
+                             .values(rtz_file_hash=bindparam('b_rtz_file_hash')), backfill)
+
+            written = list(zip(new_ids, [route_info for route_info, _ in new]))
+            written += [(route_id, route_info) for route_info, _, route_id in changed]
+            legs = _write_legs(conn, written, now)
+
+            if sync_postgis:
+                _sync_postgis(conn, [(route_info, digest) for route_info, digest, _, _ in batch])
+
+        stats['inserted'] += len(new)
+        stats['updated'] += len(changed)
+        stats['backfilled'] += len(backfill)
+        stats['legs'] += legs
+
+    stats['seconds'] = round(time.perf_counter() - start, 3)
+    logger.info(f"🗄️ RTZ ingest: {stats['inserted']} new, {stats['updated']} updated, "
+                f"{stats['backfilled']} backfilled, {stats['unchanged']} unchanged routes, "
+                f"{stats['legs']} legs in {stats['seconds']}s")
+    return stats
@@ -4,16 +4,21 @@ FIXED: Handles ZIP-compressed RTZ files and correct XML namespaces
 ENHANCED: Extracts ALL 47+ routes from ZIP files, not just the first one
 REAL-TIME: Ensures all routes are discovered and displayed in dashboard
 VISUAL ENHANCEMENT: Added route colors and visual properties for better map differentiation
+CACHED DISCOVERY: ZIP members parsed in memory, parsed routes cached by file content hash
+STREAMING: Single-pass iterparse parser, namespace resolved once from the root tag
 """
 
 import xml.etree.ElementTree as ET
 import os
+import io
+import json
+import hashlib
 import logging
-from typing import List, Dict, Tuple, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Tuple, Optional, Iterator
 from datetime import datetime
 import math
 import zipfile
-import tempfile
 import glob
 import random
 import colorsys
@@ -21,6 +26,18 @@ import colorsys
 # Configure logging
 logger = logging.getLogger(__name__)
 
+ZIP_MAGIC = b'PK\x03\x04'
+
+# Bump when parse output changes so stale cache entries are ignored
+RTZ_CACHE_VERSION = 2
+
+# Process pool only pays off once there is enough XML to parse; below this
+# many bytes of changed files, parsing runs in-process
+RTZ_PARALLEL_MIN_BYTES = 4 * 1024 * 1024
+
+# Parsed routes by content hash, as JSON text so every caller gets fresh dicts
+_route_cache_memory: Dict[str, str] = {}
+
 def get_project_root() -> str:
     """
     Get the absolute path to project root directory.
@@ -90,14 +107,39 @@ def extract_all_routes_from_zip(zip_path: str, city: str) -> List[Dict]:
     Returns:
         List of all route dictionaries from the ZIP
     """
-    all_routes = []
+    if not os.path.exists(zip_path):
+        logger.error(f"ZIP file not found: {zip_path}")
+        return []
     
     try:
-        if not os.path.exists(zip_path):
-            logger.error(f"ZIP file not found: {zip_path}")
-            return []
+        with open(zip_path, 'rb') as f:
+            data = f.read()
+    except OSError as e:
+        logger.error(f"Error reading ZIP {zip_path}: {e}")
+        return []
+    
+    all_routes = parse_rtz_zip_content(data, zip_path)
+    _add_file_metadata(all_routes, city, zip_path, is_zip=True)
+    
+    logger.info(f"🎉 Extracted {len(all_routes)} total routes from {city} ZIP")
+    return all_routes
+
+def parse_rtz_zip_content(data: bytes, zip_path: str) -> List[Dict]:
+    """
+    Parse every RTZ member of a ZIP archive held in memory.
+    Members are read straight from the archive; nothing is written to disk.
+    
+    Args:
+        data: Raw ZIP file bytes
+        zip_path: Path of the archive (for logging and route metadata)
         
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+    Returns:
+        List of route dictionaries, each tagged with its 'rtz_filename'
+    """
+    all_routes = []
+    
+    try:
+        with zipfile.ZipFile(io.BytesIO(data), 'r') as zip_ref:
             # Get ALL RTZ files in the ZIP
             rtz_files = [f for f in zip_ref.namelist() if f.endswith('.rtz')]
             
@@ -105,38 +147,20 @@ def extract_all_routes_from_zip(zip_path: str, city: str) -> List[Dict]:
                 logger.warning(f"No RTZ files found in {zip_path}")
                 return []
             
-            logger.info(f"📦 Found {len(rtz_files)} RTZ files in {city} ZIP archive")
-            
-            # Create temporary directory for extraction
-            temp_dir = tempfile.mkdtemp()
+            logger.info(f"📦 Found {len(rtz_files)} RTZ files in ZIP archive {os.path.basename(zip_path)}")
             
             for rtz_filename in rtz_files:
                 try:
-                    # Extract file
-                    extracted_path = os.path.join(temp_dir, rtz_filename)
-                    zip_ref.extract(rtz_filename, temp_dir)
-                    
-                    # Parse the RTZ file
-                    routes = parse_rtz_file(extracted_path)
+                    routes = parse_rtz_content(zip_ref.read(rtz_filename), zip_path)
+                    for route in routes:
+                        route['rtz_filename'] = rtz_filename
+                    all_routes.extend(routes)
                     if routes:
-                        # Add city metadata to each route
-                        for route in routes:
-                            route['source_city'] = city
-                            route['original_zip'] = os.path.basename(zip_path)
-                            route['rtz_filename'] = rtz_filename
-                        all_routes.extend(routes)
                         logger.info(f"  ✅ Parsed: {rtz_filename} ({len(routes)} route(s))")
-                    
-                    # Clean up extracted file
-                    os.remove(extracted_path)
-                    
                 except Exception as e:
                     logger.error(f"❌ Error processing {rtz_filename}: {e}")
                     continue
             
-            # Clean up temp directory
-            os.rmdir(temp_dir)
-            
     except zipfile.BadZipFile:
         logger.error(f"Invalid ZIP file: {zip_path}")
         return []
@@ -144,9 +168,18 @@ def extract_all_routes_from_zip(zip_path: str, city: str) -> List[Dict]:
         logger.error(f"Error extracting ZIP {zip_path}: {e}")
         return []
     
-    logger.info(f"🎉 Extracted {len(all_routes)} total routes from {city} ZIP")
     return all_routes
 
+def _add_file_metadata(routes: List[Dict], city: str, file_path: str, is_zip: bool):
+    """Tag parsed routes with the city and file they were discovered in."""
+    for route in routes:
+        route['source_city'] = city
+        route['file_path'] = file_path
+        if is_zip:
+            route['original_zip'] = os.path.basename(file_path)
+        else:
+            route['original_file'] = os.path.basename(file_path)
+
 def haversine_nm(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
     Calculate great-circle distance between two points in nautical miles.
@@ -177,102 +210,161 @@ def parse_rtz_file(file_path: str) -> List[Dict]:
             logger.warning(f"File not found: {file_path}")
             return []
         
-        # Check if file is a ZIP archive
-        actual_file_path = file_path
         with open(file_path, 'rb') as f:
-            file_header = f.read(4)
-            is_zip = file_header == b'PK\x03\x04'
+            header = f.read(4)
         
         # If it's a ZIP file, extract ALL RTZ content first
-        if is_zip:
+        if header == ZIP_MAGIC:
             logger.info(f"📦 Detected ZIP archive, extracting ALL RTZ content: {file_path}")
             # For ZIP files, we should use extract_all_routes_from_zip instead
             logger.warning("ZIP file passed to parse_rtz_file directly. Use extract_all_routes_from_zip for better handling.")
             return []
-        else:
-            logger.info(f"📄 Processing direct RTZ XML file: {file_path}")
         
-        # Now parse the XML file
-        tree = ET.parse(actual_file_path)
-        root = tree.getroot()
+        logger.info(f"📄 Processing direct RTZ XML file: {file_path}")
+        # Stream straight from disk so large route files are never held whole
+        return parse_rtz_stream(file_path, file_path)
         
-        # FIXED: Extract route information with namespace handling
-        route_name = "Unknown_Route"
+    except Exception as e:
+        logger.error(f"Error parsing RTZ file {file_path}: {e}")
+        return []
+
+def iter_rtz_waypoints(source, route_meta: Optional[Dict] = None) -> Iterator[Dict]:
+    """
+    Stream waypoints from RTZ XML with iterparse, one element at a time.
+    The namespace is resolved once from the root tag, and each waypoint is
+    cleared as soon as it is emitted so memory stays flat for large routes.
+    
+    Args:
+        source: File path or binary file object with RTZ XML
+        route_meta: Optional dict filled with 'route_name', 'schedule'
+            (waypoint id -> scheduleElement attributes) and 'extensions'
+            (route-level extension attributes) as they are encountered
         
-        # Try to get routeName from different possible locations
-        if 'routeName' in root.attrib:
-            route_name = root.get('routeName')
-        else:
-            # Look for routeInfo element
-            for namespace in ['', '{https://cirm.org/rtz-xml-schemas}']:
-                route_info_elem = root.find(f'{namespace}routeInfo')
-                if route_info_elem is not None and 'routeName' in route_info_elem.attrib:
-                    route_name = route_info_elem.get('routeName')
-                    break
-        
-        logger.debug(f"Parsing RTZ route: {route_name}")
-        
-        # Extract waypoints with FIXED namespace handling
-        waypoints = []
-        
-        # Try different namespace approaches for maximum compatibility
-        # Based on the actual XML structure you provided
-        waypoint_elements = []
-        
-        # Method 1: Direct search without namespace (most common)
-        waypoint_elements = root.findall('.//waypoint')
-        
-        # Method 2: With the actual namespace from your file
-        if not waypoint_elements:
-            ns = {'rtz': 'https://cirm.org/rtz-xml-schemas'}
-            waypoint_elements = root.findall('.//rtz:waypoint', ns)
-        
-        # Method 3: Try any namespace
-        if not waypoint_elements:
-            # Register the namespace if found
-            namespace = ''
-            if '}' in root.tag:
-                namespace = root.tag.split('}')[0] + '}'
-            if namespace:
-                waypoint_elements = root.findall(f'.//{namespace}waypoint')
-        
-        logger.debug(f"Found {len(waypoint_elements)} waypoint elements")
-        
-        for wp_elem in waypoint_elements:
-            try:
-                # Extract position information
-                position_elem = None
-                
-                # Try different ways to find position element
-                if wp_elem.find('position') is not None:
-                    position_elem = wp_elem.find('position')
-                else:
-                    # Try with namespace
-                    for ns in ['', '{https://cirm.org/rtz-xml-schemas}']:
-                        position_elem = wp_elem.find(f'{ns}position')
-                        if position_elem is not None:
-                            break
-                
-                if position_elem is not None and 'lat' in position_elem.attrib and 'lon' in position_elem.attrib:
-                    waypoint = {
-                        'name': wp_elem.get('name', ''),
-                        'lat': float(position_elem.get('lat', 0)),
-                        'lon': float(position_elem.get('lon', 0)),
-                        'radius': float(wp_elem.get('radius', 0.1))  # Default radius 0.1 nm
-                    }
-                    waypoints.append(waypoint)
-                    logger.debug(f"Added waypoint: {waypoint['name']} at {waypoint['lat']}, {waypoint['lon']}")
-                else:
-                    logger.warning(f"Could not extract position for waypoint: {wp_elem.get('name', 'unknown')}")
-                    
-            except Exception as e:
-                logger.warning(f"Error processing waypoint element: {e}")
-                continue
+    Yields:
+        Waypoint dicts with name, lat, lon, radius (and id, extensions when present)
+    """
+    meta = route_meta if route_meta is not None else {}
+    meta.setdefault('route_name', None)
+    meta.setdefault('schedule', {})
+    meta.setdefault('extensions', [])
+    
+    ns = None
+    waypoint_tag = position_tag = extension_tag = schedule_element_tag = None
+    route_info_tag = extensions_tag = None
+    root = None
+    parents = []
+    waypoint = None
+    in_route_extensions = False
+    
+    for event, elem in ET.iterparse(source, events=('start', 'end')):
+        if event == 'start':
+            if ns is None:
+                # Root element: resolve the namespace once for the whole document
+                root = elem
+                ns = elem.tag[:elem.tag.index('}') + 1] if elem.tag.startswith('{') else ''
+                waypoint_tag = f'{ns}waypoint'
+                position_tag = f'{ns}position'
+                extension_tag = f'{ns}extension'
+                extensions_tag = f'{ns}extensions'
+                schedule_element_tag = f'{ns}scheduleElement'
+                route_info_tag = f'{ns}routeInfo'
+                if 'routeName' in elem.attrib:
+                    meta['route_name'] = elem.get('routeName')
+            elif elem.tag == waypoint_tag:
+                waypoint = {'name': elem.get('name', ''), 'lat': None, 'lon': None,
+                            'radius': elem.get('radius')}
+                if elem.get('id') is not None:
+                    waypoint['id'] = elem.get('id')
+            elif elem.tag == route_info_tag and meta['route_name'] is None:
+                meta['route_name'] = elem.get('routeName')
+            elif elem.tag == extensions_tag and parents and parents[-1] is root:
+                in_route_extensions = True
+            parents.append(elem)
+            continue
+        
+        parents.pop()
+        tag = elem.tag
+        if waypoint is not None:
+            if tag == position_tag:
+                waypoint['lat'] = elem.get('lat')
+                waypoint['lon'] = elem.get('lon')
+            elif tag == extension_tag or tag == 'extension':
+                waypoint.setdefault('extensions', []).append(dict(elem.attrib))
+            elif tag == waypoint_tag:
+                emitted = _finish_waypoint(waypoint)
+                waypoint = None
+                # Drop the processed subtree so the document never accumulates
+                elem.clear()
+                if parents:
+                    parents[-1].remove(elem)
+                if emitted is not None:
+                    yield emitted
+        elif tag == schedule_element_tag:
+            waypoint_id = elem.get('waypointId')
+            if waypoint_id is not None and waypoint_id not in meta['schedule']:
+                meta['schedule'][waypoint_id] = {
+                    key: value for key, value in elem.attrib.items() if key != 'waypointId'}
+        elif in_route_extensions and (tag == extension_tag or tag == 'extension'):
+            meta['extensions'].append(dict(elem.attrib))
+        elif tag == extensions_tag:
+            in_route_extensions = False
+
+
+def _finish_waypoint(waypoint: Dict) -> Optional[Dict]:
+    """Convert streamed waypoint attributes to numbers; None if unusable."""
+    if waypoint['lat'] is None or waypoint['lon'] is None:
+        logger.warning(f"Could not extract position for waypoint: {waypoint['name'] or 'unknown'}")
+        return None
+    try:
+        waypoint['lat'] = float(waypoint['lat'])
+        waypoint['lon'] = float(waypoint['lon'])
+        # Default radius 0.1 nm
+        waypoint['radius'] = float(waypoint['radius']) if waypoint['radius'] is not None else 0.1
+    except ValueError as e:
+        logger.warning(f"Error processing waypoint element: {e}")
+        return None
+    return waypoint
+
+
+def parse_rtz_content(data: bytes, file_path: str) -> List[Dict]:
+    """
+    Parse RTZ route XML held in memory.
+    Shared by the in-memory ZIP reader and cached discovery.
+    
+    Args:
+        data: Raw RTZ XML bytes
+        file_path: Source path, used for logging and the route's 'file_path'
+        
+    Returns:
+        List with one route dictionary, or empty list if nothing could be parsed
+    """
+    return parse_rtz_stream(io.BytesIO(data), file_path)
+
+
+def parse_rtz_stream(source, file_path: str) -> List[Dict]:
+    """
+    Parse RTZ route XML from a file path or binary file object in a single
+    streaming pass (see iter_rtz_waypoints).
+    
+    Returns:
+        List with one route dictionary, or empty list if nothing could be parsed
+    """
+    try:
+        route_meta = {}
+        waypoints = list(iter_rtz_waypoints(source, route_meta))
+        route_name = route_meta['route_name'] or "Unknown_Route"
         
         if not waypoints:
             logger.warning(f"No waypoints found in {file_path}")
             return []
         
+        # Schedules follow the waypoint list in RTZ, so attach them afterwards
+        schedule = route_meta['schedule']
+        if schedule:
+            for waypoint in waypoints:
+                if waypoint.get('id') in schedule:
+                    waypoint['schedule'] = schedule[waypoint['id']]
+        
         # Calculate leg distances and total distance
         legs = []
         total_distance = 0.0
@@ -306,6 +398,8 @@ def parse_rtz_file(file_path: str) -> List[Dict]:
             'parse_timestamp': datetime.now().isoformat(),
             'data_source': 'rtz_file_parser'
         }
+        if route_meta['extensions']:
+            route_info['extensions'] = route_meta['extensions']
         
         logger.info(f"✅ Successfully parsed route '{route_name}': {origin} → {destination} ({len(waypoints)} waypoints, {total_distance:.1f} nm)")
             
@@ -563,14 +657,80 @@ def enhance_route_data_with_visuals(routes_data: List[Dict]) -> List[Dict]:
     logger.info(f"🎨 Enhanced {len(enhanced_routes)} routes with visual properties")
     return enhanced_routes
 
-def discover_rtz_files(enhanced: bool = True) -> List[Dict]:
+def get_rtz_cache_dir() -> str:
+    """Directory for parsed-route cache files (override with RTZ_CACHE_DIR)."""
+    return os.getenv("RTZ_CACHE_DIR") or os.path.join(get_project_root(), "data", "cache", "rtz_routes")
+
+def _load_cached_routes(digest: str) -> Optional[List[Dict]]:
+    """Return a fresh copy of the cached parse for a content hash, or None."""
+    cached = _route_cache_memory.get(digest)
+    if cached is None:
+        cache_file = os.path.join(get_rtz_cache_dir(), f"{digest}.json")
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                cached = f.read()
+            if json.loads(cached).get('version') != RTZ_CACHE_VERSION:
+                return None
+        except (OSError, ValueError):
+            return None
+        _route_cache_memory[digest] = cached
+    return json.loads(cached)['routes']
+
+def _store_cached_routes(digest: str, routes: List[Dict]):
+    """Persist a parse result under its content hash (memory and disk)."""
+    cached = json.dumps({'version': RTZ_CACHE_VERSION, 'routes': routes})
+    _route_cache_memory[digest] = cached
+    
+    cache_dir = get_rtz_cache_dir()
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        cache_file = os.path.join(cache_dir, f"{digest}.json")
+        temp_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            f.write(cached)
+        os.replace(temp_file, cache_file)
+    except OSError as e:
+        logger.warning(f"⚠️ Could not write RTZ cache {cache_dir}: {e}")
+
+def _parse_file_content(job: Tuple[bytes, str]) -> List[Dict]:
+    """Parse one discovered file (ZIP or plain RTZ). Runs in pool workers."""
+    data, file_path = job
+    if data[:4] == ZIP_MAGIC:
+        return parse_rtz_zip_content(data, file_path)
+    return parse_rtz_content(data, file_path)
+
+def _parse_changed_files(pending: Dict[str, Tuple[bytes, str]]) -> Dict[str, List[Dict]]:
+    """
+    Parse files whose content hash is not cached yet.
+    Large batches are spread over a process pool; small ones (the usual
+    case for a warm restart with a few edited routes) run in-process.
+    """
+    digests = list(pending)
+    jobs = [pending[digest] for digest in digests]
+    total_bytes = sum(len(data) for data, _ in jobs)
+    workers = int(os.getenv("RTZ_DISCOVERY_WORKERS", "0")) or os.cpu_count() or 1
+    
+    if len(jobs) > 1 and workers > 1 and total_bytes >= RTZ_PARALLEL_MIN_BYTES:
+        try:
+            logger.info(f"⚙️ Parsing {len(jobs)} changed RTZ files on {workers} processes")
+            with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+                return dict(zip(digests, pool.map(_parse_file_content, jobs)))
+        except Exception as e:
+            logger.warning(f"⚠️ Parallel RTZ parsing unavailable ({e}), parsing in-process")
+    
+    return {digest: _parse_file_content(job) for digest, job in zip(digests, jobs)}
+
+def discover_rtz_files(enhanced: bool = True, use_cache: bool = True) -> List[Dict]:
     """
     Discover and parse ALL RTZ files from all cities.
     FIXED: Now properly handles ZIP files and finds ALL 47+ routes.
     ENHANCED: Can return routes with visual properties for map display.
+    CACHED: Each file is hashed; only files whose content changed since the
+    last run are parsed, the rest come from the route cache.
     
     Args:
         enhanced: Whether to add visual properties to routes
+        use_cache: Whether to reuse (and update) the parsed-route cache
         
     Returns:
         List of ALL route dictionaries from all cities (with or without visual properties)
@@ -580,38 +740,49 @@ def discover_rtz_files(enhanced: bool = True) -> List[Dict]:
     
     logger.info(f"🚀 Starting comprehensive RTZ discovery for {len(rtz_files)} cities...")
     
+    # Read and hash every file once; identical copies are parsed once
+    discovered = []  # (city, file_path, digest)
+    cached_routes: Dict[str, List[Dict]] = {}
+    pending: Dict[str, Tuple[bytes, str]] = {}
     for city, file_paths in rtz_files.items():
-        logger.info(f"📂 Processing ALL routes for {city}...")
-        
         for file_path in file_paths:
             try:
-                logger.info(f"   📄 Analyzing: {os.path.basename(file_path)}")
-                
-                # Check if it's a ZIP file
                 with open(file_path, 'rb') as f:
-                    file_header = f.read(4)
-                    is_zip = file_header == b'PK\x03\x04'
-                
-                if is_zip:
-                    # Extract ALL RTZ files from ZIP
-                    routes = extract_all_routes_from_zip(file_path, city)
-                    if routes:
-                        all_routes.extend(routes)
-                        logger.info(f"   ✅ Found {len(routes)} routes in {os.path.basename(file_path)}")
-                else:
-                    # Direct RTZ file
-                    routes = parse_rtz_file(file_path)
-                    if routes:
-                        # Add city metadata
-                        for route in routes:
-                            route['source_city'] = city
-                            route['original_file'] = os.path.basename(file_path)
-                        all_routes.extend(routes)
-                        logger.info(f"   ✅ Found {len(routes)} routes in {os.path.basename(file_path)}")
-                        
-            except Exception as e:
-                logger.error(f"   ❌ Error processing {file_path}: {e}")
+                    data = f.read()
+            except OSError as e:
+                logger.error(f"   ❌ Error reading {file_path}: {e}")
                 continue
+            
+            digest = hashlib.sha256(data).hexdigest()
+            discovered.append((city, file_path, digest))
+            if digest in cached_routes or digest in pending:
+                continue
+            routes = _load_cached_routes(digest) if use_cache else None
+            if routes is None:
+                pending[digest] = (data, file_path)
+            else:
+                cached_routes[digest] = routes
+    
+    logger.info(f"📦 {len(discovered)} files: {len(cached_routes)} unchanged (cached), {len(pending)} to parse")
+    
+    if pending:
+        for digest, routes in _parse_changed_files(pending).items():
+            if use_cache:
+                _store_cached_routes(digest, routes)
+            cached_routes[digest] = routes
+    
+    used = set()
+    for city, file_path, digest in discovered:
+        # Each discovered file gets its own route dicts
+        routes = cached_routes[digest]
+        if digest in used:
+            routes = json.loads(json.dumps(routes))
+        used.add(digest)
+        
+        if routes:
+            _add_file_metadata(routes, city, file_path, is_zip=bool(routes[0].get('rtz_filename')))
+            all_routes.extend(routes)
+            logger.debug(f"   ✅ Found {len(routes)} routes in {os.path.basename(file_path)}")
     
     logger.info(f"🎉 Total routes discovered across all cities: {len(all_routes)}")
     
@@ -639,103 +810,21 @@ def discover_rtz_files(enhanced: bool = True) -> List[Dict]:
 
 def save_rtz_routes_to_db(routes_data: List[Dict]) -> int:
     """
-    Save parsed RTZ routes to database using proper SQLAlchemy models.
-    ENHANCED: Extracts and stores origin/destination information with improved error handling.
-    Maintains existing database integration.
+    Save parsed RTZ routes to database.
+    BULK: Routes are diffed by content hash and written set-based in batched
+    transactions (see backend.services.rtz_ingest), so reruns are safe.
+    
+    Returns:
+        Number of routes inserted or updated
     """
     try:
-        # Import database models within application context
-        from app import create_app
-        from backend.models import Route, VoyageLeg
-        from backend.extensions import db
-        
-        # Create Flask app and application context
-        app = create_app()
+        from backend.services.rtz_ingest import ingest_rtz_routes
         
-        with app.app_context():
-            saved_count = 0
-            error_count = 0
-            
-            for route_info in routes_data:
-                try:
-                    # Check if route already exists
-                    existing_route = Route.query.filter(
-                        Route.name == route_info['route_name']
-                    ).first()
-                    
-                    if existing_route:
-                        logger.info(f"Route '{route_info['route_name']}' already exists, skipping")
-                        continue
-                    
-                    # ENHANCED: Extract origin and destination
-                    waypoints = route_info['waypoints']
-                    origin, destination = extract_origin_destination(route_info['route_name'], waypoints)
-                    
-                    # ENHANCED: Calculate duration (assume 15 knots average commercial speed)
-                    total_distance = route_info['total_distance_nm']
-                    duration_days = round(total_distance / (15 * 24), 2)  # 15 knots * 24 hours
-                    
-                    # Create main Route entry with enhanced data
-                    new_route = Route(
-                        name=route_info['route_name'],
-                        total_distance_nm=total_distance,
-                        origin=origin,
-                        destination=destination,
-                        duration_days=duration_days,
-                        description=f"Official NCA route: {origin} → {destination} ({total_distance} nm)",
-                        is_active=True
-                    )
-                    db.session.add(new_route)
-                    db.session.flush()  # Get the route ID
-                    
-                    # Create VoyageLegs for each segment between waypoints
-                    for i in range(len(waypoints) - 1):
-                        start_wp = waypoints[i]
-                        end_wp = waypoints[i + 1]
-                        
-                        # Find the corresponding leg distance
-                        leg_distance = 0.0
-                        if i < len(route_info['legs']):
-                            leg_distance = route_info['legs'][i]['distance_nm']
-                        else:
-                            # Calculate if not available
-                            leg_distance = haversine_nm(
-                                start_wp['lat'], start_wp['lon'],
-                                end_wp['lat'], end_wp['lon']
-                            )
-                        
-                        # Create voyage leg with enhanced data
-                        voyage_leg = VoyageLeg(
-                            route_id=new_route.id,
-                            leg_order=i + 1,
-                            departure_lat=start_wp['lat'],
-                            departure_lon=start_wp['lon'],
-                            arrival_lat=end_wp['lat'],
-                            arrival_lon=end_wp['lon'],
-                            distance_nm=round(leg_distance, 2),
-                            departure_time=datetime.utcnow(),  # Placeholder for actual schedule
-                            arrival_time=datetime.utcnow(),    # Placeholder for actual schedule
-                            is_active=True
-                        )
-                        db.session.add(voyage_leg)
-                    
-                    saved_count += 1
-                    logger.info(f"✅ Saved route '{route_info['route_name']}' ({origin} → {destination}) with {len(waypoints)} waypoints")
-                    
-                except Exception as e:
-                    error_count += 1
-                    logger.error(f"❌ Failed to save route '{route_info['route_name']}': {str(e)}")
-                    continue
-            
-            # Commit all changes
-            db.session.commit()
-            
-            if saved_count > 0:
-                logger.info(f"🎉 Successfully saved {saved_count} routes to database")
-            if error_count > 0:
-                logger.warning(f"⚠️ {error_count} routes failed to save")
-            
-            return saved_count
+        stats = ingest_rtz_routes(routes_data)
+        saved_count = stats['inserted'] + stats['updated']
+        if saved_count > 0:
+            logger.info(f"🎉 Successfully saved {saved_count} routes to database")
+        return saved_count
         
     except ImportError as e:
         logger.warning(f"Database models not available: {e}")
@@ -0,0 +1,219 @@
+"""
+Source Fan-out - query several data sources concurrently under one deadline.
+Sources are given in priority order. The call returns as soon as the best
+result that can still arrive is known (every higher-priority source has
+answered without a usable result), or when the overall deadline hits, in
+which case the best result received so far wins.
+
+Calls still queued at that point are cancelled. Calls already running cannot
+be interrupted from Python; they are abandoned and only count towards the
+latency histograms (outcome 'late'). Every source callable receives a
+threading.Event that is set once its result is no longer needed, so a
+multi-step source can stop between upstream requests instead of holding a
+shared worker after the response has gone.
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from backend.services.http_client import LATENCY_BUCKETS_MS
+
+logger = logging.getLogger(__name__)
+
+# Overall budget for a concurrent multi-source AIS query (seconds)
+AIS_CAPTURE_DEADLINE_SECONDS = float(os.environ.get('AIS_CAPTURE_DEADLINE_SECONDS', '8'))
+
+OUTCOMES = ('ok', 'empty', 'error', 'late')
+
+
+def _usable(value) -> bool:
+    return bool(value)
+
+
+class FanoutResult:
+    """Outcome of one fan-out call."""
+
+    def __init__(self, source: Optional[str], value, outcomes: Dict[str, Dict], elapsed_ms: float):
+        self.source = source
+        self.value = value
+        self.outcomes = outcomes
+        self.elapsed_ms = elapsed_ms
+
+    @property
+    def timed_out(self) -> List[str]:
+        return [name for name, outcome in self.outcomes.items() if outcome['status'] == 'timeout']
+
+    def to_dict(self) -> Dict:
+        return {
+            'source': self.source,
+            'elapsed_ms': round(self.elapsed_ms, 1),
+            'outcomes': {name: {key: value for key, value in outcome.items() if key != 'value'}
+                         for name, outcome in self.outcomes.items()},
+        }
+
+
+class SourceFanout:
+    """
+    Shared executor for concurrent multi-source queries with per-source
+    latency histograms.
+    """
+
+    def __init__(self, max_workers: int = 16, name: str = 'fanout'):
+        self.name = name
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Dict] = {}
+        self.stats = {'calls': 0, 'deadline_hits': 0, 'cancelled': 0, 'abandoned': 0}
+        self._abandoned_running = 0  # Abandoned calls still occupying a worker
+
+    def run(self, sources: Sequence[Tuple[str, Callable[[threading.Event], object]]], deadline_seconds: float,
+            accept: Callable[[object], bool] = _usable, first_wins: bool = True) -> FanoutResult:
+        """
+        Query all sources concurrently.
+
+        Args:
+            sources: (name, callable) pairs in priority order; each callable is
+                called with a threading.Event that is set when its result is
+                no longer needed and should return early when it sees it
+            deadline_seconds: Overall budget for the whole call
+            accept: Decides whether a source's return value is usable
+            first_wins: Return as soon as the best-priority usable result is
+                settled; with False, wait for every source (up to the deadline)
+
+        Returns:
+            FanoutResult with the winning source/value and every source's outcome
+        """
+        start = time.perf_counter()
+        deadline = start + deadline_seconds
+        names = [name for name, _ in sources]
+        outcomes: Dict[str, Dict] = {}
+        abandoned = set()
+        futures = {}
+        no_longer_needed = threading.Event()
+
+        for name, func in sources:
+            future = self._executor.submit(func, no_longer_needed)
+            future.add_done_callback(self._make_recorder(name, time.perf_counter(), accept, abandoned))
+            futures[future] = name
+
+        pending = set(futures)
+        while pending:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                outcomes[futures[future]] = self._outcome(future, accept, start)
+            if first_wins and self._settled(names, outcomes):
+                break
+
+        with self._lock:
+            self.stats['calls'] += 1
+            for future in pending:
+                name = futures[future]
+                if future.cancel():
+                    outcomes[name] = {'status': 'cancelled'}
+                    self.stats['cancelled'] += 1
+                elif future.done():  # Finished just as the deadline passed
+                    outcomes[name] = self._outcome(future, accept, start)
+                else:
+                    abandoned.add(name)
+                    outcomes[name] = {'status': 'timeout'}
+                    self.stats['abandoned'] += 1
+                    self._abandoned_running += 1
+            if pending and not (first_wins and self._settled(names, outcomes)):
+                self.stats['deadline_hits'] += 1
+        no_longer_needed.set()
+
+        winner = next((name for name in names if outcomes.get(name, {}).get('status') == 'ok'), None)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if pending:
+            logger.info(f"⏱️ {self.name}: {len(pending)} source(s) still running after "
+                        f"{elapsed_ms:.0f} ms, using {winner or 'no source'}")
+        ordered = {name: outcomes[name] for name in names if name in outcomes}
+        return FanoutResult(winner, ordered[winner]['value'] if winner else None, ordered, elapsed_ms)
+
+    @staticmethod
+    def _settled(names: List[str], outcomes: Dict[str, Dict]) -> bool:
+        """True once the first source in priority order that has not failed is done."""
+        for name in names:
+            outcome = outcomes.get(name)
+            if outcome is None:
+                return False
+            if outcome['status'] == 'ok':
+                return True
+        return True
+
+    @staticmethod
+    def _outcome(future, accept, start: float) -> Dict:
+        elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+        error = future.exception()
+        if error is not None:
+            return {'status': 'error', 'error': str(error)[:200], 'latency_ms': elapsed_ms}
+        value = future.result()
+        return {'status': 'ok' if accept(value) else 'empty', 'value': value, 'latency_ms': elapsed_ms}
+
+    def _make_recorder(self, name: str, submitted: float, accept, abandoned: set):
+        def record(future):
+            if future.cancelled():
+                return
+            latency_ms = (time.perf_counter() - submitted) * 1000
+            with self._lock:
+                late = name in abandoned
+                if late:
+                    self._abandoned_running -= 1
+            if late:
+                outcome = 'late'
+            elif future.exception() is not None:
+                outcome = 'error'
+            else:
+                outcome = 'ok' if accept(future.result()) else 'empty'
+            self._record(name, latency_ms, outcome)
+        return record
+
+    def _record(self, name: str, latency_ms: float, outcome: str):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = {'counts': [0] * (len(LATENCY_BUCKETS_MS) + 1),
+                             'outcomes': dict.fromkeys(OUTCOMES, 0),
+                             'total_ms': 0.0, 'max_ms': 0.0, 'n': 0}
+                self._histograms[name] = histogram
+            bucket = next((i for i, bound in enumerate(LATENCY_BUCKETS_MS) if latency_ms <= bound),
+                          len(LATENCY_BUCKETS_MS))
+            histogram['counts'][bucket] += 1
+            histogram['outcomes'][outcome] += 1
+            histogram['total_ms'] += latency_ms
+            histogram['max_ms'] = max(histogram['max_ms'], latency_ms)
+            histogram['n'] += 1
+
+    def get_latency_histograms(self) -> Dict[str, Dict]:
+        """Per-source latency bucket counts ('le_<ms>' / 'gt_<ms>') and outcomes."""
+        with self._lock:
+            result = {}
+            for name, histogram in self._histograms.items():
+                buckets = {f'le_{bound}ms': count
+                           for bound, count in zip(LATENCY_BUCKETS_MS, histogram['counts'])}
+                buckets[f'gt_{LATENCY_BUCKETS_MS[-1]}ms'] = histogram['counts'][-1]
+                result[name] = {
+                    'buckets': buckets,
+                    'outcomes': dict(histogram['outcomes']),
+                    'count': histogram['n'],
+                    'mean_ms': round(histogram['total_ms'] / histogram['n'], 1),
+                    'max_ms': round(histogram['max_ms'], 1),
+                }
+            return result
+
+    def get_status(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats, abandoned_running=self._abandoned_running)
+        return {'name': self.name, 'stats': stats,
+                'latency_histograms': self.get_latency_histograms()}
+
+
+# Shared fan-out for the AIS sources (Kystverket, Kystdatahuset, BarentsWatch)
+ais_source_fanout = SourceFanout(name='ais-fanout')
@@ -0,0 +1,286 @@
+# backend/services/spatial_queries.py
+"""
+PostGIS query layer for hazard and route-corridor proximity checks.
+
+Proximity checks run in the database with ST_DWithin on geography, which the
+GiST indexes on (geometry::geography) serve directly. Many vessel positions
+are looked up in one query by unnesting coordinate arrays.
+
+Point hazards (wind farms, turbines, BarentsWatch facilities) are stored in
+hazard_zones as their circular footprint polygon so one table serves both
+drawn zones and point sources. Each synced row carries a source_key derived
+from the hazard itself (type, name, position), so rows map back to the
+caller's hazards whichever worker or process last synced them.
+
+Every query returns None when PostGIS is not reachable, and callers fall back
+to their in-memory checks. docker-compose.postgis.yml starts a local
+PostgreSQL + PostGIS stand-in.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, create_engine, text
+
+logger = logging.getLogger(__name__)
+
+# 'auto' uses PostGIS when DATABASE_URL points at PostgreSQL with the extension
+SPATIAL_QUERIES = os.getenv('SPATIAL_QUERIES', 'auto').lower()
+
+# After a failed probe or query, in-memory checks are used for this long
+SPATIAL_RETRY_SECONDS = float(os.getenv('SPATIAL_RETRY_SECONDS', '300'))
+
+# Footprint radius for point hazards without one of their own
+POINT_HAZARD_FOOTPRINT_M = 25.0
+
+_POINTS_CTE = """
+    points AS (
+        SELECT (u.idx - 1)::int AS point_index,
+               ST_SetSRID(ST_MakePoint(u.lon, u.lat), 4326)::geography AS geog
+        FROM unnest(CAST(:lats AS float8[]), CAST(:lons AS float8[])) WITH ORDINALITY AS u(lat, lon, idx)
+    )
+"""
+
+
+def hazard_source_key(hazard: Dict) -> str:
+    """Stable hazard_zones.source_key for a point hazard: the same hazard gets the same key in every process."""
+    identity = f"{hazard['type']}|{hazard.get('name') or ''}|{float(hazard['latitude']):.6f}|{float(hazard['longitude']):.6f}"
+    return hashlib.sha1(identity.encode('utf-8')).hexdigest()
+
+
+class SpatialQueries:
+    """Set-based PostGIS proximity queries with in-memory fallback signalling."""
+
+    def __init__(self, engine=None):
+        self._engine = engine
+        self._available = None
+        self._checked_at = 0.0
+        self._synced = {}  # hazard types key -> (fingerprint, source keys)
+        self.stats = {'queries': 0, 'points': 0, 'failures': 0, 'syncs': 0, 'stale_syncs': 0}
+
+    def _get_engine(self):
+        if self._engine is None:
+            from flask import has_app_context
+            if has_app_context():
+                from backend.extensions import db
+                return db.engine
+            database_url = os.getenv('DATABASE_URL')
+            if not database_url:
+                return None
+            self._engine = create_engine(database_url, pool_pre_ping=True)
+        return self._engine
+
+    def enabled(self) -> bool:
+        """True when queries should go to PostGIS (probed once, re-probed after failures)."""
+        if SPATIAL_QUERIES in ('false', '0', 'off'):
+            return False
+        if self._available is not None and (self._available or time.time() - self._checked_at < SPATIAL_RETRY_SECONDS):
+            return self._available
+
+        self._checked_at = time.time()
+        engine = self._get_engine()
+        if engine is None or engine.dialect.name != 'postgresql':
+            self._available = False
+            return False
+        try:
+            with engine.connect() as conn:
+                version = conn.execute(text("SELECT PostGIS_Lib_Version()")).scalar()
+            self._available = True
+            logger.info(f"🗺️ Spatial queries: PostGIS {version}")
+        except Exception as e:
+            self._available = False
+            logger.warning(f"⚠️ PostGIS not available, using in-memory proximity checks: {e}")
+        return self._available
+
+    def _failed(self, what: str, error: Exception):
+        self._available = False
+        self._checked_at = time.time()
+        self.stats['failures'] += 1
+        logger.warning(f"⚠️ Spatial query '{what}' failed, falling back to in-memory checks: {error}")
+
+    def sync_point_hazards(self, hazards: List[Dict], hazard_types: Sequence[str]) -> Optional[List[str]]:
+        """
+        Replace the hazard_zones rows of the given types with point hazards.
+
+        Args:
+            hazards: Dicts with 'type', 'name', 'latitude', 'longitude' and
+                optional 'radius_m' (footprint) and 'risk_score'
+            hazard_types: Types owned by this source; their rows are replaced
+
+        Returns:
+            hazard_zones source keys in the order of hazards (see match_synced),
+            or None if PostGIS is unavailable
+        """
+        if not self.enabled():
+            return None
+        key = tuple(sorted(hazard_types))
+        rows = [{
+            'source_key': hazard_source_key(hazard),
+            'name': str(hazard.get('name') or hazard['type'])[:255],
+            'hazard_type': hazard['type'],
+            'lat': float(hazard['latitude']),
+            'lon': float(hazard['longitude']),
+            'radius': float(hazard.get('radius_m') or POINT_HAZARD_FOOTPRINT_M),
+            'risk_score': float(hazard.get('risk_score') or 0.0),
+        } for hazard in hazards]
+        fingerprint = hashlib.sha1(json.dumps([key, rows], sort_keys=True).encode('utf-8')).hexdigest()
+        if key in self._synced and self._synced[key][0] == fingerprint:
+            return self._synced[key][1]
+
+        try:
+            with self._get_engine().begin() as conn:
+                conn.execute(
+                    text("DELETE FROM hazard_zones WHERE hazard_type IN :types")
+                    .bindparams(bindparam('types', expanding=True)),
+                    {'types': list(key)},
+                )
+                if rows:
+                    conn.execute(text("""
+                        INSERT INTO hazard_zones (source_key, name, hazard_type, risk_score, geometry)
+                        SELECT u.source_key, u.name, u.hazard_type, u.risk_score,
+                               ST_Buffer(ST_SetSRID(ST_MakePoint(u.lon, u.lat), 4326)::geography, u.radius)::geometry
+                        FROM unnest(CAST(:keys AS text[]), CAST(:names AS text[]), CAST(:types AS text[]),
+                                    CAST(:scores AS float8[]), CAST(:lats AS float8[]), CAST(:lons AS float8[]),
+                                    CAST(:radii AS float8[]))
+                             AS u(source_key, name, hazard_type, risk_score, lat, lon, radius)
+                    """), {
+                        'keys': [row['source_key'] for row in rows],
+                        'names': [row['name'] for row in rows],
+                        'types': [row['hazard_type'] for row in rows],
+                        'scores': [row['risk_score'] for row in rows],
+                        'lats': [row['lat'] for row in rows],
+                        'lons': [row['lon'] for row in rows],
+                        'radii': [row['radius'] for row in rows],
+                    })
+        except Exception as e:
+            self._failed('sync_point_hazards', e)
+            return None
+
+        source_keys = [row['source_key'] for row in rows]
+        self._synced[key] = (fingerprint, source_keys)
+        self.stats['syncs'] += 1
+        logger.info(f"🗺️ Synced {len(source_keys)} {'/'.join(key)} hazards to hazard_zones")
+        return source_keys
+
+    def match_synced(self, rows: List[Dict], source_keys: Sequence[str],
+                     hazard_types: Sequence[str]) -> Optional[List[Tuple[Dict, int]]]:
+        """
+        Pair query rows with the position of their hazard in the list passed
+        to sync_point_hazards.
+
+        Returns:
+            (row, hazard position) pairs; None if a row belongs to a hazard
+            this process did not sync (another process replaced the rows).
+            The sync is then forgotten, so the next sync_point_hazards call
+            writes the rows again, and the caller should use its in-memory check.
+        """
+        positions = {source_key: i for i, source_key in enumerate(source_keys)}
+        matched = []
+        for row in rows:
+            position = positions.get(row.get('source_key'))
+            if position is None:
+                self._synced.pop(tuple(sorted(hazard_types)), None)
+                self.stats['stale_syncs'] += 1
+                logger.warning(f"⚠️ hazard_zones rows for {'/'.join(sorted(hazard_types))} were replaced "
+                               f"elsewhere, re-syncing and using in-memory checks meanwhile")
+                return None
+            matched.append((row, position))
+        return matched
+
+    def hazards_near_points(self, lats: Sequence[float], lons: Sequence[float], radius_m: float,
+                            hazard_types: Optional[Sequence[str]] = None) -> Optional[List[Dict]]:
+        """
+        Hazard zones within radius_m of any of the points, in one query.
+
+        Returns:
+            Rows with 'point_index', 'zone_id', 'source_key', 'name', 'hazard_type',
+            'risk_score', 'distance_m' (to the zone edge, 0 inside) and
+            'centroid_distance_m', ordered by point then distance;
+            None if PostGIS is unavailable
+        """
+        if not self.enabled():
+            return None
+        lats, lons = [float(v) for v in lats], [float(v) for v in lons]
+        if not lats:
+            return []
+        type_filter = "AND h.hazard_type = ANY(CAST(:types AS text[]))" if hazard_types else ""
+        statement = text(f"""
+            WITH {_POINTS_CTE}
+            SELECT p.point_index, h.id AS zone_id, h.source_key, h.name, h.hazard_type, h.risk_score,
+                   ST_Distance(h.geometry::geography, p.geog) AS distance_m,
+                   ST_Distance(ST_Centroid(h.geometry)::geography, p.geog) AS centroid_distance_m
+            FROM points p
+            JOIN hazard_zones h ON ST_DWithin(h.geometry::geography, p.geog, :radius)
+            WHERE TRUE {type_filter}
+            ORDER BY p.point_index, distance_m
+        """)
+        params = {'lats': lats, 'lons': lons, 'radius': float(radius_m)}
+        if hazard_types:
+            params['types'] = list(hazard_types)
+        try:
+            with self._get_engine().connect() as conn:
+                rows = [dict(row._mapping) for row in conn.execute(statement, params)]
+        except Exception as e:
+            self._failed('hazards_near_points', e)
+            return None
+        self.stats['queries'] += 1
+        self.stats['points'] += len(lats)
+        return rows
+
+    def route_leg_hazards(self, route_name: str, corridor_m: float,
+                          hazard_types: Optional[Sequence[str]] = None) -> Optional[List[Dict]]:
+        """
+        Hazard zones within corridor_m of each leg of a stored RTZ route
+        (base_routes/route_legs, see rtz_ingest).
+
+        Returns:
+            Rows with 'leg_index', 'zone_id', 'name', 'hazard_type' and
+            'distance_m', ordered by leg then distance; None if PostGIS is unavailable
+        """
+        if not self.enabled():
+            return None
+        type_filter = "AND h.hazard_type = ANY(CAST(:types AS text[]))" if hazard_types else ""
+        statement = text(f"""
+            SELECT l.leg_index, h.id AS zone_id, h.name, h.hazard_type,
+                   ST_Distance(h.geometry::geography, l.geometry::geography) AS distance_m
+            FROM base_routes r
+            JOIN route_legs l ON l.base_route_id = r.id
+            JOIN hazard_zones h ON ST_DWithin(h.geometry::geography, l.geometry::geography, :corridor)
+            WHERE r.name = :route_name {type_filter}
+            ORDER BY l.leg_index, distance_m
+        """)
+        params = {'route_name': route_name, 'corridor': float(corridor_m)}
+        if hazard_types:
+            params['types'] = list(hazard_types)
+        try:
+            with self._get_engine().connect() as conn:
+                rows = [dict(row._mapping) for row in conn.execute(statement, params)]
+        except Exception as e:
+            self._failed('route_leg_hazards', e)
+            return None
+        self.stats['queries'] += 1
+        return rows
+
+    def get_status(self) -> Dict:
+        return {
+            'mode': SPATIAL_QUERIES,
+            'postgis_available': self._available,
+            'synced_hazard_types': {'/'.join(key): len(keys) for key, (_, keys) in self._synced.items()},
+            **self.stats,
+        }
+
+
+def group_by_point(rows: List[Dict], n_points: int) -> List[List[Dict]]:
+    """Split hazards_near_points rows into one list per input point."""
+    grouped = [[] for _ in range(n_points)]
+    for row in rows:
+        grouped[row['point_index']].append(row)
+    return grouped
+
+
+# Global instance
+spatial_queries = SpatialQueries()
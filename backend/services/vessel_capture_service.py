@@ -70,6 +70,14 @@ class RealTimeVesselCaptureService:
         """Initialize all available data sources"""
         self.data_sources = []
         
+        # Shared vessel state store first: latest position from every adapter
+        try:
+            from backend.services.vessel_state_store import vessel_state_store
+            self.data_sources.append(('vessel_state_store', vessel_state_store))
+            logger.info("✅ Vessel state store source available")
+        except ImportError as e:
+            logger.warning(f"⚠️ Vessel state store not available: {e}")
+        
         # Try to initialize Kystverket AIS
         try:
             from backend.services.kystverket_ais_service import kystverket_ais_service
@@ -119,6 +127,7 @@ class RealTimeVesselCaptureService:
         """
         try:
             vessel_data = None
+            captured_from = None
             
             # Try each data source in order
             for source_name, source in self.data_sources:
@@ -139,6 +148,7 @@ class RealTimeVesselCaptureService:
                                 vessel_data = vessels[0]
                     
                     if vessel_data:
+                        captured_from = source_name
                         logger.info(f"✅ Captured vessel from {source_name}: {vessel_data.get('name', 'Unknown')}")
                         break
                         
@@ -152,11 +162,13 @@ class RealTimeVesselCaptureService:
             
             # Create capture object
             now = datetime.now(timezone.utc)
+            vessel_lat = float(vessel_data.get('lat', vessel_data.get('latitude', lat)))
+            vessel_lon = float(vessel_data.get('lon', vessel_data.get('longitude', lon)))
             capture = VesselCapture(
                 mmsi=vessel_data.get('mmsi', str(int(time.time()))),
                 name=vessel_data.get('name', 'Unknown Vessel'),
-                lat=float(vessel_data.get('lat', lat)),
-                lon=float(vessel_data.get('lon', lon)),
+                lat=vessel_lat,
+                lon=vessel_lon,
                 speed_knots=float(vessel_data.get('speed_knots', vessel_data.get('speed', 10.0))),
                 course=float(vessel_data.get('course', 0.0)),
                 heading=float(vessel_data.get('heading', vessel_data.get('course', 0.0))),
@@ -166,8 +178,8 @@ class RealTimeVesselCaptureService:
                 capture_start=now,
                 last_update=now,
                 position_history=[{
-                    'lat': float(vessel_data.get('lat', lat)),
-                    'lon': float(vessel_data.get('lon', lon)),
+                    'lat': vessel_lat,
+                    'lon': vessel_lon,
                     'timestamp': now.isoformat(),
                     'speed': float(vessel_data.get('speed_knots', 10.0))
                 }]
@@ -176,6 +188,8 @@ class RealTimeVesselCaptureService:
             # Store capture
             with self.capture_lock:
                 self.active_captures[capture.mmsi] = capture
+            if captured_from != 'vessel_state_store':
+                self._publish_position(capture)
             
             logger.info(f"🎯 Vessel captured: {capture.name} (MMSI: {capture.mmsi})")
             return capture
@@ -228,8 +242,8 @@ class RealTimeVesselCaptureService:
                         vessel_data = source.get_vessel_by_mmsi(mmsi)
                         if vessel_data:
                             # Update capture with new data
-                            capture.lat = float(vessel_data.get('lat', capture.lat))
-                            capture.lon = float(vessel_data.get('lon', capture.lon))
+                            capture.lat = float(vessel_data.get('lat', vessel_data.get('latitude', capture.lat)))
+                            capture.lon = float(vessel_data.get('lon', vessel_data.get('longitude', capture.lon)))
                             capture.speed_knots = float(vessel_data.get('speed_knots', vessel_data.get('speed', capture.speed_knots)))
                             capture.course = float(vessel_data.get('course', capture.course))
                             capture.heading = float(vessel_data.get('heading', vessel_data.get('course', capture.heading)))
@@ -249,6 +263,9 @@ class RealTimeVesselCaptureService:
                             if len(capture.position_history) > 1000:
                                 capture.position_history = capture.position_history[-1000:]
                             
+                            if source_name != 'vessel_state_store':
+                                self._publish_position(capture)
+
                             logger.debug(f"📡 Updated position for {capture.name} from {source_name}")
                             return capture
                             
@@ -259,6 +276,22 @@ class RealTimeVesselCaptureService:
             # If no update available, simulate small movement
             return self._simulate_movement(capture)
     
+    def _publish_position(self, capture: VesselCapture):
+        """Write a captured vessel's position to the shared vessel state store."""
+        # Simulated fallback positions must not show up as live vessels
+        if capture.data_source in ('empirical_fallback', 'simulated'):
+            return
+        try:
+            from backend.services.vessel_state_store import vessel_state_store
+            vessel_state_store.upsert(
+                capture.mmsi, capture.lat, capture.lon,
+                speed=capture.speed_knots, course=capture.course, heading=capture.heading,
+                timestamp=capture.timestamp, vessel_type=capture.vessel_type,
+                name=capture.name, data_source=capture.data_source
+            )
+        except Exception as e:
+            logger.debug(f"Could not publish capture {capture.mmsi}: {e}")
+    
     def _simulate_movement(self, capture: VesselCapture) -> VesselCapture:
         """Simulate vessel movement when no real data available"""
         # Convert course to radians
@@ -0,0 +1,329 @@
+# backend/services/vessel_feed.py
+"""
+Live vessel push feed.
+
+One publisher thread turns VesselStateStore changes into numbered delta
+frames once per tick. Every connected dashboard (Server-Sent Events on
+/maritime/api/vessels/stream) reads the same frames and only filters them to
+its bounding box, so the per-tick cost is one store sweep plus work
+proportional to the vessels that changed, not to fleet size times open
+dashboards.
+
+Frames carry kinematics only. Name and type are sent when a client first
+sees a vessel and when they change. Vessels that leave a client's bounding
+box are sent as removed. A client reconnecting with its last sequence number
+(SSE Last-Event-ID) is sent the frames it missed, or a fresh snapshot when it
+is further behind than the frame history.
+
+Encodings:
+    json   - 'rows' of FEED_FIELDS: [mmsi, lat, lon, sog, cog, heading, epoch]
+    binary - the same rows packed little-endian as BINARY_ROW (22 bytes per
+             vessel), base64-encoded in 'data'; vessels whose MMSI is not
+             numeric stay in 'rows'
+"""
+
+import base64
+import json
+import logging
+import os
+import threading
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# How often store changes are published as a frame
+FEED_TICK_SECONDS = float(os.getenv('VESSEL_FEED_TICK_SECONDS', '1.0'))
+
+# Frames kept for reconnecting clients (at 1 s ticks: two minutes)
+FEED_HISTORY_FRAMES = int(os.getenv('VESSEL_FEED_HISTORY_FRAMES', '120'))
+
+# Comment line sent on idle connections so proxies keep them open
+FEED_KEEPALIVE_SECONDS = 15.0
+
+FEED_FIELDS = ['mmsi', 'lat', 'lon', 'sog', 'cog', 'heading', 't']
+
+# lat/lon in 1e-6 degrees, sog in 0.1 kn, cog/heading in 0.1 degree,
+# t in epoch seconds; 0xFFFF marks an unknown sog/cog/heading
+BINARY_ROW = np.dtype([('mmsi', '<u4'), ('lat', '<i4'), ('lon', '<i4'), ('sog', '<u2'),
+                       ('cog', '<u2'), ('heading', '<u2'), ('t', '<u4')])
+BINARY_FORMAT = 'mmsi:u4,lat:i4/1e6,lon:i4/1e6,sog:u2/10,cog:u2/10,heading:u2/10,t:u4;le;0xffff=unknown'
+
+
+def parse_bbox(value: Optional[str]) -> Optional[Tuple[float, float, float, float]]:
+    """
+    Parse 'min_lon,min_lat,max_lon,max_lat' (the BarentsWatch and Leaflet
+    toBBoxString order) into (min_lat, min_lon, max_lat, max_lon).
+    """
+    if not value:
+        return None
+    parts = [float(part) for part in value.split(',')]
+    if len(parts) != 4:
+        raise ValueError("bbox must be min_lon,min_lat,max_lon,max_lat")
+    min_lon, min_lat, max_lon, max_lat = parts
+    if min_lat > max_lat or min_lon > max_lon:
+        raise ValueError("bbox minimum exceeds maximum")
+    return min_lat, min_lon, max_lat, max_lon
+
+
+def format_sse(event: str, sequence: int, payload: Dict) -> str:
+    """One Server-Sent Event carrying a compact JSON payload."""
+    data = json.dumps(payload, separators=(',', ':'))
+    return f"id: {sequence}\nevent: {event}\ndata: {data}\n\n"
+
+
+def _nullable(values: np.ndarray, digits: int) -> np.ndarray:
+    rounded = np.round(values, digits).astype(object)
+    rounded[np.isnan(values)] = None
+    return rounded
+
+
+def _scaled_u2(values: np.ndarray, scale: float) -> np.ndarray:
+    scaled = np.round(np.nan_to_num(values, nan=-1.0) * scale)
+    return np.where((scaled < 0) | (scaled >= 0xFFFF), 0xFFFF, scaled).astype(np.uint16)
+
+
+class FeedFrame:
+    """Store changes between two sequence numbers."""
+
+    __slots__ = ('previous', 'sequence', 'reset', 'mmsi', 'lat', 'lon', 'speed', 'course',
+                 'heading', 'timestamp', 'static', 'removed')
+
+    def __init__(self, previous: int, changes: Dict):
+        self.previous = previous
+        self.sequence = changes['sequence']
+        self.reset = changes['reset']
+        self.mmsi = changes['mmsi']
+        self.lat = changes['lat']
+        self.lon = changes['lon']
+        self.speed = changes['speed']
+        self.course = changes['course']
+        self.heading = changes['heading']
+        self.timestamp = changes['timestamp']
+        self.static = changes['static']
+        self.removed = changes['removed']
+
+
+class FeedSubscription:
+    """One client: bounding box, encoding and, with a bbox, the vessels it holds."""
+
+    def __init__(self, bbox: Optional[Tuple[float, float, float, float]] = None, binary: bool = False,
+                 sequence: int = 0):
+        self.bbox = bbox
+        self.binary = binary
+        self.sequence = sequence
+        self.known = set()
+
+
+class VesselFeed:
+    """Delta frames over the vessel state store, fanned out to subscribers."""
+
+    def __init__(self, store=None, tick_seconds: float = FEED_TICK_SECONDS,
+                 history_frames: int = FEED_HISTORY_FRAMES):
+        self._store = store
+        self.tick_seconds = tick_seconds
+        self._frames = deque(maxlen=history_frames)
+        self._static: Dict[str, Tuple] = {}  # mmsi -> (name, type) of every published vessel
+        self.sequence = 0  # Store sequence covered by the published frames
+        self._condition = threading.Condition()
+        self._publish_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self.clients = 0
+        self.stats = {'frames': 0, 'snapshots': 0, 'events': 0, 'rows_sent': 0, 'publish_errors': 0}
+
+    def _get_store(self):
+        if self._store is None:
+            from backend.services.vessel_state_store import vessel_state_store
+            self._store = vessel_state_store
+        return self._store
+
+    # ------------------------------------------------------------------
+    # Publisher
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start the publisher thread once."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        # The first frame is a full reset; publish it before any client subscribes
+        self.publish()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._publish_loop, daemon=True, name='vessel-feed')
+        self._thread.start()
+        logger.info("📡 Vessel feed publisher started")
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    def _publish_loop(self):
+        while not self._stop_event.wait(self.tick_seconds):
+            try:
+                self.publish()
+            except Exception as e:
+                self.stats['publish_errors'] += 1
+                logger.error(f"❌ Vessel feed publish failed: {e}")
+
+    def publish(self) -> Optional[FeedFrame]:
+        """Turn store changes since the last frame into a new frame, if there are any."""
+        with self._publish_lock:
+            changes = self._get_store().changes_since(self.sequence)
+            if changes['sequence'] == self.sequence:
+                return None
+            frame = FeedFrame(self.sequence, changes)
+            with self._condition:
+                if frame.reset:
+                    self._static.clear()
+                self._static.update(frame.static)
+                for mmsi in frame.removed:
+                    self._static.pop(mmsi, None)
+                self._frames.append(frame)
+                self.sequence = frame.sequence
+                self._condition.notify_all()
+            self.stats['frames'] += 1
+            return frame
+
+    # ------------------------------------------------------------------
+    # Subscribers
+    # ------------------------------------------------------------------
+
+    def subscribe(self, bbox: Optional[Tuple[float, float, float, float]] = None, binary: bool = False,
+                  last_sequence: int = 0) -> FeedSubscription:
+        """
+        New subscription. Only clients without a bbox resume from
+        last_sequence; a bbox client's held vessels are unknown after a
+        reconnect, so it starts from a snapshot.
+        """
+        subscription = FeedSubscription(bbox, binary)
+        if bbox is None and 0 < last_sequence <= self.sequence:
+            subscription.sequence = last_sequence
+        return subscription
+
+    def pending(self, subscription: FeedSubscription) -> List[Tuple[str, int, Dict]]:
+        """
+        Events the subscription has not received yet, as (event, sequence,
+        payload); a 'snapshot' first when it is new or too far behind.
+        """
+        with self._condition:
+            frames = [frame for frame in self._frames if frame.sequence > subscription.sequence]
+            oldest = self._frames[0].previous if self._frames else 0
+
+        events = []
+        if subscription.sequence == 0 or subscription.sequence < oldest:
+            snapshot = FeedFrame(0, self._get_store().changes_since(0))
+            events.append(self._event(snapshot, subscription))
+            self.stats['snapshots'] += 1
+            frames = [frame for frame in frames if frame.sequence > snapshot.sequence]
+        for frame in frames:
+            events.append(self._event(frame, subscription))
+        self.stats['events'] += len(events)
+        return events
+
+    def _event(self, frame: FeedFrame, subscription: FeedSubscription) -> Tuple[str, int, Dict]:
+        """Encode one frame for one subscription and advance it."""
+        mmsi = frame.mmsi
+        if subscription.bbox is None:
+            rows = np.arange(len(mmsi))
+            static = frame.static
+            removed = list(frame.removed)
+        else:
+            min_lat, min_lon, max_lat, max_lon = subscription.bbox
+            inside = ((frame.lat >= min_lat) & (frame.lat <= max_lat)
+                      & (frame.lon >= min_lon) & (frame.lon <= max_lon))
+            rows = np.flatnonzero(inside)
+            known = set() if frame.reset else subscription.known
+            removed = [m for m in frame.removed if m in known]
+            removed += [m for m in mmsi[~inside].tolist() if m in known]
+            static = {}
+            for m in mmsi[rows].tolist():
+                info = frame.static.get(m)
+                if info is None and m not in known:
+                    info = self._static.get(m)
+                if info is not None:
+                    static[m] = info
+            known.difference_update(removed)
+            known.update(mmsi[rows].tolist())
+            subscription.known = known
+
+        payload = {'seq': frame.sequence}
+        if frame.reset:
+            payload['reset'] = True
+            payload['fields'] = FEED_FIELDS
+            if subscription.binary:
+                payload['format'] = BINARY_FORMAT
+        self.stats['rows_sent'] += len(rows)
+        if subscription.binary:
+            numeric = np.array([m.isdigit() and len(m) <= 9 for m in mmsi[rows].tolist()], dtype=bool)
+            payload['data'] = self._pack_rows(frame, rows[numeric])
+            rows = rows[~numeric]
+        payload['rows'] = self._json_rows(frame, rows)
+        payload['static'] = {m: list(info) for m, info in static.items()}
+        payload['removed'] = removed
+
+        subscription.sequence = frame.sequence
+        return ('snapshot' if frame.reset else 'delta'), frame.sequence, payload
+
+    @staticmethod
+    def _json_rows(frame: FeedFrame, rows: np.ndarray) -> List:
+        if not len(rows):
+            return []
+        return [list(row) for row in zip(
+            frame.mmsi[rows].tolist(),
+            np.round(frame.lat[rows], 5).tolist(),
+            np.round(frame.lon[rows], 5).tolist(),
+            _nullable(frame.speed[rows], 1).tolist(),
+            _nullable(frame.course[rows], 1).tolist(),
+            _nullable(frame.heading[rows], 1).tolist(),
+            frame.timestamp[rows].astype(np.int64).tolist(),
+        )]
+
+    @staticmethod
+    def _pack_rows(frame: FeedFrame, rows: np.ndarray) -> str:
+        packed = np.zeros(len(rows), dtype=BINARY_ROW)
+        packed['mmsi'] = frame.mmsi[rows].astype(np.int64)
+        packed['lat'] = np.round(frame.lat[rows] * 1e6)
+        packed['lon'] = np.round(frame.lon[rows] * 1e6)
+        packed['sog'] = _scaled_u2(frame.speed[rows], 10)
+        packed['cog'] = _scaled_u2(frame.course[rows], 10)
+        packed['heading'] = _scaled_u2(frame.heading[rows], 10)
+        packed['t'] = frame.timestamp[rows].astype(np.int64)
+        return base64.b64encode(packed.tobytes()).decode('ascii')
+
+    def stream(self, subscription: FeedSubscription) -> Iterator[str]:
+        """SSE text for one client, until the client disconnects."""
+        self.clients += 1
+        try:
+            while True:
+                events = self.pending(subscription)
+                for event, sequence, payload in events:
+                    yield format_sse(event, sequence, payload)
+                if events:
+                    continue
+                with self._condition:
+                    published = self._condition.wait_for(
+                        lambda: self.sequence > subscription.sequence, timeout=FEED_KEEPALIVE_SECONDS)
+                if not published:
+                    yield ": keepalive\n\n"
+        finally:
+            self.clients -= 1
+
+    def get_status(self) -> Dict:
+        with self._condition:
+            frames = len(self._frames)
+        return {
+            'sequence': self.sequence,
+            'clients': self.clients,
+            'frames_retained': frames,
+            'tick_seconds': self.tick_seconds,
+            'publisher_running': self._thread is not None and self._thread.is_alive(),
+            **self.stats,
+        }
+
+
+# Global feed over the shared vessel state store
+vessel_feed = VesselFeed()
@@ -0,0 +1,627 @@
+"""
+Shared live vessel state store.
+
+One in-memory table of the latest known state per MMSI, written by every AIS
+adapter (Kystverket stream, BarentsWatch, Kystdatahuset via the empirical
+service, vessel capture) and read by the vessel APIs.
+
+Positions and kinematics live in preallocated NumPy columns indexed by a
+slot number, so an upsert is a dict lookup plus a few array writes and a
+fleet-wide sweep (expiry, distance filter, risk screening) is one vectorised
+pass. Names and other rarely-changing fields are kept in a per-slot dict and
+only copied when a vessel is actually returned to a caller.
+
+A GeoGridIndex over slot positions is updated on every upsert, so radius,
+bounding-box and nearest-vessel queries only touch the grid cells around
+the query point instead of the whole fleet.
+
+Vessels expire ttl_seconds after the store last received a report for
+them, not after the report's own message time, so a delayed batch of
+older reports is still served.
+
+When a track store is attached (AIS_TRACK_STORE_ENABLED=true), every new
+position report (a newer timestamp than the stored one) is also appended
+to the on-disk AIS track history.
+
+Every change bumps a store-wide sequence number that is also recorded on
+the changed slot, and removals are logged with theirs, so delta consumers
+(the live vessel feed) can ask for just the changes after a sequence
+number instead of re-reading the fleet.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from backend.services.ais_track_store import AISTrackStore, ais_track_store
+from backend.utils.spatial_index import GeoGridIndex, haversine_km_np
+
+logger = logging.getLogger(__name__)
+
+# Key aliases used by the different AIS sources for the same quantity
+_LAT_KEYS = ('latitude', 'lat', 'Latitude')
+_LON_KEYS = ('longitude', 'lon', 'Longitude')
+_SPEED_KEYS = ('speed', 'speed_knots', 'speedOverGround', 'sog', 'SOG')
+_COURSE_KEYS = ('course', 'courseOverGround', 'cog', 'COG')
+_HEADING_KEYS = ('heading', 'trueHeading')
+_TYPE_KEYS = ('type', 'vessel_type', 'shipType', 'ship_type')
+_TIME_KEYS = ('msgtime', 'timestamp', 'time')
+
+# Fields stored in columns rather than in the per-vessel attribute dict
+_COLUMN_KEYS = frozenset(
+    ('mmsi', 'distance_km') + _LAT_KEYS + _LON_KEYS + _SPEED_KEYS + _COURSE_KEYS
+    + _HEADING_KEYS + _TYPE_KEYS + _TIME_KEYS
+)
+# Fields derived per query (relative to a searched city); never stored
+_DERIVED_KEYS = frozenset(('nearest_city', 'city_region', 'city_key', 'distance_to_city_km'))
+
+
+def _first(record: Dict, keys: Iterable[str]) -> Any:
+    for key in keys:
+        value = record.get(key)
+        if value is not None and value != '':
+            return value
+    return None
+
+
+def _to_epoch(value: Any) -> Optional[float]:
+    """Convert datetime / ISO string / epoch seconds to epoch seconds."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+
+def _float_or_nan(value: Any) -> float:
+    try:
+        return float(value) if value is not None else np.nan
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class VesselStateStore:
+    """
+    Latest state per MMSI with TTL expiry and bounded capacity.
+
+    Thread-safe: adapters write from background threads while Flask request
+    handlers read.
+    """
+
+    INITIAL_CAPACITY = 1024
+    SWEEP_INTERVAL_SECONDS = 5.0
+    # ~11 km north-south: port searches (20-30 km) touch a handful of cells
+    GRID_CELL_DEG = 0.1
+    # Removals remembered for changes_since; older consumers get a reset
+    REMOVAL_LOG_SIZE = 10000
+
+    def __init__(self, ttl_seconds: float = 600.0, max_vessels: int = 100000,
+                 track_store: Optional[AISTrackStore] = None):
+        """
+        Args:
+            ttl_seconds: Vessels not received for this long are evicted
+            max_vessels: Hard cap on stored vessels; when full, the stalest
+                vessel is evicted to make room
+            track_store: Optional AISTrackStore receiving every new position
+        """
+        self.ttl_seconds = float(ttl_seconds)
+        self.max_vessels = int(max_vessels)
+        self.track_store = track_store
+
+        self._lock = threading.RLock()
+        self._slot_of: Dict[str, int] = {}
+        self._free_slots: List[int] = []
+        self._size = 0  # High-water mark of used slots
+        self._last_sweep = 0.0
+        self._grid = GeoGridIndex(cell_size_deg=self.GRID_CELL_DEG)
+
+        # Vessel type strings are interned to small integer codes
+        self._type_names: List[str] = ['Unknown']
+        self._type_codes: Dict[str, int] = {'Unknown': 0}
+
+        # Change tracking for changes_since
+        self.sequence = 0
+        self._removals = deque(maxlen=self.REMOVAL_LOG_SIZE)  # (sequence, mmsi)
+        self._removal_floor = 0  # Removals at or below this sequence may be forgotten
+
+        self._allocate(min(self.INITIAL_CAPACITY, self.max_vessels))
+        self.stats = {'upserts': 0, 'inserts': 0, 'out_of_order': 0, 'expired': 0, 'evicted_full': 0}
+
+    def _allocate(self, capacity: int):
+        """Create or grow the column arrays to the given capacity."""
+        old = getattr(self, '_capacity', 0)
+
+        def grow(name, dtype, fill):
+            column = np.full(capacity, fill, dtype=dtype)
+            if old:
+                column[:old] = getattr(self, name)
+            setattr(self, name, column)
+
+        grow('_lat', np.float64, np.nan)
+        grow('_lon', np.float64, np.nan)
+        grow('_speed', np.float32, np.nan)
+        grow('_course', np.float32, np.nan)
+        grow('_heading', np.float32, np.nan)
+        grow('_timestamp', np.float64, -np.inf)
+        grow('_received', np.float64, -np.inf)  # Local time of the last report (TTL)
+        grow('_type', np.int16, 0)
+        grow('_alive', np.bool_, False)
+        grow('_seq', np.int64, 0)         # Sequence of the last change
+        grow('_static_seq', np.int64, 0)  # Sequence of the last name/type change
+        self._mmsi: List[Optional[str]] = getattr(self, '_mmsi', []) + [None] * (capacity - old)
+        self._attrs: List[Optional[Dict]] = getattr(self, '_attrs', []) + [None] * (capacity - old)
+        self._capacity = capacity
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def upsert(self, mmsi: Any, latitude: float, longitude: float,
+               speed: Optional[float] = None, course: Optional[float] = None,
+               heading: Optional[float] = None, timestamp: Any = None,
+               vessel_type: Optional[str] = None, **attributes) -> bool:
+        """
+        Insert or update one vessel.
+
+        Args:
+            mmsi: Vessel MMSI (stored as string)
+            latitude, longitude: Position in decimal degrees
+            speed, course, heading: Knots / degrees; None when unknown
+            timestamp: Position time (datetime, ISO string or epoch seconds),
+                defaults to now. A report older than the stored one only
+                merges vessel_type and attributes
+            vessel_type: Vessel type text
+            **attributes: Extra fields (name, data_source, destination, ...)
+                merged into the stored record
+
+        Returns:
+            True if stored, False if the record has no usable MMSI/position
+        """
+        latitude = _float_or_nan(latitude)
+        longitude = _float_or_nan(longitude)
+        if not mmsi or not (-90.0 <= latitude <= 90.0 and -180.0 <= longitude <= 180.0):
+            return False
+
+        mmsi = str(mmsi)
+        epoch = _to_epoch(timestamp)
+        if epoch is None:
+            epoch = time.time()
+
+        with self._lock:
+            slot = self._slot_of.get(mmsi)
+            static_changed = slot is None
+            received = time.time()
+            if slot is None:
+                slot = self._claim_slot()
+                self._slot_of[mmsi] = slot
+                self._mmsi[slot] = mmsi
+                self._attrs[slot] = {}
+                self._alive[slot] = True
+                self.stats['inserts'] += 1
+            # Several sources report the same position; only a newer one goes into the track history.
+            # A report older than the stored one (slower source, late delivery) keeps the stored
+            # position and only contributes type and attributes.
+            new_report = epoch > self._timestamp[slot]
+            older_report = epoch < self._timestamp[slot]
+
+            if not older_report:
+                self._lat[slot] = latitude
+                self._lon[slot] = longitude
+                self._grid.insert(slot, latitude, longitude)
+                self._speed[slot] = _float_or_nan(speed)
+                self._course[slot] = _float_or_nan(course)
+                self._heading[slot] = _float_or_nan(heading)
+                self._timestamp[slot] = epoch
+            self._received[slot] = received
+            if vessel_type:
+                static_changed |= self._set_type(slot, vessel_type)
+            if attributes:
+                static_changed |= self._merge_attributes(slot, attributes)
+            if older_report:
+                self.stats['out_of_order'] += 1
+            if static_changed or not older_report:
+                self._mark_changed(slot, static_changed)
+            self.stats['upserts'] += 1
+
+        if new_report and self.track_store is not None:
+            self.track_store.append(mmsi, latitude, longitude, sog=_float_or_nan(speed),
+                                    cog=_float_or_nan(course), timestamp=epoch)
+        return True
+
+    def upsert_vessel(self, vessel: Dict, data_source: Optional[str] = None) -> bool:
+        """
+        Insert or update from a vessel dict in any of the adapters' formats
+        (latitude/lat, speed/speedOverGround/SOG, type/shipType, ...).
+        """
+        attributes = {key: value for key, value in vessel.items() if key not in _COLUMN_KEYS}
+        if data_source and not attributes.get('data_source'):
+            attributes['data_source'] = data_source
+        return self.upsert(
+            vessel.get('mmsi'),
+            _first(vessel, _LAT_KEYS),
+            _first(vessel, _LON_KEYS),
+            speed=_first(vessel, _SPEED_KEYS),
+            course=_first(vessel, _COURSE_KEYS),
+            heading=_first(vessel, _HEADING_KEYS),
+            timestamp=_first(vessel, _TIME_KEYS),
+            vessel_type=_first(vessel, _TYPE_KEYS),
+            **attributes
+        )
+
+    def upsert_many(self, vessels: Iterable[Dict], data_source: Optional[str] = None) -> int:
+        """Upsert a batch of vessel dicts. Returns the number stored."""
+        with self._lock:
+            return sum(1 for vessel in vessels if self.upsert_vessel(vessel, data_source))
+
+    def update_attributes(self, mmsi: Any, **attributes) -> bool:
+        """Merge static fields (name, destination, ...) into a stored vessel."""
+        with self._lock:
+            slot = self._slot_of.get(str(mmsi))
+            if slot is None:
+                return False
+            vessel_type = attributes.pop('type', None)
+            static_changed = self._set_type(slot, vessel_type) if vessel_type else False
+            static_changed |= self._merge_attributes(slot, attributes)
+            self._mark_changed(slot, static_changed)
+            return True
+
+    def _set_type(self, slot: int, vessel_type: Any) -> bool:
+        """Store a vessel type. Returns True if it changed. Caller holds the lock."""
+        code = self._type_code(str(vessel_type))
+        changed = code != self._type[slot]
+        self._type[slot] = code
+        return changed
+
+    def _merge_attributes(self, slot: int, attributes: Dict) -> bool:
+        """Merge non-None, non-derived attributes. Returns True if the name changed. Caller holds the lock."""
+        attrs = self._attrs[slot]
+        name = attrs.get('name')
+        attrs.update((key, value) for key, value in attributes.items()
+                     if value is not None and key not in _DERIVED_KEYS)
+        return attrs.get('name') != name
+
+    def _mark_changed(self, slot: int, static_changed: bool):
+        self.sequence += 1
+        self._seq[slot] = self.sequence
+        if static_changed:
+            self._static_seq[slot] = self.sequence
+
+    def remove(self, mmsi: Any) -> bool:
+        with self._lock:
+            slot = self._slot_of.pop(str(mmsi), None)
+            if slot is None:
+                return False
+            self._release_slot(slot)
+            return True
+
+    def clear(self):
+        with self._lock:
+            for slot in self._slot_of.values():
+                self._release_slot(slot)
+            self._slot_of.clear()
+            self._grid.clear()
+
+    def evict_expired(self, now: Optional[float] = None) -> int:
+        """Drop every vessel older than the TTL. Returns the number removed."""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._last_sweep = now
+            used = slice(0, self._size)
+            expired = np.flatnonzero(
+                self._alive[used] & (self._received[used] < now - self.ttl_seconds)
+            )
+            for slot in expired.tolist():
+                del self._slot_of[self._mmsi[slot]]
+                self._release_slot(slot)
+            self.stats['expired'] += len(expired)
+        if len(expired):
+            logger.debug(f"Evicted {len(expired)} expired vessels from state store")
+        return len(expired)
+
+    def _maybe_evict(self):
+        if time.time() - self._last_sweep > self.SWEEP_INTERVAL_SECONDS:
+            self.evict_expired()
+
+    def _claim_slot(self) -> int:
+        """Return a free slot, growing or evicting as needed. Caller holds the lock."""
+        if self._free_slots:
+            return self._free_slots.pop()
+        if self._size < self._capacity:
+            self._size += 1
+            return self._size - 1
+        if self._capacity < self.max_vessels:
+            self._allocate(min(self._capacity * 2, self.max_vessels))
+            self._size += 1
+            return self._size - 1
+
+        # Full: expire stale vessels first, otherwise drop the stalest one
+        if self.evict_expired():
+            return self._free_slots.pop()
+        stalest = int(np.argmin(np.where(self._alive, self._received, np.inf)))
+        del self._slot_of[self._mmsi[stalest]]
+        self._release_slot(stalest)
+        self.stats['evicted_full'] += 1
+        return self._free_slots.pop()
+
+    def _release_slot(self, slot: int):
+        self.sequence += 1
+        if len(self._removals) == self._removals.maxlen:
+            self._removal_floor = self._removals[0][0]
+        self._removals.append((self.sequence, self._mmsi[slot]))
+        self._seq[slot] = 0
+        self._static_seq[slot] = 0
+        self._grid.remove(slot)
+        self._alive[slot] = False
+        self._lat[slot] = np.nan
+        self._lon[slot] = np.nan
+        self._timestamp[slot] = -np.inf
+        self._received[slot] = -np.inf
+        self._mmsi[slot] = None
+        self._attrs[slot] = None
+        self._free_slots.append(slot)
+
+    def _type_code(self, vessel_type: str) -> int:
+        code = self._type_codes.get(vessel_type)
+        if code is None:
+            code = len(self._type_names)
+            self._type_names.append(vessel_type)
+            self._type_codes[vessel_type] = code
+        return code
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def __contains__(self, mmsi: Any) -> bool:
+        return self.get(mmsi) is not None
+
+    def _fresh_slots(self, now: Optional[float] = None) -> np.ndarray:
+        """Slots holding a vessel received within the TTL. Caller holds the lock."""
+        now = time.time() if now is None else now
+        used = slice(0, self._size)
+        return np.flatnonzero(
+            self._alive[used] & (self._received[used] >= now - self.ttl_seconds)
+        )
+
+    def _record(self, slot: int) -> Dict:
+        """Materialise one slot as a vessel dict. Caller holds the lock."""
+        speed = float(self._speed[slot])
+        course = float(self._course[slot])
+        heading = float(self._heading[slot])
+        speed = 0.0 if np.isnan(speed) else speed
+        course = 0.0 if np.isnan(course) else course
+
+        record = dict(self._attrs[slot])
+        record.update({
+            'mmsi': self._mmsi[slot],
+            'latitude': float(self._lat[slot]),
+            'longitude': float(self._lon[slot]),
+            'speed': speed,
+            'course': course,
+            'heading': course if np.isnan(heading) else heading,
+            'type': self._type_names[self._type[slot]],
+            'timestamp': datetime.fromtimestamp(self._timestamp[slot], timezone.utc).isoformat(),
+        })
+        record.setdefault('name', f"MMSI {record['mmsi']}")
+        return record
+
+    def get(self, mmsi: Any) -> Optional[Dict]:
+        """Latest state for one vessel, or None if unknown or expired."""
+        with self._lock:
+            slot = self._slot_of.get(str(mmsi))
+            if slot is None or self._received[slot] < time.time() - self.ttl_seconds:
+                return None
+            return self._record(slot)
+
+    def get_vessels(self, data_source: Optional[str] = None, limit: Optional[int] = None) -> List[Dict]:
+        """All live vessels, most recently updated first."""
+        with self._lock:
+            self._maybe_evict()
+            slots = self._fresh_slots()
+            slots = slots[np.argsort(-self._timestamp[slots], kind='stable')]
+            records = []
+            for slot in slots.tolist():
+                if data_source and self._attrs[slot].get('data_source') != data_source:
+                    continue
+                records.append(self._record(slot))
+                if limit and len(records) >= limit:
+                    break
+            return records
+
+    def _select(self, slots: np.ndarray, data_source: Optional[str]) -> np.ndarray:
+        """Keep slots that are fresh and match the source. Caller holds the lock."""
+        if not len(slots):
+            return slots
+        slots = slots[self._received[slots] >= time.time() - self.ttl_seconds]
+        if data_source:
+            slots = np.array([slot for slot in slots.tolist()
+                              if self._attrs[slot].get('data_source') == data_source], dtype=np.intp)
+        return slots
+
+    def _records_with_distance(self, slots, distances) -> List[Dict]:
+        records = []
+        for slot, distance in zip(slots, distances):
+            record = self._record(slot)
+            record['distance_km'] = round(distance, 2)
+            records.append(record)
+        return records
+
+    def vessels_near(self, latitude: float, longitude: float, radius_km: float,
+                     limit: Optional[int] = None, data_source: Optional[str] = None) -> List[Dict]:
+        """
+        Live vessels within radius_km of a point, nearest first.
+
+        Only vessels in the grid cells covering the circle are considered;
+        their distances are computed in one vectorised pass and dicts are
+        only built for the vessels that are returned.
+        """
+        with self._lock:
+            self._maybe_evict()
+            slots = np.array(self._grid.candidates(latitude, longitude, radius_km), dtype=np.intp)
+            slots = self._select(np.sort(slots), data_source)
+            if not len(slots):
+                return []
+            distances = haversine_km_np(latitude, longitude, self._lat[slots], self._lon[slots])
+            inside = distances <= radius_km
+            slots, distances = slots[inside], distances[inside]
+            order = np.argsort(distances, kind='stable')
+            if limit:
+                order = order[:limit]
+            return self._records_with_distance(slots[order].tolist(), distances[order].tolist())
+
+    def nearest_vessels(self, latitude: float, longitude: float, k: int = 10,
+                        max_radius_km: Optional[float] = None) -> List[Dict]:
+        """
+        The k live vessels closest to a point, nearest first.
+
+        Searches the grid outward ring by ring, so the cost depends on local
+        vessel density rather than fleet size.
+        """
+        if k <= 0:
+            return []
+        with self._lock:
+            self._maybe_evict()
+            cutoff = time.time() - self.ttl_seconds
+            want = k
+            while True:
+                found = self._grid.nearest(latitude, longitude, k=want, max_radius_km=max_radius_km)
+                fresh = [(slot, distance) for slot, distance in found
+                         if self._received[slot] >= cutoff]
+                # Expired vessels not yet swept can crowd out live ones
+                if len(fresh) >= k or len(found) < want:
+                    break
+                want *= 2
+            fresh.sort(key=lambda item: (item[1], item[0]))
+            fresh = fresh[:k]
+            return self._records_with_distance([slot for slot, _ in fresh],
+                                               [distance for _, distance in fresh])
+
+    def vessels_in_bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+                        limit: Optional[int] = None, data_source: Optional[str] = None) -> List[Dict]:
+        """Live vessels inside a lat/lon bounding box, most recently updated first."""
+        with self._lock:
+            self._maybe_evict()
+            slots = np.array(self._grid.query_bbox(min_lat, min_lon, max_lat, max_lon), dtype=np.intp)
+            slots = self._select(np.sort(slots), data_source)
+            slots = slots[np.argsort(-self._timestamp[slots], kind='stable')]
+            if limit:
+                slots = slots[:limit]
+            return [self._record(slot) for slot in slots.tolist()]
+
+    def changes_since(self, sequence: int) -> Dict[str, Any]:
+        """
+        Live vessels changed and MMSIs removed after a change sequence number.
+
+        Returns:
+            Dict with the current 'sequence'; 'reset', True when the change
+            history does not reach back to `sequence` (or it is 0) and the
+            result is the whole live fleet; the changed vessels as columns
+            ('mmsi', 'lat', 'lon', 'speed', 'course', 'heading', 'timestamp',
+            NaN when unknown); 'static', {mmsi: (name, type)} for changed
+            vessels whose name or type changed (all of them on reset); and
+            'removed', MMSIs removed since (empty on reset)
+        """
+        with self._lock:
+            self._maybe_evict()
+            reset = sequence <= 0 or sequence < self._removal_floor or sequence > self.sequence
+            slots = self._fresh_slots()
+            if not reset:
+                slots = slots[self._seq[slots] > sequence]
+            static_slots = slots if reset else slots[self._static_seq[slots] > sequence]
+
+            removed = []
+            if not reset:
+                for removal_sequence, mmsi in reversed(self._removals):
+                    if removal_sequence <= sequence:
+                        break
+                    removed.append(mmsi)
+                removed.reverse()
+
+            return {
+                'sequence': self.sequence,
+                'reset': reset,
+                'mmsi': np.array([self._mmsi[slot] for slot in slots.tolist()], dtype=object),
+                'lat': self._lat[slots].copy(),
+                'lon': self._lon[slots].copy(),
+                'speed': self._speed[slots].astype(float),
+                'course': self._course[slots].astype(float),
+                'heading': self._heading[slots].astype(float),
+                'timestamp': self._timestamp[slots].copy(),
+                'static': {self._mmsi[slot]: (self._attrs[slot].get('name'), self._type_names[self._type[slot]])
+                           for slot in static_slots.tolist()},
+                'removed': removed,
+            }
+
+    def fleet_columns(self) -> Dict[str, np.ndarray]:
+        """
+        Snapshot of all live vessels in the columnar layout used by
+        RiskEngine.assess_fleet.
+        """
+        with self._lock:
+            self._maybe_evict()
+            slots = self._fresh_slots()
+            attrs = [self._attrs[slot] for slot in slots.tolist()]
+            type_names = np.array(self._type_names, dtype=object)
+            return {
+                'mmsi': np.array([self._mmsi[slot] for slot in slots.tolist()], dtype=object),
+                'name': np.array([attr.get('name') for attr in attrs], dtype=object),
+                'lat': self._lat[slots].copy(),
+                'lon': self._lon[slots].copy(),
+                'speed': np.nan_to_num(self._speed[slots].astype(float)),
+                'course': self._course[slots].astype(float),
+                'heading': self._heading[slots].astype(float),
+                'type': type_names[self._type[slots]],
+                'draught': np.array([attr.get('draught') or 5.0 for attr in attrs], dtype=float),
+                'length': np.array([attr.get('length') or 100.0 for attr in attrs], dtype=float),
+                'timestamp': self._timestamp[slots].copy(),
+            }
+
+    # Duck-typed data source interface used by RealTimeVesselCaptureService
+    def get_vessel_by_mmsi(self, mmsi: Any) -> Optional[Dict]:
+        return self.get(mmsi)
+
+    def get_vessels_near_position(self, lat: float, lon: float, radius_km: float = 20) -> List[Dict]:
+        return self.vessels_near(lat, lon, radius_km)
+
+    def get_store_status(self) -> Dict:
+        """Size, capacity and memory footprint of the store."""
+        with self._lock:
+            column_bytes = sum(
+                getattr(self, name).nbytes
+                for name in ('_lat', '_lon', '_speed', '_course', '_heading',
+                             '_timestamp', '_received', '_type', '_alive', '_seq', '_static_seq')
+            )
+            return {
+                'vessels': len(self._slot_of),
+                'capacity': self._capacity,
+                'max_vessels': self.max_vessels,
+                'ttl_seconds': self.ttl_seconds,
+                'vessel_types': len(self._type_names),
+                'sequence': self.sequence,
+                'column_bytes': column_bytes,
+                'grid': self._grid.stats(),
+                **self.stats,
+            }
+
+
+# Global store shared by all AIS adapters
+vessel_state_store = VesselStateStore(
+    ttl_seconds=float(os.getenv("VESSEL_STATE_TTL_SECONDS", "600")),
+    max_vessels=int(os.getenv("VESSEL_STATE_MAX_VESSELS", "100000")),
+    # Opt-in: appends (and the flushes they trigger) run on the adapter threads
+    track_store=ais_track_store if os.getenv("AIS_TRACK_STORE_ENABLED", "false").lower() == "true" else None,
+)
@@ -9,10 +9,15 @@ import logging
 from datetime import datetime, timezone, timedelta
 from typing import Dict, Any, Optional, List
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # Add dotenv import for loading environment variables
 from dotenv import load_dotenv
 
+from .rate_limiter import upstream_limiter
+from .weather_service import WEATHER_STALE_MAX_SECONDS
+
 logger = logging.getLogger(__name__)
 
 # Load environment variables from .env file
@@ -55,13 +60,17 @@ class WeatherIntegrationService:
         self.cache = {}
         self.cache_duration = timedelta(minutes=15)  # Cache for 15 minutes
         
-        # Rate limiting tracking
-        self.request_times = {}
+        # Expired entries are served while one background refresh per location runs
+        self._refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='dashboard-weather')
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
         
         # Statistics tracking
         self.stats = {
             'total_requests': 0,
             'cache_hits': 0,
+            'stale_served': 0,
+            'background_refreshes': 0,
             'service_failures': 0,
             'last_request': None
         }
@@ -134,11 +143,17 @@ class WeatherIntegrationService:
             logger.info("✅ Empirical service loaded")
         except ImportError as e:
             logger.error(f"❌ Critical: Empirical service not available: {e}")
+        
+        # Rate budgets live in the shared limiter, so every worker thread draws from the same bucket
+        for service_name, service_info in self.services.items():
+            if service_info['rate_limit'] > 0:
+                upstream_limiter.configure(f'dashboard:{service_name}', service_info['rate_limit'])
     
     def get_weather_for_dashboard(self, lat: float = None, lon: float = None) -> Dict[str, Any]:
         """
         Get comprehensive weather data for dashboard display
-        Uses intelligent source selection with caching and fallback
+        Uses intelligent source selection with caching and fallback;
+        expired entries are served immediately and refreshed in the background
         
         Args:
             lat: Latitude (defaults to MET_LAT from env)
@@ -167,6 +182,36 @@ class WeatherIntegrationService:
             logger.info("✅ Using cached weather data")
             return cached
         
+        # Stale-while-revalidate: an expired copy is served now and refreshed in the background
+        stale = self._get_stale_weather(cache_key)
+        if stale:
+            self.stats['stale_served'] += 1
+            self._refresh_in_background(lat, lon, cache_key)
+            logger.info("✅ Using stale cached weather data, refreshing in background")
+            return stale
+        
+        return self._fetch_weather(lat, lon, cache_key)
+    
+    def _refresh_in_background(self, lat: float, lon: float, cache_key: str):
+        """Schedule one refresh per location; later requests keep getting the stale copy."""
+        with self._refresh_lock:
+            if cache_key in self._refreshing:
+                return
+            self._refreshing.add(cache_key)
+        self._refresh_executor.submit(self._background_refresh, lat, lon, cache_key)
+    
+    def _background_refresh(self, lat: float, lon: float, cache_key: str):
+        try:
+            self._fetch_weather(lat, lon, cache_key)
+            self.stats['background_refreshes'] += 1
+        except Exception as e:
+            logger.error(f"❌ Background dashboard weather refresh failed: {e}")
+        finally:
+            with self._refresh_lock:
+                self._refreshing.discard(cache_key)
+    
+    def _fetch_weather(self, lat: float, lon: float, cache_key: str) -> Dict[str, Any]:
+        """Query the services in priority order and cache the result."""
         # Try services in priority order
         weather_data = None
         used_service = None
@@ -187,7 +232,7 @@ class WeatherIntegrationService:
                 logger.info(f"🔍 Trying {service_name} (priority {service_info['priority']})")
                 
                 # Check rate limiting
-                if not self._check_rate_limit(service_name, service_info['rate_limit']):
+                if not self._check_rate_limit(service_name):
                     logger.warning(f"⚠️ Rate limit exceeded for {service_name}, skipping")
                     continue
                 
@@ -334,31 +379,12 @@ class WeatherIntegrationService:
             return self.services[source]['priority']
         return 99  # Lowest priority
     
-    def _check_rate_limit(self, service_name: str, limit_per_second: float) -> bool:
-        """Check if we're within rate limits for a service."""
-        if limit_per_second == 0:  # No rate limit
-            return True
-        
-        now = datetime.now(timezone.utc)
-        
-        if service_name not in self.request_times:
-            self.request_times[service_name] = []
-        
-        # Remove old request times (older than 1 second)
-        self.request_times[service_name] = [
-            t for t in self.request_times[service_name]
-            if (now - t).total_seconds() < 1.0
-        ]
-        
-        # Check if we can make another request
-        if len(self.request_times[service_name]) < limit_per_second:
-            self.request_times[service_name].append(now)
-            return True
-        
-        return False
+    def _check_rate_limit(self, service_name: str) -> bool:
+        """Take a token from the service's shared budget (services without one are unlimited)."""
+        return upstream_limiter.try_acquire(f'dashboard:{service_name}')
     
     def _get_cached_weather(self, cache_key: str) -> Optional[Dict]:
-        """Get weather data from cache if valid."""
+        """Get weather data from cache if valid (expired entries stay for stale serving)."""
         if cache_key in self.cache:
             cached_time, cached_data = self.cache[cache_key]
             cache_age = datetime.now(timezone.utc) - cached_time
@@ -369,14 +395,26 @@ class WeatherIntegrationService:
             
             if cache_age < timedelta(minutes=cache_minutes):
                 return cached_data
-            else:
-                # Remove expired cache
-                del self.cache[cache_key]
         
         return None
     
+    def _get_stale_weather(self, cache_key: str) -> Optional[Dict]:
+        """
+        Get expired weather data from cache, marked 'stale', if it is at most
+        WEATHER_STALE_MAX_SECONDS old (the same cap as the MET grid cache).
+        """
+        if cache_key not in self.cache:
+            return None
+        cached_time, cached_data = self.cache[cache_key]
+        cache_age = datetime.now(timezone.utc) - cached_time
+        if cache_age > timedelta(seconds=WEATHER_STALE_MAX_SECONDS):
+            return None
+        return {**cached_data, 'stale': True, 'cache_age_minutes': round(cache_age.total_seconds() / 60, 1)}
+    
     def _cache_weather(self, cache_key: str, data: Dict):
         """Cache weather data."""
+        # Re-insert so refreshed entries move to the end of the eviction order
+        self.cache.pop(cache_key, None)
         self.cache[cache_key] = (datetime.now(timezone.utc), data)
         
         # Limit cache size
@@ -3,6 +3,7 @@ Real-time weather service for Norwegian maritime operations.
 FIXED: Proper .env loading, caching, and all 10 cities support.
 ENHANCED: MET Norway API integration with intelligent fallback.
 REAL-TIME: Cached data with automatic refresh for dashboard updates.
+SHARED CACHE: Grid-quantized MET forecast cache (LRU, Expires/Last-Modified, coalesced misses).
 """
 
 import os
@@ -10,14 +11,23 @@ import sys
 import logging
 import random
 import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Any
-from math import radians, cos, sin, asin, sqrt
+from typing import Callable, Dict, List, Optional, Tuple, Any
+from math import radians, cos, sin, asin, sqrt, floor
 
+import numpy as np
 import requests
 from dotenv import load_dotenv
 
+from backend.services.forecast_cube import ForecastCube, current_step, parse_timeseries
+from backend.services.http_client import upstream_client
+from backend.services.rate_limiter import RateLimiter, RateLimitExceeded, upstream_limiter
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -78,7 +88,22 @@ DEFAULT_LAT = float(os.getenv("MET_LAT", "60.3913"))
 DEFAULT_LON = float(os.getenv("MET_LON", "5.3221"))
 
 # Cache configuration (10 minutes for real-time updates)
-CACHE_TTL_SECONDS = 600  # 10 minutes
+CACHE_TTL_SECONDS = 600  # 10 minutes, used when MET sends no Expires header
+
+# Shared forecast cache: grid cell size (degrees) and maximum number of cells
+WEATHER_GRID_DEG = float(os.getenv("WEATHER_GRID_DEG", "0.05"))
+WEATHER_CACHE_MAX_CELLS = int(os.getenv("WEATHER_CACHE_MAX_CELLS", "4096"))
+
+# Stale-while-revalidate: how long past expiry a cell is still served while it
+# refreshes in the background, and the workers doing that for unthrottled caches
+WEATHER_STALE_MAX_SECONDS = float(os.getenv("WEATHER_STALE_MAX_SECONDS", "21600"))
+WEATHER_REFRESH_WORKERS = int(os.getenv("WEATHER_REFRESH_WORKERS", "4"))
+
+# Pre-warming of hot cells (port cities, vessel positions): how often, how long
+# before expiry a cell is refreshed, and how many vessel cells are kept warm
+WEATHER_PREWARM_INTERVAL_SECONDS = float(os.getenv("WEATHER_PREWARM_INTERVAL_SECONDS", "60"))
+WEATHER_PREWARM_LEAD_SECONDS = float(os.getenv("WEATHER_PREWARM_LEAD_SECONDS", "300"))
+WEATHER_PREWARM_MAX_TRACK_CELLS = int(os.getenv("WEATHER_PREWARM_MAX_TRACK_CELLS", "200"))
 
 # ============================================================================
 # ALL 10 NORWEGIAN CITIES - COMPLETE COVERAGE FOR YOUR PROJECT
@@ -191,56 +216,449 @@ NORWEGIAN_CITIES = {
 # WEATHER CACHE FOR REAL-TIME PERFORMANCE
 # ============================================================================
 
+class _InFlight:
+    """A pending upstream fetch that concurrent misses for the same cell wait on."""
+    
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.background: Optional[Future] = None  # Set while a background refresh waits for budget
+
+
 class WeatherCache:
     """
-    Simple in-memory cache for weather data.
-    Prevents excessive API calls and provides real-time response.
+    Shared in-memory cache of MET Norway forecasts, one entry per grid cell.
+    Coordinates snap to a grid_deg grid, so every position inside a cell
+    shares one upstream request. Size is bounded with LRU eviction, entries
+    live until MET's Expires header (TTL fallback) and are revalidated with
+    If-Modified-Since. Concurrent misses for the same cell are coalesced into
+    a single upstream call.
+    
+    Each entry also keeps the document's full timeseries as compact arrays;
+    sample() interpolates them at any (lat, lon, time) without a request.
+    
+    Expired cells are served as is ('stale') for up to stale_seconds while one
+    background refresh per cell revalidates them, so only a cell that was
+    never fetched (or is older than that) costs a request its round trip.
+    
+    With a limiter, upstream calls draw from its 'met_norway' budget:
+    background refreshes (stale cells, pre-warming) only use budget that
+    request-path calls leave spare, and a request-path refresh that finds the
+    budget spent serves whatever is cached or queues when there is nothing.
     """
     
-    def __init__(self, ttl_seconds: int = CACHE_TTL_SECONDS):
-        self.cache = {}
+    def __init__(self, ttl_seconds: int = CACHE_TTL_SECONDS, grid_deg: float = WEATHER_GRID_DEG,
+                 max_entries: int = WEATHER_CACHE_MAX_CELLS, limiter: Optional[RateLimiter] = None,
+                 stale_seconds: float = WEATHER_STALE_MAX_SECONDS):
+        self.cache = OrderedDict()
+        self.limiter = limiter
+        self.stale_seconds = stale_seconds
         self.ttl = timedelta(seconds=ttl_seconds)
+        self.grid_deg = grid_deg
+        self.max_entries = max_entries
+        self._inflight: Dict[Tuple[int, int], _InFlight] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Bumped on every store/eviction; the forecast cube is rebuilt when it changes
+        self._version = 0
+        self._cube: Optional[ForecastCube] = None
+        self._cube_version = -1
         self.hits = 0
         self.misses = 0
+        self.coalesced = 0
+        self.upstream_requests = 0
+        self.not_modified = 0
+        self.evictions = 0
+        self.stale = 0
+        self.background_refreshes = 0
+        self.refresh_failures = 0
+    
+    def cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        """Grid cell index for a position."""
+        return (int(floor(lat / self.grid_deg)), int(floor(lon / self.grid_deg)))
     
-    def get(self, key: str) -> Optional[Dict]:
-        """Get cached weather data if valid."""
-        if key in self.cache:
-            data, timestamp = self.cache[key]
-            if datetime.now() - timestamp < self.ttl:
+    def cell_center(self, cell: Tuple[int, int]) -> Tuple[float, float]:
+        """Cell centre, rounded to the 4 decimals MET accepts."""
+        return (round((cell[0] + 0.5) * self.grid_deg, 4),
+                round((cell[1] + 0.5) * self.grid_deg, 4))
+    
+    def get_forecast(self, lat: float, lon: float, fetch: Optional[Callable] = None) -> Optional[Dict]:
+        """Raw MET forecast document for the cell containing lat/lon, or None."""
+        return self.lookup(lat, lon, fetch)[0]
+    
+    def lookup(self, lat: float, lon: float, fetch: Optional[Callable] = None) -> Tuple[Optional[Dict], str]:
+        """
+        Get the forecast for the cell containing lat/lon.
+        
+        Args:
+            lat, lon: Position
+            fetch: Upstream call (lat, lon, if_modified_since) -> (status, document, headers);
+                defaults to request_met_forecast
+            
+        Returns:
+            (document or None, cache status: 'cached', 'fresh', 'revalidated', 'coalesced',
+            'stale' or 'failed')
+        """
+        key = self.cell(lat, lon)
+        now = time.time()
+        with self._lock:
+            entry = self.cache.get(key)
+            if entry is not None and entry['expires_at'] > now:
+                self.cache.move_to_end(key)
                 self.hits += 1
-                logger.debug(f"Cache hit for {key}")
-                return data
+                return entry['data'], 'cached'
+            stale = entry is not None and now - entry['expires_at'] < self.stale_seconds
+            if stale:
+                self.cache.move_to_end(key)
+                self.stale += 1
             else:
-                # Expired cache entry
-                del self.cache[key]
+                inflight = self._inflight.get(key)
+                # A background refresh still waiting for spare budget is taken over by this request
+                leader = inflight is None or (inflight.background is not None and inflight.background.cancel())
+                if inflight is None:
+                    inflight = _InFlight()
+                    self._inflight[key] = inflight
+                if leader:
+                    self.misses += 1
+                else:
+                    self.coalesced += 1
         
-        self.misses += 1
-        return None
+        if stale:
+            self.refresh_async(key, fetch)
+            return entry['data'], 'stale'
+        if not leader:
+            inflight.event.wait(MET_TIMEOUT * MET_MAX_RETRIES)
+            data = inflight.result[0] if inflight.result else None
+            return data, 'coalesced' if data is not None else 'failed'
+        
+        result = (None, 'failed')
+        try:
+            result = self._limited_refresh(key, entry, fetch or request_met_forecast)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            inflight.result = result
+            inflight.event.set()
+        return result
     
-    def set(self, key: str, data: Dict):
-        """Cache weather data with timestamp."""
-        self.cache[key] = (data, datetime.now())
-        logger.debug(f"Cached weather data for {key}")
+    def _limited_refresh(self, key: Tuple[int, int], entry: Optional[Dict],
+                         fetch: Callable) -> Tuple[Optional[Dict], str]:
+        """Refresh within the limiter's budget, serving stale or queueing when it is spent."""
+        if self.limiter is None or self.limiter.try_acquire('met_norway'):
+            return self._refresh(key, entry, fetch)
+        if entry is not None:
+            with self._lock:
+                # Served from cache after all
+                self.misses -= 1
+                self.stale += 1
+            return entry['data'], 'stale'
+        try:
+            return self.limiter.submit('met_norway', self._refresh, key, entry, fetch,
+                                       max_queue_seconds=MET_TIMEOUT).result()
+        except RateLimitExceeded as e:
+            logger.warning(f"⏱️ MET rate limit: {e}")
+            return None, 'failed'
+    
+    def refresh_async(self, key: Tuple[int, int], fetch: Optional[Callable] = None) -> bool:
+        """
+        Refresh one cell in the background unless it is already being fetched.
+        Misses for the cell meanwhile wait on this fetch like on any other.
+        
+        Returns:
+            True if a refresh was scheduled
+        """
+        with self._lock:
+            if key in self._inflight:
+                return False
+            inflight = _InFlight()
+            self._inflight[key] = inflight
+            if self.limiter is None and self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=WEATHER_REFRESH_WORKERS,
+                                                    thread_name_prefix='weather-refresh')
+        if self.limiter is not None:
+            future = self.limiter.submit_idle('met_norway', self._background_refresh, key, inflight, fetch)
+            with self._lock:
+                if not future.done():
+                    inflight.background = future
+        else:
+            self._executor.submit(self._background_refresh, key, inflight, fetch)
+        return True
+    
+    def _background_refresh(self, key: Tuple[int, int], inflight: _InFlight, fetch: Optional[Callable]):
+        result = (None, 'failed')
+        try:
+            with self._lock:
+                entry = self.cache.get(key)
+            result = self._refresh(key, entry, fetch or request_met_forecast)
+        except Exception as e:
+            logger.warning(f"⚠️ Background weather refresh failed for cell {key}: {e}")
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+                self.background_refreshes += 1
+                self.refresh_failures += result[1] == 'failed'
+            inflight.result = result
+            inflight.event.set()
+    
+    def prewarm(self, points, lead_seconds: float = WEATHER_PREWARM_LEAD_SECONDS,
+                fetch: Optional[Callable] = None) -> int:
+        """
+        Schedule background refreshes for the cells containing points (lat, lon)
+        that are missing or expire within lead_seconds.
+        
+        Returns:
+            Number of refreshes scheduled
+        """
+        deadline = time.time() + lead_seconds
+        keys = {self.cell(lat, lon) for lat, lon in points}
+        with self._lock:
+            due = [key for key in keys
+                   if key not in self.cache or self.cache[key]['expires_at'] <= deadline]
+        return sum(self.refresh_async(key, fetch) for key in due)
+    
+    def _refresh(self, key: Tuple[int, int], entry: Optional[Dict], fetch: Callable) -> Tuple[Optional[Dict], str]:
+        """Fetch (or revalidate) one cell from upstream and store it."""
+        lat, lon = self.cell_center(key)
+        last_modified = entry['last_modified'] if entry is not None else None
+        with self._lock:
+            self.upstream_requests += 1
+        status, data, headers = fetch(lat, lon, last_modified)
+        
+        if status == 304 and entry is not None:
+            with self._lock:
+                self.not_modified += 1
+                self._store(key, entry['data'], headers, last_modified, entry['series'])
+            return entry['data'], 'revalidated'
+        if data is None:
+            return None, 'failed'
+        
+        series = parse_timeseries(data)
+        with self._lock:
+            self._store(key, data, headers, (headers or {}).get('Last-Modified'), series)
+        return data, 'fresh'
+    
+    def _store(self, key: Tuple[int, int], data: Dict, headers: Optional[Dict], last_modified: Optional[str],
+               series: Tuple[np.ndarray, np.ndarray]):
+        """Insert or replace an entry (lock held), evicting least recently used cells."""
+        self.cache[key] = {
+            'data': data,
+            'series': series,
+            'expires_at': self._expires_at(headers),
+            'last_modified': last_modified,
+            'fetched_at': time.time()
+        }
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)
+            self.evictions += 1
+        self._version += 1
+    
+    def cube(self) -> ForecastCube:
+        """Forecast cube of every cached cell, rebuilt only after the cache changed."""
+        with self._lock:
+            if self._cube is not None and self._cube_version == self._version:
+                return self._cube
+            version = self._version
+            cells = {key: entry['series'] for key, entry in self.cache.items()}
+        cube = ForecastCube(cells, self.grid_deg)
+        with self._lock:
+            if version >= self._cube_version:
+                self._cube, self._cube_version = cube, version
+        return cube
+    
+    def sample(self, lats, lons, times, variables: Optional[List[str]] = None,
+               fetch_missing: bool = False, fetch: Optional[Callable] = None) -> Dict[str, np.ndarray]:
+        """
+        Forecast at each (lat, lon, epoch seconds) point from the cached cells,
+        interpolated in space and time (see ForecastCube.sample).
+        
+        Args:
+            lats, lons: Positions
+            times: Epoch seconds per point (or one for all)
+            variables: Subset of forecast_cube.FORECAST_VARIABLES (default all)
+            fetch_missing: First fetch the cells containing the points that are not cached
+            fetch: Upstream call for those, as for lookup
+        
+        Returns:
+            Variable name -> array aligned with the inputs (NaN with no cached cell nearby)
+        """
+        if fetch_missing:
+            cells = np.unique(np.floor(np.column_stack([np.ravel(lats), np.ravel(lons)]) / self.grid_deg)
+                              .astype(np.int64), axis=0)
+            with self._lock:
+                missing = [(i, j) for i, j in cells.tolist() if (i, j) not in self.cache]
+            for key in missing:
+                self.get_forecast(*self.cell_center(key), fetch)
+        return self.cube().sample(lats, lons, times, variables)
+    
+    def _expires_at(self, headers: Optional[Dict]) -> float:
+        """Epoch seconds from MET's Expires header, falling back to the TTL."""
+        expires = (headers or {}).get('Expires')
+        if expires:
+            try:
+                return parsedate_to_datetime(expires).timestamp()
+            except (TypeError, ValueError):
+                logger.debug(f"Unparseable Expires header: {expires}")
+        return time.time() + self.ttl.total_seconds()
     
     def clear(self):
         """Clear all cached data."""
-        self.cache.clear()
-        self.hits = 0
-        self.misses = 0
+        with self._lock:
+            self.cache.clear()
+            self._version += 1
+            self.hits = 0
+            self.misses = 0
+            self.coalesced = 0
+            self.upstream_requests = 0
+            self.not_modified = 0
+            self.evictions = 0
+            self.stale = 0
+            self.background_refreshes = 0
+            self.refresh_failures = 0
         logger.info("Weather cache cleared")
     
     def stats(self) -> Dict:
         """Get cache statistics."""
+        lookups = self.hits + self.misses + self.coalesced + self.stale
         return {
             'size': len(self.cache),
+            'max_entries': self.max_entries,
+            'grid_deg': self.grid_deg,
             'hits': self.hits,
             'misses': self.misses,
-            'hit_ratio': f"{(self.hits/(self.hits+self.misses)*100):.1f}%" if (self.hits + self.misses) > 0 else "0%"
+            'coalesced': self.coalesced,
+            'upstream_requests': self.upstream_requests,
+            'not_modified': self.not_modified,
+            'evictions': self.evictions,
+            'stale': self.stale,
+            'background_refreshes': self.background_refreshes,
+            'refresh_failures': self.refresh_failures,
+            'in_flight': len(self._inflight),
+            'hit_ratio': f"{((self.hits + self.coalesced + self.stale) / lookups * 100):.1f}%"
+            if lookups > 0 else "0%"
         }
 
 # Global cache instance
-weather_cache = WeatherCache()
+weather_cache = WeatherCache(limiter=upstream_limiter)
+
+
+def vessel_track_points(max_cells: int = WEATHER_PREWARM_MAX_TRACK_CELLS,
+                        grid_deg: float = WEATHER_GRID_DEG) -> List[Tuple[float, float]]:
+    """
+    Positions of live (state store), simulated and captured vessels, one per
+    grid cell, keeping the max_cells cells with the most vessels.
+    Vessel services are only read if the application has already loaded them.
+    """
+    lats, lons = [], []
+    
+    store_module = sys.modules.get('backend.services.vessel_state_store')
+    if store_module is not None:
+        fleet = store_module.vessel_state_store.fleet_columns()
+        lats.extend(fleet['lat'].tolist())
+        lons.extend(fleet['lon'].tolist())
+    
+    simulator_module = sys.modules.get('backend.simulation.realtime_simulator')
+    if simulator_module is not None:
+        for vessel in simulator_module.realtime_simulator.get_all_vessels():
+            position = vessel.get('position') or {}
+            if position.get('lat') is not None and position.get('lon') is not None:
+                lats.append(position['lat'])
+                lons.append(position['lon'])
+    
+    capture_module = sys.modules.get('backend.services.vessel_capture_service')
+    if capture_module is not None:
+        for capture in capture_module.vessel_capture_service.get_active_captures().values():
+            lats.append(capture['lat'])
+            lons.append(capture['lon'])
+    
+    positions = np.column_stack([np.asarray(lats, dtype=float), np.asarray(lons, dtype=float)])
+    positions = positions[np.isfinite(positions).all(axis=1)]
+    if not len(positions):
+        return []
+    cells = np.floor(positions / grid_deg).astype(np.int64)
+    unique, counts = np.unique(cells, axis=0, return_counts=True)
+    busiest = unique[np.argsort(-counts, kind='stable')[:max_cells]]
+    return [((row[0] + 0.5) * grid_deg, (row[1] + 0.5) * grid_deg) for row in busiest.tolist()]
+
+
+def hot_weather_points() -> List[Tuple[float, float]]:
+    """The cells kept warm: the port cities plus where vessels currently are."""
+    points = [(city['lat'], city['lon']) for city in NORWEGIAN_CITIES.values()]
+    points.extend(vessel_track_points())
+    return points
+
+
+class WeatherPrewarmer:
+    """
+    Daemon thread that keeps the hot cells of a WeatherCache fresh, so
+    dashboard weather reads hit the cache instead of waiting on MET.
+    
+    Args:
+        cache: Cache to keep warm
+        hot_points: Returns the (lat, lon) positions whose cells are hot
+        interval_seconds: How often the hot set is re-checked
+        lead_seconds: Cells expiring within this long are refreshed
+        fetch: Upstream call, as for WeatherCache.lookup (default request_met_forecast)
+    """
+    
+    def __init__(self, cache: WeatherCache, hot_points: Callable[[], List[Tuple[float, float]]] = hot_weather_points,
+                 interval_seconds: float = WEATHER_PREWARM_INTERVAL_SECONDS,
+                 lead_seconds: float = WEATHER_PREWARM_LEAD_SECONDS, fetch: Optional[Callable] = None):
+        self.cache = cache
+        self.hot_points = hot_points
+        self.fetch = fetch
+        self.interval_seconds = interval_seconds
+        self.lead_seconds = lead_seconds
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._start_lock = threading.Lock()
+        self.stats = {'runs': 0, 'hot_cells': 0, 'refreshes_scheduled': 0, 'errors': 0}
+    
+    def start(self):
+        """Start the pre-warm thread once."""
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run_loop, daemon=True, name='weather-prewarm')
+            self._thread.start()
+        logger.info("🔥 Weather pre-warmer started")
+    
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._thread = None
+    
+    def _run_loop(self):
+        while True:
+            try:
+                self.run_once()
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f"❌ Weather pre-warm failed: {e}")
+            if self._stop_event.wait(self.interval_seconds):
+                return
+    
+    def run_once(self) -> int:
+        """Schedule refreshes for hot cells that are missing or about to expire."""
+        points = self.hot_points()
+        scheduled = self.cache.prewarm(points, self.lead_seconds, self.fetch)
+        self.stats['runs'] += 1
+        self.stats['hot_cells'] = len({self.cache.cell(lat, lon) for lat, lon in points})
+        self.stats['refreshes_scheduled'] += scheduled
+        return scheduled
+    
+    def get_status(self) -> Dict:
+        return {
+            'running': self._thread is not None and self._thread.is_alive(),
+            'interval_seconds': self.interval_seconds,
+            'lead_seconds': self.lead_seconds,
+            **self.stats
+        }
+
+# Global pre-warmer for the shared cache (started by the first weather read)
+weather_prewarmer = WeatherPrewarmer(weather_cache)
 
 # ============================================================================
 # UTILITY FUNCTIONS
@@ -328,83 +746,78 @@ def calculate_wind_chill(temperature_c: float, wind_speed_ms: float) -> float:
 # MET NORWAY API INTEGRATION - REAL-TIME WEATHER DATA
 # ============================================================================
 
-def fetch_met_weather(lat: float, lon: float) -> Dict[str, Any]:
+def request_met_forecast(lat: float, lon: float,
+                         if_modified_since: Optional[str] = None) -> Tuple[int, Optional[Dict], Dict]:
     """
-    Fetch real-time weather data from MET Norway API.
+    Request a MET Norway Locationforecast document, retrying on rate limits,
+    timeouts and connection errors.
     
     Args:
-        lat: Latitude
+        lat: Latitude (at most 4 decimals, as MET requires)
         lon: Longitude
+        if_modified_since: Last-Modified value of a cached copy, for revalidation
         
     Returns:
-        Dictionary with weather data or error information
+        (HTTP status or 0, parsed JSON on 200, response headers)
     """
-    # Create cache key
-    cache_key = f"met_{lat:.4f}_{lon:.4f}"
-    
-    # Check cache first
-    cached = weather_cache.get(cache_key)
-    if cached:
-        cached['cache_status'] = 'cached'
-        return cached
-    
     headers = {
         'User-Agent': MET_USER_AGENT,
         'Accept': 'application/json'
     }
+    if if_modified_since:
+        headers['If-Modified-Since'] = if_modified_since
     
     params = {
         'lat': round(lat, 4),
         'lon': round(lon, 4)
     }
     
-    logger.info(f"🌤️ Fetching MET Norway weather for {lat}, {lon}")
+    logger.info(f"🌤️ Fetching MET Norway weather for {params['lat']}, {params['lon']}")
+    
+    try:
+        # Retries with backoff on 429/5xx, timeouts and connection errors
+        response = upstream_client.get(
+            MET_BASE_URL,
+            params=params,
+            headers=headers,
+            timeout=MET_TIMEOUT,
+            retries=MET_MAX_RETRIES - 1
+        )
+    except requests.exceptions.RequestException as e:
+        logger.warning(f"MET API request failed after {MET_MAX_RETRIES} attempts: {e}")
+        return 0, None, {}
     
-    for attempt in range(MET_MAX_RETRIES):
+    if response.status_code == 200:
         try:
-            response = requests.get(
-                MET_BASE_URL,
-                params=params,
-                headers=headers,
-                timeout=MET_TIMEOUT
-            )
-            
-            if response.status_code == 200:
-                weather_data = parse_met_response(response.json(), lat, lon)
-                if weather_data:
-                    # Cache successful response
-                    weather_cache.set(cache_key, weather_data)
-                    weather_data['cache_status'] = 'fresh'
-                    return weather_data
-                else:
-                    logger.warning("Failed to parse MET Norway response")
-                    break
-                    
-            elif response.status_code == 429:  # Too Many Requests
-                wait_time = (attempt + 1) * 2  # Exponential backoff
-                logger.warning(f"Rate limited. Waiting {wait_time}s (attempt {attempt + 1}/{MET_MAX_RETRIES})")
-                time.sleep(wait_time)
-                continue
-                
-            else:
-                logger.error(f"MET API error {response.status_code}: {response.text[:100]}")
-                break
-                
-        except requests.exceptions.Timeout:
-            logger.warning(f"MET API timeout (attempt {attempt + 1}/{MET_MAX_RETRIES})")
-            if attempt < MET_MAX_RETRIES - 1:
-                time.sleep(1)
-                continue
-                
-        except requests.exceptions.ConnectionError:
-            logger.warning(f"MET API connection error (attempt {attempt + 1}/{MET_MAX_RETRIES})")
-            if attempt < MET_MAX_RETRIES - 1:
-                time.sleep(1)
-                continue
-                
-        except Exception as e:
-            logger.error(f"Unexpected error fetching MET weather: {e}")
-            break
+            return 200, response.json(), dict(response.headers)
+        except ValueError as e:
+            logger.error(f"MET API returned invalid JSON: {e}")
+            return 0, None, {}
+    if response.status_code != 304:
+        logger.error(f"MET API error {response.status_code}: {response.text[:100]}")
+    return response.status_code, None, dict(response.headers)
+
+def fetch_met_weather(lat: float, lon: float) -> Dict[str, Any]:
+    """
+    Fetch real-time weather data from MET Norway API.
+    Served from the shared grid-cell cache; positions in the same cell
+    share one upstream request.
+    
+    Args:
+        lat: Latitude
+        lon: Longitude
+        
+    Returns:
+        Dictionary with weather data or error information
+    """
+    api_data, cache_status = weather_cache.lookup(lat, lon)
+    
+    if api_data is not None:
+        weather_data = parse_met_response(api_data, lat, lon)
+        if weather_data:
+            weather_data['cache_status'] = cache_status
+            return weather_data
+        logger.warning("Failed to parse MET Norway response")
     
     # If we get here, all attempts failed
     logger.warning("All MET API attempts failed, using fallback data")
@@ -428,8 +841,8 @@ def parse_met_response(api_data: Dict, lat: float, lon: float) -> Optional[Dict]
             logger.warning("No timeseries data in MET response")
             return None
         
-        # Get current forecast (first in array)
-        current = timeseries[0]
+        # Step in effect now (a stale-served document no longer starts at this hour)
+        current = current_step(timeseries)
         
         # Extract data
         instant = current.get('data', {}).get('instant', {}).get('details', {})
@@ -636,6 +1049,7 @@ class RealTimeWeatherService:
             Current weather data
         """
         self.request_count += 1
+        weather_prewarmer.start()
         
         # Use defaults if not provided
         if lat is None:
@@ -699,12 +1113,10 @@ class RealTimeWeatherService:
         
         for city_key, city_data in NORWEGIAN_CITIES.items():
             try:
+                # Pre-warmed cells; upstream calls are paced by the shared rate limiter
                 weather = self.get_current_weather(city_data['lat'], city_data['lon'])
                 all_weather[city_key] = weather
                 
-                # Small delay to avoid overwhelming the API
-                time.sleep(0.1)
-                
             except Exception as e:
                 logger.error(f"Failed to get weather for {city_key}: {e}")
                 all_weather[city_key] = {
@@ -736,7 +1148,8 @@ class RealTimeWeatherService:
                 'last_update': self.last_update.isoformat(),
                 'uptime_seconds': (datetime.now() - self.last_update).total_seconds()
             },
-            'cache': self.cache.stats()
+            'cache': self.cache.stats(),
+            'prewarm': weather_prewarmer.get_status()
         }
     
     def clear_cache(self):
@@ -4,5 +4,7 @@ Integrates with existing RTZ, Weather, Risk, and Alert services.
 """
 
 from backend.simulation.integrated_simulator import IntegratedShipSimulator, get_simulator
+from backend.simulation.voyage_batch import VoyageBatchResult, WeatherTimeGrid, simulate_voyages
 
-__all__ = ['IntegratedShipSimulator', 'get_simulator']
+__all__ = ['IntegratedShipSimulator', 'get_simulator',
+           'VoyageBatchResult', 'WeatherTimeGrid', 'simulate_voyages']
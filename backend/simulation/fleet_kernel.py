@@ -0,0 +1,204 @@
+"""
+Vectorized fleet stepping kernel for the real-time simulator.
+Fleet state is kept as a structure of NumPy arrays (one slot per vessel)
+plus a flattened waypoint table; step_fleet advances every vessel along its
+route in one pass and detects waypoint arrivals in bulk.
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_NM = 3440.065
+
+# Status codes, in VesselStatus declaration order
+DOCKED, DEPARTING, UNDERWAY, ARRIVING, ANCHORED, EMERGENCY = range(6)
+
+MAX_HEADING_CHANGE_DEG = 5.0
+WAYPOINT_RADIUS_NM = 0.5
+INITIAL_CAPACITY = 64
+
+
+def haversine_nm(lat1, lon1, lat2, lon2):
+    """Great-circle distance in nautical miles; works on scalars and arrays."""
+    lat1, lon1, lat2, lon2 = (np.radians(x) for x in (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return EARTH_RADIUS_NM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def bearing_deg(lat1, lon1, lat2, lon2):
+    """Initial bearing from point 1 to point 2 in degrees [0, 360)."""
+    lat1, lon1, lat2, lon2 = (np.radians(x) for x in (lat1, lon1, lat2, lon2))
+    dlon = lon2 - lon1
+    x = np.sin(dlon) * np.cos(lat2)
+    y = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(dlon)
+    return (np.degrees(np.arctan2(x, y)) + 360) % 360
+
+
+class FleetState:
+    """
+    Structure-of-arrays vessel state.
+
+    Per vessel (slot): lat, lon, heading, speed, max_speed, wp_index (global
+    index of the waypoint last passed), wp_first / wp_last (global indices of
+    the route's first and final waypoints), dist_to_next, traveled, total_distance, progress, status,
+    timestamp (epoch seconds).
+    Per waypoint (flattened, each vessel owns a contiguous run): wp_lat,
+    wp_lon, wp_arrival, wp_departure (epoch seconds, NaN until set).
+    """
+
+    VESSEL_FIELDS = {
+        'lat': np.float64, 'lon': np.float64, 'heading': np.float64, 'speed': np.float64,
+        'max_speed': np.float64, 'wp_index': np.int64, 'wp_first': np.int64, 'wp_last': np.int64,
+        'dist_to_next': np.float64, 'traveled': np.float64, 'total_distance': np.float64,
+        'progress': np.float64, 'status': np.int8, 'timestamp': np.float64,
+    }
+    WAYPOINT_FIELDS = {
+        'wp_lat': np.float64, 'wp_lon': np.float64,
+        'wp_arrival': np.float64, 'wp_departure': np.float64,
+    }
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        self.size = 0
+        self.n_waypoints = 0
+        for name, dtype in self.VESSEL_FIELDS.items():
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+        for name, dtype in self.WAYPOINT_FIELDS.items():
+            setattr(self, name, np.full(capacity * 8, np.nan, dtype=dtype))
+
+    def _grow(self, fields, needed: int):
+        for name in fields:
+            array = getattr(self, name)
+            if needed > len(array):
+                grown = np.full(max(needed, len(array) * 2), np.nan if array.dtype.kind == 'f' else 0,
+                                dtype=array.dtype)
+                grown[:len(array)] = array
+                setattr(self, name, grown)
+
+    def add_vessel(self, lat: float, lon: float, heading: float, speed: float, max_speed: float,
+                   waypoints: List[Tuple[float, float]], status: int, timestamp: float,
+                   wp_index: int = 0, dist_to_next: float = 0.0, traveled: float = 0.0,
+                   total_distance: float = 0.0, progress: float = 0.0) -> int:
+        """Append a vessel and its waypoints; returns the vessel's slot."""
+        slot = self.size
+        first = self.n_waypoints
+        self._grow(self.VESSEL_FIELDS, slot + 1)
+        self._grow(self.WAYPOINT_FIELDS, first + len(waypoints))
+
+        self.wp_lat[first:first + len(waypoints)] = [wp[0] for wp in waypoints]
+        self.wp_lon[first:first + len(waypoints)] = [wp[1] for wp in waypoints]
+        self.wp_arrival[first:first + len(waypoints)] = np.nan
+        self.wp_departure[first:first + len(waypoints)] = np.nan
+        self.n_waypoints += len(waypoints)
+
+        values = {'lat': lat, 'lon': lon, 'heading': heading, 'speed': speed,
+                  'max_speed': max_speed, 'wp_index': first + wp_index,
+                  'wp_first': first, 'wp_last': first + len(waypoints) - 1, 'dist_to_next': dist_to_next,
+                  'traveled': traveled, 'total_distance': total_distance,
+                  'progress': progress, 'status': status, 'timestamp': timestamp}
+        for name, value in values.items():
+            getattr(self, name)[slot] = value
+        self.size += 1
+        return slot
+
+    def waypoint_range(self, slot: int) -> range:
+        """Global waypoint indices owned by a slot."""
+        return range(int(self.wp_first[slot]), int(self.wp_last[slot]) + 1)
+
+
+def step_fleet(state: FleetState, dt_seconds: float, now: float) -> np.ndarray:
+    """
+    Advance every vessel by one tick.
+
+    Vessels that are docked do not move; vessels already past their final
+    waypoint are set to ARRIVING at zero speed. Everyone else turns at most
+    MAX_HEADING_CHANGE_DEG toward the next waypoint, moves speed * dt along a
+    great circle, and passes the waypoint once within WAYPOINT_RADIUS_NM.
+
+    Returns:
+        Slots of vessels that reached a waypoint this tick
+    """
+    n = state.size
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+
+    status = state.status[:n]
+    wp_index = state.wp_index[:n]
+    wp_last = state.wp_last[:n]
+
+    # Already at (or past) the final waypoint
+    finished = (status != DOCKED) & (wp_index >= wp_last)
+    if finished.any():
+        status[finished] = ARRIVING
+        state.speed[:n][finished] = 0.0
+        last = wp_last[finished]
+        unset = np.isnan(state.wp_arrival[last])
+        state.wp_arrival[last[unset]] = now
+
+    moving = np.flatnonzero((status != DOCKED) & ~finished)
+    if len(moving) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    lat = state.lat[moving]
+    lon = state.lon[moving]
+    heading = state.heading[moving]
+    speed = state.speed[moving]
+    nxt = state.wp_index[moving] + 1
+    next_lat = state.wp_lat[nxt]
+    next_lon = state.wp_lon[nxt]
+
+    # Turn toward the next waypoint, at most MAX_HEADING_CHANGE_DEG per tick
+    heading_diff = bearing_deg(lat, lon, next_lat, next_lon) - heading
+    wrap = np.abs(heading_diff) > 180
+    heading_diff = np.where(wrap, heading_diff - 360 * np.sign(heading_diff), heading_diff)
+    heading = (heading + np.clip(heading_diff, -MAX_HEADING_CHANGE_DEG, MAX_HEADING_CHANGE_DEG)) % 360
+
+    # Great-circle step
+    distance_moved = speed * (dt_seconds / 3600.0)
+    lat_rad = np.radians(lat)
+    heading_rad = np.radians(heading)
+    distance_rad = distance_moved / EARTH_RADIUS_NM
+    sin_lat, cos_lat = np.sin(lat_rad), np.cos(lat_rad)
+    sin_d, cos_d = np.sin(distance_rad), np.cos(distance_rad)
+    new_lat_rad = np.arcsin(sin_lat * cos_d + cos_lat * sin_d * np.cos(heading_rad))
+    new_lon = lon + np.degrees(np.arctan2(np.sin(heading_rad) * sin_d * cos_lat,
+                                          cos_d - sin_lat * np.sin(new_lat_rad)))
+    new_lat = np.degrees(new_lat_rad)
+
+    dist_to_next = haversine_nm(new_lat, new_lon, next_lat, next_lon)
+
+    state.lat[moving] = new_lat
+    state.lon[moving] = new_lon
+    state.heading[moving] = heading
+    state.timestamp[moving] = now
+    state.traveled[moving] += distance_moved
+
+    # Bulk waypoint arrival
+    arrived = dist_to_next <= WAYPOINT_RADIUS_NM
+    if arrived.any():
+        arrived_slots = moving[arrived]
+        passed = nxt[arrived]
+        state.wp_departure[passed - 1] = now
+        state.wp_arrival[passed] = now
+        state.wp_index[arrived_slots] = passed
+        # Distance of the following leg for vessels that have one left
+        more = passed < state.wp_last[arrived_slots]
+        following = passed[more]
+        dist_arrived = dist_to_next[arrived]
+        dist_arrived[more] = haversine_nm(state.wp_lat[following], state.wp_lon[following],
+                                         state.wp_lat[following + 1], state.wp_lon[following + 1])
+        dist_to_next[arrived] = dist_arrived
+    else:
+        arrived_slots = np.empty(0, dtype=np.int64)
+    state.dist_to_next[moving] = dist_to_next
+
+    # Progress and status
+    total = state.total_distance[moving]
+    has_total = total > 0
+    progress = state.progress[moving]
+    progress[has_total] = np.minimum(100.0, state.traveled[moving][has_total] / total[has_total] * 100)
+    state.progress[moving] = progress
+    state.status[moving] = np.where(progress >= 95, ARRIVING,
+                                    np.where(progress > 0, UNDERWAY, state.status[moving]))
+    return arrived_slots
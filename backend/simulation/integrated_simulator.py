@@ -12,6 +12,9 @@ from typing import Dict, List, Optional, Tuple, Any
 import logging
 import math
 
+from backend.simulation.voyage_batch import (DEFAULT_MAX_HOURS, DEFAULT_TICK_SECONDS, VoyageBatchResult,
+                                             WeatherTimeGrid, simulate_voyages)
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -49,6 +52,9 @@ class IntegratedShipSimulator:
         self.waypoints = self.route_data.get('waypoints', [])
         self.current_waypoint_index = 0
         
+        # Hazards along the route, screened once per leg
+        self._route_corridor()
+        
         # Ship state
         self.current_position = self.waypoints[0] if self.waypoints else [60.3913, 5.3221]  # Bergen port
         self.speed_knots = 15.0
@@ -142,6 +148,29 @@ class IntegratedShipSimulator:
             logger.error(f"Error loading route: {e}")
             return self._create_fallback_route()
     
+    def _route_corridor(self):
+        """
+        Per-leg hazard candidates for the loaded route. Cached, and rebuilt
+        when the route or the risk engine's hazards change.
+        """
+        if not self.risk_engine or not self.alerts_service or len(self.waypoints) < 2:
+            return None
+        try:
+            from backend.services.route_corridor import route_corridor_cache
+            waypoints = [{'lat': wp[0], 'lon': wp[1]} for wp in self.waypoints]
+            return route_corridor_cache.get(waypoints, route_key=self.route_data.get('route_name'))
+        except Exception as e:
+            logger.warning(f"⚠️ Route corridor unavailable, using full hazard checks: {e}")
+            return None
+    
+    def _current_leg_candidates(self):
+        """Hazard candidates of the leg being sailed, or None for a full check."""
+        corridor = self._route_corridor()
+        if corridor is None:
+            return None
+        return corridor.candidates_for(self.current_position[0], self.current_position[1],
+                                       self.current_waypoint_index - 1)
+    
     def _create_fallback_route(self) -> Dict:
         """Create a fallback route when real routes are unavailable."""
         logger.info("Creating fallback route for simulation")
@@ -241,17 +270,20 @@ class IntegratedShipSimulator:
                 # Get real weather data if service is available
                 current_weather = self._get_current_weather()
                 
+                # Only the current leg's pre-screened hazards need checking
+                corridor = self._current_leg_candidates()
+                
                 # Check for alerts using existing alerts service
                 if self.alerts_service:
                     vessel_data = self._create_vessel_data()
-                    context = {'weather': current_weather}
+                    context = {'weather': current_weather, 'corridor': corridor}
                     alerts = self.alerts_service.generate_vessel_alerts(vessel_data, context)
                     self.active_alerts = alerts
                 
                 # Check risks using existing risk engine
                 if self.risk_engine:
                     vessel_data = self._create_vessel_data()
-                    risks = self.risk_engine.assess_vessel(vessel_data, current_weather)
+                    risks = self.risk_engine.assess_vessel(vessel_data, current_weather, corridor=corridor)
                     self.risk_history.append({
                         'timestamp': datetime.now().isoformat(),
                         'position': self.current_position.copy(),
@@ -294,6 +326,39 @@ class IntegratedShipSimulator:
                 logger.error(f"⚠️ Simulation error: {e}")
                 time.sleep(5)
     
+    def simulate_batch(self, speeds_knots: List[float], departure_times: Optional[List[float]] = None,
+                       weather: Optional[WeatherTimeGrid] = None, prefetch_weather: bool = True,
+                       tick_seconds: float = DEFAULT_TICK_SECONDS,
+                       max_hours: float = DEFAULT_MAX_HOURS) -> VoyageBatchResult:
+        """
+        Headless batch mode: run this route to arrival once per speed/departure
+        pair on a simulated clock, without touching the live simulation state.
+        
+        Args:
+            speeds_knots: Speed per voyage (broadcast against departure_times)
+            departure_times: Departure epoch seconds per voyage (default: now)
+            weather: Pre-fetched weather grid; fetched along the route from the
+                shared weather cache when omitted and prefetch_weather is set
+            tick_seconds: Simulated seconds per tick
+            max_hours: Give up on voyages that have not arrived by then
+            
+        Returns:
+            VoyageBatchResult with (voyages, ticks) timelines
+        """
+        if departure_times is None:
+            departure_times = [time.time()]
+        if weather is None and prefetch_weather and self.weather_service:
+            weather = WeatherTimeGrid.prefetch(self.waypoints)
+        
+        return simulate_voyages(
+            self.waypoints, speeds_knots, departure_times, weather=weather,
+            tick_seconds=tick_seconds, max_hours=max_hours,
+            vessel={'mmsi': self.ship_id, 'name': self.ship_name, 'type': self.ship_type,
+                    'draught': 8.5, 'length': 200.0},
+            risk_engine=self.risk_engine, alerts_service=self.alerts_service,
+            route_name=self.route_data.get('route_name', '')
+        )
+    
     def _update_position(self):
         """Update ship position based on speed and heading toward next waypoint."""
         if not self.waypoints or self.current_waypoint_index >= len(self.waypoints):
@@ -13,14 +13,24 @@ import logging
 import math
 import threading
 import time
+from collections import deque
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 import random
 from enum import Enum
 
+import numpy as np
+
+from backend.simulation.fleet_kernel import FleetState, step_fleet
+
 logger = logging.getLogger(__name__)
 
+# Alerts are kept for an hour, bounded per vessel so a vessel idling near a
+# waypoint cannot grow its history by one alert per tick
+ALERT_MAX_AGE_SECONDS = 3600
+MAX_ALERTS_PER_VESSEL = 50
+
 class VesselStatus(Enum):
     """Vessel status enumeration."""
     DOCKED = "docked"
@@ -30,6 +40,10 @@ class VesselStatus(Enum):
     ANCHORED = "anchored"
     EMERGENCY = "emergency"
 
+# Fleet kernel status codes follow the declaration order above
+_STATUSES = tuple(VesselStatus)
+_STATUS_CODES = {status: code for code, status in enumerate(_STATUSES)}
+
 class AlertLevel(Enum):
     """Alert level enumeration."""
     INFO = "info"
@@ -129,6 +143,12 @@ class RealTimeSimulator:
     
     def __init__(self):
         self.vessels: Dict[str, SimulatedVessel] = {}
+        # Kinematic state lives in the fleet arrays; the dataclasses above are
+        # refreshed from them (_sync_vessel) whenever a vessel is serialized
+        self.fleet = FleetState()
+        self._slots: Dict[str, int] = {}
+        self._slot_mmsi: List[str] = []
+        self._alert_history: List[deque] = []
         self.routes: Dict[str, Dict] = {}
         self._lock = threading.Lock()
         self._running = False
@@ -241,7 +261,7 @@ class RealTimeSimulator:
             vessel.position.eta_next_waypoint = departure_time + time_to_wp
         
         with self._lock:
-            self.vessels[mmsi] = vessel
+            self._register_vessel(vessel)
             self.routes[route_id] = route
         
         logger.info(f"Created vessel {vessel.name} for route {route_id}")
@@ -285,7 +305,7 @@ class RealTimeSimulator:
         bergen_stavanger.position.eta_next_waypoint = datetime.now() + timedelta(hours=1)
         
         with self._lock:
-            self.vessels['259001000'] = bergen_stavanger
+            self._register_vessel(bergen_stavanger)
         
         logger.info("Created fallback vessel: Bergen Explorer")
     
@@ -382,200 +402,161 @@ class RealTimeSimulator:
                 logger.error(f"Error in simulation update loop: {e}")
                 time.sleep(5)  # Wait before retrying
     
-    def _update_vessels(self):
-        """Update all vessel positions."""
-        current_time = datetime.now()
-        
-        with self._lock:
-            for mmsi, vessel in list(self.vessels.items()):
-                try:
-                    self._update_vessel_position(vessel, current_time)
-                except Exception as e:
-                    logger.error(f"Error updating vessel {mmsi}: {e}")
-    
-    def _update_vessel_position(self, vessel: SimulatedVessel, current_time: datetime):
-        """Update a single vessel's position."""
-        if vessel.status == VesselStatus.DOCKED:
+    def _register_vessel(self, vessel: SimulatedVessel):
+        """Add a vessel and copy its kinematic state into the fleet arrays (caller holds the lock)."""
+        if vessel.mmsi in self._slots:
+            logger.warning(f"Vessel {vessel.mmsi} already simulated, keeping the existing one")
             return
-        
-        # Get current and next waypoint
-        current_wp_index = vessel.position.waypoint_index
-        if current_wp_index >= len(vessel.waypoints) - 1:
-            # Arrived at final destination
-            vessel.status = VesselStatus.ARRIVING
-            vessel.position.speed_knots = 0
-            vessel.current_speed_knots = 0
-            
-            # Mark final waypoint arrival
-            if vessel.waypoints[-1].actual_arrival is None:
-                vessel.waypoints[-1].actual_arrival = current_time
-            
-            return
-        
-        current_wp = vessel.waypoints[current_wp_index]
-        next_wp = vessel.waypoints[current_wp_index + 1]
-        
-        # Calculate bearing to next waypoint
-        target_bearing = self._calculate_bearing(
-            vessel.position.lat, vessel.position.lon,
-            next_wp.lat, next_wp.lon
-        )
-        
-        # Gradually adjust heading toward target
-        heading_diff = target_bearing - vessel.position.heading
-        if abs(heading_diff) > 180:
-            heading_diff = heading_diff - 360 if heading_diff > 0 else heading_diff + 360
-        
-        # Adjust heading (max 5 degrees per update)
-        max_heading_change = 5.0
-        heading_change = max(-max_heading_change, min(max_heading_change, heading_diff))
-        vessel.position.heading = (vessel.position.heading + heading_change) % 360
-        
-        # Calculate movement
-        speed_ms = vessel.position.speed_knots * 0.514444  # knots to m/s
-        time_elapsed = self.update_interval / 3600  # hours
-        
-        # Calculate distance moved this update
-        distance_moved_nm = vessel.position.speed_knots * time_elapsed
-        
-        # Update vessel's traveled distance
-        vessel.distance_traveled_nm += distance_moved_nm
-        
-        # Update position (simplified great circle movement)
-        lat_rad = math.radians(vessel.position.lat)
-        lon_rad = math.radians(vessel.position.lon)
-        
-        distance_rad = distance_moved_nm / 3440.065  # Convert NM to radians
-        
-        new_lat_rad = math.asin(
-            math.sin(lat_rad) * math.cos(distance_rad) +
-            math.cos(lat_rad) * math.sin(distance_rad) * math.cos(math.radians(vessel.position.heading))
-        )
-        
-        new_lon_rad = lon_rad + math.atan2(
-            math.sin(math.radians(vessel.position.heading)) * math.sin(distance_rad) * math.cos(lat_rad),
-            math.cos(distance_rad) - math.sin(lat_rad) * math.sin(new_lat_rad)
-        )
-        
-        vessel.position.lat = math.degrees(new_lat_rad)
-        vessel.position.lon = math.degrees(new_lon_rad)
-        vessel.position.timestamp = current_time
-        
-        # Update distance to next waypoint
-        distance_to_next = self._calculate_distance(
-            vessel.position.lat, vessel.position.lon,
-            next_wp.lat, next_wp.lon
+        slot = self.fleet.add_vessel(
+            lat=vessel.position.lat,
+            lon=vessel.position.lon,
+            heading=vessel.position.heading,
+            speed=vessel.position.speed_knots,
+            max_speed=vessel.max_speed_knots,
+            waypoints=[(wp.lat, wp.lon) for wp in vessel.waypoints],
+            status=_STATUS_CODES[vessel.status],
+            timestamp=vessel.position.timestamp.timestamp(),
+            wp_index=vessel.position.waypoint_index,
+            dist_to_next=vessel.position.distance_to_next_waypoint_nm,
+            traveled=vessel.distance_traveled_nm,
+            total_distance=vessel.total_distance_nm,
+            progress=vessel.progress_percentage
         )
-        vessel.position.distance_to_next_waypoint_nm = distance_to_next
-        
-        # Update ETA for next waypoint
-        if vessel.position.speed_knots > 0:
-            hours_to_next = distance_to_next / vessel.position.speed_knots
-            vessel.position.eta_next_waypoint = current_time + timedelta(hours=hours_to_next)
-        
-        # Check if we've reached the next waypoint
-        waypoint_radius_nm = 0.5  # Consider reached if within 0.5 NM
-        if distance_to_next <= waypoint_radius_nm:
-            # Mark current waypoint departure
-            current_wp.departure = current_time
-            
-            # Mark next waypoint arrival
-            next_wp.actual_arrival = current_time
-            
-            # Move to next waypoint
-            vessel.position.waypoint_index += 1
-            
-            # If there's another waypoint after this, update distance
-            if vessel.position.waypoint_index < len(vessel.waypoints) - 1:
-                next_next_wp = vessel.waypoints[vessel.position.waypoint_index + 1]
-                next_distance = self._calculate_distance(
-                    next_wp.lat, next_wp.lon,
-                    next_next_wp.lat, next_next_wp.lon
-                )
-                vessel.position.distance_to_next_waypoint_nm = next_distance
-            
-            logger.info(f"Vessel {vessel.name} reached waypoint {next_wp.name}")
-        
-        # Update progress percentage
-        if vessel.total_distance_nm > 0:
-            vessel.progress_percentage = min(100.0, (vessel.distance_traveled_nm / vessel.total_distance_nm) * 100)
-        
-        # Update vessel status based on progress
-        if vessel.progress_percentage >= 95:
-            vessel.status = VesselStatus.ARRIVING
-        elif vessel.progress_percentage > 0:
-            vessel.status = VesselStatus.UNDERWAY
-    
+        self.vessels[vessel.mmsi] = vessel
+        self._slots[vessel.mmsi] = slot
+        self._slot_mmsi.append(vessel.mmsi)
+        self._alert_history.append(deque(maxlen=MAX_ALERTS_PER_VESSEL))
+
+    def _update_vessels(self):
+        """Advance every vessel one tick with the vectorized fleet kernel."""
+        with self._lock:
+            arrived = step_fleet(self.fleet, self.update_interval, time.time())
+            for slot in arrived:
+                vessel = self.vessels[self._slot_mmsi[slot]]
+                local_index = int(self.fleet.wp_index[slot] - self.fleet.wp_first[slot])
+                logger.info(f"Vessel {vessel.name} reached waypoint {vessel.waypoints[local_index].name}")
+
+    def _sync_vessel(self, vessel: SimulatedVessel):
+        """Copy the fleet arrays back into the vessel's dataclasses before serialization."""
+        fleet = self.fleet
+        slot = self._slots[vessel.mmsi]
+        position = vessel.position
+
+        position.lat = float(fleet.lat[slot])
+        position.lon = float(fleet.lon[slot])
+        position.heading = float(fleet.heading[slot])
+        position.speed_knots = float(fleet.speed[slot])
+        position.timestamp = datetime.fromtimestamp(fleet.timestamp[slot])
+        position.waypoint_index = int(fleet.wp_index[slot] - fleet.wp_first[slot])
+        position.distance_to_next_waypoint_nm = float(fleet.dist_to_next[slot])
+        if position.speed_knots > 0 and position.waypoint_index < len(vessel.waypoints) - 1:
+            position.eta_next_waypoint = position.timestamp + timedelta(
+                hours=position.distance_to_next_waypoint_nm / position.speed_knots)
+
+        vessel.current_speed_knots = position.speed_knots
+        vessel.status = _STATUSES[fleet.status[slot]]
+        vessel.distance_traveled_nm = float(fleet.traveled[slot])
+        vessel.progress_percentage = float(fleet.progress[slot])
+
+        first = int(fleet.wp_first[slot])
+        for wp, arrival, departure in zip(vessel.waypoints,
+                                          fleet.wp_arrival[first:first + len(vessel.waypoints)],
+                                          fleet.wp_departure[first:first + len(vessel.waypoints)]):
+            if not np.isnan(arrival):
+                wp.actual_arrival = datetime.fromtimestamp(arrival)
+            if not np.isnan(departure):
+                wp.departure = datetime.fromtimestamp(departure)
+
+        cutoff = time.time() - ALERT_MAX_AGE_SECONDS
+        vessel.alerts = [alert for created, alert in self._alert_history[slot] if created >= cutoff]
+
     def _generate_alerts(self):
-        """Generate alerts for vessels."""
-        current_time = datetime.now()
-        
+        """Generate alerts for vessels; the trigger conditions are evaluated for the whole fleet at once."""
+        now = time.time()
+        current_time = datetime.fromtimestamp(now)
+        timestamp = current_time.isoformat()
+
         with self._lock:
-            for vessel in self.vessels.values():
-                if vessel.status in [VesselStatus.DOCKED, VesselStatus.EMERGENCY]:
-                    continue
-                
-                # Clear old alerts (older than 1 hour)
-                vessel.alerts = [a for a in vessel.alerts 
-                               if current_time - datetime.fromisoformat(a['timestamp'].replace('Z', '+00:00')) < timedelta(hours=1)]
-                
-                # Generate new alerts
-                new_alerts = []
-                
+            fleet = self.fleet
+            n = fleet.size
+            if n == 0:
+                return
+            status = fleet.status[:n]
+            speed = fleet.speed[:n]
+            dist_to_next = fleet.dist_to_next[:n]
+            progress = fleet.progress[:n]
+
+            active = (status != _STATUS_CODES[VesselStatus.DOCKED]) & (status != _STATUS_CODES[VesselStatus.EMERGENCY])
+            speed_alert = active & (speed > fleet.max_speed[:n] * 0.9)
+            approach_alert = active & (dist_to_next < 2.0)
+            progress_alert = active & (progress > 0) & (progress % 25 < 1)
+
+            cutoff = now - ALERT_MAX_AGE_SECONDS
+            for slot in np.flatnonzero(speed_alert | approach_alert | progress_alert):
+                vessel = self.vessels[self._slot_mmsi[slot]]
+                history = self._alert_history[slot]
+                while history and history[0][0] < cutoff:
+                    history.popleft()
+
                 # Speed alert
-                if vessel.position.speed_knots > vessel.max_speed_knots * 0.9:
-                    new_alerts.append({
+                if speed_alert[slot]:
+                    history.append((now, {
                         'type': 'SPEED_WARNING',
                         'level': AlertLevel.WARNING.value,
-                        'message': f"High speed: {vessel.position.speed_knots:.1f} knots",
-                        'timestamp': current_time.isoformat(),
+                        'message': f"High speed: {speed[slot]:.1f} knots",
+                        'timestamp': timestamp,
                         'details': {
-                            'current_speed': vessel.position.speed_knots,
+                            'current_speed': float(speed[slot]),
                             'max_speed': vessel.max_speed_knots
                         }
-                    })
-                
+                    }))
+
                 # Proximity to waypoint alert
-                if vessel.position.distance_to_next_waypoint_nm < 2.0:
-                    next_wp = vessel.waypoints[min(vessel.position.waypoint_index + 1, len(vessel.waypoints) - 1)]
-                    new_alerts.append({
+                if approach_alert[slot]:
+                    next_index = min(int(fleet.wp_index[slot] + 1), int(fleet.wp_last[slot])) - int(fleet.wp_first[slot])
+                    next_wp = vessel.waypoints[next_index]
+                    history.append((now, {
                         'type': 'WAYPOINT_APPROACH',
                         'level': AlertLevel.INFO.value,
-                        'message': f"Approaching {next_wp.name} ({vessel.position.distance_to_next_waypoint_nm:.1f} NM)",
-                        'timestamp': current_time.isoformat(),
+                        'message': f"Approaching {next_wp.name} ({dist_to_next[slot]:.1f} NM)",
+                        'timestamp': timestamp,
                         'details': {
                             'waypoint': next_wp.name,
-                            'distance_nm': vessel.position.distance_to_next_waypoint_nm
+                            'distance_nm': float(dist_to_next[slot])
                         }
-                    })
-                
+                    }))
+
                 # Progress alert
-                if vessel.progress_percentage > 0 and vessel.progress_percentage % 25 < 1:
-                    new_alerts.append({
+                if progress_alert[slot]:
+                    history.append((now, {
                         'type': 'PROGRESS_UPDATE',
                         'level': AlertLevel.INFO.value,
-                        'message': f"Progress: {vessel.progress_percentage:.1f}% complete",
-                        'timestamp': current_time.isoformat(),
+                        'message': f"Progress: {progress[slot]:.1f}% complete",
+                        'timestamp': timestamp,
                         'details': {
-                            'progress': vessel.progress_percentage,
-                            'distance_traveled': vessel.distance_traveled_nm,
+                            'progress': float(progress[slot]),
+                            'distance_traveled': float(fleet.traveled[slot]),
                             'total_distance': vessel.total_distance_nm
                         }
-                    })
-                
-                # Add new alerts
-                vessel.alerts.extend(new_alerts)
+                    }))
     
     def get_all_vessels(self) -> List[Dict]:
         """Get all simulated vessels."""
         with self._lock:
-            return [vessel.to_dict() for vessel in self.vessels.values()]
+            result = []
+            for vessel in self.vessels.values():
+                self._sync_vessel(vessel)
+                result.append(vessel.to_dict())
+            return result
     
     def get_vessel(self, mmsi: str) -> Optional[Dict]:
         """Get a specific vessel by MMSI."""
         with self._lock:
             vessel = self.vessels.get(mmsi)
-            return vessel.to_dict() if vessel else None
+            if not vessel:
+                return None
+            self._sync_vessel(vessel)
+            return vessel.to_dict()
     
     def create_vessel(self, route_name: str, origin: str, destination: str) -> Optional[Dict]:
         """Create a new simulated vessel for a route."""
@@ -613,6 +594,7 @@ class RealTimeSimulator:
             if vessel:
                 vessel.current_speed_knots = max(0, min(speed_knots, vessel.max_speed_knots))
                 vessel.position.speed_knots = vessel.current_speed_knots
+                self.fleet.speed[self._slots[mmsi]] = vessel.current_speed_knots
                 return True
             return False
     
@@ -620,8 +602,9 @@ class RealTimeSimulator:
         """Get overall simulation status."""
         with self._lock:
             vessels_count = len(self.vessels)
-            active_vessels = sum(1 for v in self.vessels.values() 
-                               if v.status not in [VesselStatus.DOCKED, VesselStatus.EMERGENCY])
+            status = self.fleet.status[:self.fleet.size]
+            active_vessels = int(np.count_nonzero(
+                (status != _STATUS_CODES[VesselStatus.DOCKED]) & (status != _STATUS_CODES[VesselStatus.EMERGENCY])))
             
             return {
                 'timestamp': datetime.now().isoformat(),
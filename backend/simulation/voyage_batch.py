@@ -0,0 +1,387 @@
+"""
+Headless batch voyage simulation for planning what-if runs.
+Runs many voyages of one route to arrival on a simulated clock (no sleeps,
+no wall-clock reads), looks weather up in a pre-fetched time-indexed grid and
+returns the position, weather, risk and alert timelines as NumPy arrays.
+
+Ship motion follows IntegratedShipSimulator._update_position (turn toward
+the current waypoint, flat-earth step, 0.5 nm arrival radius), vectorized
+across voyages: one loop iteration advances every voyage by one tick.
+"""
+
+import logging
+import math
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.simulation.fleet_kernel import bearing_deg, haversine_nm
+
+logger = logging.getLogger(__name__)
+
+ARRIVAL_RADIUS_NM = 0.5
+TURN_RATE_DEG_PER_SECOND = 10.0
+DEFAULT_TICK_SECONDS = 30.0
+DEFAULT_MAX_HOURS = 72.0
+
+# Severity codes of the risk_level timeline (RiskEngine.RISK_LEVEL_CODES)
+RISK_LEVELS = {'LOW': 1, 'MEDIUM': 2, 'HIGH': 3}
+
+
+class WeatherTimeGrid:
+    """
+    Pre-fetched weather on grid cells, indexed by time.
+
+    Each variable is a (cells, times) array. Lookups snap positions to the
+    grid cell (same quantization as the shared WeatherCache) and times to
+    the nearest forecast step; positions outside every fetched cell use the
+    nearest fetched cell.
+    """
+
+    VARIABLES = ('wind_speed', 'wind_direction', 'wave_height', 'air_temperature')
+
+    def __init__(self, cell_lats: Sequence[float], cell_lons: Sequence[float],
+                 times: Sequence[float], values: Dict[str, np.ndarray], grid_deg: float):
+        self.cell_lats = np.asarray(cell_lats, dtype=float)
+        self.cell_lons = np.asarray(cell_lons, dtype=float)
+        self.times = np.asarray(times, dtype=float)
+        self.grid_deg = grid_deg
+        shape = (len(self.cell_lats), len(self.times))
+        self.values = {name: np.asarray(values[name], dtype=float) if name in values else np.full(shape, np.nan)
+                       for name in self.VARIABLES}
+        self._cell_index = {self._cell_key(lat, lon): i
+                            for i, (lat, lon) in enumerate(zip(self.cell_lats, self.cell_lons))}
+
+    def __len__(self) -> int:
+        return len(self.cell_lats)
+
+    def _cell_key(self, lat: float, lon: float) -> Tuple[int, int]:
+        return (int(math.floor(lat / self.grid_deg)), int(math.floor(lon / self.grid_deg)))
+
+    @classmethod
+    def from_forecasts(cls, forecasts: Iterable[Tuple[float, float, Dict]], grid_deg: float) -> 'WeatherTimeGrid':
+        """
+        Build from raw MET Locationforecast documents.
+
+        Args:
+            forecasts: (lat, lon, document) per grid cell
+            grid_deg: Grid cell size in degrees
+
+        Returns:
+            WeatherTimeGrid on the union of all forecast times
+        """
+        cells = []
+        for lat, lon, document in forecasts:
+            series = {name: [] for name in cls.VARIABLES}
+            times = []
+            for step in (document or {}).get('properties', {}).get('timeseries', []):
+                details = step.get('data', {}).get('instant', {}).get('details', {})
+                times.append(datetime.fromisoformat(step['time'].replace('Z', '+00:00')).timestamp())
+                series['wind_speed'].append(details.get('wind_speed', np.nan))
+                series['wind_direction'].append(details.get('wind_from_direction', np.nan))
+                series['wave_height'].append(details.get('sea_surface_wave_height', np.nan))
+                series['air_temperature'].append(details.get('air_temperature', np.nan))
+            if times:
+                cells.append((lat, lon, np.array(times), series))
+
+        if not cells:
+            return cls([], [], [], {}, grid_deg)
+
+        axis = np.unique(np.concatenate([times for _, _, times, _ in cells]))
+        values = {name: np.empty((len(cells), len(axis))) for name in cls.VARIABLES}
+        for i, (_, _, times, series) in enumerate(cells):
+            # Each cell's own steps, carried to the nearest common step
+            index = _nearest_index(times, axis)
+            for name in cls.VARIABLES:
+                values[name][i] = np.asarray(series[name], dtype=float)[index]
+        return cls([c[0] for c in cells], [c[1] for c in cells], axis, values, grid_deg)
+
+    @classmethod
+    def prefetch(cls, waypoints: Sequence[Sequence[float]], grid_deg: Optional[float] = None,
+                 get_forecast: Optional[Callable[[float, float], Optional[Dict]]] = None) -> 'WeatherTimeGrid':
+        """
+        Fetch the forecast for every grid cell the route passes through.
+
+        Args:
+            waypoints: [lat, lon] pairs of the route
+            grid_deg: Cell size; defaults to the shared weather cache grid
+            get_forecast: (lat, lon) -> MET document; defaults to weather_cache.get_forecast
+        """
+        if grid_deg is None or get_forecast is None:
+            from backend.services.weather_service import weather_cache
+            grid_deg = grid_deg or weather_cache.grid_deg
+            get_forecast = get_forecast or weather_cache.get_forecast
+
+        cells = {}
+        for (lat1, lon1), (lat2, lon2) in zip(waypoints[:-1], waypoints[1:]):
+            # Sample each leg at half a cell so no crossed cell is skipped
+            steps = max(1, int(math.ceil(max(abs(lat2 - lat1), abs(lon2 - lon1)) / (grid_deg / 2))))
+            for k in range(steps + 1):
+                lat = lat1 + (lat2 - lat1) * k / steps
+                lon = lon1 + (lon2 - lon1) * k / steps
+                key = (int(math.floor(lat / grid_deg)), int(math.floor(lon / grid_deg)))
+                cells.setdefault(key, ((key[0] + 0.5) * grid_deg, (key[1] + 0.5) * grid_deg))
+
+        forecasts = [(lat, lon, get_forecast(lat, lon)) for lat, lon in cells.values()]
+        grid = cls.from_forecasts(forecasts, grid_deg)
+        logger.info(f"🌦️ Weather grid prefetched: {len(grid)}/{len(cells)} cells, {len(grid.times)} time steps")
+        return grid
+
+    def cell_indices(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        """Grid cell row for each position."""
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        if len(lats) == 0:
+            return np.empty(0, dtype=np.int64)
+        ci = np.floor(lats / self.grid_deg).astype(np.int64)
+        cj = np.floor(lons / self.grid_deg).astype(np.int64)
+        # One int64 per cell so np.unique sorts a flat array
+        unique, inverse = np.unique((ci << 32) + (cj + (1 << 31)), return_inverse=True)
+        mapped = np.array([self._cell_index.get((int(key >> 32), int((key & 0xFFFFFFFF) - (1 << 31))), -1)
+                           for key in unique], dtype=np.int64)
+        rows = mapped[inverse.reshape(-1)]
+
+        # Positions off the fetched corridor: nearest fetched cell (equirectangular)
+        missing = np.flatnonzero(rows < 0)
+        for chunk in np.array_split(missing, max(1, len(missing) * len(self) // 4_000_000 + 1)):
+            if len(chunk) == 0:
+                continue
+            cos_lat = np.cos(np.radians(lats[chunk]))[:, None]
+            d2 = ((lats[chunk, None] - self.cell_lats[None, :]) ** 2
+                  + ((lons[chunk, None] - self.cell_lons[None, :]) * cos_lat) ** 2)
+            rows[chunk] = np.argmin(d2, axis=1)
+        return rows
+
+    def sample(self, lats, lons, times) -> Dict[str, np.ndarray]:
+        """
+        Weather at each (lat, lon, epoch seconds) point.
+
+        Returns:
+            Variable name -> array aligned with the inputs (NaN when the grid is empty)
+        """
+        lats = np.asarray(lats, dtype=float)
+        n = len(lats)
+        if len(self) == 0 or len(self.times) == 0:
+            return {name: np.full(n, np.nan) for name in self.VARIABLES}
+        rows = self.cell_indices(lats, lons)
+        columns = _nearest_index(self.times, np.broadcast_to(np.asarray(times, dtype=float), (n,)))
+        return {name: values[rows, columns] for name, values in self.values.items()}
+
+
+def _nearest_index(axis: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """Index of the nearest value in sorted axis for each point."""
+    index = np.clip(np.searchsorted(axis, points), 1, max(1, len(axis) - 1))
+    if len(axis) == 1:
+        return np.zeros(len(points), dtype=np.int64)
+    previous_closer = (points - axis[index - 1]) <= (axis[index] - points)
+    return np.where(previous_closer, index - 1, index)
+
+
+class VoyageBatchResult:
+    """
+    Timelines of a voyage batch. Every timeline array is (voyages, ticks);
+    entries after a voyage's arrival are NaN (float) or 0 (counts/levels).
+    """
+
+    def __init__(self, route_name: str, speeds: np.ndarray, departures: np.ndarray,
+                 tick_seconds: float, timelines: Dict[str, np.ndarray], arrival_tick: np.ndarray):
+        self.route_name = route_name
+        self.speeds = speeds
+        self.departures = departures
+        self.tick_seconds = tick_seconds
+        self.arrival_tick = arrival_tick
+        self.timelines = timelines
+        self.elapsed_ms = 0.0
+
+    def __getattr__(self, name):
+        timelines = self.__dict__.get('timelines', {})
+        if name in timelines:
+            return timelines[name]
+        raise AttributeError(name)
+
+    @property
+    def arrived(self) -> np.ndarray:
+        return self.arrival_tick >= 0
+
+    @property
+    def duration_hours(self) -> np.ndarray:
+        ticks = np.where(self.arrived, self.arrival_tick, np.nan)
+        return ticks * self.tick_seconds / 3600.0
+
+    def summary(self) -> List[Dict]:
+        """One JSON-friendly row per voyage."""
+        rows = []
+        duration = self.duration_hours
+        for v in range(len(self.speeds)):
+            valid = self.valid[v]
+            arrived = bool(self.arrived[v])
+            rows.append({
+                'speed_knots': float(self.speeds[v]),
+                'departure': datetime.fromtimestamp(self.departures[v], timezone.utc).isoformat(),
+                'arrived': arrived,
+                'arrival': (datetime.fromtimestamp(self.departures[v] + duration[v] * 3600, timezone.utc).isoformat()
+                            if arrived else None),
+                'duration_hours': round(float(duration[v]), 2) if arrived else None,
+                'distance_nm': round(float(np.nansum(self.distance_nm[v])), 1),
+                'max_risk_level': int(self.risk_level[v].max()) if valid.any() else 0,
+                'high_risk_hours': round(float((self.risk_level[v] == RISK_LEVELS['HIGH']).sum())
+                                         * self.tick_seconds / 3600.0, 2),
+                'alert_count': int(self.alert_count[v].sum()),
+                'max_wind_speed': (round(float(np.nanmax(self.wind_speed[v])), 1)
+                                   if np.isfinite(self.wind_speed[v]).any() else None),
+            })
+        return rows
+
+    def to_dict(self) -> Dict:
+        return {
+            'route_name': self.route_name,
+            'voyages': len(self.speeds),
+            'tick_seconds': self.tick_seconds,
+            'ticks': int(self.valid.shape[1]),
+            'elapsed_ms': round(self.elapsed_ms, 1),
+            'summary': self.summary(),
+        }
+
+
+def simulate_voyages(waypoints: Sequence[Sequence[float]], speeds_knots: Sequence[float],
+                     departure_times: Sequence[float], weather: Optional[WeatherTimeGrid] = None,
+                     tick_seconds: float = DEFAULT_TICK_SECONDS, max_hours: float = DEFAULT_MAX_HOURS,
+                     vessel: Optional[Dict] = None, risk_engine=None, alerts_service=None,
+                     route_name: str = '') -> VoyageBatchResult:
+    """
+    Simulate one voyage per (speed, departure) pair along the same route.
+
+    Args:
+        waypoints: [lat, lon] pairs; the first one is the departure point
+        speeds_knots: Constant speed per voyage
+        departure_times: Departure epoch seconds per voyage (broadcast with speeds)
+        weather: Pre-fetched weather; None runs without weather
+        tick_seconds: Simulated seconds per tick (the turn limit scales with it)
+        max_hours: Voyages not arrived by then stop
+        vessel: 'mmsi', 'name', 'type', 'draught', 'length' for the risk/alert checks
+        risk_engine: RiskEngine (assess_fleet_levels) or None to skip risk timelines
+        alerts_service: MaritimeAlertsService (screen_track) or None to skip alerts
+
+    Returns:
+        VoyageBatchResult
+    """
+    start = time.perf_counter()
+    route = np.asarray(waypoints, dtype=float).reshape(-1, 2)
+    speeds, departures = np.broadcast_arrays(np.asarray(speeds_knots, dtype=float),
+                                             np.asarray(departure_times, dtype=float))
+    speeds = speeds.astype(float).ravel()
+    departures = departures.astype(float).ravel()
+    n_voyages = len(speeds)
+    vessel = vessel or {}
+
+    lat = np.full(n_voyages, route[0, 0])
+    lon = np.full(n_voyages, route[0, 1])
+    heading = np.zeros(n_voyages)
+    target = np.zeros(n_voyages, dtype=np.int64)
+    active = np.full(n_voyages, len(route) > 0)
+    arrival_tick = np.full(n_voyages, -1, dtype=np.int64)
+    max_turn = TURN_RATE_DEG_PER_SECOND * tick_seconds
+    step_deg = speeds * tick_seconds / 3600.0 / 60.0  # 1 nm ~ 1/60 degree, as in _update_position
+
+    record = {name: [] for name in ('lat', 'lon', 'heading', 'waypoint_index', 'valid')}
+    max_ticks = int(max_hours * 3600 / tick_seconds)
+    tick = 0
+    while active.any() and tick < max_ticks:
+        record['lat'].append(lat.copy())
+        record['lon'].append(lon.copy())
+        record['heading'].append(heading.copy())
+        record['waypoint_index'].append(target.copy())
+        record['valid'].append(active.copy())
+
+        idx = np.flatnonzero(active)
+        t_lat, t_lon = route[target[idx], 0], route[target[idx], 1]
+        c_lat, c_lon = lat[idx], lon[idx]
+
+        bearing = bearing_deg(c_lat, c_lon, t_lat, t_lon)
+        heading_diff = (bearing - heading[idx]) % 360
+        heading_diff = np.where(heading_diff > 180, heading_diff - 360, heading_diff)
+        new_heading = (heading[idx] + np.clip(heading_diff, -max_turn, max_turn)) % 360
+        heading_rad = np.radians(new_heading)
+        lat[idx] = c_lat + step_deg[idx] * np.cos(heading_rad)
+        lon[idx] = c_lon + step_deg[idx] * np.sin(heading_rad) / np.cos(np.radians(c_lat))
+        heading[idx] = new_heading
+
+        # Arrival is judged from the position before the move, like _update_position
+        reached = haversine_nm(c_lat, c_lon, t_lat, t_lon) < ARRIVAL_RADIUS_NM
+        target[idx[reached]] += 1
+        finished = idx[reached & (target[idx] >= len(route))]
+        active[finished] = False
+        arrival_tick[finished] = tick + 1
+        tick += 1
+
+    if active.any():
+        logger.warning(f"⚠️ {int(active.sum())} voyage(s) did not arrive within {max_hours} h")
+
+    timelines = {name: np.stack(values, axis=1) if values else np.empty((n_voyages, 0))
+                 for name, values in record.items()}
+    valid = timelines['valid'].astype(bool)
+    timelines['valid'] = valid
+    n_ticks = valid.shape[1]
+    times = departures[:, None] + np.arange(n_ticks)[None, :] * tick_seconds
+    timelines['time'] = np.where(valid, times, np.nan)
+    for name in ('lat', 'lon', 'heading'):
+        timelines[name] = np.where(valid, timelines[name], np.nan)
+    timelines['speed'] = np.where(valid, speeds[:, None], np.nan)
+    timelines['distance_nm'] = np.where(valid, (speeds * tick_seconds / 3600.0)[:, None], np.nan)
+
+    # Weather, risks and alerts for every valid point in one vectorized pass each
+    points = np.flatnonzero(valid.ravel())
+    p_lat = timelines['lat'].ravel()[points]
+    p_lon = timelines['lon'].ravel()[points]
+    p_time = times.ravel()[points]
+    p_speed = timelines['speed'].ravel()[points]
+    p_hour = ((p_time // 3600) % 24).astype(int)
+
+    sampled = (weather.sample(p_lat, p_lon, p_time) if weather is not None
+               else {name: np.full(len(points), np.nan) for name in WeatherTimeGrid.VARIABLES})
+    for name, values in sampled.items():
+        timelines[name] = _scatter(values, points, valid.shape, np.nan)
+
+    risk_level = np.zeros(len(points), dtype=np.int8)
+    risk_count = np.zeros(len(points), dtype=np.int16)
+    if risk_engine is not None and len(points):
+        levels = risk_engine.assess_fleet_levels(
+            {'lat': p_lat, 'lon': p_lon, 'speed': p_speed,
+             'draught': np.full(len(points), vessel.get('draught', 5.0)),
+             'length': np.full(len(points), vessel.get('length', 100.0)),
+             'type': [vessel.get('type', '')] * len(points)},
+            weather_grid={'wind_speed': sampled['wind_speed'], 'wave_height': sampled['wave_height']}
+            if weather is not None else None,
+            hours=p_hour)
+        risk_level = levels.pop('level')
+        risk_count = levels.pop('count')
+        for risk_type, mask in levels.items():
+            timelines[f'risk_{risk_type.lower()}'] = _scatter(mask, points, valid.shape, False)
+    timelines['risk_level'] = _scatter(risk_level, points, valid.shape, 0)
+    timelines['risk_count'] = _scatter(risk_count, points, valid.shape, 0)
+
+    alert_count = np.zeros(len(points), dtype=np.int16)
+    if alerts_service is not None and len(points):
+        screened = alerts_service.screen_track(p_lat, p_lon, p_speed, vessel.get('type', 'unknown'),
+                                               sampled['wind_speed'], sampled['wave_height'], hours=p_hour)
+        alert_count = screened.pop('count')
+        for name, mask in screened.items():
+            timelines[f'alert_{name}'] = _scatter(mask, points, valid.shape, False)
+    timelines['alert_count'] = _scatter(alert_count, points, valid.shape, 0)
+
+    result = VoyageBatchResult(route_name, speeds, departures, tick_seconds, timelines, arrival_tick)
+    result.elapsed_ms = (time.perf_counter() - start) * 1000
+    logger.info(f"🧪 Batch simulated {n_voyages} voyage(s), {n_ticks} ticks of {tick_seconds:g} s "
+                f"in {result.elapsed_ms:.0f} ms")
+    return result
+
+
+def _scatter(values: np.ndarray, points: np.ndarray, shape: Tuple[int, int], fill) -> np.ndarray:
+    values = np.asarray(values)
+    dtype = values.dtype if values.dtype != object else float
+    out = np.full(shape[0] * shape[1], fill, dtype=dtype)
+    out[points] = values
+    return out.reshape(shape)
+
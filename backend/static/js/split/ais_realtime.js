@@ -12,6 +12,9 @@ window.aisManager = {
     isUpdating: false,
     lastUpdateTime: null,
     updateLock: false, // Prevents concurrent API calls
+    feedSource: null,     // EventSource on /maritime/api/vessels/stream
+    feedVessels: new Map(), // mmsi -> vessel, maintained from snapshot + delta events
+    feedRenderPending: false,
     
     /**
      * Initialize AIS real-time monitoring - SECURE VERSION
@@ -58,9 +61,12 @@ window.aisManager = {
         // Initial load
         this.fetchRealTimeVessels();
         
+        // Push feed when the browser supports it; polling only while it is down
+        this.startLiveFeed();
+        
         // Set up periodic updates (every 2 minutes)
         this.updateInterval = setInterval(() => {
-            if (this.shouldUpdate()) {
+            if (this.shouldUpdate() && !this.isFeedOpen()) {
                 this.fetchRealTimeVessels();
             }
         }, 120000);
@@ -68,6 +74,86 @@ window.aisManager = {
         return this;
     },
     
+    /**
+     * Subscribe to live vessel deltas for the visible map area (Server-Sent Events)
+     */
+    startLiveFeed: function() {
+        if (!window.EventSource) return;
+        
+        if (this.feedSource) this.feedSource.close();
+        this.feedVessels.clear();
+        
+        let url = '/maritime/api/vessels/stream';
+        if (window.map) {
+            url += `?bbox=${window.map.getBounds().pad(0.2).toBBoxString()}`;
+            // New area needs a new snapshot; reconnect once the map settles
+            if (!this.feedMoveHandler) {
+                this.feedMoveHandler = () => {
+                    clearTimeout(this.feedMoveTimer);
+                    this.feedMoveTimer = setTimeout(() => this.startLiveFeed(), 1000);
+                };
+                window.map.on('moveend', this.feedMoveHandler);
+            }
+        }
+        
+        const source = new EventSource(url);
+        source.addEventListener('snapshot', (event) => this.applyFeedEvent(JSON.parse(event.data)));
+        source.addEventListener('delta', (event) => this.applyFeedEvent(JSON.parse(event.data)));
+        source.onerror = () => {
+            // EventSource reconnects by itself (resuming from Last-Event-ID) unless closed
+            if (source.readyState === EventSource.CLOSED) {
+                console.warn('⚠️ Live vessel feed closed, back to polling');
+                this.feedSource = null;
+            }
+        };
+        this.feedSource = source;
+        console.log('📡 Live vessel feed subscribed');
+    },
+    
+    isFeedOpen: function() {
+        return this.feedSource !== null && this.feedSource.readyState === EventSource.OPEN;
+    },
+    
+    /**
+     * Merge one snapshot/delta event into the vessel map
+     * Rows are [mmsi, lat, lon, sog, cog, heading, epoch]; name/type arrive in 'static'
+     */
+    applyFeedEvent: function(payload) {
+        if (payload.reset) this.feedVessels.clear();
+        
+        payload.removed.forEach(mmsi => this.feedVessels.delete(mmsi));
+        payload.rows.forEach(([mmsi, lat, lon, sog, cog, heading, t]) => {
+            const vessel = this.feedVessels.get(mmsi) || { mmsi: mmsi, source: 'live_feed' };
+            vessel.latitude = lat;
+            vessel.longitude = lon;
+            vessel.speed = sog || 0;
+            vessel.course = cog || 0;
+            vessel.heading = heading === null ? vessel.course : heading;
+            vessel.timestamp = new Date(t * 1000).toISOString();
+            this.feedVessels.set(mmsi, vessel);
+        });
+        Object.entries(payload.static).forEach(([mmsi, [name, type]]) => {
+            const vessel = this.feedVessels.get(mmsi);
+            if (!vessel) return;
+            vessel.name = name || `MMSI ${mmsi}`;
+            vessel.type = type;
+            vessel.ship_type = type;
+        });
+        
+        // One redraw per animation frame however many events arrive
+        if (this.feedRenderPending || this.feedVessels.size === 0) return;
+        this.feedRenderPending = true;
+        requestAnimationFrame(() => {
+            this.feedRenderPending = false;
+            const vessels = this.applyBergenPriority(Array.from(this.feedVessels.values()));
+            this.realtimeVessels = vessels;
+            this.updateVesselDisplay();
+            this.updateUICounters(vessels);
+            this.updateAPIStatus('live_feed', true);
+            this.lastUpdateTime = new Date();
+        });
+    },
+    
     /**
      * Check if we should update
      */
@@ -365,6 +451,7 @@ window.aisManager = {
         
         const sourceMap = {
             'kystverket': { text: 'Kystverket Live', class: 'success' },
+            'live_feed': { text: 'Live AIS Feed', class: 'success' },
             'barentswatch': { text: 'BarentsWatch Live', class: 'success' },
             'kystdatahuset': { text: 'Kystdatahuset', class: 'info' },
             'empirical_historical': { text: 'Empirical Historical (2023-2024)', class: 'warning' },
@@ -560,6 +647,15 @@ window.aisManager = {
             clearInterval(this.updateInterval);
             this.updateInterval = null;
         }
+        if (this.feedSource) {
+            this.feedSource.close();
+            this.feedSource = null;
+        }
+        if (this.feedMoveHandler && window.map) {
+            window.map.off('moveend', this.feedMoveHandler);
+            this.feedMoveHandler = null;
+        }
+        clearTimeout(this.feedMoveTimer);
     },
     
     /**
@@ -0,0 +1,154 @@
+"""
+Tests for the append-only AIS track store.
+Queries must return the appended reports (within quantisation) whether they
+are still buffered or already flushed to delta-encoded segments on disk.
+"""
+
+import json
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from backend.services.ais_track_store import AISTrackStore
+from backend.services.vessel_state_store import VesselStateStore
+
+T0 = 1_789_999_200.0  # Hour-aligned
+
+
+@pytest.fixture
+def reports():
+    rng = np.random.default_rng(14)
+    rows = []
+    for k in range(40):
+        lat, lon = rng.uniform(58.0, 70.0), rng.uniform(4.0, 30.0)
+        for step in range(120):
+            lat += rng.normal(0, 0.002)
+            lon += rng.normal(0, 0.004)
+            rows.append((257000000 + k, T0 + step * 60 + rng.uniform(0, 10), lat, lon,
+                         float(rng.uniform(0, 20)) if step % 7 else None, float(rng.uniform(0, 359.9))))
+    rng.shuffle(rows)
+    return rows
+
+
+def _expected(reports, keep):
+    rows = sorted((r for r in reports if keep(r)), key=lambda r: (r[0], r[1]))
+    return rows
+
+
+def test_track_and_bbox_queries_match_appended_reports(tmp_path, reports):
+    store = AISTrackStore(str(tmp_path), partition_seconds=1800, flush_rows=1000, flush_seconds=1e9,
+                          retention_hours=0)
+    for mmsi, t, lat, lon, sog, cog in reports:
+        assert store.append(mmsi, lat, lon, sog=sog, cog=cog, timestamp=t)
+    # Partly flushed (several segments per partition), the rest still buffered
+    status = store.get_store_status()
+    assert status['partitions'] == 4 and status['segments'] > 4 and status['buffered_rows'] > 0
+
+    t0, t1 = T0 + 1000, T0 + 5000
+    track = store.track(257000007, t0, t1)
+    expected = _expected(reports, lambda r: r[0] == 257000007 and t0 <= r[1] <= t1)
+    assert len(track['timestamp']) == len(expected)
+    assert np.allclose(track['timestamp'], [r[1] for r in expected], atol=1e-3)
+    assert np.allclose(track['lat'], [r[2] for r in expected], atol=1e-6)
+    assert np.allclose(track['lon'], [r[3] for r in expected], atol=1e-6)
+    assert np.array_equal(np.isnan(track['sog']), [r[4] is None for r in expected])
+    assert np.allclose(track['cog'], [r[5] for r in expected], atol=0.05)
+
+    store.flush()
+    box = (60.0, 5.0, 66.0, 20.0)
+    positions = store.positions_in_bbox(*box, t0, t1)
+    expected = _expected(reports, lambda r: (t0 <= r[1] <= t1 and box[0] <= r[2] <= box[2]
+                                             and box[1] <= r[3] <= box[3]))
+    assert positions['mmsi'].tolist() == [r[0] for r in expected]
+    assert np.allclose(positions['lat'], [r[2] for r in expected], atol=1e-6)
+
+
+def test_failed_partition_is_retried_without_duplicating_the_others(tmp_path, reports, monkeypatch):
+    store = AISTrackStore(str(tmp_path), partition_seconds=1800, flush_rows=10 ** 6, flush_seconds=1e9,
+                          retention_hours=0)
+    for mmsi, t, lat, lon, sog, cog in reports:
+        store.append(mmsi, lat, lon, sog=sog, cog=cog, timestamp=t)
+
+    write_segment = store._write_segment
+
+    def disk_full_for_third_partition(partition_start, columns, replaces=None):
+        if partition_start == int(T0) + 3600:
+            raise OSError(28, 'No space left on device')
+        write_segment(partition_start, columns, replaces)
+
+    monkeypatch.setattr(store, '_write_segment', disk_full_for_third_partition)
+    assert store.flush() == 3
+    failed_rows = len([r for r in reports if T0 + 3600 <= r[1] < T0 + 5400])
+    status = store.get_store_status()
+    assert status['buffered_rows'] == failed_rows and status['rows'] == len(reports) - failed_rows
+
+    monkeypatch.setattr(store, '_write_segment', write_segment)
+    assert store.flush() == 1
+    assert store.get_store_status()['rows'] == len(reports)
+    track = store.track(257000005, T0, T0 + 10 ** 5)
+    assert len(track['timestamp']) == len([r for r in reports if r[0] == 257000005])
+
+
+def test_maintenance_prunes_compacts_and_closes_segments(tmp_path, reports):
+    store = AISTrackStore(str(tmp_path), partition_seconds=1800, flush_rows=500, flush_seconds=1e9,
+                          retention_hours=0, maintenance_seconds=1e9, max_open_segments=4)
+    for mmsi, t, lat, lon, sog, cog in reports:
+        store.append(mmsi, lat, lon, sog=sog, cog=cog, timestamp=t)
+    store.flush()
+    status = store.get_store_status()
+    assert status['segments'] > 8 and status['open_segments'] == 4
+    before = store.positions_in_bbox(58.0, 4.0, 70.0, 30.0, T0 + 1800, T0 + 7200)
+
+    # One hour of retention at T0 + 1.5 h: the first partition is pruned, the
+    # next two are closed and merged into one segment each, the last is open
+    store.retention_hours = 1
+    assert store.maintain(now=T0 + 5400) == {'pruned': 1, 'compacted': 2}
+    assert all(path.startswith(os.path.join(str(tmp_path), str(int(T0) + 5400))) for path in store._segments)
+    status = store.get_store_status()
+    assert status['partitions'] == 3 and status['rows'] == len([r for r in reports if r[1] >= T0 + 1800])
+    assert len(os.listdir(os.path.join(tmp_path, str(int(T0) + 1800)))) == 1
+    assert len(os.listdir(os.path.join(tmp_path, str(int(T0) + 5400)))) > 1
+    after = store.positions_in_bbox(58.0, 4.0, 70.0, 30.0, T0 + 1800, T0 + 7200)
+    assert after['mmsi'].tolist() == before['mmsi'].tolist()
+    assert np.array_equal(after['timestamp'], before['timestamp'])
+    assert np.array_equal(np.isnan(after['sog']), np.isnan(before['sog']))
+
+    # Until its inputs are removed, a merged segment hides them from readers
+    partition = os.path.join(tmp_path, str(int(T0) + 1800))
+    merged = next(os.scandir(partition)).path
+    with open(os.path.join(merged, 'meta.json')) as f:
+        replaced = json.load(f)['replaces']
+    shutil.copytree(merged, os.path.join(partition, replaced[0]))
+    track = store.track(257000003, T0, T0 + 10 ** 5)
+    assert len(track['timestamp']) == len([r for r in reports if r[0] == 257000003 and r[1] >= T0 + 1800])
+
+
+def test_segments_are_delta_encoded_and_prunable(tmp_path, reports):
+    store = AISTrackStore(str(tmp_path), partition_seconds=3600, flush_rows=10 ** 6, retention_hours=0)
+    for mmsi, t, lat, lon, sog, cog in reports:
+        store.append(mmsi, lat, lon, sog=sog, cog=cog, timestamp=t)
+    assert store.flush() == 2
+
+    segment_dir = next(os.scandir(next(os.scandir(tmp_path)).path)).path
+    assert np.load(os.path.join(segment_dir, 'lat.npy')).dtype.itemsize <= 2
+    status = store.get_store_status()
+    assert status['rows'] == len(reports)
+    # Six float64 columns would take 48 bytes per row
+    assert status['bytes_per_row'] < 24
+
+    assert store.prune(before=T0 + 3600 * 10) == 2
+    assert len(store.track(257000001, T0, T0 + 10 ** 5)['timestamp']) == 0
+
+
+def test_state_store_records_only_new_reports(tmp_path):
+    tracks = AISTrackStore(str(tmp_path), flush_seconds=1e9, retention_hours=0)
+    store = VesselStateStore(ttl_seconds=1e9, track_store=tracks)
+
+    store.upsert('257000001', 60.0, 5.0, speed=10.0, timestamp=T0)
+    store.upsert('257000001', 60.0, 5.0, speed=10.0, timestamp=T0)  # same report, second source
+    store.upsert('257000001', 60.01, 5.0, speed=10.0, course=0.0, timestamp=T0 + 60)
+
+    track = tracks.track('257000001', T0, T0 + 60)
+    assert track['lat'].tolist() == pytest.approx([60.0, 60.01])
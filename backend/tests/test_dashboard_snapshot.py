@@ -0,0 +1,81 @@
+"""
+Tests for the versioned, background-refreshed dashboard snapshot.
+"""
+
+from backend.services.dashboard_snapshot import DashboardSnapshot, rtz_fingerprint
+
+
+def _snapshot(fingerprint, calls):
+    def build_routes():
+        calls['routes'] += 1
+        return {'route_count': calls['routes']}
+
+    def fetch_vessel():
+        calls['vessel'] += 1
+        return {'name': f"vessel-{calls['vessel']}"}
+
+    def fetch_weather():
+        calls['weather'] += 1
+        raise ConnectionError('MET Norway unavailable')
+
+    return DashboardSnapshot(
+        build_routes=build_routes,
+        fingerprint=lambda: fingerprint[0],
+        live_sources={'vessel': (fetch_vessel, 30), 'weather': (fetch_weather, 300)},
+        route_check_seconds=60,
+    )
+
+
+def test_parts_refresh_on_their_own_cadence():
+    fingerprint = ['a']
+    calls = {'routes': 0, 'vessel': 0, 'weather': 0}
+    snapshot = _snapshot(fingerprint, calls)
+
+    first = snapshot.get()
+    assert first['routes'] == {'route_count': 1}
+    assert first['live'] == {'vessel': {'name': 'vessel-1'}, 'weather': None}
+
+    # Reads never fetch once every part has a value
+    snapshot.get()
+    assert calls == {'routes': 1, 'vessel': 1, 'weather': 1}
+
+    snapshot.refresh_due(now=snapshot._live_updated['vessel'] + 31)
+    assert calls == {'routes': 1, 'vessel': 2, 'weather': 1}
+
+    # Route part rebuilt only when the RTZ fingerprint changes
+    snapshot.refresh_due(now=snapshot._route_checked_at + 61)
+    assert calls['routes'] == 1
+    fingerprint[0] = 'b'
+    version = snapshot.version
+    snapshot.refresh_due(now=snapshot._route_checked_at + 61)
+    assert calls['routes'] == 2
+    assert snapshot.get()['routes'] == {'route_count': 2}
+    assert snapshot.version > version
+
+
+def test_render_latency_percentiles():
+    snapshot = _snapshot(['a'], {'routes': 0, 'vessel': 0, 'weather': 0})
+    assert snapshot.get_metrics()['p50_ms'] is None
+
+    for ms in range(1, 101):
+        snapshot.record_render(float(ms))
+
+    metrics = snapshot.get_metrics()
+    assert metrics['renders'] == 100
+    assert metrics['p50_ms'] == 50.5
+    assert metrics['p99_ms'] == 99.01
+    assert metrics['max_ms'] == 100.0
+
+
+def test_rtz_fingerprint_tracks_route_files(tmp_path):
+    (tmp_path / 'bergen').mkdir()
+    route = tmp_path / 'bergen' / 'route.rtz'
+    route.write_text('<route/>')
+    (tmp_path / 'notes.txt').write_text('ignored')
+    before = rtz_fingerprint(str(tmp_path))
+
+    (tmp_path / 'notes.txt').write_text('still ignored')
+    assert rtz_fingerprint(str(tmp_path)) == before
+
+    route.write_text('<route version="1.1"/>')
+    assert rtz_fingerprint(str(tmp_path)) != before
@@ -0,0 +1,91 @@
+"""
+Tests for fleet-wide CPA/TCPA encounter screening.
+The spatial hash must find exactly the pairs a brute-force sweep finds.
+"""
+
+import numpy as np
+
+from backend.services.alerts_service import AlertType, AlertPriority, MaritimeAlertsService
+from backend.services.encounter_screening import EncounterScreener, vessel_columns
+
+
+def _brute_force(columns, threshold_nm, horizon_minutes):
+    lat, lon = columns['lat'], columns['lon']
+    vx, vy = EncounterScreener._velocities(columns['sog'], columns['cog'])
+    i, j = np.triu_indices(len(lat), k=1)
+    cos_lat = np.cos(np.radians((lat[i] + lat[j]) / 2))
+    rx, ry = (lon[j] - lon[i]) * 60.0 * cos_lat, (lat[j] - lat[i]) * 60.0
+    dvx, dvy = vx[j] - vx[i], vy[j] - vy[i]
+    dv2 = dvx ** 2 + dvy ** 2
+    tcpa = np.where(dv2 > 1e-12, -(rx * dvx + ry * dvy) / np.where(dv2 > 1e-12, dv2, 1.0), 0.0)
+    tcpa = np.clip(tcpa, 0.0, horizon_minutes / 60.0)
+    cpa = np.hypot(rx + dvx * tcpa, ry + dvy * tcpa)
+    hit = cpa <= threshold_nm
+    return set(zip(i[hit].tolist(), j[hit].tolist()))
+
+
+def test_screen_matches_brute_force():
+    rng = np.random.default_rng(13)
+    n = 3000
+    columns = {
+        # Two clusters far apart in longitude and latitude
+        'lat': np.where(np.arange(n) % 2 == 0, rng.uniform(59.8, 60.6, n), rng.uniform(69.8, 70.4, n)),
+        'lon': np.where(np.arange(n) % 2 == 0, rng.uniform(4.8, 5.8, n), rng.uniform(24.0, 25.5, n)),
+        'sog': rng.choice([0.0, 5.0, 12.0, 22.0, 102.3], n),
+        'cog': rng.uniform(0.0, 360.0, n),
+    }
+    columns['lat'][:5] = np.nan
+
+    pairs = EncounterScreener(horizon_minutes=12).screen(columns, cpa_threshold_nm=0.8)
+
+    found = {(min(a, b), max(a, b)) for a, b in zip(pairs.i.tolist(), pairs.j.tolist())}
+    assert len(found) == len(pairs)
+    assert found == _brute_force(columns, 0.8, 12)
+    assert np.all(np.diff(pairs.tcpa_minutes) >= 0)
+
+
+def test_head_on_and_diverging_pairs():
+    # Head-on at 10 kn each, 2 nm apart: CPA 0 in 6 minutes
+    columns = vessel_columns([
+        {'lat': 60.0, 'lon': 5.0, 'sog': 10.0, 'cog': 0.0},
+        {'lat': 60.0 + 2 / 60, 'lon': 5.0, 'sog': 10.0, 'cog': 180.0},
+        # Diverging pair far from the others
+        {'lat': 61.0, 'lon': 5.0, 'sog': 10.0, 'cog': 180.0},
+        {'lat': 61.0 + 0.5 / 60, 'lon': 5.0, 'sog': 10.0, 'cog': 0.0},
+    ])
+
+    pairs = EncounterScreener(horizon_minutes=12).screen(columns, cpa_threshold_nm=0.5)
+
+    assert len(pairs) == 2
+    assert (pairs.i[0], pairs.j[0]) == (2, 3)
+    assert pairs.tcpa_minutes[0] == 0.0 and abs(pairs.cpa_nm[0] - 0.5) < 1e-6
+    assert abs(pairs.tcpa_minutes[1] - 6.0) < 1e-6 and pairs.cpa_nm[1] < 1e-6
+
+
+def test_encounter_alerts_use_closest_point_of_approach():
+    service = MaritimeAlertsService()
+    own = {'mmsi': '257000001', 'name': 'Own', 'type': 'cargo', 'lat': 60.0, 'lon': 5.0, 'sog': 12.0, 'cog': 0.0}
+    # 3 nm ahead and steaming straight at us - too far for a static distance check
+    tanker = {'mmsi': '257000002', 'name': 'Crude Carrier', 'type': 'Oil Tanker',
+              'lat': 60.05, 'lon': 5.0, 'sog': 12.0, 'cog': 180.0}
+    crossing = {'mmsi': '257000003', 'name': 'Ferry', 'type': 'passenger',
+                'lat': 60.02, 'lon': 5.0 - 1.6 / (60 * np.cos(np.radians(60.02))), 'sog': 12.0, 'cog': 90.0}
+    moored = [{'mmsi': str(257000010 + k), 'name': f'Moored {k}', 'type': 'cargo',
+               'lat': 62.0, 'lon': 5.0 + k * 0.002, 'sog': 0.0, 'cog': 0.0} for k in range(3)]
+
+    alerts = service.generate_encounter_alerts([own, tanker, crossing] + moored)
+
+    own_types = {alert['type'] for alert in alerts['257000001']}
+    assert own_types == {AlertType.TANKER, AlertType.COLLISION}
+    tanker_alert = next(a for a in alerts['257000001'] if a['type'] == AlertType.TANKER)
+    assert tanker_alert['priority'] == AlertPriority.CRITICAL
+    assert tanker_alert['details']['tanker_mmsi'] == '257000002'
+    assert 7 < tanker_alert['details']['tcpa_minutes'] < 8
+    assert not any(mmsi.startswith('25700001') for mmsi in alerts)
+
+    single = service._check_tanker_proximity(own, [own, tanker, crossing])
+    assert [a['details']['tanker_mmsi'] for a in single] == ['257000002']
+
+    context = {'encounter_alerts': alerts}
+    vessel_alerts = service.generate_vessel_alerts(own, context)
+    assert sum(a['type'] == AlertType.TANKER for a in vessel_alerts) == 1
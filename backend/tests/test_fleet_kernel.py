@@ -0,0 +1,114 @@
+"""
+Tests for the vectorized fleet kernel: parity with the per-vessel update it
+replaced, bulk waypoint arrival, and the simulator's array-to-dataclass sync.
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from backend.simulation import fleet_kernel
+from backend.simulation.fleet_kernel import FleetState, haversine_nm, step_fleet
+from backend.simulation.realtime_simulator import (MAX_ALERTS_PER_VESSEL, RealTimeSimulator,
+                                                   VesselStatus)
+
+ROUTE = [(60.3913, 5.3221), (60.45, 5.20), (60.52, 5.05), (60.60, 4.95)]
+
+
+def _scalar_step(vessel, waypoints, dt):
+    """The former RealTimeSimulator._update_vessel_position, on a plain dict."""
+    if vessel['wp'] >= len(waypoints) - 1:
+        vessel['speed'] = 0
+        return
+    next_lat, next_lon = waypoints[vessel['wp'] + 1]
+    lat1, lon1, lat2, lon2 = map(math.radians, (vessel['lat'], vessel['lon'], next_lat, next_lon))
+    x = math.sin(lon2 - lon1) * math.cos(lat2)
+    y = math.cos(lat1) * math.sin(lat2) - math.sin(lat1) * math.cos(lat2) * math.cos(lon2 - lon1)
+    heading_diff = (math.degrees(math.atan2(x, y)) + 360) % 360 - vessel['heading']
+    if abs(heading_diff) > 180:
+        heading_diff = heading_diff - 360 if heading_diff > 0 else heading_diff + 360
+    vessel['heading'] = (vessel['heading'] + max(-5.0, min(5.0, heading_diff))) % 360
+
+    distance = vessel['speed'] * dt / 3600
+    vessel['traveled'] += distance
+    lat_rad, heading_rad, d = math.radians(vessel['lat']), math.radians(vessel['heading']), distance / 3440.065
+    new_lat = math.asin(math.sin(lat_rad) * math.cos(d) + math.cos(lat_rad) * math.sin(d) * math.cos(heading_rad))
+    new_lon = math.radians(vessel['lon']) + math.atan2(math.sin(heading_rad) * math.sin(d) * math.cos(lat_rad),
+                                                       math.cos(d) - math.sin(lat_rad) * math.sin(new_lat))
+    vessel['lat'], vessel['lon'] = math.degrees(new_lat), math.degrees(new_lon)
+    vessel['dist'] = float(haversine_nm(vessel['lat'], vessel['lon'], next_lat, next_lon))
+    if vessel['dist'] <= 0.5:
+        vessel['wp'] += 1
+        if vessel['wp'] < len(waypoints) - 1:
+            vessel['dist'] = float(haversine_nm(*waypoints[vessel['wp']], *waypoints[vessel['wp'] + 1]))
+
+
+def test_step_matches_scalar_update():
+    fleet = FleetState(capacity=1)
+    reference = []
+    for i, speed in enumerate((12.0, 18.0, 25.0)):
+        heading = 90.0 * i
+        fleet.add_vessel(ROUTE[0][0], ROUTE[0][1], heading, speed, 30.0, ROUTE,
+                         status=fleet_kernel.DEPARTING, timestamp=0.0, total_distance=20.0)
+        reference.append({'lat': ROUTE[0][0], 'lon': ROUTE[0][1], 'heading': heading, 'speed': speed,
+                          'wp': 0, 'dist': 0.0, 'traveled': 0.0})
+
+    for tick in range(1, 3000):
+        step_fleet(fleet, 1.0, float(tick))
+        for vessel in reference:
+            _scalar_step(vessel, ROUTE, 1.0)
+
+    for slot, vessel in enumerate(reference):
+        assert fleet.lat[slot] == pytest.approx(vessel['lat'], abs=1e-9)
+        assert fleet.lon[slot] == pytest.approx(vessel['lon'], abs=1e-9)
+        assert fleet.heading[slot] == pytest.approx(vessel['heading'], abs=1e-9)
+        assert fleet.wp_index[slot] - fleet.wp_first[slot] == vessel['wp']
+        assert fleet.traveled[slot] == pytest.approx(vessel['traveled'])
+
+
+def test_bulk_arrival_and_docked_vessels():
+    fleet = FleetState(capacity=2)
+    short_route = ROUTE[:2]
+    for _ in range(5):
+        fleet.add_vessel(*short_route[0], 300.0, 20.0, 20.0, short_route,
+                         status=fleet_kernel.UNDERWAY, timestamp=0.0)
+    docked = fleet.add_vessel(*ROUTE[0], 0.0, 20.0, 20.0, ROUTE, status=fleet_kernel.DOCKED, timestamp=0.0)
+
+    arrivals = []
+    for tick in range(1, 1200):
+        arrivals.extend(step_fleet(fleet, 1.0, float(tick)).tolist())
+    step_fleet(fleet, 1.0, 1200.0)
+
+    assert sorted(arrivals) == [0, 1, 2, 3, 4]
+    assert (fleet.status[:5] == fleet_kernel.ARRIVING).all()
+    assert (fleet.speed[:5] == 0).all()
+    assert not np.isnan(fleet.wp_arrival[fleet.wp_last[:5]]).any()
+    assert not np.isnan(fleet.wp_departure[fleet.wp_first[:5]]).any()
+    # Docked vessel untouched, its waypoint rows never stamped
+    assert (fleet.lat[docked], fleet.lon[docked]) == ROUTE[0]
+    assert np.isnan(fleet.wp_arrival[list(fleet.waypoint_range(docked))]).all()
+
+
+def test_simulator_syncs_arrays_into_vessels(monkeypatch):
+    monkeypatch.setattr(RealTimeSimulator, '_initialize_default_vessels',
+                        RealTimeSimulator._create_fallback_vessels)
+    simulator = RealTimeSimulator()
+    mmsi = '259001000'
+    start = simulator.get_vessel(mmsi)['position']
+
+    assert simulator.update_vessel_speed(mmsi, 17.5)
+    for _ in range(MAX_ALERTS_PER_VESSEL + 10):
+        simulator._update_vessels()
+        simulator._generate_alerts()
+    vessel = simulator.get_vessel(mmsi)
+
+    assert vessel['current_speed_knots'] == 17.5
+    assert vessel['status'] == VesselStatus.UNDERWAY.value
+    assert (vessel['position']['lat'], vessel['position']['lon']) != (start['lat'], start['lon'])
+    assert vessel['position']['eta_next_waypoint'] is not None
+    assert vessel['distance_traveled_nm'] > 25.0
+    assert simulator.get_simulation_status()['active_vessels'] == 1
+    # 17.5 kn > 0.9 * 18 kn max: one speed warning per tick, history capped
+    assert len(vessel['alerts']) == MAX_ALERTS_PER_VESSEL
+    assert {alert['type'] for alert in vessel['alerts']} == {'SPEED_WARNING'}
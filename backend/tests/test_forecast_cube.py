@@ -0,0 +1,82 @@
+"""
+Tests for full-timeseries forecast ingestion and (lat, lon, time) sampling.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from backend.services.forecast_cube import ForecastCube, current_step, parse_timeseries
+from backend.services.weather_service import WeatherCache
+
+T0 = datetime(2026, 10, 16, 12, tzinfo=timezone.utc)
+
+
+def document(steps):
+    """Locationforecast document from (hours after T0, wind_speed, wind_from_direction) steps."""
+    return {'properties': {'timeseries': [
+        {'time': (T0 + timedelta(hours=hours)).isoformat().replace('+00:00', 'Z'),
+         'data': {'instant': {'details': {'wind_speed': speed, 'wind_from_direction': direction,
+                                          'air_temperature': 10.0}},
+                  'next_6_hours': {'details': {'precipitation_amount': 3.0}}}}
+        for hours, speed, direction in steps]}}
+
+
+def test_parse_keeps_every_step():
+    times, values = parse_timeseries(document([(0, 5.0, 180.0), (1, 7.0, 190.0), (7, 9.0, 200.0)]))
+
+    assert values.dtype == np.float32 and values.shape == (3, 7)
+    assert list(times - T0.timestamp()) == [0, 3600, 7 * 3600]
+    assert list(values[:, 1]) == [5.0, 7.0, 9.0]
+    assert values[0, -1] == pytest.approx(0.5)  # 3 mm over 6 hours
+    assert np.isnan(values[0, 3])  # no pressure in this document
+
+
+def test_sample_interpolates_in_time_and_space():
+    grid = 0.1
+    cells = {(600, 50): parse_timeseries(document([(0, 4.0, 350.0), (2, 8.0, 350.0)])),
+             (600, 51): parse_timeseries(document([(0, 8.0, 10.0), (2, 12.0, 10.0)]))}
+    cube = ForecastCube(cells, grid)
+    lat, lon_west, lon_east = 60.05, 5.05, 5.15  # the two cell centres
+
+    result = cube.sample([lat, lat, lat, lat, 70.0], [lon_west, lon_east, 5.1, 5.1, 5.1],
+                         T0.timestamp() + np.array([3600, 3600, 3600, 99 * 3600, 3600]))
+
+    assert result['wind_speed'][:2] == pytest.approx([6.0, 10.0])        # halfway in time
+    assert result['wind_speed'][2] == pytest.approx(8.0)                 # halfway between cells
+    assert result['wind_speed'][3] == pytest.approx(10.0)                # last step held
+    direction = result['wind_from_direction'][2]
+    assert min(direction, 360 - direction) < 1e-3                        # 350 and 10 average to north
+    assert np.isnan(result['wind_speed'][4])                             # nothing cached nearby
+
+
+def test_weather_cache_samples_voyages_without_requests():
+    calls = []
+
+    def fetch(lat, lon, if_modified_since=None):
+        calls.append((lat, lon))
+        return 200, document([(0, lat, 90.0), (6, lat + 6, 90.0)]), {}
+
+    cache = WeatherCache(grid_deg=0.5)
+    lats = np.linspace(60.1, 61.9, 2000)
+    lons = np.full(2000, 5.2)
+
+    result = cache.sample(lats, lons, T0.timestamp() + 3 * 3600, ['wind_speed'], fetch_missing=True, fetch=fetch)
+    cube = cache.cube()
+    cache.sample(lats, lons, T0.timestamp(), fetch_missing=True, fetch=fetch)
+
+    # One request per cell the voyage crosses; the cube is only rebuilt after the cache changes
+    assert sorted(calls) == [(60.25, 5.25), (60.75, 5.25), (61.25, 5.25), (61.75, 5.25)]
+    assert cache.cube() is cube
+    # Stand-in wind speed = cell-centre latitude + 3 h: linear between centres, held beyond them
+    expected = np.clip(lats, 60.25, 61.75) + 3
+    assert result['wind_speed'] == pytest.approx(expected, abs=1e-3)
+
+
+def test_current_step_skips_past_steps():
+    steps = document([(0, 5.0, 180.0), (1, 6.0, 180.0), (2, 7.0, 180.0)])['properties']['timeseries']
+
+    assert current_step(steps, T0.timestamp() - 60) is steps[0]
+    assert current_step(steps, T0.timestamp() + 5400) is steps[1]
+    assert current_step(steps, T0.timestamp() + 99 * 3600) is steps[2]
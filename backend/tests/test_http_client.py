@@ -0,0 +1,111 @@
+"""
+Tests for the shared upstream HTTP client, with a local keep-alive HTTP
+server standing in for the upstream APIs.
+"""
+
+import gzip
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+
+from backend.services.http_client import CircuitOpenError, UpstreamClient
+
+
+class FakeUpstreamHandler(BaseHTTPRequestHandler):
+    """GET/POST /data?fail=<n>&key=<k>: the first n calls per key answer 503, then 200"""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    calls = {}
+
+    def _respond(self):
+        params = parse_qs(urlparse(self.path).query)
+        key = params.get('key', ['default'])[0]
+        calls = self.calls[key] = self.calls.get(key, 0) + 1
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        if calls <= int(params.get('fail', ['0'])[0]):
+            status, body = 503, b'busy'
+        else:
+            status, body = 200, json.dumps({'calls': calls, 'items': list(range(200))}).encode('utf-8')
+        compress = 'gzip' in self.headers.get('Accept-Encoding', '') and status == 200
+        if compress:
+            body = gzip.compress(body)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        if compress:
+            self.send_header('Content-Encoding', 'gzip')
+        if status == 503:
+            self.send_header('Retry-After', '0')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = _respond
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def upstream():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeUpstreamHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_connections_are_reused_and_gzip_negotiated(upstream):
+    client = UpstreamClient(name='test')
+    for _ in range(20):
+        response = client.get(f'{upstream}/data', params={'key': 'reuse'}, timeout=5)
+        assert response.status_code == 200 and len(response.json()['items']) == 200
+
+    stats = client.get_status()['hosts'][urlparse(upstream).netloc]
+    assert stats['attempts'] == 20 and stats['statuses']['2xx'] == 20
+    assert stats['connections_opened'] == 1 and stats['connection_reuse_rate'] == 0.95
+    assert stats['compressed_responses'] == 20 and stats['error_rate'] == 0.0
+
+
+def test_retryable_statuses_are_retried_with_backoff(upstream):
+    client = UpstreamClient(name='test', max_retries=3, backoff_base=0.01)
+    response = client.get(f'{upstream}/data', params={'key': 'flaky', 'fail': 2}, timeout=5)
+    assert response.status_code == 200 and response.json()['calls'] == 3
+
+    # POST is not retried unless the caller says so
+    assert client.post(f'{upstream}/data', params={'key': 'post', 'fail': 1}, timeout=5).status_code == 503
+    assert client.post(f'{upstream}/data', params={'key': 'post2', 'fail': 1}, timeout=5,
+                       retries=1).status_code == 200
+
+    stats = client.get_status()['hosts'][urlparse(upstream).netloc]
+    assert stats['retries'] == 3 and stats['statuses']['5xx'] == 4
+    assert stats['breaker']['state'] == 'closed'
+
+
+def test_breaker_opens_on_repeated_failures_and_recovers(upstream):
+    client = UpstreamClient(name='test', max_retries=0, failure_threshold=3, reset_seconds=0.2)
+    dead = 'http://127.0.0.1:9/data'  # discard port, connection refused
+    for _ in range(3):
+        with pytest.raises(requests.exceptions.ConnectionError):
+            client.get(dead, timeout=1)
+    with pytest.raises(CircuitOpenError):
+        client.get(dead, timeout=1)
+    stats = client.get_status()['hosts']['127.0.0.1:9']
+    assert stats['attempts'] == 3 and stats['rejected_by_breaker'] == 1
+    assert stats['breaker'] == {'state': 'open', 'consecutive_failures': 3, 'times_opened': 1}
+
+    # Breakers are per host: other upstreams are unaffected
+    assert client.get(f'{upstream}/data', params={'key': 'other'}, timeout=5).status_code == 200
+
+    time.sleep(0.25)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.get(dead, timeout=1)  # half-open trial fails and re-opens
+    with pytest.raises(CircuitOpenError):
+        client.get(dead, timeout=1)
+    assert client.get_status()['hosts']['127.0.0.1:9']['breaker']['times_opened'] == 2
@@ -0,0 +1,125 @@
+"""
+Tests for the shared upstream token-bucket rate limiter.
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backend.services.rate_limiter import RateLimiter, RateLimitExceeded
+from backend.services.weather_integration_service import WeatherIntegrationService
+from backend.services.weather_service import WEATHER_STALE_MAX_SECONDS, WeatherCache
+from backend.tests.test_weather_cache import FakeMET
+
+
+def test_burst_then_denial_then_refill():
+    limiter = RateLimiter({'met': (20, 3)})
+
+    assert [limiter.try_acquire('met') for _ in range(4)] == [True, True, True, False]
+    time.sleep(0.06)  # a little over one token at 20/s
+    assert limiter.try_acquire('met') and not limiter.try_acquire('met')
+    # Upstreams without a budget are not limited
+    assert all(limiter.try_acquire('other') for _ in range(50))
+
+    status = limiter.get_status()['upstreams']['met']
+    assert status['granted'] == 4 and status['denied'] == 2
+    assert status['rate_per_second'] == 20 and status['burst'] == 3
+
+
+def test_submitted_calls_run_in_order_at_the_budgeted_rate():
+    limiter = RateLimiter({'met': (50, 1)})
+    ran = []
+    start = time.monotonic()
+
+    futures = [limiter.submit('met', lambda i=i: ran.append((i, time.monotonic() - start)) or i)
+               for i in range(6)]
+
+    assert [future.result(timeout=2) for future in futures] == list(range(6))
+    assert [i for i, _ in ran] == list(range(6))
+    # One immediately from the burst, then one every 20 ms
+    assert ran[-1][1] == pytest.approx(0.1, abs=0.04)
+
+    status = limiter.get_status()['upstreams']['met']
+    assert status['granted'] == 1 and status['queued'] == 5 and status['queue_depth'] == 0
+    assert 80 <= status['max_wait_ms'] <= 150
+    assert sum(status['wait_buckets'].values()) == 6
+
+
+def test_submit_rejects_calls_that_would_queue_too_long():
+    limiter = RateLimiter({'met': (10, 1)})
+    calls = []
+
+    first, second, rejected = [limiter.submit('met', calls.append, i, max_queue_seconds=0.15)
+                               for i in (1, 2, 3)]
+
+    with pytest.raises(RateLimitExceeded):
+        rejected.result(timeout=1)
+    assert first.result(timeout=1) is None and second.result(timeout=1) is None
+    assert calls == [1, 2]
+    assert limiter.get_status()['upstreams']['met']['rejected'] == 1
+
+
+def test_weather_cache_serves_stale_when_budget_is_spent():
+    limiter = RateLimiter({'met_norway': (4, 1)})
+    # Without stale-while-revalidate, so the refresh happens in the request
+    cache = WeatherCache(grid_deg=0.05, limiter=limiter, stale_seconds=0)
+    met = FakeMET(expires_in=-10)  # every entry is already expired
+
+    assert cache.lookup(60.39, 5.32, met)[1] == 'fresh'
+    data, status = cache.lookup(60.39, 5.32, met)
+
+    assert status == 'stale' and data is not None
+    assert len(met.calls) == 1 and cache.stats()['stale'] == 1
+    # A cell with nothing to serve queues for the next token instead
+    start = time.monotonic()
+    assert cache.lookup(61.0, 5.32, met)[1] == 'fresh'
+    assert time.monotonic() - start >= 0.2
+    assert limiter.get_status()['upstreams']['met_norway']['queued'] == 1
+
+
+def test_dashboard_weather_is_only_served_stale_within_the_cap():
+    service = WeatherIntegrationService.__new__(WeatherIntegrationService)  # cache only, no upstreams
+    now = datetime.now(timezone.utc)
+    service.cache = {
+        'hour': (now - timedelta(hours=1), {'temperature': 8.0, 'data_source': 'met_norway'}),
+        'days': (now - timedelta(seconds=WEATHER_STALE_MAX_SECONDS + 60), {'temperature': 3.0}),
+    }
+
+    stale = service._get_stale_weather('hour')
+    assert stale['temperature'] == 8.0 and stale['stale'] and stale['cache_age_minutes'] == pytest.approx(60, abs=1)
+    assert 'stale' not in service.cache['hour'][1]
+    assert service._get_stale_weather('days') is None
+
+
+def test_idle_calls_only_use_spare_budget():
+    limiter = RateLimiter({'met': (20, 3)})
+    idle_ran = []
+
+    idle = [limiter.submit_idle('met', idle_ran.append, i) for i in range(30)]
+    time.sleep(0.1)
+    start = time.monotonic()
+    # However much background work is pending, a request-path call is not queued behind it
+    assert limiter.submit('met', lambda: 'user', max_queue_seconds=0.1).result(timeout=1) == 'user'
+    assert time.monotonic() - start < 0.1
+
+    for future in idle:
+        future.result(timeout=5)
+    assert idle_ran == list(range(30))
+    status = limiter.get_status()['upstreams']['met']
+    assert status['idle'] == 30 and status['idle_depth'] == 0 and status['rejected'] == 0
+
+
+def test_prewarming_does_not_starve_request_path_misses():
+    limiter = RateLimiter({'met_norway': (8, 8)})
+    cache = WeatherCache(grid_deg=0.05, limiter=limiter)
+    met = FakeMET()
+
+    # Port cities plus the maximum number of vessel cells
+    assert cache.prewarm([(58.025 + 0.05 * (i // 30), 5.025 + 0.05 * (i % 30)) for i in range(210)], fetch=met) == 210
+
+    start = time.monotonic()
+    assert cache.lookup(70.0, 20.0, met)[1] == 'fresh'         # a cell nobody pre-warms
+    assert cache.lookup(58.325, 6.475, met)[1] == 'fresh'      # a pre-warm cell still waiting for budget
+    assert time.monotonic() - start < 1.0
+    assert limiter.get_status()['upstreams']['met_norway']['rejected'] == 0
@@ -0,0 +1,124 @@
+"""
+Tests for RiskEngine fleet assessment.
+assess_fleet must produce the same risks as calling assess_vessel per vessel.
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from backend.services.risk_engine import RiskEngine
+
+
+def _comparable(risks):
+    """Drop per-call timestamps and normalise numbers for comparison."""
+    cleaned = []
+    for risk in risks:
+        risk = {key: value for key, value in risk.items() if key != 'timestamp'}
+        cleaned.append(_round_numbers(risk))
+    return cleaned
+
+
+def _round_numbers(value):
+    if isinstance(value, dict):
+        return {key: _round_numbers(item) for key, item in value.items()}
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return round(float(value), 6)
+    return value
+
+
+@pytest.fixture
+def engine():
+    rng = random.Random(9)
+
+    def hazards(n):
+        return [{'name': f'Hazard {i}', 'latitude': rng.uniform(60.0, 60.3),
+                 'longitude': rng.uniform(5.0, 5.3)} for i in range(n)]
+
+    risk_engine = RiskEngine()
+    risk_engine.load_hazard_data(hazards(800), hazards(100), hazards(60))
+    return risk_engine
+
+
+@pytest.fixture
+def vessels():
+    rng = random.Random(21)
+    fleet = []
+    for i in range(300):
+        vessel = {
+            'mmsi': str(257000000 + i),
+            'name': f'Vessel {i}',
+            'lat': rng.uniform(60.0, 60.3),
+            'lon': rng.uniform(5.0, 5.3),
+            'speed': rng.choice([0, 6.0, 14.0, 19.0, 24.0]),
+            'type': rng.choice(['Cargo', 'tanker', 'fishing', 'passenger', 'unknown']),
+            'draught': rng.choice([5.0, 12.0]),
+            'length': rng.choice([60.0, 180.0]),
+        }
+        if i % 4 == 0:
+            vessel['route_deviation_km'] = rng.uniform(0.0, 12.0)
+        fleet.append(vessel)
+    return fleet
+
+
+def test_assess_fleet_without_weather_matches_assess_vessel(engine, vessels):
+    results = engine.assess_fleet(RiskEngine.fleet_columns(vessels))
+
+    assert len(results) == len(vessels)
+    for vessel, risks in zip(vessels, results):
+        assert _comparable(risks) == _comparable(engine.assess_vessel(vessel))
+
+
+def test_assess_fleet_with_weather_matches_assess_vessel(engine, vessels):
+    rng = np.random.default_rng(4)
+    wind = rng.uniform(0.0, 25.0, len(vessels))
+    wave = rng.uniform(0.0, 6.0, len(vessels))
+    wave[::3] = np.nan  # estimated from wind, as assess_vessel does
+
+    results = engine.assess_fleet(RiskEngine.fleet_columns(vessels),
+                                  {'wind_speed': wind, 'wave_height': wave})
+
+    for i, (vessel, risks) in enumerate(zip(vessels, results)):
+        weather = {'wind_speed': float(wind[i])}
+        if np.isfinite(wave[i]):
+            weather['wave_height'] = float(wave[i])
+        expected = engine.assess_vessel(vessel, weather)
+        assert _comparable(risks) == _comparable(expected)
+        assert engine.get_risk_summary(risks) == engine.get_risk_summary(expected)
+
+
+def test_assess_fleet_empty():
+    assert RiskEngine().assess_fleet({'lat': [], 'lon': []}) == []
+
+
+@pytest.mark.parametrize('with_weather', [False, True])
+def test_assess_fleet_levels_match_assess_fleet(engine, vessels, with_weather):
+    rng = np.random.default_rng(8)
+    columns = RiskEngine.fleet_columns(vessels)
+    weather = ({'wind_speed': rng.uniform(0.0, 25.0, len(vessels)),
+                'wave_height': rng.uniform(0.0, 6.0, len(vessels))} if with_weather else None)
+    hours = rng.integers(0, 24, len(vessels))
+
+    risks = engine.assess_fleet(columns, weather, hours=hours)
+    levels = engine.assess_fleet_levels(columns, weather, hours=hours)
+
+    codes = RiskEngine.RISK_LEVEL_CODES
+    assert levels['count'].tolist() == [len(r) for r in risks]
+    assert levels['level'].tolist() == [max((codes[x['severity']] for x in r), default=0) for r in risks]
+    assert levels['NIGHT_OPERATION'].tolist() == [any(x['type'] == 'NIGHT_OPERATION' for x in r) for r in risks]
+
+
+def test_location_weather_uses_step_in_effect_now(monkeypatch):
+    from datetime import datetime, timedelta, timezone
+    from backend.services import weather_service
+
+    hour = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    # An expired document served stale: its first step is two hours old
+    document = {'properties': {'timeseries': [
+        {'time': (hour + timedelta(hours=h)).isoformat().replace('+00:00', 'Z'),
+         'data': {'instant': {'details': {'wind_speed': float(10 + h), 'air_temperature': 8.0}}}}
+        for h in (-2, -1, 0, 1)]}}
+    monkeypatch.setattr(weather_service.weather_cache, 'get_forecast', lambda lat, lon: document)
+
+    assert RiskEngine()._fetch_weather_for_location(60.4, 5.3)['wind_speed'] == 10.0
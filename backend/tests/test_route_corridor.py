@@ -0,0 +1,94 @@
+"""
+Tests for route-corridor hazard pre-screening.
+Checking only the current leg's candidates must give the same risks and
+alerts as checking every hazard, for any position inside the corridor.
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from backend.services.alerts_service import MaritimeAlertsService
+from backend.services.risk_engine import RiskEngine
+from backend.services.route_corridor import RouteCorridorCache, segment_distance_km
+
+# Route passing Høg-Jæren wind farm (58.70 N, 5.58 E)
+WAYPOINTS = [{'lat': lat, 'lon': lon} for lat, lon in
+             [(58.55, 5.45), (58.62, 5.52), (58.69, 5.57), (58.76, 5.60), (58.85, 5.58), (58.95, 5.50)]]
+
+
+def _comparable(risks):
+    return [{key: value for key, value in risk.items() if key != 'timestamp'} for risk in risks]
+
+
+@pytest.fixture
+def engine():
+    rng = random.Random(18)
+
+    def hazards(n, spread):
+        return [{'name': f'Hazard {i}', 'latitude': rng.uniform(58.5, 59.0),
+                 'longitude': rng.uniform(5.5 - spread, 5.5 + spread)} for i in range(n)]
+
+    risk_engine = RiskEngine()
+    risk_engine.load_hazard_data(hazards(3000, 0.4), hazards(400, 0.4), hazards(200, 0.4))
+    return risk_engine
+
+
+def _track(n=400, drift_km=0.9):
+    rng = np.random.default_rng(18)
+    points = []
+    for _ in range(n):
+        k = int(rng.integers(len(WAYPOINTS) - 1))
+        t = rng.uniform()
+        lat = WAYPOINTS[k]['lat'] + t * (WAYPOINTS[k + 1]['lat'] - WAYPOINTS[k]['lat'])
+        lon = WAYPOINTS[k]['lon'] + t * (WAYPOINTS[k + 1]['lon'] - WAYPOINTS[k]['lon'])
+        angle = rng.uniform(0, 2 * np.pi)
+        lat += drift_km / 111.195 * np.sin(angle)
+        lon += drift_km / (111.195 * np.cos(np.radians(lat))) * np.cos(angle)
+        points.append((k, float(lat), float(lon)))
+    return points
+
+
+def test_leg_candidates_match_full_checks(engine):
+    alerts_service = MaritimeAlertsService()
+    corridor = RouteCorridorCache(engine, alerts_service).get(WAYPOINTS)
+    weather = {'wind_speed': 8.0, 'wave_height': 1.0}
+
+    checked = 0
+    for k, lat, lon in _track():
+        leg = corridor.candidates_for(lat, lon, k)
+        if leg is None:
+            continue
+        checked += 1
+        vessel = {'mmsi': '257000001', 'name': 'Test', 'lat': lat, 'lon': lon, 'speed': 12.0, 'type': 'cargo'}
+        assert _comparable(engine.assess_vessel(vessel, weather, corridor=leg)) == \
+               _comparable(engine.assess_vessel(vessel, weather))
+        assert alerts_service._check_wind_turbine_proximity(lat, lon, 'Test', farm_indexes=leg.wind_farms) == \
+               alerts_service._check_wind_turbine_proximity(lat, lon, 'Test')
+    assert checked > 300
+    assert corridor.get_stats()['candidates_max_per_leg'] < len(engine.hazard_locations) / 2
+
+
+def test_vessel_outside_corridor_gets_full_check(engine):
+    corridor = RouteCorridorCache(engine, MaritimeAlertsService(), margin_km=0.5).get(WAYPOINTS)
+    assert corridor.candidates_for(58.62, 5.52, 1) is not None
+    assert corridor.candidates_for(58.62, 5.60, 1) is None
+    # 1 km north of an east-west leg, and 1 km past its end
+    assert segment_distance_km([60.0 + 1 / 111.195], [5.05], 60.0, 5.0, 60.0, 5.1)[0] == pytest.approx(1.0)
+    assert segment_distance_km([61.0 + 1 / 111.195], [5.0], 60.0, 5.0, 61.0, 5.0)[0] == pytest.approx(1.0)
+
+
+def test_corridor_rebuilds_when_hazards_or_route_change(engine):
+    cache = RouteCorridorCache(engine, MaritimeAlertsService())
+    corridor = cache.get(WAYPOINTS, route_key='Test route')
+    assert cache.get(WAYPOINTS, route_key='Test route') is corridor
+
+    engine.load_hazard_data(engine.hazard_data['aquaculture'][:10], [], [])
+    rebuilt = cache.get(WAYPOINTS, route_key='Test route')
+    assert rebuilt is not corridor
+    assert rebuilt.get_stats()['candidates_total'] < corridor.get_stats()['candidates_total']
+
+    moved = [dict(wp, lon=wp['lon'] + 0.1) for wp in WAYPOINTS]
+    assert cache.get(moved, route_key='Test route') is not rebuilt
+    assert cache.get_status() == {'routes': 1, 'margin_km': cache.margin_km, 'hits': 1, 'builds': 3}
@@ -0,0 +1,98 @@
+"""
+Tests for zoom-dependent route geometry tiles.
+Simplification must match plain Douglas-Peucker at every zoom, and the map
+endpoints must answer repeat requests with 304 Not Modified.
+"""
+
+import numpy as np
+from flask import Flask
+
+from backend.routes import rtz_data_api
+from backend.services.route_tiles import (
+    RouteTileCache, RouteTileSet, decode_polyline, encode_polyline, project,
+    tolerance_for_zoom, vertex_significance
+)
+
+
+def _douglas_peucker(x, y, tolerance, first=0, last=None):
+    last = len(x) - 1 if last is None else last
+    if last - first < 2:
+        return {first, last}
+    dx, dy = x[last] - x[first], y[last] - y[first]
+    best, split = -1.0, None
+    for k in range(first + 1, last):
+        t = max(0.0, min(1.0, ((x[k] - x[first]) * dx + (y[k] - y[first]) * dy) / (dx * dx + dy * dy)))
+        distance = np.hypot(x[k] - x[first] - t * dx, y[k] - y[first] - t * dy)
+        if distance > best:
+            best, split = distance, k
+    if best <= tolerance:
+        return {first, last}
+    return _douglas_peucker(x, y, tolerance, first, split) | _douglas_peucker(x, y, tolerance, split, last)
+
+
+def _routes(n_routes=6, n_waypoints=80):
+    rng = np.random.default_rng(15)
+    routes = []
+    for i in range(n_routes):
+        lat = 58.0 + i + np.cumsum(rng.normal(0.01, 0.02, n_waypoints))
+        lon = 5.0 + np.cumsum(rng.normal(0.02, 0.02, n_waypoints))
+        routes.append({'route_name': f'Route {i}', 'origin': 'Bergen', 'destination': 'Oslo',
+                       'waypoints': [{'name': f'WP {k}', 'lat': float(a), 'lon': float(b), 'radius': 0.3}
+                                     for k, (a, b) in enumerate(zip(lat, lon))]})
+    return routes
+
+
+def test_polyline_encoding_round_trip():
+    # Reference example from the encoded polyline format documentation
+    assert encode_polyline([38.5, 40.7, 43.252], [-120.2, -120.95, -126.453]) == '_p~iF~ps|U_ulLnnqC_mqNvxq`@'
+    points = [(59.913868, 10.752245), (60.391263, 5.322054), (-33.8688, 151.2093)]
+    assert np.allclose(decode_polyline(encode_polyline(*zip(*points))), points, atol=1e-5)
+
+
+def test_significance_threshold_matches_douglas_peucker():
+    for route in _routes(n_routes=3):
+        x, y = project([wp['lat'] for wp in route['waypoints']], [wp['lon'] for wp in route['waypoints']])
+        significance = vertex_significance(x, y)
+        for zoom in (4, 7, 10, 13):
+            tolerance = tolerance_for_zoom(zoom)
+            assert set(np.flatnonzero(significance > tolerance).tolist()) == _douglas_peucker(x, y, tolerance)
+
+
+def test_tiles_cover_simplified_route():
+    routes = _routes()
+    tiles = RouteTileSet(routes)
+    zoom = 9
+    keep = tiles.simplified(2, zoom)
+    x, y = project([routes[2]['waypoints'][k]['lat'] for k in keep], [routes[2]['waypoints'][k]['lon'] for k in keep])
+
+    covered = set()
+    for tx in range(int(x.min() * 2 ** zoom), int(x.max() * 2 ** zoom) + 1):
+        for ty in range(int(y.min() * 2 ** zoom), int(y.max() * 2 ** zoom) + 1):
+            for route in tiles.tile(zoom, tx, ty)['routes']:
+                if route['index'] == 2:
+                    for part in route['parts']:
+                        covered.update((round(a, 5), round(b, 5)) for a, b in decode_polyline(part))
+    expected = {(round(routes[2]['waypoints'][k]['lat'], 5), round(routes[2]['waypoints'][k]['lon'], 5))
+                for k in keep}
+    assert covered == expected
+
+
+def test_map_data_is_compact_and_conditional(monkeypatch):
+    cache = RouteTileCache(load_data=lambda: {'routes': _routes(), 'ports_list': ['Bergen']},
+                           fingerprint=lambda: 'v1')
+    monkeypatch.setattr(rtz_data_api, 'route_tile_cache', cache)
+    app = Flask(__name__)
+    app.register_blueprint(rtz_data_api.rtz_api_bp)
+    client = app.test_client()
+
+    compact = client.get('/api/rtz/map-data?zoom=6')
+    full = client.get('/api/rtz/map-data?detail=full')
+    assert compact.status_code == 200
+    assert 'waypoints' not in compact.get_json()['routes'][0]
+    assert len(compact.data) * 10 < len(full.data)
+
+    repeat = client.get('/api/rtz/map-data?zoom=6', headers={'If-None-Match': compact.headers['ETag']})
+    assert repeat.status_code == 304
+    assert client.get('/api/rtz/tiles/6/33/18.json').status_code == 200
+    assert client.get('/api/rtz/tiles/6/64/0.json').status_code == 404
+    assert cache.get_status()['builds'] == 1
@@ -0,0 +1,105 @@
+"""
+Tests for cached RTZ discovery: in-memory ZIP parsing and content-hash
+cache invalidation.
+"""
+
+import io
+import zipfile
+
+import pytest
+
+from backend.services import rtz_parser
+
+RTZ_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
+<route xmlns="https://cirm.org/rtz-xml-schemas" version="1.1">
+  <routeInfo routeName="{name}"/>
+  <waypoints>
+    <waypoint id="1" name="Bergen"><position lat="60.39" lon="5.32"/></waypoint>
+    <waypoint id="2" name="Fedje"><position lat="60.78" lon="4.70"/></waypoint>
+    <waypoint id="3" name="Stad"><position lat="{lat}" lon="5.10"/></waypoint>
+  </waypoints>
+</route>
+"""
+
+
+def _rtz(name, lat=62.19):
+    return RTZ_TEMPLATE.format(name=name, lat=lat).encode('utf-8')
+
+
+@pytest.fixture
+def route_files(tmp_path, monkeypatch):
+    """Two plain RTZ files and one ZIP archive for 'bergen', isolated cache."""
+    city_dir = tmp_path / 'bergen'
+    city_dir.mkdir()
+    (city_dir / 'NCA_Bergen_Fedje_In.rtz').write_bytes(_rtz('NCA_Bergen_Fedje_In_20250731'))
+    (city_dir / 'copy_of_fedje.rtz').write_bytes(_rtz('NCA_Bergen_Fedje_In_20250731'))
+
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w') as zip_file:
+        zip_file.writestr('NCA_Bergen_Stad_In.rtz', _rtz('NCA_Bergen_Stad_In_20250731'))
+        zip_file.writestr('NCA_Stad_Bergen_Out.rtz', _rtz('NCA_Stad_Bergen_Out_20250731'))
+        zip_file.writestr('readme.txt', 'not a route')
+    (city_dir / 'bergen_routes.rtz').write_bytes(archive.getvalue())
+
+    files = sorted(str(path) for path in city_dir.iterdir())
+    monkeypatch.setattr(rtz_parser, 'find_rtz_files', lambda: {'bergen': files})
+    monkeypatch.setenv('RTZ_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(rtz_parser, '_route_cache_memory', {})
+    return city_dir
+
+
+def _without_timestamps(routes):
+    return [{key: value for key, value in route.items() if key != 'parse_timestamp'}
+            for route in routes]
+
+
+def _count_parses(monkeypatch):
+    parsed = []
+    original = rtz_parser._parse_changed_files
+
+    def counting(pending):
+        parsed.extend(path for _, path in pending.values())
+        return original(pending)
+
+    monkeypatch.setattr(rtz_parser, '_parse_changed_files', counting)
+    return parsed
+
+
+def test_zip_members_parsed_in_memory(route_files):
+    routes = rtz_parser.extract_all_routes_from_zip(str(route_files / 'bergen_routes.rtz'), 'bergen')
+
+    assert sorted(route['rtz_filename'] for route in routes) == [
+        'NCA_Bergen_Stad_In.rtz', 'NCA_Stad_Bergen_Out.rtz']
+    assert all(route['original_zip'] == 'bergen_routes.rtz' for route in routes)
+    assert routes[0]['waypoint_count'] == 3
+
+
+def test_warm_discovery_uses_cache(route_files, monkeypatch):
+    parsed = _count_parses(monkeypatch)
+    cold = rtz_parser.discover_rtz_files(enhanced=False)
+    # Identical file contents are parsed once
+    assert len(parsed) == 2
+
+    # Simulate a restart: in-process cache gone, disk cache kept
+    monkeypatch.setattr(rtz_parser, '_route_cache_memory', {})
+    parsed.clear()
+    warm = rtz_parser.discover_rtz_files(enhanced=False)
+
+    assert parsed == []
+    assert len(warm) == len(cold) == 4
+    assert _without_timestamps(warm) == _without_timestamps(cold)
+    # Duplicate files still yield separate route dicts with their own paths
+    assert len({id(route) for route in warm}) == 4
+    assert {route.get('original_file') for route in warm} >= {'NCA_Bergen_Fedje_In.rtz', 'copy_of_fedje.rtz'}
+
+
+def test_changed_file_is_reparsed(route_files, monkeypatch):
+    rtz_parser.discover_rtz_files(enhanced=False)
+    parsed = _count_parses(monkeypatch)
+
+    (route_files / 'copy_of_fedje.rtz').write_bytes(_rtz('NCA_Bergen_Fedje_In_20250731', lat=62.5))
+    routes = rtz_parser.discover_rtz_files(enhanced=False)
+
+    assert [path.rsplit('/', 1)[-1] for path in parsed] == ['copy_of_fedje.rtz']
+    changed = [route for route in routes if route.get('original_file') == 'copy_of_fedje.rtz']
+    assert changed[0]['waypoints'][-1]['lat'] == 62.5
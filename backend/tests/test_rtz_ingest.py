@@ -0,0 +1,123 @@
+"""
+Tests for the bulk RTZ-to-database ingest.
+Runs against in-memory SQLite with only the routes/voyage_legs tables;
+reruns must be no-ops and changed routes must have their legs replaced.
+"""
+
+from sqlalchemy import create_engine, func, insert, select, text, update
+from sqlalchemy.pool import StaticPool
+
+from backend.extensions import db
+from backend.services.rtz_ingest import fuel_table, ingest_rtz_routes, legs_table, routes_table
+
+
+def _engine(*extra_tables):
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    db.metadata.create_all(engine, tables=[routes_table, legs_table, *extra_tables])
+    return engine
+
+
+def _routes(n_routes=5, n_waypoints=6):
+    return [{
+        'route_name': f'NCA_Bergen_Route{i}_In',
+        'file_path': f'/data/bergen/route{i}.rtz',
+        'total_distance_nm': 10.0 + i,
+        'waypoints': [{'name': f'wp {k}', 'lat': 60.0 + 0.01 * k, 'lon': 5.0 + 0.01 * (i + k)}
+                      for k in range(n_waypoints)],
+        'legs': [{'distance_nm': 2.0} for _ in range(n_waypoints - 1)],
+    } for i in range(n_routes)]
+
+
+def _count(engine, table):
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(table)).scalar()
+
+
+def test_ingest_writes_routes_and_legs_in_batches():
+    engine = _engine()
+    stats = ingest_rtz_routes(_routes() + _routes(n_routes=1), engine=engine, batch_size=2)
+
+    assert stats['inserted'] == 5 and stats['legs'] == 25
+    assert _count(engine, routes_table) == 5
+    with engine.connect() as conn:
+        row = conn.execute(select(routes_table).where(routes_table.c.name == 'NCA_Bergen_Route3_In')).one()
+        legs = conn.execute(select(legs_table.c.leg_order, legs_table.c.departure_lon)
+                            .where(legs_table.c.route_id == row.id).order_by(legs_table.c.leg_order)).all()
+    assert row.waypoint_count == 6 and row.rtz_filename == 'route3.rtz' and len(row.rtz_file_hash) == 64
+    assert [leg.leg_order for leg in legs] == [1, 2, 3, 4, 5]
+    assert legs[0].departure_lon == 5.03
+
+
+def test_rerun_is_a_no_op():
+    engine = _engine()
+    ingest_rtz_routes(_routes(), engine=engine)
+    stats = ingest_rtz_routes(_routes(), engine=engine)
+
+    assert stats == {**stats, 'inserted': 0, 'updated': 0, 'unchanged': 5, 'legs': 0}
+    assert _count(engine, routes_table) == 5
+    assert _count(engine, legs_table) == 25
+
+
+def test_changed_route_replaces_its_legs():
+    engine = _engine()
+    ingest_rtz_routes(_routes(), engine=engine)
+    with engine.connect() as conn:
+        route_id = conn.execute(select(routes_table.c.id).where(routes_table.c.name == 'NCA_Bergen_Route1_In')).scalar()
+
+    routes = _routes()
+    routes[1]['waypoints'] = routes[1]['waypoints'][:3]
+    routes[1]['legs'] = routes[1]['legs'][:2]
+    stats = ingest_rtz_routes(routes + _routes(n_routes=7)[5:], engine=engine)
+
+    assert (stats['inserted'], stats['updated'], stats['unchanged']) == (2, 1, 4)
+    with engine.connect() as conn:
+        row = conn.execute(select(routes_table).where(routes_table.c.id == route_id)).one()
+        leg_count = conn.execute(select(func.count()).where(legs_table.c.route_id == route_id)).scalar()
+    assert row.waypoint_count == 3 and leg_count == 2
+    assert _count(engine, legs_table) == 4 * 5 + 2 + 2 * 5
+
+
+def test_referenced_legs_survive_a_route_change():
+    # Every table the foreign keys point at must exist once they are enforced
+    engine = _engine(fuel_table, *(db.metadata.tables[name] for name in ('ports', 'cruises', 'ships')))
+    ingest_rtz_routes(_routes(), engine=engine)
+    with engine.begin() as conn:
+        route_id = conn.execute(select(routes_table.c.id).where(routes_table.c.name == 'NCA_Bergen_Route1_In')).scalar()
+        leg_ids = dict(conn.execute(select(legs_table.c.leg_order, legs_table.c.id)
+                                    .where(legs_table.c.route_id == route_id)).all())
+        conn.execute(insert(fuel_table), [
+            {'ship_id': 1, 'voyage_leg_id': leg_ids[order], 'current_speed': 12.0, 'optimal_speed': 11.0,
+             'fuel_saving_percent': 4.0, 'estimated_savings_usd_hour': 20.0} for order in (1, 5)
+        ])
+    with engine.connect() as conn:
+        conn.execute(text('PRAGMA foreign_keys = ON'))  # Enforce voyage_leg_id like PostgreSQL
+
+    routes = _routes()
+    routes[1]['waypoints'] = routes[1]['waypoints'][:3]
+    routes[1]['legs'] = routes[1]['legs'][:2]
+    assert ingest_rtz_routes(routes, engine=engine)['updated'] == 1
+
+    with engine.connect() as conn:
+        legs = conn.execute(select(legs_table.c.leg_order, legs_table.c.id, legs_table.c.is_active)
+                            .where(legs_table.c.route_id == route_id).order_by(legs_table.c.leg_order)).all()
+    # Legs 1-2 updated in place, 3-4 deleted, 5 kept inactive for its calculation
+    assert [(leg.leg_order, leg.id, leg.is_active) for leg in legs] == \
+           [(1, leg_ids[1], True), (2, leg_ids[2], True), (5, leg_ids[5], False)]
+
+
+def test_routes_without_a_hash_are_only_backfilled():
+    engine = _engine()
+    ingest_rtz_routes(_routes(), engine=engine)
+    with engine.begin() as conn:
+        conn.execute(update(routes_table).values(rtz_file_hash=None))
+
+    routes = _routes()
+    routes[1]['waypoints'] = routes[1]['waypoints'][:3]
+    stats = ingest_rtz_routes(routes, engine=engine)
+
+    assert (stats['updated'], stats['backfilled'], stats['legs']) == (0, 5, 0)
+    assert _count(engine, legs_table) == 25
+    with engine.connect() as conn:
+        assert conn.execute(select(routes_table.c.waypoint_count)
+                            .where(routes_table.c.name == 'NCA_Bergen_Route1_In')).scalar() == 6
+    assert ingest_rtz_routes(routes, engine=engine)['unchanged'] == 5
@@ -0,0 +1,80 @@
+"""
+Tests for the streaming iterparse RTZ parser.
+"""
+
+import io
+
+from backend.services import rtz_parser
+
+RTZ_WITH_SCHEDULE = b"""<?xml version="1.0" encoding="utf-8"?>
+<route xmlns="https://cirm.org/rtz-xml-schemas" version="1.1">
+  <routeInfo routeName="NCA_Bergen_Stad_In_20250731"/>
+  <waypoints>
+    <defaultWaypoint radius="0.3"/>
+    <waypoint id="1" name="Bergen" radius="0.5">
+      <position lat="60.39" lon="5.32"/>
+      <extensions><extension manufacturer="NCA" name="pilot" xmlns=""/></extensions>
+    </waypoint>
+    <waypoint id="2" name="Broken"><position lat="6x.0" lon="5.0"/></waypoint>
+    <waypoint id="3" name="No position"/>
+    <waypoint id="4" name="Stad"><position lat="62.19" lon="5.10"/></waypoint>
+  </waypoints>
+  <schedules>
+    <schedule id="1">
+      <manual><scheduleElement waypointId="4" eta="2025-08-01T12:00:00Z" speed="12"/></manual>
+      <calculated><scheduleElement waypointId="4" eta="2025-08-01T13:00:00Z"/></calculated>
+    </schedule>
+  </schedules>
+  <extensions>
+    <extension manufacturer="Norwegian Coastal Administration" routeNumber="NO-410013" xmlns=""/>
+  </extensions>
+</route>
+"""
+
+
+def test_stream_parser_reads_schedule_and_extensions():
+    routes = rtz_parser.parse_rtz_content(RTZ_WITH_SCHEDULE, 'bergen/route.rtz')
+
+    assert len(routes) == 1
+    route = routes[0]
+    assert route['route_name'] == 'NCA_Bergen_Stad_In_20250731'
+    # Waypoints without a usable position are skipped
+    assert [wp['name'] for wp in route['waypoints']] == ['Bergen', 'Stad']
+    bergen, stad = route['waypoints']
+    assert (bergen['lat'], bergen['lon'], bergen['radius']) == (60.39, 5.32, 0.5)
+    assert stad['radius'] == 0.1
+    assert bergen['extensions'] == [{'manufacturer': 'NCA', 'name': 'pilot'}]
+    # First (manual) schedule element wins
+    assert stad['schedule'] == {'eta': '2025-08-01T12:00:00Z', 'speed': '12'}
+    assert 'schedule' not in bergen
+    assert route['extensions'] == [{'manufacturer': 'Norwegian Coastal Administration',
+                                    'routeNumber': 'NO-410013'}]
+    assert route['leg_count'] == 1
+
+
+def test_stream_parser_without_namespace_and_root_route_name():
+    data = (b'<route routeName="Plain"><waypoints>'
+            b'<waypoint name="A"><position lat="59.0" lon="10.0"/></waypoint>'
+            b'<waypoint name="B"><position lat="59.1" lon="10.1"/></waypoint>'
+            b'</waypoints></route>')
+
+    meta = {}
+    waypoints = list(rtz_parser.iter_rtz_waypoints(io.BytesIO(data), meta))
+
+    assert meta['route_name'] == 'Plain'
+    assert [(wp['name'], wp['lat']) for wp in waypoints] == [('A', 59.0), ('B', 59.1)]
+    assert meta['schedule'] == {} and meta['extensions'] == []
+
+
+def test_stream_parser_reads_file_from_disk(tmp_path):
+    path = tmp_path / 'route.rtz'
+    path.write_bytes(RTZ_WITH_SCHEDULE)
+
+    routes = rtz_parser.parse_rtz_file(str(path))
+
+    assert routes[0]['file_path'] == str(path)
+    assert routes[0]['waypoint_count'] == 2
+
+
+def test_malformed_xml_returns_no_routes():
+    assert rtz_parser.parse_rtz_content(b'<route><waypoints><waypoint', 'bad.rtz') == []
@@ -0,0 +1,126 @@
+"""
+Tests for the concurrent multi-source fan-out, with a local HTTP server
+standing in for the AIS upstreams.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+
+from backend.services.source_fanout import SourceFanout
+
+
+class FakeAISHandler(BaseHTTPRequestHandler):
+    """GET /vessels?delay=<s>&count=<n>&status=<code>"""
+
+    def do_GET(self):
+        params = parse_qs(urlparse(self.path).query)
+        time.sleep(float(params.get('delay', ['0'])[0]))
+        status = int(params.get('status', ['200'])[0])
+        body = json.dumps([{'mmsi': str(257000000 + i)}
+                           for i in range(int(params.get('count', ['1'])[0]))]).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def upstream():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeAISHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/vessels"
+    server.shutdown()
+
+
+def _source(url, **params):
+    def fetch(no_longer_needed):
+        response = requests.get(url, params=params, timeout=5)
+        response.raise_for_status()
+        return response.json()
+    return fetch
+
+
+def test_deadline_returns_best_available_result(upstream):
+    fanout = SourceFanout(name='test')
+    start = time.perf_counter()
+    result = fanout.run([
+        ('kystverket', _source(upstream, delay=2.0)),
+        ('kystdatahuset', _source(upstream, delay=0.05, count=3)),
+        ('barentswatch', _source(upstream, delay=0.0)),
+    ], deadline_seconds=0.5)
+    elapsed = time.perf_counter() - start
+
+    # Bounded by the deadline, not by the slowest source
+    assert elapsed < 1.0
+    assert result.source == 'kystdatahuset'
+    assert len(result.value) == 3
+    assert result.timed_out == ['kystverket']
+    assert list(result.outcomes) == ['kystverket', 'kystdatahuset', 'barentswatch']
+
+
+def test_returns_early_once_priority_is_settled(upstream):
+    fanout = SourceFanout(name='test')
+    result = fanout.run([
+        ('kystverket', _source(upstream, status=503)),
+        ('kystdatahuset', _source(upstream, count=0)),
+        ('barentswatch', _source(upstream, delay=0.1)),
+        ('slow_backup', _source(upstream, delay=2.0)),
+    ], deadline_seconds=3.0)
+
+    # Higher-priority sources failed or were empty, so BarentsWatch wins
+    # without waiting for the slower, lower-priority source
+    assert result.source == 'barentswatch'
+    assert result.elapsed_ms < 1500
+    assert result.outcomes['kystverket']['status'] == 'error'
+    assert result.outcomes['kystdatahuset']['status'] == 'empty'
+    assert result.outcomes['slow_backup']['status'] == 'timeout'
+
+
+def test_latency_histograms_record_every_call(upstream):
+    fanout = SourceFanout(name='test')
+    for _ in range(3):
+        fanout.run([('fast', _source(upstream)), ('slow', _source(upstream, delay=0.3))],
+                   deadline_seconds=0.15, first_wins=False)
+    time.sleep(0.5)  # let the abandoned calls finish
+
+    histograms = fanout.get_latency_histograms()
+    assert histograms['fast']['count'] == 3
+    assert histograms['fast']['outcomes']['ok'] == 3
+    assert histograms['slow']['outcomes']['late'] == 3
+    assert histograms['slow']['buckets']['le_500ms'] == 3
+    assert fanout.stats['deadline_hits'] == 3
+
+
+def test_abandoned_sources_are_told_to_stop(upstream):
+    fanout = SourceFanout(name='test')
+    requested = []
+
+    def per_city(no_longer_needed):
+        # Like the capture sources: one upstream request per city until told to stop
+        for city in range(10):
+            if no_longer_needed.is_set():
+                return None
+            requested.append(city)
+            _source(upstream, delay=0.1, count=0)(no_longer_needed)
+        return None
+
+    result = fanout.run([('per_city', per_city)], deadline_seconds=0.15)
+    assert result.timed_out == ['per_city']
+    assert fanout.get_status()['stats']['abandoned_running'] == 1
+
+    time.sleep(0.3)
+    assert len(requested) == 2  # the request in flight at the deadline finished, then it stopped
+    assert fanout.get_status()['stats']['abandoned_running'] == 0
+    assert fanout.get_latency_histograms()['per_city']['outcomes']['late'] == 1
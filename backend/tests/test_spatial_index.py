@@ -0,0 +1,79 @@
+"""
+Tests for the grid-bucket spatial index and its use in the RiskEngine.
+Results are checked against brute-force scans over the same points.
+"""
+
+import random
+
+import pytest
+
+from backend.utils.spatial_index import GeoGridIndex, haversine_km
+
+
+@pytest.fixture
+def coastal_points():
+    """Random points spread over Norwegian coastal waters."""
+    rng = random.Random(42)
+    return [(i, rng.uniform(58.0, 71.0), rng.uniform(4.0, 31.0)) for i in range(3000)]
+
+
+def test_query_radius_matches_brute_force(coastal_points):
+    index = GeoGridIndex(cell_size_deg=0.05)
+    index.bulk_load(coastal_points)
+    rng = random.Random(7)
+
+    for _ in range(50):
+        lat, lon = rng.uniform(58.0, 71.0), rng.uniform(4.0, 31.0)
+        radius_km = rng.choice([0.5, 5.0, 40.0])
+        expected = {key for key, p_lat, p_lon in coastal_points
+                    if haversine_km(lat, lon, p_lat, p_lon) <= radius_km}
+        assert {key for key, _ in index.query_radius(lat, lon, radius_km)} == expected
+
+
+def test_nearest_matches_brute_force(coastal_points):
+    index = GeoGridIndex(cell_size_deg=0.05)
+    index.bulk_load(coastal_points)
+    rng = random.Random(11)
+
+    for _ in range(50):
+        lat, lon = rng.uniform(58.0, 71.0), rng.uniform(4.0, 31.0)
+        expected = sorted(coastal_points, key=lambda p: haversine_km(lat, lon, p[1], p[2]))[:5]
+        assert [key for key, _ in index.nearest(lat, lon, k=5)] == [p[0] for p in expected]
+
+
+def test_insert_moves_existing_key():
+    index = GeoGridIndex(cell_size_deg=0.05)
+    index.insert('257000000', 60.39, 5.32)   # Bergen
+    index.insert('257000000', 63.43, 10.39)  # Trondheim
+
+    assert len(index) == 1
+    assert index.query_radius(60.39, 5.32, 10.0) == []
+    assert index.query_bbox(63.0, 10.0, 64.0, 11.0) == ['257000000']
+    assert index.remove('257000000') is True
+    assert index.stats()['occupied_cells'] == 0
+
+
+def test_risk_engine_hazard_checks_use_index():
+    from backend.services.risk_engine import RiskEngine
+
+    rng = random.Random(3)
+    farms = [{'name': f'Farm {i}', 'latitude': rng.uniform(60.0, 61.0),
+              'longitude': rng.uniform(4.5, 5.5)} for i in range(2000)]
+    engine = RiskEngine()
+    engine.load_hazard_data(farms, [], [])
+
+    for _ in range(20):
+        lat, lon = rng.uniform(60.0, 61.0), rng.uniform(4.5, 5.5)
+        expected = [
+            farm['name'] for farm in farms
+            if engine._calculate_distance_km(lat, lon, farm['latitude'], farm['longitude']) <= 2.0
+        ]
+        nearby = engine._find_nearby_hazards(lat, lon, radius_km=2.0)
+        assert [hazard['name'] for hazard in nearby] == expected
+
+        expected_legacy = [
+            farm['name'] for farm in farms
+            if engine._calculate_distance_meters(lat, lon, farm['latitude'], farm['longitude']) < 200
+        ]
+        legacy = engine._check_hazard_proximity_legacy(lat, lon, {'mmsi': '1'})
+        assert [risk['details']['hazard_name'] for risk in legacy] == expected_legacy
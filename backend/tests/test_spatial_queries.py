@@ -0,0 +1,192 @@
+"""
+Tests for the PostGIS hazard query layer.
+Batched lookups must be one statement for all points, and the PostGIS-backed
+alert and risk checks must match the in-memory ones they replace.
+"""
+
+import random
+
+from backend.services import alerts_service, risk_engine, spatial_queries as spatial_module
+from backend.services.alerts_service import MaritimeAlertsService
+from backend.services.risk_engine import RiskEngine
+from backend.services.spatial_queries import SpatialQueries, group_by_point, hazard_source_key
+from backend.utils.spatial_index import haversine_km
+
+
+class _Result(list):
+    def scalar(self):
+        return 'fake 3.4'
+
+
+class _Connection:
+    def __init__(self, log, fail):
+        self.log, self.fail = log, fail
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, statement, params=None):
+        if self.fail and 'PostGIS_Lib_Version' not in str(statement):
+            raise RuntimeError('connection lost')
+        self.log.append((str(statement), params))
+        return _Result()
+
+
+class _Engine:
+    class dialect:
+        name = 'postgresql'
+
+    def __init__(self, fail=False):
+        self.log, self.fail = [], fail
+
+    def connect(self):
+        return _Connection(self.log, self.fail)
+
+
+class FakePostGIS(SpatialQueries):
+    """In-memory stand-in with the semantics of SpatialQueries' PostGIS queries."""
+
+    def __init__(self):
+        super().__init__()
+        self.zones, self.next_id, self.lookups = {}, 100, []
+
+    def sync_point_hazards(self, hazards, hazard_types):
+        self.zones = {k: v for k, v in self.zones.items() if v['hazard_type'] not in hazard_types}
+        for hazard in hazards:
+            self.next_id += 1
+            self.zones[self.next_id] = {'source_key': hazard_source_key(hazard),
+                                        'name': hazard['name'], 'hazard_type': hazard['type'],
+                                        'lat': hazard['latitude'], 'lon': hazard['longitude'],
+                                        'radius': hazard.get('radius_m') or spatial_module.POINT_HAZARD_FOOTPRINT_M}
+        self.stats['syncs'] += 1
+        return [hazard_source_key(hazard) for hazard in hazards]
+
+    def hazards_near_points(self, lats, lons, radius_m, hazard_types=None):
+        self.lookups.append(len(lats))
+        rows = []
+        for k, (lat, lon) in enumerate(zip(lats, lons)):
+            for zone_id, zone in self.zones.items():
+                centroid_m = haversine_km(lat, lon, zone['lat'], zone['lon']) * 1000
+                edge_m = max(0.0, centroid_m - zone['radius'])
+                if edge_m <= radius_m and (not hazard_types or zone['hazard_type'] in hazard_types):
+                    rows.append({'point_index': k, 'zone_id': zone_id, 'source_key': zone['source_key'],
+                                 'name': zone['name'],
+                                 'hazard_type': zone['hazard_type'], 'risk_score': 0.0,
+                                 'distance_m': edge_m, 'centroid_distance_m': centroid_m})
+        return sorted(rows, key=lambda row: (row['point_index'], row['distance_m']))
+
+
+def test_batched_lookup_is_one_geography_query():
+    engine = _Engine()
+    queries = SpatialQueries(engine=engine)
+    lats, lons = [60.1, 60.2, 60.3], [5.1, 5.2, 5.3]
+
+    assert queries.hazards_near_points(lats, lons, 500, ['wind_farm']) == []
+    (probe, _), (statement, params) = engine.log
+    assert 'PostGIS_Lib_Version' in probe
+    assert 'unnest' in statement and 'ST_DWithin(h.geometry::geography' in statement
+    assert params == {'lats': lats, 'lons': lons, 'radius': 500.0, 'types': ['wind_farm']}
+    assert group_by_point([{'point_index': 2, 'zone_id': 7}], 3) == [[], [], [{'point_index': 2, 'zone_id': 7}]]
+
+
+def test_failures_and_non_postgres_fall_back():
+    failing = SpatialQueries(engine=_Engine(fail=True))
+    assert failing.hazards_near_points([60.0], [5.0], 100) is None
+    assert not failing.enabled() and failing.stats['failures'] == 1
+
+    class SQLite(_Engine):
+        class dialect:
+            name = 'sqlite'
+
+    assert SpatialQueries(engine=SQLite()).sync_point_hazards([], ['wind_farm']) is None
+
+
+def test_turbine_alerts_match_in_memory_checks(monkeypatch):
+    service = MaritimeAlertsService()
+    rng = random.Random(17)
+    vessels = [{'mmsi': str(257000000 + i), 'name': f'Vessel {i}',
+                'lat': farm['lat'] + rng.uniform(-0.02, 0.02), 'lon': farm['lon'] + rng.uniform(-0.03, 0.03)}
+               for i, farm in enumerate(service.NORWEGIAN_WIND_FARMS * 40)]
+    expected = {}
+    for vessel in vessels:
+        alerts = service._check_wind_turbine_proximity(vessel['lat'], vessel['lon'], vessel['name'])
+        if alerts:
+            expected[vessel['mmsi']] = alerts
+
+    fake = FakePostGIS()
+    monkeypatch.setattr(alerts_service, 'spatial_queries', fake)
+    batched = service.generate_turbine_alerts(vessels)
+    assert fake.lookups == [len(vessels)]
+    assert expected and batched.keys() == expected.keys()
+    for mmsi, alerts in expected.items():
+        assert [(a['priority'], a['details']['wind_farm']) for a in batched[mmsi]] == \
+               [(a['priority'], a['details']['wind_farm']) for a in alerts]
+        assert all(abs(a['details']['distance_meters'] - b['details']['distance_meters']) <= 1
+                   for a, b in zip(batched[mmsi], alerts))
+
+    # The static wind farm rows are written once; single-vessel checks never query
+    service.generate_turbine_alerts(vessels)
+    service._check_wind_turbine_proximity(vessels[0]['lat'], vessels[0]['lon'], vessels[0]['name'])
+    assert fake.stats['syncs'] == 1 and fake.lookups == [len(vessels)] * 2
+
+
+def _index_pairs(engine, lats, lons, radius_km):
+    pairs = sorted((k, i, distance) for k, (lat, lon) in enumerate(zip(lats, lons))
+                   for i, distance in engine._hazard_index.query_radius(lat, lon, radius_km))
+    return [(k, i) for k, i, _ in pairs], [distance for _, _, distance in pairs]
+
+
+def _db_pairs(pairs):
+    return list(zip(pairs[0].tolist(), pairs[1].tolist())), pairs[2].tolist()
+
+
+def test_risk_engine_fleet_hazard_query_matches_index(monkeypatch):
+    rng = random.Random(9)
+
+    def hazards(n):
+        return [{'name': f'Hazard {i}', 'latitude': rng.uniform(60.0, 60.3),
+                 'longitude': rng.uniform(5.0, 5.3)} for i in range(n)]
+
+    fake = FakePostGIS()
+    monkeypatch.setattr(risk_engine, 'spatial_queries', fake)
+    engine = RiskEngine()
+    engine.load_hazard_data(hazards(300), hazards(40), hazards(20))
+    assert len(fake.zones) == len(engine.hazard_locations)
+
+    lats, lons = [60.0 + 0.01 * k for k in range(30)], [5.0 + 0.01 * k for k in range(30)]
+    expected_pairs, expected_distances = _index_pairs(engine, lats, lons, 2.0)
+    pairs, distances = _db_pairs(engine._hazards_within_db(lats, lons, 2.0))
+    assert fake.lookups == [30]
+    assert expected_pairs and pairs == expected_pairs
+    assert all(abs(a - b) < 1e-3 for a, b in zip(distances, expected_distances))
+
+    # Single-vessel checks stay on the in-memory index
+    engine._find_nearby_hazards(60.1, 5.1, 2.0)
+    assert fake.lookups == [30]
+
+
+def test_rows_synced_by_another_process(monkeypatch):
+    rng = random.Random(23)
+    hazards = [{'name': f'Hazard {i}', 'latitude': rng.uniform(60.0, 60.3),
+                'longitude': rng.uniform(5.0, 5.3)} for i in range(80)]
+    fake = FakePostGIS()
+    monkeypatch.setattr(risk_engine, 'spatial_queries', fake)
+    engine = RiskEngine()
+    engine.load_hazard_data(hazards, [], [])
+    lats, lons = [60.0 + 0.01 * k for k in range(30)], [5.0 + 0.01 * k for k in range(30)]
+    expected = engine._hazards_within_db(lats, lons, 2.0)
+
+    # Another worker re-syncs the same hazards: new ids, same source keys
+    fake.sync_point_hazards(engine.hazard_locations, engine.HAZARD_ZONE_TYPES)
+    assert _db_pairs(engine._hazards_within_db(lats, lons, 2.0)) == _db_pairs(expected)
+    assert fake.stats['stale_syncs'] == 0
+
+    # ...or a different hazard set: the caller falls back to memory, nothing is written back
+    fake.sync_point_hazards([dict(h, name=f"Other {i}") for i, h in enumerate(engine.hazard_locations)],
+                            engine.HAZARD_ZONE_TYPES)
+    syncs = fake.stats['syncs']
+    assert engine._hazards_within_db(lats, lons, 2.0) is None
+    assert fake.stats['stale_syncs'] == 1 and fake.stats['syncs'] == syncs
@@ -0,0 +1,66 @@
+"""
+Tests for precompiled translation catalogs and the Flask template helpers.
+"""
+
+import json
+
+from flask import Flask, render_template_string
+
+from backend.translations import flask_integration
+from backend.translations.catalog import CatalogStore
+from backend.translations.flask_integration import DynamicTranslator, init_app
+
+
+def write_catalogs(directory, en, no):
+    (directory / 'en.json').write_text(json.dumps(en), encoding='utf-8')
+    (directory / 'no.json').write_text(json.dumps(no), encoding='utf-8')
+
+
+def test_translate_from_compiled_catalog(tmp_path):
+    write_catalogs(tmp_path,
+                   {'global': {'home': 'Home', 'routes': 'Routes'}, 'base_template': {'dashboard': 'Dashboard'}},
+                   {'global': {'home': 'Hjem', 'routes': ''}})
+    translator = DynamicTranslator(str(tmp_path))
+
+    assert translator.translate('home', 'no') == 'Hjem'
+    assert translator.translate('base_template.dashboard', 'en') == 'Dashboard'
+    assert translator.translate('routes', 'no') == '[NO TRANSLATION] Routes'  # empty counts as missing
+    assert translator.translate('missing', 'no', 'Fallback') == '[NO TRANSLATION] Fallback'
+    assert translator.translate('missing', 'en') == 'missing'
+    assert translator.get_all('no') == {'global.home': 'Hjem'}
+    assert translator.has_translation('home', 'en') and not translator.has_translation('routes', 'no')
+
+
+def test_compiled_catalog_is_reused_until_source_changes(tmp_path):
+    write_catalogs(tmp_path, {'global': {'home': 'Home'}}, {'global': {'home': 'Hjem'}})
+    CatalogStore(str(tmp_path)).compile_all()
+
+    store = CatalogStore(str(tmp_path), reload_check_seconds=0)
+    assert store.get('no').lookup == {'global.home': 'Hjem'}
+    assert store.stats == {'loads': 2, 'compiles': 0, 'reloads': 0}
+
+    # A new English key reaches the Norwegian fallbacks without a restart
+    (tmp_path / 'en.json').write_text(json.dumps({'global': {'home': 'Home', 'about': 'About'}}), encoding='utf-8')
+    assert store.get('no').lookup['global.about'] == '[NO TRANSLATION] About'
+    assert store.stats['reloads'] == 2 and store.stats['compiles'] == 1  # en recompiled, no rebuilt over it
+
+
+def test_template_helpers_are_built_once_per_catalog(tmp_path, monkeypatch):
+    write_catalogs(tmp_path, {'global': {'home': 'Home'}, 'nav': {'about': 'About'}},
+                   {'global': {'home': 'Hjem'}, 'nav': {'about': 'Om'}})
+    translator = DynamicTranslator(str(tmp_path))
+    translator.catalogs.reload_check_seconds = 0
+    monkeypatch.setattr(flask_integration, '_translator', translator)
+    app = init_app(Flask(__name__))
+    template = "{{ t('home') }}|{{ t('about', 'nav') }}|{{ t('nope', 'nav', 'Default') }}|{{ lang }}"
+
+    with app.test_request_context('/?lang=no'):
+        assert render_template_string(template) == 'Hjem|Om|[NO TRANSLATION] Default|no'
+    helpers = translator.template_helpers('no')
+    with app.test_request_context('/?lang=xx'):
+        assert render_template_string(template) == 'Home|About|Default|en'
+    assert translator.template_helpers('no') is helpers
+
+    (tmp_path / 'no.json').write_text(json.dumps({'global': {'home': 'Hjemme'}}), encoding='utf-8')
+    with app.test_request_context('/?lang=no'):
+        assert render_template_string("{{ t('home') }}") == 'Hjemme'
@@ -0,0 +1,101 @@
+"""
+Tests for the live vessel push feed.
+Subscribers must only be sent what changed since their last sequence number,
+inside their bounding box, and the encodings must round-trip.
+"""
+
+import base64
+import json
+
+import numpy as np
+import pytest
+
+from backend.services.vessel_feed import BINARY_ROW, VesselFeed, format_sse, parse_bbox
+from backend.services.vessel_state_store import VesselStateStore
+
+BERGEN = parse_bbox('5.0,60.0,5.3,60.3')
+
+
+@pytest.fixture
+def store():
+    store = VesselStateStore(ttl_seconds=1e9, max_vessels=100)
+    for i in range(20):
+        store.upsert(str(257000000 + i), 60.1 + 0.02 * i, 5.1 + 0.02 * i, speed=10.0, course=90.0,
+                     vessel_type='Cargo', name=f'VESSEL {i}')
+    return store
+
+
+def test_store_changes_since_returns_only_changes(store):
+    start = store.sequence
+    assert store.changes_since(0)['reset'] and len(store.changes_since(0)['mmsi']) == 20
+
+    store.upsert('257000003', 60.2, 5.2, speed=11.0)
+    store.update_attributes('257000004', name='RENAMED')
+    store.remove('257000005')
+    changes = store.changes_since(start)
+
+    assert not changes['reset'] and changes['sequence'] == start + 3
+    assert changes['mmsi'].tolist() == ['257000003', '257000004']
+    assert changes['static'] == {'257000004': ('RENAMED', 'Cargo')}
+    assert changes['removed'] == ['257000005']
+    assert store.changes_since(changes['sequence'])['mmsi'].tolist() == []
+
+
+def test_subscriber_gets_snapshot_then_deltas_in_its_bbox(store):
+    feed = VesselFeed(store=store)
+    feed.publish()
+    everything = feed.subscribe()
+    bergen = feed.subscribe(bbox=BERGEN)
+
+    (event, _, snapshot), = feed.pending(everything)
+    assert event == 'snapshot' and snapshot['reset'] and len(snapshot['rows']) == 20
+    (event, _, local), = feed.pending(bergen)
+    inside = [row[0] for row in local['rows']]
+    assert 0 < len(inside) < 20 and local['static'][inside[0]] == [f'VESSEL {int(inside[0]) - 257000000}', 'Cargo']
+
+    store.upsert(inside[0], 60.25, 5.25, speed=5.0)  # moves inside the bbox
+    store.upsert(inside[1], 61.0, 6.0, speed=5.0)    # leaves the bbox
+    store.upsert('257000019', 61.4, 5.5, speed=5.0)  # outside, never seen by bergen
+    feed.publish()
+
+    (event, sequence, delta), = feed.pending(bergen)
+    assert event == 'delta' and sequence == store.sequence
+    assert [row[:3] for row in delta['rows']] == [[inside[0], 60.25, 5.25]]
+    assert delta['static'] == {} and delta['removed'] == [inside[1]]
+    assert len(feed.pending(everything)[0][2]['rows']) == 3
+    assert feed.pending(bergen) == []
+
+
+def test_reconnect_resumes_or_falls_back_to_snapshot(store):
+    feed = VesselFeed(store=store, history_frames=2)
+    feed.publish()
+    resume_from = feed.sequence
+    store.upsert('257000001', 60.2, 5.2)
+    feed.publish()
+
+    events = feed.pending(feed.subscribe(last_sequence=resume_from))
+    assert [event for event, _, _ in events] == ['delta']
+
+    for lon in (5.3, 5.4):
+        store.upsert('257000001', 60.2, lon)
+        feed.publish()
+    events = feed.pending(feed.subscribe(last_sequence=resume_from))
+    assert [event for event, _, _ in events] == ['snapshot']
+    assert [event for event, _, _ in feed.pending(feed.subscribe(bbox=BERGEN, last_sequence=feed.sequence))] == \
+           ['snapshot']
+
+
+def test_binary_rows_round_trip(store):
+    store.upsert('SIM-1', 60.5, 5.5)
+    store.upsert('257000002', 60.123456, 5.654321, speed=12.3, course=None)
+    feed = VesselFeed(store=store)
+    (_, sequence, payload), = feed.pending(feed.subscribe(binary=True))
+
+    packed = np.frombuffer(base64.b64decode(payload['data']), dtype=BINARY_ROW)
+    assert len(packed) == 20 and [row[0] for row in payload['rows']] == ['SIM-1']
+    row = packed[packed['mmsi'] == 257000002][0]
+    assert (row['lat'], row['lon'], row['sog'], row['cog']) == (60123456, 5654321, 123, 0xFFFF)
+
+    message = format_sse('snapshot', sequence, payload)
+    assert message.startswith(f'id: {sequence}\nevent: snapshot\ndata: ') and message.endswith('\n\n')
+    assert json.loads(message.split('data: ', 1)[1]) == payload
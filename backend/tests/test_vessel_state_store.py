@@ -0,0 +1,189 @@
+"""
+Tests for the shared columnar vessel state store.
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from backend.services.vessel_state_store import VesselStateStore
+from backend.utils.spatial_index import haversine_km
+
+
+@pytest.fixture
+def store():
+    return VesselStateStore(ttl_seconds=60, max_vessels=50)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Settable time.time() for receive-time TTL tests."""
+    now = [time.time()]
+    monkeypatch.setattr(time, 'time', lambda: now[0])
+    return now
+
+
+def test_upsert_updates_in_place_and_keeps_attributes(store):
+    assert store.upsert('257000001', 60.39, 5.32, speed=12.0, vessel_type='Cargo', name='MS TEST')
+    assert store.upsert(257000001, 60.40, 5.33, speed=None, course=90.0)
+
+    vessel = store.get('257000001')
+    assert len(store) == 1
+    assert vessel['latitude'] == pytest.approx(60.40)
+    assert vessel['speed'] == 0.0  # unavailable reads back as a number
+    assert vessel['heading'] == pytest.approx(90.0)  # falls back to course
+    assert vessel['type'] == 'Cargo'
+    assert vessel['name'] == 'MS TEST'
+
+
+def test_older_report_does_not_roll_back_position(store):
+    now = time.time()
+    store.upsert('257000001', 60.40, 5.33, speed=12.0, timestamp=now)
+    sequence = store.sequence
+
+    # A slower source delivers an earlier position with the vessel's name
+    assert store.upsert('257000001', 60.10, 5.00, speed=3.0, timestamp=now - 600,
+                        vessel_type='Cargo', name='MS TEST', data_source='kystdatahuset')
+
+    vessel = store.get('257000001')
+    assert (vessel['latitude'], vessel['speed']) == (pytest.approx(60.40), pytest.approx(12.0))
+    assert vessel['type'] == 'Cargo' and vessel['name'] == 'MS TEST'
+    assert store.vessels_near(60.10, 5.00, 5.0) == []
+    changes = store.changes_since(sequence)
+    assert changes['lat'].tolist() == [pytest.approx(60.40)] and '257000001' in changes['static']
+    assert store.stats['out_of_order'] == 1
+
+    # Without a static change an older report publishes no delta
+    sequence = store.sequence
+    store.upsert('257000001', 60.20, 5.10, timestamp=now - 300)
+    assert store.sequence == sequence
+
+
+def test_upsert_vessel_normalises_source_formats(store):
+    barentswatch = {'mmsi': 258000002, 'latitude': 59.9, 'longitude': 10.7,
+                    'speedOverGround': 8.5, 'courseOverGround': 45.0, 'shipType': 70,
+                    'msgtime': '2026-10-16T10:00:00+00:00', 'name': 'COLOR MAGIC'}
+    capture = {'mmsi': '259000003', 'lat': 63.4, 'lon': 10.4, 'speed_knots': 11.0}
+
+    assert store.upsert_many([barentswatch, capture, {'mmsi': '1', 'lat': None}], 'test') == 2
+
+    store.ttl_seconds = 1e9
+    assert store.get('258000002')['speed'] == pytest.approx(8.5)
+    assert store.get('258000002')['type'] == '70'
+    assert store.get('259000003')['data_source'] == 'test'
+
+
+def test_ttl_expiry(store, clock):
+    store.upsert('1', 60.0, 5.0)
+    clock[0] += 120
+    store.upsert('2', 60.0, 5.0)
+
+    assert store.get('1') is None
+    assert store.evict_expired() == 1
+    assert len(store) == 1
+    # Freed slot is reused
+    store.upsert('3', 61.0, 5.0)
+    assert store.get_store_status()['capacity'] == 50
+
+
+def test_capacity_is_bounded(store):
+    now = time.time()
+    for i in range(80):
+        store.upsert(str(i), 60.0, 5.0, timestamp=now - 50 + i * 0.1)
+
+    assert len(store) == 50
+    assert store.get('0') is None  # stalest vessels were evicted
+    assert store.get('79') is not None
+    assert store.stats['evicted_full'] == 30
+
+
+def test_vessels_near_matches_brute_force():
+    store = VesselStateStore(ttl_seconds=600)
+    rng = np.random.default_rng(5)
+    lats = rng.uniform(59.5, 61.0, 2000)
+    lons = rng.uniform(4.5, 6.5, 2000)
+    for i, (lat, lon) in enumerate(zip(lats, lons)):
+        store.upsert(str(i), lat, lon)
+
+    result = store.vessels_near(60.3913, 5.3221, 20, limit=15)
+    expected = sorted(
+        (haversine_km(60.3913, 5.3221, lat, lon), str(i))
+        for i, (lat, lon) in enumerate(zip(lats, lons))
+    )
+    expected = [mmsi for distance, mmsi in expected if distance <= 20][:15]
+
+    assert [vessel['mmsi'] for vessel in result] == expected
+    assert all(vessel['distance_km'] <= 20 for vessel in result)
+
+
+def test_fleet_columns_feed_risk_engine(store):
+    from backend.services.risk_engine import RiskEngine
+
+    store.upsert('1', 60.0, 5.0, speed=25.0, vessel_type='Tanker', name='FAST ONE')
+    store.upsert('2', 60.1, 5.1, speed=5.0)
+
+    columns = store.fleet_columns()
+    results = RiskEngine().assess_fleet(columns, {'wind_speed': 5.0})
+
+    assert list(columns['mmsi']) == ['1', '2']
+    assert any(risk['type'] == 'EXCESSIVE_SPEED' for risk in results[0])
+
+
+def test_nearest_and_bbox_follow_position_updates():
+    store = VesselStateStore(ttl_seconds=600)
+    rng = np.random.default_rng(8)
+    positions = {str(i): (lat, lon) for i, (lat, lon) in
+                 enumerate(zip(rng.uniform(59.0, 62.0, 3000), rng.uniform(4.0, 8.0, 3000)))}
+    for mmsi, (lat, lon) in positions.items():
+        store.upsert(mmsi, lat, lon)
+    # Move some vessels to new grid cells
+    for mmsi in list(positions)[:500]:
+        positions[mmsi] = (rng.uniform(59.0, 62.0), rng.uniform(4.0, 8.0))
+        store.upsert(mmsi, *positions[mmsi])
+
+    nearest = store.nearest_vessels(60.3913, 5.3221, k=12, max_radius_km=30)
+    expected = sorted((haversine_km(60.3913, 5.3221, lat, lon), mmsi)
+                      for mmsi, (lat, lon) in positions.items())
+    expected = [mmsi for distance, mmsi in expected if distance <= 30][:12]
+    assert [vessel['mmsi'] for vessel in nearest] == expected
+
+    in_box = {vessel['mmsi'] for vessel in store.vessels_in_bbox(60.0, 5.0, 60.5, 5.8)}
+    assert in_box == {mmsi for mmsi, (lat, lon) in positions.items()
+                      if 60.0 <= lat <= 60.5 and 5.0 <= lon <= 5.8}
+
+
+def test_nearest_skips_expired_vessels(store, clock):
+    store.upsert('stale', 60.3913, 5.3221)
+    clock[0] += 120
+    store.upsert('live', 60.5, 5.3221)
+
+    assert [vessel['mmsi'] for vessel in store.nearest_vessels(60.3913, 5.3221, k=1)] == ['live']
+
+
+def test_queries_filter_by_data_source(store):
+    store.upsert('1', 60.39, 5.32, data_source='barentswatch')
+    store.upsert('2', 60.39, 5.33, data_source='kystdatahuset')
+
+    result = store.vessels_near(60.39, 5.32, 10, data_source='kystdatahuset')
+    assert [vessel['mmsi'] for vessel in result] == ['2']
+
+
+def test_ttl_counts_from_receive_time(store, clock):
+    # A delayed batch: message times well past the TTL, received just now
+    store.upsert_many([{'mmsi': str(257000000 + i), 'lat': 60.0, 'lon': 5.0 + 0.01 * i,
+                        'timestamp': clock[0] - 3600} for i in range(3)])
+    assert len(store.get_vessels()) == 3 and store.evict_expired() == 0
+
+    clock[0] += 61
+    assert store.get('257000000') is None and store.evict_expired() == 3
+
+
+def test_city_fields_are_not_stored(store):
+    store.upsert_vessel({'mmsi': '257000001', 'lat': 60.39, 'lon': 5.32, 'name': 'MS TEST',
+                         'nearest_city': 'Bergen', 'city_key': 'bergen', 'distance_to_city_km': 1.2})
+    store.upsert_vessel({'mmsi': '257000001', 'lat': 63.43, 'lon': 10.39})
+
+    vessel = store.get('257000001')
+    assert vessel['name'] == 'MS TEST'
+    assert not {'nearest_city', 'city_key', 'distance_to_city_km'} & vessel.keys()
@@ -0,0 +1,109 @@
+"""
+Tests for the headless batch voyage simulation: motion parity with the
+real-time simulator, the pre-fetched weather grid and simulated-clock
+risk/alert timelines.
+"""
+
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from backend.services.alerts_service import MaritimeAlertsService
+from backend.services.risk_engine import RiskEngine
+from backend.simulation.integrated_simulator import IntegratedShipSimulator
+from backend.simulation.voyage_batch import WeatherTimeGrid, simulate_voyages
+
+ROUTE = [[60.3913, 5.3221], [60.45, 5.25], [60.52, 5.10], [60.55, 4.95]]
+MIDNIGHT = datetime(2026, 1, 15, tzinfo=timezone.utc).timestamp()
+
+
+class _BareSimulator(IntegratedShipSimulator):
+    """Real-time simulator state without loading services or RTZ routes."""
+
+    def __init__(self, waypoints, speed):
+        self.waypoints = waypoints
+        self.route_data = {'route_name': 'test'}
+        self.ship_id, self.ship_name, self.ship_type = 'SIM-1', 'Test', 'Container Ship'
+        self.current_waypoint_index = 0
+        self.current_position = list(waypoints[0])
+        self.heading = 0.0
+        self.speed_knots = speed
+        self.status = 'underway'
+        self.running = True
+        self.weather_service = self.risk_engine = self.alerts_service = None
+
+
+def _forecast(hours, wind):
+    return {'properties': {'timeseries': [
+        {'time': datetime.fromtimestamp(MIDNIGHT + h * 3600, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+         'data': {'instant': {'details': {'wind_speed': wind + h, 'air_temperature': 4.0}}}}
+        for h in hours]}}
+
+
+def test_batch_motion_matches_realtime_update():
+    speeds = [9.0, 16.0]
+    result = simulate_voyages(ROUTE, speeds, MIDNIGHT, tick_seconds=1.0)
+
+    for v, speed in enumerate(speeds):
+        simulator = _BareSimulator(ROUTE, speed)
+        positions = []
+        while simulator.running:
+            positions.append(list(simulator.current_position))
+            simulator._update_position()
+        positions = np.array(positions)
+
+        assert result.arrival_tick[v] == len(positions)
+        np.testing.assert_allclose(result.lat[v, :len(positions)], positions[:, 0], atol=1e-9)
+        np.testing.assert_allclose(result.lon[v, :len(positions)], positions[:, 1], atol=1e-9)
+        assert np.isnan(result.lat[v, len(positions):]).all()
+
+
+def test_weather_grid_prefetch_and_sample():
+    requested = []
+
+    def get_forecast(lat, lon):
+        requested.append((lat, lon))
+        return _forecast(range(0, 12, 3), wind=lat - 60.0)
+
+    grid = WeatherTimeGrid.prefetch(ROUTE, grid_deg=0.05, get_forecast=get_forecast)
+
+    assert len(grid) == len(requested) == len(set(requested))
+    # Every route vertex falls in a fetched cell
+    assert all(grid._cell_key(lat, lon) in grid._cell_index for lat, lon in ROUTE)
+    sampled = grid.sample([60.3913, 60.3913, 10.0], [5.3221, 5.3221, 10.0],
+                          [MIDNIGHT + 3600, MIDNIGHT + 2 * 3600, MIDNIGHT])
+    start_cell = grid.cell_indices([60.3913], [5.3221])[0]
+    base = grid.cell_lats[start_cell] - 60.0
+    # Nearest forecast step: 01:00 -> 00:00, 02:00 -> 03:00
+    assert sampled['wind_speed'][:2].tolist() == pytest.approx([base, base + 3])
+    # Far away positions fall back to the nearest fetched cell
+    assert np.isfinite(sampled['wind_speed'][2])
+    assert np.isnan(sampled['wave_height']).all()
+
+
+def test_batch_timelines_use_simulated_clock():
+    simulator = _BareSimulator(ROUTE, 15.0)
+    simulator.risk_engine = RiskEngine()
+    simulator.alerts_service = MaritimeAlertsService()
+    weather = WeatherTimeGrid.prefetch(ROUTE, grid_deg=0.05,
+                                       get_forecast=lambda lat, lon: _forecast(range(24), wind=4.0))
+
+    result = simulator.simulate_batch([15.0, 15.0], [MIDNIGHT, MIDNIGHT + 12 * 3600],
+                                      weather=weather, tick_seconds=10.0)
+
+    assert result.arrived.all()
+    night, noon = result.summary()
+    assert night['duration_hours'] == noon['duration_hours']
+    # Departing at midnight UTC every point is a night point; at noon none are
+    valid = result.valid
+    assert result.alert_night_operations[0][valid[0]].all()
+    assert not result.alert_night_operations[1][valid[1]].any()
+    assert result.risk_night_operation[0][valid[0]].all()
+    assert (result.risk_level[0][valid[0]] >= 1).all()
+    # Forecast wind rises 1 m/s per hour: calm at midnight, gale around noon
+    assert result.wind_speed[0][valid[0]].max() < 10
+    assert result.wind_speed[1][valid[1]].min() > 15
+    assert not result.alert_excessive_speed[0][valid[0]].any()
+    assert result.alert_excessive_speed[1][valid[1]].all()
+    assert result.risk_high_winds[1][valid[1]].all()
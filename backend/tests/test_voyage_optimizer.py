@@ -0,0 +1,86 @@
+"""
+Tests for whole-route speed optimisation.
+Plans must arrive inside the ETA window, fall back to constant speed in calm
+weather and slow down where the weather makes fuel expensive.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from backend.ml.enhanced_fuel_optimizer import EmpiricalFuelOptimizer
+
+DEPARTURE = datetime(2026, 1, 15, 6, tzinfo=timezone.utc)
+VESSEL = {'type': 'container', 'mmsi': '257000001'}
+
+
+def _route(distances):
+    return {'route_name': 'Bergen - Stavanger', 'legs': [{'distance_nm': d} for d in distances]}
+
+
+def _storm(n_legs, stormy_legs, start_hour, end_hour):
+    """Flat forecasts: calm, then a gale on the given legs from start_hour to end_hour"""
+    hours = range(0, 48)
+    forecasts = []
+    for i in range(n_legs):
+        stormy = i in stormy_legs
+        forecasts.append([{'time': DEPARTURE + timedelta(hours=h),
+                           'wind_speed': 25.0 if stormy and start_hour <= h <= end_hour else 5.0,
+                           'wave_height': 4.5 if stormy and start_hour <= h <= end_hour else 0.5}
+                          for h in hours])
+    return forecasts
+
+
+@pytest.fixture
+def optimizer():
+    return EmpiricalFuelOptimizer()
+
+
+def test_calm_route_sails_at_constant_speed(optimizer):
+    distances = np.random.default_rng(20).lognormal(np.log(1.5), 1.0, 60) + 0.2
+    plan = optimizer.optimize_voyage_speeds(VESSEL, _route(distances), (0, distances.sum() / 12.0),
+                                            departure_time=DEPARTURE)
+
+    assert plan.feasible and len(plan.leg_speeds) == 60
+    assert plan.arrival_hours <= distances.sum() / 12.0 + 1e-6
+    assert plan.total_fuel == pytest.approx(plan.constant_speed_fuel, rel=2e-3)
+    assert (plan.eta - DEPARTURE).total_seconds() / 3600 == pytest.approx(sum(distances / np.array(plan.leg_speeds)))
+
+
+def test_slows_down_in_storm_and_still_meets_eta(optimizer):
+    distances = [10.0] * 12
+    window = (DEPARTURE + timedelta(hours=8), DEPARTURE + timedelta(hours=10.5))
+    plan = optimizer.optimize_voyage_speeds(VESSEL, _route(distances), window,
+                                            leg_forecasts=_storm(12, range(6, 12), 0, 48),
+                                            departure_time=DEPARTURE)
+
+    assert plan.feasible and 8 <= plan.arrival_hours <= 10.5
+    assert np.mean(plan.leg_speeds[6:]) < np.mean(plan.leg_speeds[:6])
+    assert plan.fuel_savings_pct > 0 and plan.total_fuel < plan.constant_speed_fuel
+
+
+def test_unreachable_window_is_reported(optimizer):
+    too_late = optimizer.optimize_voyage_speeds(VESSEL, _route([50.0] * 4), (0, 5), departure_time=DEPARTURE)
+    assert not too_late.feasible and len(set(too_late.leg_speeds)) == 1
+    assert too_late.leg_speeds[0] == max(too_late.leg_speeds) and too_late.arrival_hours > 5
+
+    too_early = optimizer.optimize_voyage_speeds(VESSEL, _route([5.0] * 4), (10, 12), departure_time=DEPARTURE)
+    assert not too_early.feasible and too_early.arrival_hours < 10
+    with pytest.raises(ValueError):
+        optimizer.optimize_voyage_speeds(VESSEL, _route([]), (0, 5), departure_time=DEPARTURE)
+
+
+def test_met_timeseries_forecasts_are_read(optimizer):
+    flat = _storm(6, range(6), 0, 48)
+    met = [[{'time': entry['time'].isoformat().replace('+00:00', 'Z'),
+             'data': {'instant': {'details': {'wind_speed': entry['wind_speed'],
+                                              'sea_surface_wave_height': entry['wave_height']}}}}
+            for entry in forecast] for forecast in flat]
+    args = (VESSEL, _route([10.0] * 6), (0, 6))
+
+    from_flat = optimizer.optimize_voyage_speeds(*args, leg_forecasts=flat, departure_time=DEPARTURE)
+    from_met = optimizer.optimize_voyage_speeds(*args, leg_forecasts=met, departure_time=DEPARTURE)
+    calm = optimizer.optimize_voyage_speeds(*args, departure_time=DEPARTURE)
+    assert from_met.leg_speeds == from_flat.leg_speeds and from_met.total_fuel == from_flat.total_fuel
+    assert from_met.total_fuel > calm.total_fuel
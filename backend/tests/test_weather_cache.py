@@ -0,0 +1,143 @@
+"""
+Tests for the shared grid-quantized MET forecast cache.
+"""
+
+import threading
+import time
+from email.utils import formatdate
+
+from backend.services.weather_service import WeatherCache, WeatherPrewarmer, fetch_met_weather, weather_cache
+
+FORECAST = {'properties': {'timeseries': [{'time': '2026-10-16T12:00:00Z', 'data': {
+    'instant': {'details': {'air_temperature': 9.5, 'wind_speed': 7.2, 'wind_from_direction': 200.0}},
+    'next_1_hours': {'summary': {'symbol_code': 'rain'}, 'details': {'precipitation_amount': 0.4}}}}]}}
+
+
+class FakeMET:
+    def __init__(self, delay=0.0, expires_in=3600):
+        self.calls = []
+        self.delay = delay
+        self.expires_in = expires_in
+        self.lock = threading.Lock()
+
+    def __call__(self, lat, lon, if_modified_since=None):
+        with self.lock:
+            self.calls.append((lat, lon, if_modified_since))
+        time.sleep(self.delay)
+        headers = {'Expires': formatdate(time.time() + self.expires_in, usegmt=True),
+                   'Last-Modified': 'Fri, 16 Oct 2026 11:00:00 GMT'}
+        if if_modified_since:
+            return 304, None, headers
+        return 200, FORECAST, headers
+
+
+def test_positions_in_one_cell_share_an_upstream_call():
+    cache = WeatherCache(grid_deg=0.05)
+    met = FakeMET()
+
+    assert cache.get_forecast(60.391, 5.322, met) is FORECAST
+    assert cache.get_forecast(60.399, 5.349, met) is FORECAST
+    assert cache.get_forecast(60.41, 5.322, met) is FORECAST  # next cell north
+
+    assert len(met.calls) == 2
+    # Upstream is queried at the cell centre
+    assert met.calls[0][:2] == (60.375, 5.325)
+    assert cache.stats()['hits'] == 1
+
+
+def test_lru_eviction_bounds_size():
+    cache = WeatherCache(grid_deg=0.05, max_entries=3)
+    met = FakeMET()
+    for i in range(5):
+        cache.get_forecast(60.0 + i * 0.1, 5.0, met)
+    cache.get_forecast(60.2, 5.0, met)  # touch: most recently used
+
+    cache.get_forecast(61.0, 5.0, met)
+
+    assert len(cache.cache) == 3
+    assert cache.cell(60.2, 5.0) in cache.cache
+    assert cache.cell(60.3, 5.0) not in cache.cache
+    assert cache.stats()['evictions'] == 3
+
+
+def test_expires_header_and_conditional_revalidation():
+    cache = WeatherCache(grid_deg=0.05, stale_seconds=0)  # revalidate in the request
+    met = FakeMET(expires_in=-1)  # already expired
+
+    cache.get_forecast(60.39, 5.32, met)
+    data, status = cache.lookup(60.39, 5.32, met)
+
+    assert data is FORECAST
+    assert status == 'revalidated'
+    assert met.calls[1][2] == 'Fri, 16 Oct 2026 11:00:00 GMT'
+    assert cache.stats()['not_modified'] == 1
+
+
+def test_concurrent_misses_are_coalesced():
+    cache = WeatherCache(grid_deg=0.05)
+    met = FakeMET(delay=0.2)
+    results = []
+
+    threads = [threading.Thread(target=lambda: results.append(cache.get_forecast(60.39, 5.32, met)))
+               for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(met.calls) == 1
+    assert results == [FORECAST] * 20
+    assert cache.stats()['coalesced'] == 19
+
+
+def test_fetch_met_weather_reads_through_shared_cache(monkeypatch):
+    met = FakeMET()
+    monkeypatch.setattr('backend.services.weather_service.request_met_forecast', met)
+    weather_cache.clear()
+
+    first = fetch_met_weather(60.391, 5.322)
+    second = fetch_met_weather(60.392, 5.323)
+
+    assert len(met.calls) == 1
+    assert first['cache_status'] == 'fresh' and second['cache_status'] == 'cached'
+    weather_cache.clear()
+
+
+def wait_for_refreshes(cache, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while cache.stats()['in_flight'] and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_expired_cells_are_served_stale_while_one_background_refresh_runs():
+    cache = WeatherCache(grid_deg=0.05)
+    cache.get_forecast(60.39, 5.32, FakeMET(expires_in=-1))
+    met = FakeMET(delay=0.2)
+
+    start = time.monotonic()
+    results = [cache.lookup(60.39, 5.32, met) for _ in range(10)]
+
+    assert time.monotonic() - start < 0.1
+    assert results == [(FORECAST, 'stale')] * 10
+    wait_for_refreshes(cache)
+    assert len(met.calls) == 1 and met.calls[0][2] == 'Fri, 16 Oct 2026 11:00:00 GMT'
+    assert cache.lookup(60.39, 5.32, met) == (FORECAST, 'cached')
+    stats = cache.stats()
+    assert stats['stale'] == 10 and stats['background_refreshes'] == 1 and stats['not_modified'] == 1
+
+
+def test_prewarmer_refreshes_missing_and_expiring_hot_cells():
+    cache = WeatherCache(grid_deg=0.05)
+    met = FakeMET()
+    cache.get_forecast(60.39, 5.32, FakeMET(expires_in=3600))   # fresh for an hour
+    cache.get_forecast(59.91, 10.75, FakeMET(expires_in=60))    # expires within the lead time
+    hot = [(60.39, 5.32), (59.91, 10.75), (63.43, 10.39), (63.431, 10.391)]
+    prewarmer = WeatherPrewarmer(cache, hot_points=lambda: hot, lead_seconds=300, fetch=met)
+
+    assert prewarmer.run_once() == 2
+    wait_for_refreshes(cache)
+
+    assert sorted(call[:2] for call in met.calls) == [(59.925, 10.775), (63.425, 10.375)]
+    assert all(cache.lookup(lat, lon, met)[1] == 'cached' for lat, lon in hot)
+    assert prewarmer.get_status()['hot_cells'] == 3
+    assert prewarmer.run_once() == 0
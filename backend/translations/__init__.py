@@ -3,6 +3,8 @@ Complete dynamic translation system for BergNavn Maritime.
 Automatically handles ALL text in ALL templates.
 """
 
+from .catalog import CatalogStore
+
 from .core import (
     TranslationRegistry,
     get_registry,
@@ -19,6 +21,7 @@ from .template_transformer import TemplateTransformer
 
 __version__ = "1.0.0"
 __all__ = [
+    'CatalogStore',
     'TranslationRegistry',
     'DynamicTranslator',
     'TemplateTransformer',
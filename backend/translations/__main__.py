@@ -5,13 +5,14 @@ Run with: python -m backend.translations
 import sys
 import argparse
 from datetime import datetime
+from .catalog import CatalogStore
 from .core import initialize_translations, get_registry
 from .template_transformer import TemplateTransformer
 
 def main():
     """Main entry point for translation system."""
     parser = argparse.ArgumentParser(description="BergNavn Maritime Translation System")
-    parser.add_argument('command', choices=['init', 'discover', 'transform', 'backup', 'stats'],
+    parser.add_argument('command', choices=['init', 'discover', 'transform', 'backup', 'stats', 'compile'],
                        help='Command to execute')
     parser.add_argument('--dry-run', action='store_true',
                        help='Show changes without applying (for transform)')
@@ -98,6 +99,12 @@ def main():
         backup_path = transformer.create_backup()
         print(f"✅ Backup created at: {backup_path}")
     
+    elif args.command == 'compile':
+        print("⚙️  Compiling translation catalogs...")
+        counts = CatalogStore("backend/translations/data").compile_all()
+        for lang, count in counts.items():
+            print(f"  {lang}: {count} entries")
+    
     elif args.command == 'stats':
         print("📊 Translation system statistics")
         print("=" * 50)
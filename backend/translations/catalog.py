@@ -0,0 +1,196 @@
+"""
+Precompiled translation catalogs for BergNavn Maritime.
+
+The nested {category: {key: text}} JSON files in translations/data are
+compiled into one flat "category.key" -> text table per language, with the
+Norwegian -> English fallback already resolved, so a lookup is a single dict
+probe. Compiled tables are written to data/compiled as marshal files stamped
+with their source's mtime and size (python -m backend.translations compile),
+memory-mapped and loaded with interned keys, and recompiled when the JSON
+source changes.
+"""
+import os
+import sys
+import json
+import mmap
+import time
+import marshal
+import logging
+import threading
+from typing import Dict, Optional
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+SUPPORTED_LANGUAGES = ('en', 'no')
+FALLBACK_LANGUAGE = 'en'
+NO_TRANSLATION_PREFIX = '[NO TRANSLATION] '
+COMPILED_DIRNAME = 'compiled'
+CATALOG_FORMAT = 1
+# How often (seconds) a catalog stats its source file for hot-reload
+RELOAD_CHECK_SECONDS = float(os.getenv('TRANSLATIONS_RELOAD_CHECK_SECONDS', '2'))
+
+
+def flatten(categories: Dict[str, Dict[str, str]]) -> Dict[str, str]:
+    """{category: {key: text}} -> {"category.key": text}, dropping empty texts."""
+    return {
+        sys.intern(f"{category}.{key}"): text
+        for category, items in categories.items()
+        if isinstance(items, dict)
+        for key, text in items.items()
+        if isinstance(text, str) and text
+    }
+
+
+class Catalog:
+    """
+    Compiled translations of one language.
+
+    Attributes:
+        lang: Language code
+        categories: Source {category: {key: text}} as loaded from JSON
+        entries: Flat "category.key" -> text of this language only
+        lookup: entries plus resolved fallbacks ("[NO TRANSLATION] English text")
+        version: (mtime_ns, size) of the sources the catalog was built from
+    """
+
+    def __init__(self, lang: str, categories: Dict[str, Dict[str, str]],
+                 entries: Dict[str, str], lookup: Dict[str, str], version: tuple):
+        self.lang = lang
+        self.categories = categories
+        self.entries = entries
+        self.lookup = lookup
+        self.version = version
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+class CatalogStore:
+    """
+    Per-language catalogs compiled from translations_dir, hot-reloaded when
+    a source file changes (checked at most every reload_check_seconds).
+    """
+
+    def __init__(self, translations_dir: str, reload_check_seconds: float = RELOAD_CHECK_SECONDS):
+        self.translations_dir = translations_dir
+        self.compiled_dir = os.path.join(translations_dir, COMPILED_DIRNAME)
+        self.reload_check_seconds = reload_check_seconds
+        self._catalogs: Dict[str, Catalog] = {}
+        self._next_check: Dict[str, float] = {}
+        self._lock = threading.RLock()
+        self.stats = {'loads': 0, 'compiles': 0, 'reloads': 0}
+
+    def _source(self, lang: str) -> str:
+        return os.path.join(self.translations_dir, f"{lang}.json")
+
+    def _compiled(self, lang: str) -> str:
+        return os.path.join(self.compiled_dir, f"{lang}.catalog")
+
+    def _file_version(self, lang: str) -> tuple:
+        try:
+            st = os.stat(self._source(lang))
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return (0, 0)
+
+    def _version(self, lang: str) -> tuple:
+        # A non-English catalog embeds English fallbacks, so it changes with en.json too
+        version = self._file_version(lang)
+        if lang != FALLBACK_LANGUAGE:
+            version += self._file_version(FALLBACK_LANGUAGE)
+        return version
+
+    def get(self, lang: str) -> Catalog:
+        """The catalog for lang, reloaded first if its source has changed."""
+        catalog = self._catalogs.get(lang)
+        if catalog is not None:
+            if time.monotonic() < self._next_check.get(lang, 0.0):
+                return catalog
+            if self._version(lang) == catalog.version:
+                self._next_check[lang] = time.monotonic() + self.reload_check_seconds
+                return catalog
+
+        with self._lock:
+            catalog = self._catalogs.get(lang)
+            version = self._version(lang)
+            if catalog is None or catalog.version != version:
+                if catalog is not None:
+                    self.stats['reloads'] += 1
+                    logger.info(f"🔄 Translations for '{lang}' changed on disk, reloading")
+                catalog = self._load(lang, version)
+                self._catalogs[lang] = catalog
+            self._next_check[lang] = time.monotonic() + self.reload_check_seconds
+            return catalog
+
+    def _load(self, lang: str, version: tuple) -> Catalog:
+        """Read the compiled table, or compile (and write) it if missing or out of date."""
+        compiled = self._read_compiled(lang, version[:2])
+        if compiled is None:
+            compiled = self.compile(lang, version[:2])
+        else:
+            self.stats['loads'] += 1
+
+        categories, entries = compiled['categories'], compiled['entries']
+        entries = {sys.intern(key): text for key, text in entries.items()}
+        lookup = dict(entries)
+        if lang != FALLBACK_LANGUAGE:
+            self._next_check.pop(FALLBACK_LANGUAGE, None)  # re-stat en.json now
+            english = self.get(FALLBACK_LANGUAGE).entries
+            for key, text in english.items():
+                lookup.setdefault(key, NO_TRANSLATION_PREFIX + text)
+        return Catalog(lang, categories, entries, lookup, version)
+
+    def _read_compiled(self, lang: str, version: tuple) -> Optional[Dict]:
+        try:
+            with open(self._compiled(lang), 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                compiled = marshal.loads(mapped)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if (not isinstance(compiled, dict) or compiled.get('format') != CATALOG_FORMAT
+                or tuple(compiled.get('source_version', ())) != version):
+            return None
+        return compiled
+
+    def compile(self, lang: str, version: Optional[tuple] = None) -> Dict:
+        """Compile lang's JSON source into a flat table and write it to compiled_dir."""
+        version = self._file_version(lang) if version is None else version
+        categories = {}
+        try:
+            with open(self._source(lang), 'r', encoding='utf-8') as f:
+                categories = json.load(f)
+        except FileNotFoundError:
+            logger.debug(f"Translation file not found: {self._source(lang)}")
+        except json.JSONDecodeError as e:
+            logger.error(f"Invalid JSON in {self._source(lang)}: {e}")
+        except Exception as e:
+            logger.error(f"Failed to load translations for {lang}: {e}")
+
+        compiled = {
+            'format': CATALOG_FORMAT,
+            'source_version': version,
+            'categories': categories,
+            'entries': flatten(categories),
+        }
+        self.stats['compiles'] += 1
+        try:
+            os.makedirs(self.compiled_dir, exist_ok=True)
+            tmp_path = f"{self._compiled(lang)}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                marshal.dump(compiled, f)
+            os.replace(tmp_path, self._compiled(lang))
+        except OSError as e:
+            logger.warning(f"Could not write compiled catalog for {lang}: {e}")
+        logger.debug(f"Compiled {len(compiled['entries'])} translations for language: {lang}")
+        return compiled
+
+    def compile_all(self) -> Dict[str, int]:
+        """Compile every supported language; returns entry counts."""
+        return {lang: len(self.compile(lang)['entries']) for lang in SUPPORTED_LANGUAGES}
+
+    def clear(self):
+        """Drop loaded catalogs; the next lookup loads them again."""
+        with self._lock:
+            self._catalogs.clear()
+            self._next_check.clear()
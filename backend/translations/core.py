@@ -11,6 +11,8 @@ from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 
+from .catalog import CatalogStore
+
 @dataclass
 class TranslationKey:
     """Represents a translatable text item."""
@@ -266,6 +268,10 @@ class TranslationRegistry:
             json.dump(metadata, f, ensure_ascii=False, indent=2)
         
         print(f"✅ Exported {len(self.translation_keys)} translations to {output_dir}")
+        
+        # Precompile the flat per-language catalogs the Flask translator serves
+        counts = CatalogStore(output_dir).compile_all()
+        print(f"⚙️  Compiled catalogs: {counts}")
     
     def generate_template_updates(self) -> Dict[str, List[str]]:
         """
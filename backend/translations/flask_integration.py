@@ -6,17 +6,19 @@ from flask import request, current_app
 from datetime import datetime  
 import json
 import os
-from functools import lru_cache
 from typing import Dict, Any, Optional
 import logging
 
+from .catalog import CatalogStore, NO_TRANSLATION_PREFIX, SUPPORTED_LANGUAGES
+
 # Configure logger
 logger = logging.getLogger(__name__)
 
 class DynamicTranslator:
     """
     Dynamic translation system for Flask templates.
-    Loads translations on-demand and caches them for performance.
+    Serves lookups from precompiled per-language catalogs (see catalog.py),
+    hot-reloaded when a translation file changes.
     """
     
     def __init__(self, translations_dir: str = "backend/translations/data"):
@@ -32,11 +34,14 @@ class DynamicTranslator:
         if not os.path.exists(translations_dir):
             logger.warning(f"Translations directory not found: {translations_dir}")
             os.makedirs(translations_dir, exist_ok=True)
+        
+        self.catalogs = CatalogStore(translations_dir)
+        # lang -> (catalog, template helpers built over it)
+        self._helpers: Dict[str, tuple] = {}
     
-    @lru_cache(maxsize=2)
     def _load_language(self, lang: str) -> Dict[str, Dict[str, str]]:
         """
-        Load translations for a language (cached).
+        Load translations for a language (compiled once, reloaded on change).
         
         Args:
             lang: Language code ('en' or 'no')
@@ -44,23 +49,15 @@ class DynamicTranslator:
         Returns:
             Dictionary of translations for the language
         """
-        filepath = os.path.join(self.translations_dir, f"{lang}.json")
-        
-        if not os.path.exists(filepath):
-            logger.debug(f"Translation file not found: {filepath}")
-            return {}
-        
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                logger.debug(f"Loaded {len(data)} categories for language: {lang}")
-                return data
-        except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON in {filepath}: {e}")
-            return {}
-        except Exception as e:
-            logger.error(f"Failed to load translations for {lang}: {e}")
-            return {}
+        return self.catalogs.get(lang).categories
+    
+    def _missing(self, key: str, lang: str, default: Optional[str]) -> str:
+        """Result for a key with no translation in lang or English."""
+        if lang == 'no' and default is not None and default != key:
+            return f"{NO_TRANSLATION_PREFIX}{default}"
+        if default is not None:
+            return default
+        return key
     
     def translate(self, key: str, lang: str = 'en', 
                  default: Optional[str] = None) -> str:
@@ -73,41 +70,19 @@ class DynamicTranslator:
             default: Default value if translation not found
             
         Returns:
-            Translated string or default/key if not found
+            Translated string, English text marked "[NO TRANSLATION]" for
+            Norwegian, or default/key if not found
         """
         # Validate language
-        if lang not in ['en', 'no']:
+        if lang not in SUPPORTED_LANGUAGES:
             logger.warning(f"Unsupported language: {lang}, falling back to 'en'")
             lang = 'en'
         
-        # Load translations for language
-        translations = self._load_language(lang)
-        
-        # Split key into category and subkey
-        if '.' in key:
-            category, subkey = key.split('.', 1)
-        else:
-            category = 'global'
-            subkey = key
-        
-        # Look up translation
-        category_dict = translations.get(category, {})
-        translated = category_dict.get(subkey)
-        
+        # Keys without a category live in 'global'
+        translated = self.catalogs.get(lang).lookup.get(key if '.' in key else f"global.{key}")
         if translated:
             return translated
-        
-        # Not found - try English as fallback for Norwegian
-        if lang == 'no':
-            english_translation = self.translate(key, 'en', default)
-            if english_translation and english_translation != key:
-                # Return English text (better than key)
-                return f"[NO TRANSLATION] {english_translation}"
-        
-        # Return default or key
-        if default is not None:
-            return default
-        return key
+        return self._missing(key, lang, default)
     
     def get_all(self, lang: str = 'en') -> Dict[str, Any]:
         """
@@ -117,21 +92,14 @@ class DynamicTranslator:
             lang: Language code ('en' or 'no')
             
         Returns:
-            Dictionary of all translations for the language
+            Flat "category.key" dictionary of the language's translations
+            (shared with the catalog - do not modify)
         """
         # Validate language
-        if lang not in ['en', 'no']:
+        if lang not in SUPPORTED_LANGUAGES:
             lang = 'en'
         
-        translations = self._load_language(lang)
-        
-        # Flatten for easier template access
-        flattened = {}
-        for category, items in translations.items():
-            for key, value in items.items():
-                flattened[f"{category}.{key}"] = value
-        
-        return flattened
+        return self.catalogs.get(lang).entries
     
     def get_categories(self, lang: str = 'en') -> Dict[str, Dict[str, str]]:
         """
@@ -156,70 +124,26 @@ class DynamicTranslator:
         Returns:
             True if translation exists
         """
-        if '.' in key:
-            category, subkey = key.split('.', 1)
-        else:
-            category = 'global'
-            subkey = key
-        
-        translations = self._load_language(lang)
-        category_dict = translations.get(category, {})
-        
-        return subkey in category_dict
-    
-    def clear_cache(self):
-        """Clear the language cache."""
-        self._load_language.cache_clear()
-        logger.info("Translation cache cleared")
-    
-    def cache_info(self):
-        """Get cache information."""
-        return self._load_language.cache_info()
-
-# Global translator instance
-_translator: Optional[DynamicTranslator] = None
-
-def get_translator() -> DynamicTranslator:
-    """
-    Get or create the global translator instance.
-    
-    Returns:
-        DynamicTranslator instance
-    """
-    global _translator
-    if _translator is None:
-        _translator = DynamicTranslator()
-    return _translator
-
-def init_app(app):
-    """
-    Initialize translation system with Flask app.
-    
-    Args:
-        app: Flask application instance
-    """
-    from flask import jsonify
+        return (key if '.' in key else f"global.{key}") in self.catalogs.get(lang).entries
     
-    @app.context_processor
-    def inject_translations():
-        """
-        Inject translations into all templates.
-        This makes the 't' function available in every template.
+    def template_helpers(self, lang: str) -> Dict[str, Any]:
         """
-        # Get language from URL parameter or default to English
-        lang = 'en'
-        
-        # Try to get language from URL parameters
-        if request.view_args:
-            lang = request.view_args.get('lang', 'en')
-        elif request.args:
-            lang = request.args.get('lang', 'en')
+        Template context for a language: lang, t, t_all, translate_many, ...
+        Built once per catalog, so a render only pays for the lookups it makes.
         
-        # Ensure valid language code
-        if lang not in ['en', 'no']:
-            lang = 'en'
+        Args:
+            lang: Supported language code
+            
+        Returns:
+            Context dictionary (shared between renders - do not modify)
+        """
+        catalog = self.catalogs.get(lang)
+        cached = self._helpers.get(lang)
+        if cached is not None and cached[0] is catalog:
+            return cached[1]
         
-        translator = get_translator()
+        lookup = catalog.lookup
+        missing = self._missing
         
         def t(key: str, category: str = 'global', 
               default: Optional[str] = None) -> str:
@@ -235,8 +159,8 @@ def init_app(app):
                 Translated text
             """
             full_key = f"{category}.{key}" if category != 'global' else key
-            result = translator.translate(full_key, lang, default or key)
-            return result
+            translated = lookup.get(full_key if '.' in full_key else f"global.{full_key}")
+            return translated or missing(full_key, lang, default or key)
         
         def t_all() -> Dict[str, str]:
             """
@@ -245,7 +169,7 @@ def init_app(app):
             Returns:
                 Dictionary of all translations
             """
-            return translator.get_all(lang)
+            return catalog.entries
         
         def get_language() -> str:
             """Get current language code."""
@@ -261,12 +185,9 @@ def init_app(app):
         
         def translate_many(keys: list, category: str = 'global') -> Dict[str, str]:
             """Translate multiple keys at once."""
-            results = {}
-            for key in keys:
-                results[key] = t(key, category)
-            return results
+            return {key: t(key, category) for key in keys}
         
-        return {
+        helpers = {
             'lang': lang,
             't': t,
             't_all': t_all,
@@ -274,8 +195,69 @@ def init_app(app):
             'is_english': is_english,
             'is_norwegian': is_norwegian,
             'translate_many': translate_many,
-            'translations': t_all()  # For direct access if needed
+            'translations': catalog.entries  # For direct access if needed
         }
+        self._helpers[lang] = (catalog, helpers)
+        return helpers
+    
+    def compile(self) -> Dict[str, int]:
+        """Compile every language's catalog now; returns entry counts."""
+        return self.catalogs.compile_all()
+    
+    def clear_cache(self):
+        """Drop loaded catalogs; the next lookup reloads them from disk."""
+        self.catalogs.clear()
+        self._helpers.clear()
+        logger.info("Translation cache cleared")
+    
+    def cache_info(self) -> Dict[str, int]:
+        """Get catalog cache information."""
+        return {'size': len(self.catalogs._catalogs), **self.catalogs.stats}
+
+# Global translator instance
+_translator: Optional[DynamicTranslator] = None
+
+def get_translator() -> DynamicTranslator:
+    """
+    Get or create the global translator instance.
+    
+    Returns:
+        DynamicTranslator instance
+    """
+    global _translator
+    if _translator is None:
+        _translator = DynamicTranslator()
+    return _translator
+
+def init_app(app):
+    """
+    Initialize translation system with Flask app.
+    
+    Args:
+        app: Flask application instance
+    """
+    from flask import jsonify
+    
+    @app.context_processor
+    def inject_translations():
+        """
+        Inject translations into all templates.
+        This makes the 't' function available in every template.
+        """
+        # Get language from URL parameter or default to English
+        lang = 'en'
+        
+        # Try to get language from URL parameters
+        if request.view_args:
+            lang = request.view_args.get('lang', 'en')
+        elif request.args:
+            lang = request.args.get('lang', 'en')
+        
+        # Ensure valid language code
+        if lang not in ['en', 'no']:
+            lang = 'en'
+        
+        return get_translator().template_helpers(lang)
     
     # Add translation API endpoints
     @app.route('/api/translations/<lang>', methods=['GET'])
@@ -334,7 +316,7 @@ def init_app(app):
     def refresh_translations():
         """
         Refresh translations cache.
-        Useful after updating translation files.
+        Catalogs also reload on their own when a translation file changes.
         
         Returns:
             JSON response with status
@@ -367,28 +349,13 @@ def init_app(app):
         en_translation = translator.translate(test_key, 'en', 'not_found')
         no_translation = translator.translate(test_key, 'no', 'not_found')
         
-        # Get cache info
-        try:
-            cache_info = translator.cache_info()
-            cache_size = cache_info.currsize
-            cache_hits = cache_info.hits
-            cache_misses = cache_info.misses
-        except:
-            cache_size = 0
-            cache_hits = 0
-            cache_misses = 0
-        
         status = 'healthy' if en_exists else 'degraded'
         
         return jsonify({
             'status': status,
             'english_file': en_exists,
             'norwegian_file': no_exists,
-            'cache_info': {
-                'size': cache_size,
-                'hits': cache_hits,
-                'misses': cache_misses
-            },
+            'cache_info': translator.cache_info(),
             'sample_translation': {
                 'key': test_key,
                 'english': en_translation,
@@ -0,0 +1,352 @@
+"""
+Spatial indexes for latitude/longitude points.
+
+GeoGridIndex answers radius, bounding-box and nearest-neighbour queries by
+only touching the grid cells that can contain a match, instead of scanning
+every point. LatitudeBandIndex answers the same radius question for a whole
+batch of query points at once with NumPy.
+"""
+
+import math
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE_LAT = math.pi * EARTH_RADIUS_KM / 180.0  # ~111.195 km
+
+# Floor for cos(lat) so cells near the poles do not explode in width
+_MIN_COS_LAT = 0.01
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometers."""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def haversine_km_np(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Vectorised great-circle distance in kilometers (broadcasts like NumPy)."""
+    phi1 = np.radians(lat1)
+    phi2 = np.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = np.radians(np.asarray(lon2) - np.asarray(lon1))
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlmb / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+class GeoGridIndex:
+    """
+    Spatial index that buckets points into fixed-size lat/lon cells.
+
+    Points are stored under caller-supplied hashable keys, so the same index
+    works for static hazard lists (keyed by list position) and for live
+    vessels (keyed by MMSI) that move between cells as positions update.
+
+    Longitudes are not wrapped at the antimeridian; all data handled by
+    BergNavn lies well inside Norwegian waters.
+    """
+
+    def __init__(self, cell_size_deg: float = 0.05):
+        """
+        Args:
+            cell_size_deg: Edge length of a grid cell in degrees. Pick it close
+                to the typical query radius (0.05° ≈ 5.5 km north-south).
+        """
+        if cell_size_deg <= 0:
+            raise ValueError("cell_size_deg must be positive")
+        self.cell_size_deg = cell_size_deg
+        self._cells: Dict[Tuple[int, int], Set[Hashable]] = {}
+        self._points: Dict[Hashable, Tuple[float, float, Tuple[int, int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._points
+
+    def _cell_of(self, lat: float, lon: float) -> Tuple[int, int]:
+        return (int(math.floor(lat / self.cell_size_deg)),
+                int(math.floor(lon / self.cell_size_deg)))
+
+    # --- Maintenance ---
+
+    def insert(self, key: Hashable, lat: float, lon: float) -> None:
+        """Insert a point, or move it if the key is already indexed."""
+        cell = self._cell_of(lat, lon)
+        existing = self._points.get(key)
+        if existing is not None and existing[2] != cell:
+            self._discard_from_cell(key, existing[2])
+        self._points[key] = (lat, lon, cell)
+        self._cells.setdefault(cell, set()).add(key)
+
+    def bulk_load(self, points: Iterable[Tuple[Hashable, float, float]]) -> None:
+        """Insert many (key, lat, lon) tuples."""
+        for key, lat, lon in points:
+            self.insert(key, lat, lon)
+
+    def remove(self, key: Hashable) -> bool:
+        """Remove a point. Returns False if the key was not indexed."""
+        existing = self._points.pop(key, None)
+        if existing is None:
+            return False
+        self._discard_from_cell(key, existing[2])
+        return True
+
+    def clear(self) -> None:
+        """Remove all points."""
+        self._cells.clear()
+        self._points.clear()
+
+    def get(self, key: Hashable) -> Optional[Tuple[float, float]]:
+        """Return the indexed (lat, lon) for a key, or None."""
+        existing = self._points.get(key)
+        return (existing[0], existing[1]) if existing else None
+
+    def _discard_from_cell(self, key: Hashable, cell: Tuple[int, int]) -> None:
+        bucket = self._cells.get(cell)
+        if bucket is not None:
+            bucket.discard(key)
+            if not bucket:
+                del self._cells[cell]
+
+    # --- Queries ---
+
+    def _cell_span(self, lat: float, radius_km: float) -> Tuple[int, int]:
+        """Number of cells to search either side of the centre cell."""
+        lat_deg = radius_km / KM_PER_DEGREE_LAT
+        # Use the widest latitude the circle touches, where degrees of
+        # longitude are shortest, so the span is never too small.
+        edge_lat = min(89.9, abs(lat) + lat_deg)
+        cos_lat = max(_MIN_COS_LAT, math.cos(math.radians(edge_lat)))
+        lon_deg = lat_deg / cos_lat
+        return (int(math.ceil(lat_deg / self.cell_size_deg)),
+                int(math.ceil(lon_deg / self.cell_size_deg)))
+
+    def _keys_in_cells(self, ci_min: int, ci_max: int,
+                       cj_min: int, cj_max: int) -> Iterable[Hashable]:
+        # Walk whichever is smaller: the requested window or the occupied cells
+        window = (ci_max - ci_min + 1) * (cj_max - cj_min + 1)
+        if window > len(self._cells):
+            for (ci, cj), bucket in self._cells.items():
+                if ci_min <= ci <= ci_max and cj_min <= cj <= cj_max:
+                    yield from bucket
+            return
+        for ci in range(ci_min, ci_max + 1):
+            for cj in range(cj_min, cj_max + 1):
+                bucket = self._cells.get((ci, cj))
+                if bucket:
+                    yield from bucket
+
+    def candidates(self, lat: float, lon: float, radius_km: float) -> List[Hashable]:
+        """
+        Keys in the cells covering a radius query, without distance filtering.
+
+        A superset of query_radius, for callers that compute distances for the
+        candidates in bulk (e.g. with haversine_km_np).
+        """
+        if not self._points or radius_km < 0:
+            return []
+        ci, cj = self._cell_of(lat, lon)
+        span_i, span_j = self._cell_span(lat, radius_km)
+        return list(self._keys_in_cells(ci - span_i, ci + span_i, cj - span_j, cj + span_j))
+
+    def query_radius(self, lat: float, lon: float, radius_km: float,
+                     sort: bool = False) -> List[Tuple[Hashable, float]]:
+        """
+        Find all points within radius_km of (lat, lon).
+
+        Returns:
+            List of (key, distance_km) tuples, ordered by distance if sort=True
+        """
+        if not self._points or radius_km < 0:
+            return []
+        ci, cj = self._cell_of(lat, lon)
+        span_i, span_j = self._cell_span(lat, radius_km)
+
+        results = []
+        points = self._points
+        for key in self._keys_in_cells(ci - span_i, ci + span_i, cj - span_j, cj + span_j):
+            p_lat, p_lon, _ = points[key]
+            distance = haversine_km(lat, lon, p_lat, p_lon)
+            if distance <= radius_km:
+                results.append((key, distance))
+
+        if sort:
+            results.sort(key=lambda item: item[1])
+        return results
+
+    def query_bbox(self, min_lat: float, min_lon: float,
+                   max_lat: float, max_lon: float) -> List[Hashable]:
+        """Find all points inside a lat/lon bounding box (inclusive)."""
+        if not self._points:
+            return []
+        ci_min, cj_min = self._cell_of(min_lat, min_lon)
+        ci_max, cj_max = self._cell_of(max_lat, max_lon)
+
+        results = []
+        points = self._points
+        for key in self._keys_in_cells(ci_min, ci_max, cj_min, cj_max):
+            p_lat, p_lon, _ = points[key]
+            if min_lat <= p_lat <= max_lat and min_lon <= p_lon <= max_lon:
+                results.append(key)
+        return results
+
+    def nearest(self, lat: float, lon: float, k: int = 1,
+                max_radius_km: Optional[float] = None) -> List[Tuple[Hashable, float]]:
+        """
+        Find the k points closest to (lat, lon).
+
+        Searches outward ring by ring and stops once the k-th best distance is
+        inside the area already covered.
+
+        Returns:
+            List of (key, distance_km) tuples sorted by distance
+        """
+        if k <= 0 or not self._points:
+            return []
+
+        ci, cj = self._cell_of(lat, lon)
+        points = self._points
+        found: List[Tuple[Hashable, float]] = []
+        ring = 0
+        while True:
+            if (2 * ring + 1) ** 2 > len(self._cells):
+                # The ring window is larger than the occupied grid: finish by
+                # scanning every point once.
+                found = [(key, haversine_km(lat, lon, p[0], p[1])) for key, p in points.items()]
+                break
+
+            for cell in self._ring_cells(ci, cj, ring):
+                bucket = self._cells.get(cell)
+                if not bucket:
+                    continue
+                for key in bucket:
+                    p_lat, p_lon, _ = points[key]
+                    found.append((key, haversine_km(lat, lon, p_lat, p_lon)))
+
+            # Everything within ring cell edges of the query has been seen.
+            # Measure the edge at the poleward side of the next ring, where
+            # cells are narrowest, and keep a margin for great-circle vs
+            # parallel distance.
+            edge_lat = min(89.9, abs(lat) + (ring + 1) * self.cell_size_deg)
+            cos_lat = max(_MIN_COS_LAT, math.cos(math.radians(edge_lat)))
+            covered_km = 0.95 * ring * self.cell_size_deg * KM_PER_DEGREE_LAT * cos_lat
+            if max_radius_km is not None and covered_km >= max_radius_km:
+                break
+            if len(found) >= k:
+                found.sort(key=lambda item: item[1])
+                if found[k - 1][1] <= covered_km:
+                    break
+            ring += 1
+
+        if max_radius_km is not None:
+            found = [item for item in found if item[1] <= max_radius_km]
+        found.sort(key=lambda item: item[1])
+        return found[:k]
+
+    @staticmethod
+    def _ring_cells(ci: int, cj: int, ring: int) -> Iterable[Tuple[int, int]]:
+        """Cells forming the square ring at Chebyshev distance `ring`."""
+        if ring == 0:
+            yield (ci, cj)
+            return
+        for dj in range(-ring, ring + 1):
+            yield (ci - ring, cj + dj)
+            yield (ci + ring, cj + dj)
+        for di in range(-ring + 1, ring):
+            yield (ci + di, cj - ring)
+            yield (ci + di, cj + ring)
+
+    def stats(self) -> Dict[str, Any]:
+        """Occupancy statistics for diagnostics endpoints."""
+        occupied = len(self._cells)
+        return {
+            'points': len(self._points),
+            'occupied_cells': occupied,
+            'cell_size_deg': self.cell_size_deg,
+            'avg_points_per_cell': round(len(self._points) / occupied, 2) if occupied else 0.0,
+        }
+
+
+class LatitudeBandIndex:
+    """
+    Static point set sorted by latitude for batched radius joins.
+
+    Each query point only measures reference points inside its latitude band
+    (found with a binary search) and longitude window, so a whole fleet can be
+    matched against thousands of hazards with a handful of array operations.
+    """
+
+    # Query points processed per chunk, bounding temporary pair arrays
+    CHUNK_SIZE = 4096
+
+    def __init__(self, lats, lons):
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        self._order = np.argsort(lats, kind='stable')
+        self._lats = lats[self._order]
+        self._lons = lons[self._order]
+
+    def __len__(self) -> int:
+        return len(self._lats)
+
+    def within(self, lats, lons, radius_km: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Find every (query, reference) pair closer than radius_km.
+
+        Args:
+            lats, lons: Query coordinates; NaN entries never match
+            radius_km: Search radius in kilometers
+
+        Returns:
+            (query_idx, ref_idx, distance_km) arrays, where ref_idx refers to
+            the order the reference points were given in. Pairs are sorted by
+            query index, then reference index.
+        """
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        empty = (np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp), np.empty(0))
+        if len(self._lats) == 0 or len(lats) == 0 or radius_km < 0:
+            return empty
+
+        parts = [self._within_chunk(lats[i:i + self.CHUNK_SIZE], lons[i:i + self.CHUNK_SIZE], radius_km, i)
+                 for i in range(0, len(lats), self.CHUNK_SIZE)]
+        parts = [part for part in parts if len(part[0])]
+        if not parts:
+            return empty
+        query_idx, ref_idx, distance = (np.concatenate(column) for column in zip(*parts))
+
+        order = np.lexsort((ref_idx, query_idx))
+        return query_idx[order], ref_idx[order], distance[order]
+
+    def _within_chunk(self, lats, lons, radius_km, offset):
+        lat_deg = radius_km / KM_PER_DEGREE_LAT
+        valid = np.isfinite(lats) & np.isfinite(lons)
+        lo = np.searchsorted(self._lats, lats - lat_deg, side='left')
+        hi = np.searchsorted(self._lats, lats + lat_deg, side='right')
+        counts = np.where(valid, hi - lo, 0)
+        total = int(counts.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp), np.empty(0)
+
+        # Expand each query's [lo, hi) band into explicit candidate pairs
+        query_local = np.repeat(np.arange(len(lats)), counts)
+        starts = np.cumsum(counts) - counts
+        ref_sorted = np.repeat(lo, counts) + (np.arange(total) - np.repeat(starts, counts))
+
+        # Cheap longitude window before the trigonometry
+        edge_lat = np.minimum(89.9, np.abs(lats) + lat_deg)
+        lon_deg = lat_deg / np.maximum(_MIN_COS_LAT, np.cos(np.radians(edge_lat)))
+        q_lat = lats[query_local]
+        q_lon = lons[query_local]
+        keep = np.abs(self._lons[ref_sorted] - q_lon) <= lon_deg[query_local]
+        query_local, ref_sorted, q_lat, q_lon = query_local[keep], ref_sorted[keep], q_lat[keep], q_lon[keep]
+
+        distance = haversine_km_np(q_lat, q_lon, self._lats[ref_sorted], self._lons[ref_sorted])
+        hit = distance <= radius_km
+        return query_local[hit] + offset, self._order[ref_sorted[hit]], distance[hit]
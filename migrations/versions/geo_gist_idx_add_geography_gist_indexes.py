@@ -0,0 +1,66 @@
+"""Add geography GiST indexes for PostGIS proximity queries
+
+ST_DWithin on geography (meters) only uses an index built on the same
+geography expression; the existing geometry indexes do not serve it.
+Also makes sure the PostGIS extension and the geometry indexes exist.
+
+Revision ID: geo_gist_idx
+Revises: rtz_final_fix
+Create Date: 2026-10-16 12:00:00.000000
+"""
+
+from alembic import op
+from sqlalchemy import text
+
+# revision identifiers, used by Alembic
+revision = 'geo_gist_idx'
+down_revision = 'rtz_final_fix'
+branch_labels = None
+depends_on = None
+
+
+# (table, column) pairs queried by backend/services/spatial_queries.py
+SPATIAL_COLUMNS = [
+    ('hazard_zones', 'geometry'),
+    ('base_routes', 'geometry'),
+    ('route_legs', 'geometry'),
+    ('waypoints', 'position'),
+    ('maritime_route_legs', 'geometry'),
+]
+
+
+def _table_exists(conn, table):
+    return conn.execute(text("SELECT to_regclass(:table)"), {'table': table}).scalar() is not None
+
+
+def upgrade():
+    """Create geometry and geography GiST indexes on every spatial column."""
+    conn = op.get_bind()
+    conn.execute(text("CREATE EXTENSION IF NOT EXISTS postgis"))
+
+    for table, column in SPATIAL_COLUMNS:
+        if not _table_exists(conn, table):
+            print(f"⚠️  Table {table} doesn't exist, skipping")
+            continue
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS idx_{table}_{column}_gist ON {table} USING gist ({column})"
+        ))
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS idx_{table}_{column}_geography ON {table} USING gist (({column}::geography))"
+        ))
+        conn.execute(text(f"ANALYZE {table}"))
+        print(f"✅ GiST indexes on {table}.{column}")
+
+    if _table_exists(conn, 'hazard_zones'):
+        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_hazard_zones_hazard_type ON hazard_zones (hazard_type)"))
+        print("✅ Index on hazard_zones.hazard_type")
+
+
+def downgrade():
+    """Drop the indexes added by upgrade (the PostGIS extension is kept)."""
+    conn = op.get_bind()
+    conn.execute(text("DROP INDEX IF EXISTS idx_hazard_zones_hazard_type"))
+    for table, column in SPATIAL_COLUMNS:
+        conn.execute(text(f"DROP INDEX IF EXISTS idx_{table}_{column}_geography"))
+        conn.execute(text(f"DROP INDEX IF EXISTS idx_{table}_{column}_gist"))
+        print(f"✅ Dropped GiST indexes on {table}.{column}")
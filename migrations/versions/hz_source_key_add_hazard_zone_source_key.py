@@ -0,0 +1,43 @@
+"""Add source_key to hazard_zones
+
+Point hazards synced by backend/services/spatial_queries.py are deleted and
+re-inserted with fresh ids whenever a worker syncs them, so rows are mapped
+back to their hazard by a stable key instead of the id.
+
+Revision ID: hz_source_key
+Revises: geo_gist_idx
+Create Date: 2026-10-16 15:00:00.000000
+"""
+
+from alembic import op
+from sqlalchemy import text
+
+# revision identifiers, used by Alembic
+revision = 'hz_source_key'
+down_revision = 'geo_gist_idx'
+branch_labels = None
+depends_on = None
+
+
+def _table_exists(conn, table):
+    return conn.execute(text("SELECT to_regclass(:table)"), {'table': table}).scalar() is not None
+
+
+def upgrade():
+    """Add the indexed hazard_zones.source_key column."""
+    conn = op.get_bind()
+    if not _table_exists(conn, 'hazard_zones'):
+        print("⚠️  Table hazard_zones doesn't exist, skipping")
+        return
+    conn.execute(text("ALTER TABLE hazard_zones ADD COLUMN IF NOT EXISTS source_key VARCHAR(40)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS idx_hazard_zones_source_key ON hazard_zones (source_key)"))
+    print("✅ Added hazard_zones.source_key")
+
+
+def downgrade():
+    """Drop hazard_zones.source_key and its index."""
+    conn = op.get_bind()
+    conn.execute(text("DROP INDEX IF EXISTS idx_hazard_zones_source_key"))
+    if _table_exists(conn, 'hazard_zones'):
+        conn.execute(text("ALTER TABLE hazard_zones DROP COLUMN IF EXISTS source_key"))
+        print("✅ Dropped hazard_zones.source_key")
@@ -0,0 +1,43 @@
+"""Add rtz_file_hash to base_routes
+
+Marks the base_routes rows written by backend/services/rtz_ingest.py, so a
+re-import only replaces its own rows and leaves manually created routes
+with the same name alone.
+
+Revision ID: rtz_base_hash
+Revises: hz_source_key
+Create Date: 2026-10-16 18:00:00.000000
+"""
+
+from alembic import op
+from sqlalchemy import text
+
+# revision identifiers, used by Alembic
+revision = 'rtz_base_hash'
+down_revision = 'hz_source_key'
+branch_labels = None
+depends_on = None
+
+
+def _table_exists(conn, table):
+    return conn.execute(text("SELECT to_regclass(:table)"), {'table': table}).scalar() is not None
+
+
+def upgrade():
+    """Add the indexed base_routes.rtz_file_hash column."""
+    conn = op.get_bind()
+    if not _table_exists(conn, 'base_routes'):
+        print("⚠️  Table base_routes doesn't exist, skipping")
+        return
+    conn.execute(text("ALTER TABLE base_routes ADD COLUMN IF NOT EXISTS rtz_file_hash VARCHAR(64)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS idx_base_routes_rtz_file_hash ON base_routes (rtz_file_hash)"))
+    print("✅ Added base_routes.rtz_file_hash")
+
+
+def downgrade():
+    """Drop base_routes.rtz_file_hash and its index."""
+    conn = op.get_bind()
+    conn.execute(text("DROP INDEX IF EXISTS idx_base_routes_rtz_file_hash"))
+    if _table_exists(conn, 'base_routes'):
+        conn.execute(text("ALTER TABLE base_routes DROP COLUMN IF EXISTS rtz_file_hash"))
+        print("✅ Dropped base_routes.rtz_file_hash")
@@ -0,0 +1,146 @@
+# scripts/benchmark_ais_decoder.py
+# AIS decoder throughput: raw decode, and end-to-end replay of a recorded
+# NMEA file through KystverketAISService from a local TCP stand-in.
+# Run from project root:
+#   python -m scripts.benchmark_ais_decoder [recording.nmea]
+# Without a recording, a synthetic Norwegian coastal feed is generated.
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+from backend.services.ais_decoder import AISStreamDecoder, armor_payload, to_sentences
+# Imported before the stand-in is configured, so the module-level singleton
+# does not connect to it ahead of the benchmarked instance
+from backend.services.kystverket_ais_service import KystverketAISService
+
+N_SENTENCES = 200000
+CHUNK_BYTES = 65536
+
+
+def _uint(value, bits):
+    return format(value & ((1 << bits) - 1), f'0{bits}b')
+
+
+def _text(value, chars):
+    sixbit = '@ABCDEFGHIJKLMNOPQRSTUVWXYZ[\\]^_ !"#$%&\'()*+,-./0123456789:;<=>?'
+    value = value.upper()[:chars].ljust(chars, '@')
+    return ''.join(_uint(sixbit.index(c), 6) for c in value)
+
+
+def position_bits(msg_type, mmsi, lat, lon, sog, cog, heading):
+    """Type 1/2/3 (class A) or 18 (class B) position report bits."""
+    lon_raw, lat_raw = int(round(lon * 600000)), int(round(lat * 600000))
+    if msg_type == 18:
+        return (_uint(18, 6) + _uint(0, 2) + _uint(mmsi, 30) + _uint(0, 8)
+                + _uint(int(sog * 10), 10) + _uint(0, 1) + _uint(lon_raw, 28) + _uint(lat_raw, 27)
+                + _uint(int(cog * 10), 12) + _uint(heading, 9) + _uint(30, 6) + '0' * 29)
+    return (_uint(msg_type, 6) + _uint(0, 2) + _uint(mmsi, 30) + _uint(0, 4) + _uint(0, 8)
+            + _uint(int(sog * 10), 10) + _uint(0, 1) + _uint(lon_raw, 28) + _uint(lat_raw, 27)
+            + _uint(int(cog * 10), 12) + _uint(heading, 9) + _uint(30, 6) + '0' * 25)
+
+
+def static_bits(mmsi, name, ship_type, destination):
+    """Type 5 static and voyage data bits."""
+    return (_uint(5, 6) + _uint(0, 2) + _uint(mmsi, 30) + _uint(0, 2) + _uint(9000000 + mmsi % 999999, 30)
+            + _text('LA' + str(mmsi)[-4:], 7) + _text(name, 20) + _uint(ship_type, 8)
+            + _uint(80, 9) + _uint(20, 9) + _uint(8, 6) + _uint(8, 6) + _uint(1, 4)
+            + _uint(0, 20) + _uint(65, 8) + _text(destination, 20) + '00')
+
+
+def generate_recording(path, n_sentences, seed=7):
+    """Write a synthetic Kystverket-style recording with tag blocks."""
+    rng = random.Random(seed)
+    fleet = [(257000000 + i, rng.uniform(58.0, 71.0), rng.uniform(4.0, 31.0)) for i in range(5000)]
+    names = ['NORDLYS', 'KONG HARALD', 'HAVILA CAPELLA', 'COLOR FANTASY', 'BERGENSFJORD']
+    ship_types = [30, 60, 70, 80, 52]
+    written = 0
+    sequence = 0
+    unix_time = 1760000000
+    with open(path, 'w') as recording:
+        while written < n_sentences:
+            mmsi, lat, lon = rng.choice(fleet)
+            roll = rng.random()
+            if roll < 0.08:
+                sequence = (sequence + 1) % 10
+                payload, fill = armor_payload(static_bits(
+                    mmsi, rng.choice(names), rng.choice(ship_types), 'BERGEN'))
+                sentences = to_sentences(payload, fill, sequence_id=str(sequence))
+            else:
+                msg_type = 18 if roll < 0.2 else rng.choice([1, 2, 3])
+                payload, fill = armor_payload(position_bits(
+                    msg_type, mmsi, lat + rng.uniform(-0.01, 0.01), lon + rng.uniform(-0.01, 0.01),
+                    rng.uniform(0, 20), rng.uniform(0, 359), rng.randint(0, 359)))
+                sentences = to_sentences(payload, fill, channel=rng.choice('AB'))
+            unix_time += rng.randint(0, 1)
+            for sentence in sentences:
+                tag = f"s:{2573000 + mmsi % 500},c:{unix_time}"
+                checksum = 0
+                for byte in tag.encode('ascii'):
+                    checksum ^= byte
+                recording.write(f"\\{tag}*{checksum:02X}\\{sentence}\r\n")
+                written += 1
+
+
+def bench_decoder(data):
+    decoder = AISStreamDecoder()
+    start = time.perf_counter()
+    messages = 0
+    for offset in range(0, len(data), CHUNK_BYTES):
+        messages += len(decoder.feed(data[offset:offset + CHUNK_BYTES]))
+    elapsed = time.perf_counter() - start
+    print(f"Decoder only:     {decoder.stats['sentences'] / elapsed:10.0f} sentences/s "
+          f"({messages} messages, {decoder.stats})")
+
+
+def bench_service(data):
+    """Replay through KystverketAISService._listen_to_stream over local TCP."""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(('127.0.0.1', 0))
+    server.listen(1)
+    port = server.getsockname()[1]
+
+    def serve():
+        connection, _ = server.accept()
+        connection.sendall(data)
+        connection.close()
+
+    threading.Thread(target=serve, daemon=True).start()
+
+    os.environ.update({
+        'USE_KYSTVERKET_AIS': 'true',
+        'KYSTVERKET_AIS_HOST': '127.0.0.1',
+        'KYSTVERKET_AIS_PORT': str(port),
+    })
+    start = time.perf_counter()
+    service = KystverketAISService()  # starts the listener thread
+    while service._connection_active or service._decoder.stats['sentences'] == 0:
+        time.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    service.stop_service()
+    server.close()
+
+    stats = service._decoder.stats
+    print(f"Service replay:   {stats['sentences'] / elapsed:10.0f} sentences/s "
+          f"({len(service._vessel_store)} vessels in store)")
+
+
+def main():
+    if len(sys.argv) > 1:
+        path = sys.argv[1]
+    else:
+        path = os.path.join(tempfile.gettempdir(), 'bergnavn_ais_replay.nmea')
+        if not os.path.exists(path):
+            generate_recording(path, N_SENTENCES)
+    with open(path, 'rb') as recording:
+        data = recording.read()
+    print(f"Recording: {path} ({len(data) / 1e6:.1f} MB)")
+    bench_decoder(data)
+    bench_service(data)
+
+
+if __name__ == "__main__":
+    main()
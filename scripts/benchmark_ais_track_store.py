@@ -0,0 +1,74 @@
+# scripts/benchmark_ais_track_store.py
+# AIS track store at archive scale: append throughput, on-disk size per
+# report versus raw float64 columns, and latency of the two range queries
+# (one vessel's track over a time window, all positions in a bbox during a
+# window) against a cold, memory-mapped store.
+# Run from project root: python -m scripts.benchmark_ais_track_store [n_vessels] [reports_per_vessel]
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from backend.services.ais_track_store import AISTrackStore
+
+T0 = 1_789_999_200.0
+REPORT_INTERVAL_SECONDS = 30
+N_QUERIES = 50
+
+
+def run(n_vessels, reports_per_vessel):
+    rng = np.random.default_rng(14)
+    lat = rng.uniform(58.0, 71.0, n_vessels)
+    lon = rng.uniform(4.0, 30.0, n_vessels)
+    sog = rng.uniform(0.0, 20.0, n_vessels)
+    cog = rng.uniform(0.0, 360.0, n_vessels)
+    mmsi = 257000000 + np.arange(n_vessels)
+
+    with tempfile.TemporaryDirectory() as root:
+        store = AISTrackStore(root, retention_hours=0)  # archive import: keep all history
+        start = time.perf_counter()
+        for step in range(reports_per_vessel):
+            t = T0 + step * REPORT_INTERVAL_SECONDS
+            heading = np.radians(cog)
+            lat += sog * np.cos(heading) * REPORT_INTERVAL_SECONDS / 3600 / 60
+            lon += sog * np.sin(heading) * REPORT_INTERVAL_SECONDS / 3600 / 60 / np.cos(np.radians(lat))
+            cog = (cog + rng.normal(0, 2, n_vessels)) % 360
+            for k in range(n_vessels):
+                store.append(mmsi[k], lat[k], lon[k], sog=sog[k], cog=cog[k], timestamp=t + k % 10)
+        store.flush()
+        append_s = time.perf_counter() - start
+        rows = n_vessels * reports_per_vessel
+
+        status = store.get_store_status()
+        t_end = T0 + reports_per_vessel * REPORT_INTERVAL_SECONDS
+
+        cold = AISTrackStore(root, retention_hours=0)
+        start = time.perf_counter()
+        track_rows = 0
+        for query in range(N_QUERIES):
+            t0 = rng.uniform(T0, t_end - 3 * 3600)
+            track_rows += len(cold.track(int(rng.choice(mmsi)), t0, t0 + 3 * 3600)['timestamp'])
+        track_ms = (time.perf_counter() - start) * 1000 / N_QUERIES
+
+        start = time.perf_counter()
+        bbox_rows = 0
+        for query in range(N_QUERIES):
+            min_lat, min_lon = rng.uniform(58.0, 69.0), rng.uniform(4.0, 26.0)
+            t0 = rng.uniform(T0, t_end - 3600)
+            bbox_rows += len(cold.positions_in_bbox(min_lat, min_lon, min_lat + 1.0, min_lon + 2.0,
+                                                    t0, t0 + 3600)['mmsi'])
+        bbox_ms = (time.perf_counter() - start) * 1000 / N_QUERIES
+
+    print(f"Reports: {rows} ({n_vessels} vessels x {reports_per_vessel}) | "
+          f"partitions: {status['partitions']} | segments: {status['segments']}")
+    print(f"  append + flush:        {rows / append_s:12.0f} reports/s")
+    print(f"  on disk:               {status['bytes_per_row']:12.2f} bytes/report "
+          f"(raw float64 columns: 48, {48 / status['bytes_per_row']:.1f}x)")
+    print(f"  track, 3 h window:     {track_ms:12.2f} ms ({track_rows / N_QUERIES:.0f} rows)")
+    print(f"  bbox 1x2 deg, 1 h:     {bbox_ms:12.2f} ms ({bbox_rows / N_QUERIES:.0f} rows)")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 2000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 1000)
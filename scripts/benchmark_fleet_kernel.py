@@ -0,0 +1,85 @@
+# scripts/benchmark_fleet_kernel.py
+# Real-time simulator tick at fleet scale: the vectorized fleet kernel vs.
+# the previous per-vessel Python update (same math, one vessel at a time).
+# The kernel should stay well inside the 1 s tick budget at 10k+ vessels.
+# Run from project root: python -m scripts.benchmark_fleet_kernel [n_vessels]
+import math
+import sys
+import time
+
+import numpy as np
+
+from backend.simulation import fleet_kernel
+from backend.simulation.fleet_kernel import FleetState, step_fleet
+
+N_TICKS = 20
+EARTH_RADIUS_NM = 3440.065
+
+
+def legacy_step(vessel, waypoints, dt):
+    """Per-vessel update as RealTimeSimulator._update_vessel_position did it."""
+    if vessel['wp'] >= len(waypoints) - 1:
+        vessel['speed'] = 0
+        return
+    next_lat, next_lon = waypoints[vessel['wp'] + 1]
+    lat1, lon1, lat2, lon2 = map(math.radians, (vessel['lat'], vessel['lon'], next_lat, next_lon))
+    x = math.sin(lon2 - lon1) * math.cos(lat2)
+    y = math.cos(lat1) * math.sin(lat2) - math.sin(lat1) * math.cos(lat2) * math.cos(lon2 - lon1)
+    heading_diff = (math.degrees(math.atan2(x, y)) + 360) % 360 - vessel['heading']
+    if abs(heading_diff) > 180:
+        heading_diff = heading_diff - 360 if heading_diff > 0 else heading_diff + 360
+    vessel['heading'] = (vessel['heading'] + max(-5.0, min(5.0, heading_diff))) % 360
+
+    distance = vessel['speed'] * dt / 3600
+    vessel['traveled'] += distance
+    lat_rad, heading_rad, d = math.radians(vessel['lat']), math.radians(vessel['heading']), distance / EARTH_RADIUS_NM
+    new_lat = math.asin(math.sin(lat_rad) * math.cos(d) + math.cos(lat_rad) * math.sin(d) * math.cos(heading_rad))
+    new_lon = math.radians(vessel['lon']) + math.atan2(math.sin(heading_rad) * math.sin(d) * math.cos(lat_rad),
+                                                       math.cos(d) - math.sin(lat_rad) * math.sin(new_lat))
+    vessel['lat'], vessel['lon'] = math.degrees(new_lat), math.degrees(new_lon)
+
+    lat1, lon1, lat2, lon2 = map(math.radians, (vessel['lat'], vessel['lon'], next_lat, next_lon))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    vessel['dist'] = EARTH_RADIUS_NM * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    if vessel['dist'] <= 0.5:
+        vessel['wp'] += 1
+    if vessel['total'] > 0:
+        vessel['progress'] = min(100.0, vessel['traveled'] / vessel['total'] * 100)
+
+
+def run(n_vessels):
+    rng = np.random.default_rng(11)
+    fleet = FleetState()
+    legacy = []
+    for _ in range(n_vessels):
+        n_waypoints = int(rng.integers(5, 40))
+        start = (rng.uniform(58.0, 70.0), rng.uniform(4.0, 30.0))
+        route = [(start[0] + 0.05 * i, start[1] + 0.05 * i * rng.uniform(-1, 1)) for i in range(n_waypoints)]
+        speed = float(rng.uniform(8.0, 22.0))
+        fleet.add_vessel(*route[0], 0.0, speed, 25.0, route, status=fleet_kernel.DEPARTING,
+                         timestamp=0.0, total_distance=3.0 * n_waypoints)
+        legacy.append(({'lat': route[0][0], 'lon': route[0][1], 'heading': 0.0, 'speed': speed,
+                        'wp': 0, 'dist': 0.0, 'traveled': 0.0, 'total': 3.0 * n_waypoints,
+                        'progress': 0.0}, route))
+
+    start = time.perf_counter()
+    for tick in range(N_TICKS):
+        step_fleet(fleet, 1.0, float(tick))
+    kernel_ms = (time.perf_counter() - start) * 1000 / N_TICKS
+
+    start = time.perf_counter()
+    for _ in range(N_TICKS):
+        for vessel, route in legacy:
+            legacy_step(vessel, route, 1.0)
+    legacy_ms = (time.perf_counter() - start) * 1000 / N_TICKS
+
+    assert np.allclose(fleet.lat[:n_vessels], [vessel['lat'] for vessel, _ in legacy], atol=1e-9)
+    assert np.allclose(fleet.lon[:n_vessels], [vessel['lon'] for vessel, _ in legacy], atol=1e-9)
+    print(f"Vessels: {n_vessels} | waypoints: {fleet.n_waypoints}")
+    print(f"  vectorized kernel:  {kernel_ms:10.2f} ms/tick")
+    print(f"  per-vessel loop:    {legacy_ms:10.2f} ms/tick")
+    print(f"  Speed-up: {legacy_ms / kernel_ms:.1f}x")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,55 @@
+# scripts/benchmark_fleet_risk.py
+# Fleet-wide risk sweep: RiskEngine.assess_fleet vs. assess_vessel per vessel.
+# Run from project root: python -m scripts.benchmark_fleet_risk [n_vessels]
+import random
+import sys
+import time
+
+import numpy as np
+
+from backend.services.risk_engine import RiskEngine
+from scripts.benchmark_hazard_index import make_hazards
+
+N_HAZARDS = 10000
+
+
+def run(n_vessels):
+    rng = np.random.default_rng(2024)
+    engine = RiskEngine()
+    engine.load_hazard_data(*make_hazards(N_HAZARDS, random.Random(1)))
+
+    vessels = [{
+        'mmsi': str(257000000 + i),
+        'lat': float(lat), 'lon': float(lon),
+        'speed': float(speed),
+        'type': str(vessel_type),
+    } for i, (lat, lon, speed, vessel_type) in enumerate(zip(
+        rng.uniform(58.0, 71.0, n_vessels), rng.uniform(4.0, 31.0, n_vessels),
+        rng.uniform(0.0, 22.0, n_vessels),
+        rng.choice(['cargo', 'tanker', 'fishing', 'passenger'], n_vessels)))]
+    # Typical coastal conditions: mostly moderate wind, occasional gales
+    wind = rng.gamma(2.0, 3.5, n_vessels)
+    wave = 0.02 * wind ** 1.5
+
+    start = time.perf_counter()
+    columns = RiskEngine.fleet_columns(vessels)
+    fleet_results = engine.assess_fleet(columns, {'wind_speed': wind, 'wave_height': wave})
+    fleet_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    loop_results = [
+        engine.assess_vessel(vessel, {'wind_speed': float(wind[i]), 'wave_height': float(wave[i])})
+        for i, vessel in enumerate(vessels)
+    ]
+    loop_ms = (time.perf_counter() - start) * 1000
+
+    print(f"Vessels: {n_vessels} | hazards: {len(engine.hazard_locations)}")
+    print(f"  assess_fleet:          {fleet_ms:9.1f} ms ({sum(map(len, fleet_results))} risks)")
+    print(f"  assess_vessel loop:    {loop_ms:9.1f} ms ({sum(map(len, loop_results))} risks)")
+    print(f"  Speed-up: {loop_ms / fleet_ms:.1f}x")
+    print(f"  Vessels with risks: {sum(1 for risks in fleet_results if risks)} "
+          f"(night checks flag every vessel between 18 and 06 UTC)")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,69 @@
+# scripts/benchmark_forecast_cube.py
+# Weather at N (lat, lon, time) points along a planned Bergen -> Trondheim
+# voyage from MET-sized forecasts (~90 steps) in the shared grid cache:
+# per point, a cache lookup plus a parse of the document's timeseries for
+# the step at that time (what callers had to do with first-step parsing),
+# vs. one vectorised sample of the forecast cube.
+# Run from project root: python -m scripts.benchmark_forecast_cube [n_points]
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from backend.services.forecast_cube import ForecastCube, current_step
+from backend.services.weather_service import WeatherCache
+
+T0 = datetime(2026, 10, 16, 12, tzinfo=timezone.utc)
+# Locationforecast layout: hourly for 60 h, then 6-hourly to 10 days
+STEP_HOURS = list(range(60)) + list(range(60, 241, 6))
+
+
+def stand_in_forecast(lat, lon, if_modified_since=None):
+    rng = np.random.default_rng(int(lat * 1000) ^ int(lon * 1000))
+    return 200, {'properties': {'timeseries': [
+        {'time': (T0 + timedelta(hours=hours)).isoformat().replace('+00:00', 'Z'),
+         'data': {'instant': {'details': {
+             'air_temperature': float(rng.normal(8, 3)), 'wind_speed': float(rng.gamma(3, 2)),
+             'wind_from_direction': float(rng.uniform(0, 360)), 'air_pressure_at_sea_level': 1010.0,
+             'relative_humidity': 80.0, 'cloud_area_fraction': 60.0}},
+             'next_1_hours': {'details': {'precipitation_amount': 0.2}}}}
+        for hours in STEP_HOURS]}}, {}
+
+
+def run(n_points):
+    cache = WeatherCache(grid_deg=0.05)
+    lats = np.linspace(60.39, 63.43, n_points)
+    lons = np.linspace(5.32, 10.39, n_points)
+    times = T0.timestamp() + np.linspace(0, 30 * 3600, n_points)  # a 30-hour passage
+
+    start = time.perf_counter()
+    cache.sample(lats, lons, times, fetch_missing=True, fetch=stand_in_forecast)
+    fetch_ms = (time.perf_counter() - start) * 1000
+    print(f"Points: {n_points} | cells cached: {len(cache.cache)} | steps per forecast: {len(STEP_HOURS)} "
+          f"(fetch + parse into cache: {fetch_ms:.0f} ms)")
+
+    start = time.perf_counter()
+    per_point = np.empty(n_points)
+    for i in range(n_points):
+        document = cache.get_forecast(lats[i], lons[i])
+        step = current_step(document['properties']['timeseries'], times[i])
+        per_point[i] = step['data']['instant']['details']['wind_speed']
+    loop_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    ForecastCube({key: entry['series'] for key, entry in cache.cache.items()}, cache.grid_deg)
+    build_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    result = cache.sample(lats, lons, times)
+    sample_ms = (time.perf_counter() - start) * 1000
+
+    print(f"  per-point lookup + parse  {loop_ms:8.1f} ms  ({loop_ms * 1000 / n_points:6.1f} us/point, "
+          f"nearest earlier step, nearest cell)")
+    print(f"  forecast cube sample      {sample_ms:8.1f} ms  ({sample_ms * 1000 / n_points:6.2f} us/point, "
+          f"interpolated, all {len(result)} variables; cube build {build_ms:.1f} ms once per cache change)")
+    print(f"  Speed-up: {loop_ms / sample_ms:.0f}x")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,68 @@
+# scripts/benchmark_hazard_index.py
+# Per-vessel hazard proximity latency: grid index vs. full linear scan.
+# Run from project root: python -m scripts.benchmark_hazard_index [n_hazards]
+import random
+import sys
+import time
+
+from backend.services.risk_engine import RiskEngine
+
+N_VESSELS = 2000
+
+
+def make_hazards(n, rng):
+    """Synthetic BarentsWatch-style hazards along the Norwegian coast."""
+    def point(prefix, i):
+        return {
+            'name': f'{prefix} {i}',
+            'latitude': rng.uniform(58.0, 71.0),
+            'longitude': rng.uniform(4.0, 31.0),
+        }
+    aquaculture = [point('Farm', i) for i in range(int(n * 0.8))]
+    cables = [point('Cable', i) for i in range(int(n * 0.15))]
+    installations = [point('Turbine', i) for i in range(n - len(aquaculture) - len(cables))]
+    return aquaculture, cables, installations
+
+
+def linear_nearby(engine, lat, lon, radius_km):
+    """The pre-index implementation of _find_nearby_hazards."""
+    nearby = []
+    for hazard in engine.hazard_locations:
+        distance = engine._calculate_distance_km(lat, lon, hazard['latitude'], hazard['longitude'])
+        if distance <= radius_km:
+            nearby.append(hazard)
+    return nearby
+
+
+def run(n_hazards):
+    rng = random.Random(2024)
+    engine = RiskEngine()
+
+    start = time.perf_counter()
+    engine.load_hazard_data(*make_hazards(n_hazards, rng))
+    build_ms = (time.perf_counter() - start) * 1000
+
+    vessels = [(rng.uniform(58.0, 71.0), rng.uniform(4.0, 31.0)) for _ in range(N_VESSELS)]
+
+    start = time.perf_counter()
+    for lat, lon in vessels:
+        engine._find_nearby_hazards(lat, lon, radius_km=2.0)
+        engine._check_hazard_proximity_legacy(lat, lon, {})
+    indexed_us = (time.perf_counter() - start) / N_VESSELS * 1e6
+
+    sample = vessels[:200]
+    start = time.perf_counter()
+    for lat, lon in sample:
+        linear_nearby(engine, lat, lon, 2.0)
+        linear_nearby(engine, lat, lon, 0.5)
+    linear_us = (time.perf_counter() - start) / len(sample) * 1e6
+
+    print(f"Hazards: {len(engine.hazard_locations)} | index build: {build_ms:.1f} ms")
+    print(f"  {engine._hazard_index.stats()}")
+    print(f"  Indexed proximity checks: {indexed_us:9.1f} µs/vessel")
+    print(f"  Linear scan baseline:     {linear_us:9.1f} µs/vessel")
+    print(f"  Speed-up: {linear_us / indexed_us:.0f}x")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,74 @@
+# scripts/benchmark_http_client.py
+# Bare requests.get vs. the shared pooled upstream client against a local
+# HTTP/1.1 stand-in. Each new connection pays an emulated TCP+TLS handshake
+# (HANDSHAKE_MS, ~2 round trips to a European API), which bare calls pay on
+# every request and the pooled client only once per kept-alive connection.
+# Run from project root: python -m scripts.benchmark_http_client [n_requests] [n_threads] [handshake_ms]
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from backend.services.http_client import UpstreamClient
+
+# MET-sized JSON document (a Locationforecast is ~100-400 kB uncompressed)
+BODY = json.dumps({'timeseries': [{'time': i, 'details': {'air_temperature': 4.2, 'wind_speed': 7.1}}
+                                  for i in range(2000)]}).encode('utf-8')
+
+
+def make_handler(handshake_ms):
+    class StandInHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            time.sleep(handshake_ms / 1000)
+            super().setup()
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(BODY)))
+            self.end_headers()
+            self.wfile.write(BODY)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StandInHandler
+
+
+def timed(label, fetch, n_requests, n_threads):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n_threads) as pool:
+        statuses = list(pool.map(lambda _: fetch(), range(n_requests)))
+    elapsed = time.perf_counter() - start
+    assert all(status == 200 for status in statuses)
+    print(f"  {label:<16} {elapsed * 1000 / n_requests:7.2f} ms/request  {n_requests / elapsed:8.0f} req/s")
+    return elapsed
+
+
+def run(n_requests, n_threads, handshake_ms):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(handshake_ms))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/forecast"
+    client = UpstreamClient(name='benchmark')
+
+    print(f"Requests: {n_requests} | threads: {n_threads} | handshake: {handshake_ms} ms")
+    bare = timed('bare requests', lambda: requests.get(url, timeout=10).status_code, n_requests, n_threads)
+    pooled = timed('pooled client', lambda: client.get(url, timeout=10).status_code, n_requests, n_threads)
+    host = client.get_status()['hosts'][f"127.0.0.1:{server.server_address[1]}"]
+    print(f"  Speed-up: {bare / pooled:.1f}x | connections opened: {host['connections_opened']} "
+          f"(reuse rate {host['connection_reuse_rate']:.1%}), mean latency {host['mean_ms']} ms")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 400,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 8,
+        float(sys.argv[3]) if len(sys.argv) > 3 else 30.0)
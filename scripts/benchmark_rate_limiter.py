@@ -0,0 +1,102 @@
+# scripts/benchmark_rate_limiter.py
+# Dashboard threads polling weather for a handful of hot cells whose forecasts
+# expire faster than the MET budget can refresh them, against a stand-in
+# upstream (UPSTREAM_MS per call). Both runs use the coalescing grid cache and
+# differ only in the throttle: sleeping in the request thread until one shared
+# "last request" timestamp is min_interval old, or the shared token-bucket
+# limiter, which serves an expired cell as stale when the budget is spent and
+# queues only cells it has nothing for.
+# Run from project root: python -m scripts.benchmark_rate_limiter [n_threads] [rate_per_second] [seconds]
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+
+import numpy as np
+
+from backend.services.rate_limiter import RateLimiter
+from backend.services.weather_service import WeatherCache
+
+UPSTREAM_MS = 40.0
+EXPIRES_SECONDS = 1.0
+N_CELLS = 12
+THINK_MS = 20.0
+FORECAST = {'properties': {'timeseries': [{'time': '2026-10-16T12:00:00Z', 'data': {
+    'instant': {'details': {'air_temperature': 9.5, 'wind_speed': 7.2}}}}]}}
+
+
+class StandInMET:
+    def __init__(self):
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, lat, lon, if_modified_since=None):
+        with self.lock:
+            self.calls += 1
+        time.sleep(UPSTREAM_MS / 1000)
+        return 200, FORECAST, {'Expires': formatdate(time.time() + EXPIRES_SECONDS, usegmt=True)}
+
+
+class SleepThrottledFetch:
+    """The previous pattern: space upstream calls by sleeping under one shared "last request" timestamp."""
+
+    def __init__(self, fetch, rate):
+        self.fetch = fetch
+        self.min_interval = 1.0 / rate
+        self.last_request_time = 0.0
+        self.lock = threading.Lock()
+
+    def __call__(self, lat, lon, if_modified_since=None):
+        with self.lock:
+            wait = self.last_request_time + self.min_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self.last_request_time = time.monotonic()
+        return self.fetch(lat, lon, if_modified_since)
+
+
+def timed(label, cache, met, fetch, n_threads, duration):
+    cells = [(60.0 + 0.1 * (i % 4), 5.0 + 0.1 * (i // 4)) for i in range(N_CELLS)]
+
+    def dashboard(seed):
+        # Each thread polls random cells with a short think time until the run ends
+        rng = np.random.default_rng(seed)
+        latencies = []
+        stop = time.monotonic() + duration
+        while time.monotonic() < stop:
+            start = time.perf_counter()
+            data, _ = cache.lookup(*cells[rng.integers(N_CELLS)], fetch)
+            latencies.append((time.perf_counter() - start) * 1000 if data is not None else np.inf)
+            time.sleep(THINK_MS / 1000)
+        return latencies
+
+    with ThreadPoolExecutor(max_workers=n_threads) as pool:
+        latencies = np.concatenate([np.asarray(part) for part in pool.map(dashboard, range(n_threads))])
+    served = np.isfinite(latencies)
+    print(f"  {label:<14} p50 {np.percentile(latencies[served], 50):7.1f} ms  "
+          f"p99 {np.percentile(latencies[served], 99):7.1f} ms  max {latencies[served].max():7.1f} ms | "
+          f"requests {len(latencies)} ({len(latencies) / duration:.0f}/s), failed {int((~served).sum())} | "
+          f"upstream calls {met.calls / duration:.1f}/s")
+
+
+def run(n_threads, rate, duration):
+    print(f"Threads: {n_threads} | budget: {rate}/s | cells: {N_CELLS} (expire after {EXPIRES_SECONDS}s) | "
+          f"upstream: {UPSTREAM_MS} ms | think: {THINK_MS} ms | {duration}s per run")
+    met = StandInMET()
+    timed('sleep throttle', WeatherCache(grid_deg=0.05), met, SleepThrottledFetch(met, rate), n_threads, duration)
+
+    met = StandInMET()
+    limiter = RateLimiter({'met_norway': (rate, rate)}, name='benchmark')
+    cache = WeatherCache(grid_deg=0.05, limiter=limiter)
+    timed('token bucket', cache, met, met, n_threads, duration)
+    status = limiter.get_status()['upstreams']['met_norway']
+    print(f"  Limiter: granted {status['granted']}, denied {status['denied']} "
+          f"(served stale {cache.stats()['stale']}), queued {status['queued']}, "
+          f"mean queue wait {status['mean_wait_ms']} ms, max {status['max_wait_ms']} ms")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 16,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 8.0,
+        float(sys.argv[3]) if len(sys.argv) > 3 else 5.0)
@@ -0,0 +1,71 @@
+# scripts/benchmark_route_corridor.py
+# Per-tick hazard checks for a vessel following an RTZ route: assess_vessel and
+# the wind farm check against every hazard vs. the current leg's corridor
+# candidates, plus the one-off corridor build cost.
+# Run from project root: python -m scripts.benchmark_route_corridor [n_hazards]
+import random
+import sys
+import time
+
+from backend.services.alerts_service import MaritimeAlertsService
+from backend.services.risk_engine import RiskEngine
+from backend.services.route_corridor import RouteCorridorCache
+
+N_TICKS = 2000
+
+
+def make_route(rng, n_waypoints=40):
+    lat, lon = 58.6, 5.4
+    waypoints = []
+    for _ in range(n_waypoints):
+        waypoints.append({'lat': lat, 'lon': lon})
+        lat += rng.uniform(0.02, 0.08)
+        lon += rng.uniform(-0.05, 0.05)
+    return waypoints
+
+
+def run(n_hazards=20000):
+    rng = random.Random(18)
+    engine = RiskEngine()
+    lats = [rng.uniform(58.5, 62.0) for _ in range(n_hazards)]
+    lons = [rng.uniform(4.5, 6.5) for _ in range(n_hazards)]
+    hazards = [{'name': f'Hazard {i}', 'latitude': a, 'longitude': b} for i, (a, b) in enumerate(zip(lats, lons))]
+    engine.load_hazard_data(hazards[:int(n_hazards * 0.8)], hazards[int(n_hazards * 0.8):int(n_hazards * 0.95)],
+                            hazards[int(n_hazards * 0.95):])
+    alerts = MaritimeAlertsService()
+    waypoints = make_route(rng)
+
+    start = time.perf_counter()
+    corridor = RouteCorridorCache(engine, alerts).get(waypoints)
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f"Hazards: {n_hazards} | legs: {len(corridor.legs)} | corridor build: {build_ms:.1f} ms")
+    print(f"  {corridor.get_stats()}")
+
+    ticks = []
+    for _ in range(N_TICKS):
+        k = rng.randrange(len(waypoints) - 1)
+        t = rng.random()
+        lat = waypoints[k]['lat'] + t * (waypoints[k + 1]['lat'] - waypoints[k]['lat'])
+        lon = waypoints[k]['lon'] + t * (waypoints[k + 1]['lon'] - waypoints[k]['lon'])
+        ticks.append((k, {'mmsi': '1', 'name': 'Sim', 'lat': lat, 'lon': lon, 'speed': 14.0, 'type': 'cargo'}))
+    weather = {'wind_speed': 8.0, 'wave_height': 1.0}
+
+    start = time.perf_counter()
+    for _, vessel in ticks:
+        engine.assess_vessel(vessel, weather)
+        alerts._check_wind_turbine_proximity(vessel['lat'], vessel['lon'], 'Sim')
+    full_us = (time.perf_counter() - start) * 1e6 / N_TICKS
+
+    start = time.perf_counter()
+    for k, vessel in ticks:
+        leg = corridor.candidates_for(vessel['lat'], vessel['lon'], k)
+        engine.assess_vessel(vessel, weather, corridor=leg)
+        alerts._check_wind_turbine_proximity(vessel['lat'], vessel['lon'], 'Sim', farm_indexes=leg.wind_farms)
+    corridor_us = (time.perf_counter() - start) * 1e6 / N_TICKS
+
+    print(f"  full hazard checks: {full_us:8.1f} us/tick")
+    print(f"  corridor checks:    {corridor_us:8.1f} us/tick ({full_us / corridor_us:.1f}x)")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
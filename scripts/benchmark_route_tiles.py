@@ -0,0 +1,36 @@
+# scripts/benchmark_route_tiles.py
+# /api/rtz/map-data payload size on the real RTZ routes: every waypoint
+# (the previous response) vs. encoded polylines simplified per zoom level,
+# plus build time of the tile set and cost of a cached request.
+# Run from project root: python -m scripts.benchmark_route_tiles
+import time
+
+from backend.routes.rtz_data_api import _load_rtz_data
+from backend.services.route_tiles import RouteTileCache
+
+N_REQUESTS = 1000
+
+
+def run():
+    data = _load_rtz_data()
+    cache = RouteTileCache(load_data=lambda: data, fingerprint=lambda: 'bench')
+
+    start = time.perf_counter()
+    _, full = cache.full_map_data()
+    build_ms = (time.perf_counter() - start) * 1000
+    waypoints = sum(len(route.get('waypoints', [])) for route in data['routes'])
+    print(f"Routes: {len(data['routes'])} | waypoints: {waypoints} | tile set build: {build_ms:.1f} ms")
+    print(f"  full waypoints:   {len(full):9d} bytes")
+
+    for zoom in (4, 6, 8, 10, 12):
+        _, body = cache.map_data(zoom)
+        print(f"  zoom {zoom:2d} polylines: {len(body):9d} bytes ({len(full) / len(body):.1f}x smaller)")
+
+    start = time.perf_counter()
+    for _ in range(N_REQUESTS):
+        cache.map_data(6)
+    print(f"  cached request:   {(time.perf_counter() - start) * 1e6 / N_REQUESTS:9.1f} us")
+
+
+if __name__ == "__main__":
+    run()
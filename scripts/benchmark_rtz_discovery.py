@@ -0,0 +1,55 @@
+# scripts/benchmark_rtz_discovery.py
+# RTZ discovery across all city archives: cold (empty cache), warm restart
+# (disk cache only) and warm in-process, plus the process-pool path forced on.
+# Run from project root: python -m scripts.benchmark_rtz_discovery
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+from backend.services import rtz_parser
+
+ROUNDS = 5
+
+
+def timed(label, prepare):
+    best = float('inf')
+    for _ in range(ROUNDS):
+        prepare()
+        start = time.perf_counter()
+        routes = rtz_parser.discover_rtz_files(enhanced=False)
+        best = min(best, time.perf_counter() - start)
+    print(f"  {label:<28} {best * 1000:8.1f} ms ({len(routes)} routes)")
+    return best
+
+
+def run():
+    logging.disable(logging.WARNING)
+    cache_dir = tempfile.mkdtemp(prefix='rtz_cache_')
+    os.environ['RTZ_CACHE_DIR'] = cache_dir
+
+    def cold():
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        rtz_parser._route_cache_memory.clear()
+
+    def restart():
+        rtz_parser._route_cache_memory.clear()
+
+    files = rtz_parser.find_rtz_files()
+    print(f"Cities: {len(files)} | files: {sum(len(paths) for paths in files.values())}")
+    cold_s = timed('cold (parse everything)', cold)
+    restart_s = timed('warm restart (disk cache)', restart)
+    warm_s = timed('warm (in-process cache)', lambda: None)
+
+    threshold = rtz_parser.RTZ_PARALLEL_MIN_BYTES
+    rtz_parser.RTZ_PARALLEL_MIN_BYTES = 0
+    timed('cold, process pool forced', cold)
+    rtz_parser.RTZ_PARALLEL_MIN_BYTES = threshold
+
+    print(f"  Warm restart speed-up: {cold_s / restart_s:.1f}x, in-process: {cold_s / warm_s:.1f}x")
+    shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    run()
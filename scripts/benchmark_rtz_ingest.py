@@ -0,0 +1,67 @@
+# scripts/benchmark_rtz_ingest.py
+# Import every city's RTZ routes into a scratch SQLite database: the previous
+# per-route ORM path (lookup, add, flush, one VoyageLeg per waypoint pair) vs.
+# the bulk ingest, plus a rerun of the bulk ingest on unchanged data.
+# Run from project root: python -m scripts.benchmark_rtz_ingest
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from backend.extensions import db
+from backend.models import Route, VoyageLeg
+from backend.services.rtz_ingest import ingest_rtz_routes, legs_table, routes_table
+from backend.services.rtz_parser import discover_rtz_files, extract_origin_destination
+
+
+def _engine():
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine, tables=[routes_table, legs_table])
+    return engine
+
+
+def legacy_save(engine, routes_data):
+    with Session(engine) as session:
+        for route_info in routes_data:
+            if session.query(Route).filter(Route.name == route_info['route_name']).first():
+                continue
+            waypoints = route_info['waypoints']
+            origin, destination = extract_origin_destination(route_info['route_name'], waypoints)
+            route = Route(name=route_info['route_name'], total_distance_nm=route_info['total_distance_nm'],
+                          origin=origin, destination=destination, is_active=True)
+            session.add(route)
+            session.flush()
+            for i in range(len(waypoints) - 1):
+                session.add(VoyageLeg(route_id=route.id, leg_order=i + 1,
+                                      departure_lat=waypoints[i]['lat'], departure_lon=waypoints[i]['lon'],
+                                      arrival_lat=waypoints[i + 1]['lat'], arrival_lon=waypoints[i + 1]['lon'],
+                                      distance_nm=route_info['legs'][i]['distance_nm'],
+                                      departure_time=datetime.utcnow(), arrival_time=datetime.utcnow()))
+        session.commit()
+
+
+def run():
+    routes = discover_rtz_files(enhanced=False)
+    waypoints = sum(len(route['waypoints']) for route in routes)
+    print(f"Routes: {len(routes)} | waypoints: {waypoints}")
+
+    engine = _engine()
+    start = time.perf_counter()
+    legacy_save(engine, routes)
+    print(f"  legacy ORM save:   {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+    engine = _engine()
+    start = time.perf_counter()
+    stats = ingest_rtz_routes(routes, engine=engine)
+    print(f"  bulk ingest:       {(time.perf_counter() - start) * 1000:8.1f} ms "
+          f"({stats['inserted']} routes, {stats['legs']} legs)")
+
+    start = time.perf_counter()
+    stats = ingest_rtz_routes(routes, engine=engine)
+    print(f"  bulk rerun:        {(time.perf_counter() - start) * 1000:8.1f} ms "
+          f"({stats['unchanged']} unchanged)")
+
+
+if __name__ == "__main__":
+    run()
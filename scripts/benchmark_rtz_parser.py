@@ -0,0 +1,142 @@
+# scripts/benchmark_rtz_parser.py
+# Streaming iterparse RTZ parser vs. the previous parser (full ElementTree,
+# up to three findall passes, per-waypoint namespace probing and debug logs)
+# over the bundled routeinfo files, plus peak memory on a synthetic long route.
+# Run from project root: python -m scripts.benchmark_rtz_parser
+import glob
+import io
+import logging
+import os
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+from backend.services import rtz_parser
+
+ROUNDS = 5
+RTZ_NS = 'https://cirm.org/rtz-xml-schemas'
+logger = logging.getLogger('benchmark_rtz_parser')
+
+
+def legacy_waypoints(data):
+    """Waypoint extraction as parse_rtz_content did it before streaming."""
+    root = ET.fromstring(data)
+    route_name = "Unknown_Route"
+    if 'routeName' in root.attrib:
+        route_name = root.get('routeName')
+    else:
+        for namespace in ['', f'{{{RTZ_NS}}}']:
+            route_info_elem = root.find(f'{namespace}routeInfo')
+            if route_info_elem is not None and 'routeName' in route_info_elem.attrib:
+                route_name = route_info_elem.get('routeName')
+                break
+
+    waypoint_elements = root.findall('.//waypoint')
+    if not waypoint_elements:
+        waypoint_elements = root.findall('.//rtz:waypoint', {'rtz': RTZ_NS})
+    if not waypoint_elements and '}' in root.tag:
+        waypoint_elements = root.findall(f".//{root.tag.split('}')[0]}}}waypoint")
+
+    waypoints = []
+    for wp_elem in waypoint_elements:
+        position_elem = None
+        if wp_elem.find('position') is not None:
+            position_elem = wp_elem.find('position')
+        else:
+            for ns in ['', f'{{{RTZ_NS}}}']:
+                position_elem = wp_elem.find(f'{ns}position')
+                if position_elem is not None:
+                    break
+        if position_elem is not None and 'lat' in position_elem.attrib and 'lon' in position_elem.attrib:
+            try:
+                waypoint = {
+                    'name': wp_elem.get('name', ''),
+                    'lat': float(position_elem.get('lat', 0)),
+                    'lon': float(position_elem.get('lon', 0)),
+                    'radius': float(wp_elem.get('radius', 0.1))
+                }
+            except ValueError:
+                continue
+            waypoints.append(waypoint)
+            logger.debug(f"Added waypoint: {waypoint['name']} at {waypoint['lat']}, {waypoint['lon']}")
+    return route_name, waypoints
+
+
+def streaming_waypoints(data):
+    meta = {}
+    waypoints = list(rtz_parser.iter_rtz_waypoints(io.BytesIO(data), meta))
+    return meta['route_name'], waypoints
+
+
+def load_route_files():
+    root = os.path.join(rtz_parser.get_project_root(), 'backend', 'assets', 'routeinfo_routes')
+    contents = []
+    for path in sorted(glob.glob(os.path.join(root, '**', '*.rtz'), recursive=True)):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if data[:4] != rtz_parser.ZIP_MAGIC:
+            contents.append(data)
+    return contents
+
+
+def best_of(parse, contents):
+    best = float('inf')
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        for data in contents:
+            parse(data)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def synthetic_route(n_waypoints):
+    parts = [f'<?xml version="1.0" encoding="utf-8"?>\n<route xmlns="{RTZ_NS}" version="1.0">'
+             '<routeInfo routeName="NCA_Synthetic_Long_Route"/><waypoints>']
+    for i in range(n_waypoints):
+        parts.append(f'<waypoint id="{i}" name="WP{i}"><position lat="{60 + i * 1e-5:.6f}" '
+                     f'lon="{5 + i * 1e-5:.6f}"/><leg starboardXTD="0.1" portsideXTD="0.1"/></waypoint>')
+    parts.append('</waypoints></route>')
+    return ''.join(parts).encode('utf-8')
+
+
+def peak_memory_mb(parse, data):
+    tracemalloc.start()
+    parse(data)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1e6
+
+
+def count_streamed(data):
+    return sum(1 for _ in rtz_parser.iter_rtz_waypoints(io.BytesIO(data)))
+
+
+def run():
+    logging.disable(logging.WARNING)
+    contents = load_route_files()
+    n_waypoints = 0
+    for data in contents:
+        legacy = legacy_waypoints(data)
+        streamed = streaming_waypoints(data)
+        assert streamed[0] == legacy[0]
+        assert [{k: wp[k] for k in ('name', 'lat', 'lon', 'radius')} for wp in streamed[1]] == legacy[1]
+        n_waypoints += len(legacy[1])
+
+    legacy_s = best_of(legacy_waypoints, contents)
+    stream_s = best_of(streaming_waypoints, contents)
+    print(f"Route files: {len(contents)} | waypoints: {n_waypoints} | "
+          f"{sum(len(data) for data in contents) / 1e6:.2f} MB XML")
+    print(f"  previous parser:   {legacy_s * 1000:8.1f} ms")
+    print(f"  streaming parser:  {stream_s * 1000:8.1f} ms")
+    print(f"  Speed-up: {legacy_s / stream_s:.2f}x")
+
+    print("Peak memory on a synthetic route (tracemalloc, excluding source bytes):")
+    for n in (10000, 100000):
+        data = synthetic_route(n)
+        print(f"  {n:>7} waypoints ({len(data) / 1e6:5.1f} MB): "
+              f"previous {peak_memory_mb(legacy_waypoints, data):7.1f} MB | "
+              f"streaming, waypoints consumed {peak_memory_mb(count_streamed, data):5.1f} MB")
+
+
+if __name__ == "__main__":
+    run()
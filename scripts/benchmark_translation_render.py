@@ -0,0 +1,129 @@
+# scripts/benchmark_translation_render.py
+# Renders a dashboard-sized template (N_CALLS t() lookups across the real
+# en/no catalogs in backend/translations/data) through the Flask context
+# processor. Compares the previous per-render path - new t/t_all/
+# translate_many closures each render, a flattened copy of the whole language
+# for `translations`, and nested category lookups - with the precompiled
+# catalogs and template helpers built once per catalog.
+# Run from project root: python -m scripts.benchmark_translation_render [n_renders]
+import json
+import os
+import sys
+import time
+from functools import lru_cache
+
+import numpy as np
+from flask import Flask, render_template, request
+from jinja2 import DictLoader
+
+from backend.translations.flask_integration import DynamicTranslator
+
+DATA_DIR = "backend/translations/data"
+N_CALLS = 150
+
+
+class PreviousTranslator:
+    """The previous DynamicTranslator lookup path: cached nested JSON, split per call."""
+
+    def __init__(self, translations_dir):
+        self.translations_dir = translations_dir
+
+    @lru_cache(maxsize=2)
+    def _load_language(self, lang):
+        with open(os.path.join(self.translations_dir, f"{lang}.json"), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def translate(self, key, lang='en', default=None):
+        translations = self._load_language(lang)
+        category, subkey = key.split('.', 1) if '.' in key else ('global', key)
+        translated = translations.get(category, {}).get(subkey)
+        if translated:
+            return translated
+        if lang == 'no':
+            english = self.translate(key, 'en', default)
+            if english and english != key:
+                return f"[NO TRANSLATION] {english}"
+        return default if default is not None else key
+
+    def get_all(self, lang='en'):
+        return {f"{category}.{key}": value
+                for category, items in self._load_language(lang).items() for key, value in items.items()}
+
+
+def previous_context_processor(translator):
+    def inject_translations():
+        lang = request.args.get('lang', 'en')
+
+        def t(key, category='global', default=None):
+            full_key = f"{category}.{key}" if category != 'global' else key
+            return translator.translate(full_key, lang, default or key)
+
+        def t_all():
+            return translator.get_all(lang)
+
+        def translate_many(keys, category='global'):
+            return {key: t(key, category) for key in keys}
+
+        return {'lang': lang, 't': t, 't_all': t_all, 'get_language': lambda: lang,
+                'is_english': lambda: lang == 'en', 'is_norwegian': lambda: lang == 'no',
+                'translate_many': translate_many, 'translations': t_all()}
+    return inject_translations
+
+
+def dashboard_template():
+    with open(os.path.join(DATA_DIR, 'en.json'), 'r', encoding='utf-8') as f:
+        keys = [(category, key) for category, items in json.load(f).items() for key in items]
+    rng = np.random.default_rng(7)
+    picks = [keys[i] for i in rng.choice(len(keys), N_CALLS, replace=False)]
+    rows = "\n".join(f"<div class=\"card\"><span>{{{{ t('{key}', '{category}') }}}}</span></div>"
+                     for category, key in picks)
+    return f"<html><body><h1>{{{{ t('dashboard', 'base_template') }}}}</h1>\n{rows}\n</body></html>"
+
+
+def timed(label, app, n_renders):
+    with app.test_request_context('/?lang=no'):
+        render_template('dashboard.html')  # warm: load catalogs, compile template
+        samples = np.empty(n_renders)
+        context = np.empty(n_renders)
+        for i in range(n_renders):
+            start = time.perf_counter()
+            app.update_template_context({})
+            context[i] = time.perf_counter() - start
+            start = time.perf_counter()
+            render_template('dashboard.html')
+            samples[i] = time.perf_counter() - start
+    print(f"  {label:<22} render p50 {np.median(samples) * 1e6:7.1f} us  p99 {np.percentile(samples, 99) * 1e6:7.1f} us"
+          f" | context processor {np.median(context) * 1e6:6.1f} us")
+    return np.median(samples)
+
+
+def make_app(context_processor):
+    app = Flask(__name__)
+    app.jinja_loader = DictLoader({'dashboard.html': dashboard_template()})
+    app.context_processor(context_processor)
+    return app
+
+
+def run(n_renders):
+    translator = DynamicTranslator(DATA_DIR)
+    print(f"Renders: {n_renders} | t() calls per render: {N_CALLS + 1} | "
+          f"catalog: {len(translator.get_all('en'))} en / {len(translator.get_all('no'))} no entries")
+
+    before = timed('per-render closures', make_app(previous_context_processor(PreviousTranslator(DATA_DIR))),
+                   n_renders)
+    after = timed('precompiled catalogs',
+                  make_app(lambda: translator.template_helpers(request.args.get('lang', 'en'))), n_renders)
+    print(f"  Speed-up: {before / after:.1f}x")
+
+    start = time.perf_counter()
+    translator.compile()
+    compile_ms = (time.perf_counter() - start) * 1000
+    translator.clear_cache()
+    start = time.perf_counter()
+    translator.translate('home', 'no')
+    load_ms = (time.perf_counter() - start) * 1000
+    print(f"  Build-time compile: {compile_ms:.1f} ms | cold load of compiled en+no: {load_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,66 @@
+# scripts/benchmark_vessel_feed.py
+# Live vessel feed vs. polling: per-tick server time and bytes for N open
+# dashboards when a fraction of the fleet reports a new position each tick.
+# Polling rebuilds and serialises every vessel dict per dashboard; the feed
+# publishes one frame and sends each dashboard only its changed vessels.
+# Run from project root: python -m scripts.benchmark_vessel_feed [n_vessels] [n_dashboards]
+import json
+import sys
+import time
+
+import numpy as np
+
+from backend.services.vessel_feed import VesselFeed, format_sse, parse_bbox
+from backend.services.vessel_state_store import VesselStateStore
+
+N_TICKS = 10
+CHANGED_PER_TICK = 0.05
+# Dashboards look at one of the main port areas or at the whole coast
+VIEWS = [None, '4.8,60.1,5.8,60.7', '5.3,58.7,6.1,59.2', '10.0,63.2,10.8,63.6', '10.4,59.6,11.0,60.0']
+
+
+def run(n_vessels, n_dashboards):
+    rng = np.random.default_rng(19)
+    mmsis = [str(257000000 + i) for i in range(n_vessels)]
+    store = VesselStateStore(max_vessels=n_vessels)
+    lats, lons = rng.uniform(58.0, 64.0, n_vessels), rng.uniform(4.5, 11.0, n_vessels)
+    for i, mmsi in enumerate(mmsis):
+        store.upsert(mmsi, lats[i], lons[i], speed=10.0, course=90.0, vessel_type='Cargo', name=f'VESSEL {i}')
+
+    feed = VesselFeed(store=store)
+    feed.publish()
+    subscriptions = [feed.subscribe(bbox=parse_bbox(VIEWS[k % len(VIEWS)]), binary=k % 2 == 1)
+                     for k in range(n_dashboards)]
+    for subscription in subscriptions:
+        feed.pending(subscription)
+
+    poll_ms = feed_ms = 0.0
+    poll_bytes = feed_bytes = 0
+    n_changed = int(n_vessels * CHANGED_PER_TICK)
+    for _ in range(N_TICKS):
+        for i in rng.choice(n_vessels, n_changed, replace=False).tolist():
+            store.upsert(mmsis[i], lats[i] + rng.normal(0, 0.001), lons[i] + rng.normal(0, 0.001), speed=10.0)
+
+        start = time.perf_counter()
+        for k in range(n_dashboards):
+            bbox = parse_bbox(VIEWS[k % len(VIEWS)])
+            vessels = store.vessels_in_bbox(*bbox) if bbox else store.get_vessels()
+            poll_bytes += len(json.dumps({'vessels': vessels}))
+        poll_ms += (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        feed.publish()
+        for subscription in subscriptions:
+            for event, sequence, payload in feed.pending(subscription):
+                feed_bytes += len(format_sse(event, sequence, payload))
+        feed_ms += (time.perf_counter() - start) * 1000
+
+    print(f"Vessels: {n_vessels} | dashboards: {n_dashboards} | changed per tick: {n_changed}")
+    print(f"  polling: {poll_ms / N_TICKS:9.1f} ms/tick {poll_bytes / N_TICKS / 1e6:9.2f} MB/tick")
+    print(f"  feed:    {feed_ms / N_TICKS:9.1f} ms/tick {feed_bytes / N_TICKS / 1e6:9.2f} MB/tick")
+    print(f"  Speed-up: {poll_ms / feed_ms:.1f}x, bandwidth: {poll_bytes / feed_bytes:.1f}x less")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 20000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20)
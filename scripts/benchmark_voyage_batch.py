@@ -0,0 +1,88 @@
+# scripts/benchmark_voyage_batch.py
+# Headless batch voyages vs. the real-time IntegratedShipSimulator loop.
+# The real-time loop needs one wall-clock second per tick (plus per-tick
+# assess_vessel / generate_vessel_alerts work); the batch mode runs every
+# what-if voyage to arrival on a simulated clock with a pre-fetched weather grid.
+# Timelines are kept in memory, so very small ticks over hundreds of
+# voyages need a lot of RAM (roughly 200 bytes per vessel-tick).
+# Run from project root: python -m scripts.benchmark_voyage_batch [n_voyages]
+import logging
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from backend.services.alerts_service import MaritimeAlertsService
+from backend.services.risk_engine import RiskEngine
+from backend.simulation.voyage_batch import WeatherTimeGrid, simulate_voyages
+
+# Fallback Bergen -> Oslo route of IntegratedShipSimulator
+ROUTE = [[60.3913, 5.3221], [60.467, 5.500], [60.600, 5.800], [60.800, 6.100],
+         [60.700, 6.500], [60.900, 7.100], [61.000, 7.800], [59.9139, 10.7522]]
+DEPARTURE = datetime(2026, 3, 1, tzinfo=timezone.utc).timestamp()
+VESSEL = {'mmsi': 'SIM-BERG-001', 'name': 'MS Bergen Navigator', 'type': 'Container Ship',
+          'draught': 8.5, 'length': 200.0}
+LEGACY_SAMPLE_TICKS = 2000
+
+
+def synthetic_forecast(lat, lon):
+    steps = []
+    for h in range(96):
+        stamp = datetime.fromtimestamp(DEPARTURE + h * 3600, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        wind = 6.0 + 8.0 * abs(np.sin(h / 7.0 + lat))
+        steps.append({'time': stamp, 'data': {'instant': {'details': {
+            'wind_speed': round(wind, 1), 'wind_from_direction': 220.0, 'air_temperature': 3.0}}}})
+    return {'properties': {'timeseries': steps}}
+
+
+def legacy_tick_ms(risk_engine, alerts_service):
+    """CPU cost of one real-time tick's service calls (sleep excluded)."""
+    weather = {'wind_speed': 9.0, 'wind_speed_ms': 9.0, 'wave_height_m': 1.0}
+    lat, lon = ROUTE[0]
+    start = time.perf_counter()
+    for i in range(LEGACY_SAMPLE_TICKS):
+        vessel = dict(VESSEL, lat=lat + i * 1e-4, lon=lon + i * 1e-4, speed=15.0, heading=45.0,
+                      timestamp=datetime.now().isoformat())
+        alerts_service.generate_vessel_alerts(vessel, {'weather': weather})
+        risk_engine.assess_vessel(vessel, weather)
+    return (time.perf_counter() - start) * 1000 / LEGACY_SAMPLE_TICKS
+
+
+def run(n_voyages):
+    logging.disable(logging.WARNING)
+    risk_engine = RiskEngine()
+    alerts_service = MaritimeAlertsService()
+
+    start = time.perf_counter()
+    weather = WeatherTimeGrid.prefetch(ROUTE, grid_deg=0.05, get_forecast=synthetic_forecast)
+    grid_ms = (time.perf_counter() - start) * 1000
+
+    speeds = np.repeat(np.linspace(8.0, 22.0, 10), max(1, n_voyages // 10))
+    departures = DEPARTURE + np.tile(np.arange(max(1, n_voyages // 10)) * 1800.0, 10)
+
+    results = {}
+    for tick_seconds in (10.0, 30.0):
+        start = time.perf_counter()
+        result = simulate_voyages(ROUTE, speeds, departures, weather, tick_seconds=tick_seconds,
+                                  vessel=VESSEL, risk_engine=risk_engine, alerts_service=alerts_service)
+        results[tick_seconds] = (result, time.perf_counter() - start)
+
+    per_tick_ms = legacy_tick_ms(risk_engine, alerts_service)
+    result, batch_seconds = results[30.0]
+    # The real-time loop ticks once per second of voyage time
+    voyage_hours = float(np.nansum(result.duration_hours))
+    ticks = voyage_hours * 3600
+
+    print(f"Voyages: {len(speeds)} | weather cells: {len(weather)} ({grid_ms:.0f} ms to build)")
+    for tick_seconds, (result, elapsed) in results.items():
+        print(f"  batch, {tick_seconds:4.0f} s ticks:   {elapsed:8.2f} s "
+              f"({int(result.valid.sum())} vessel-ticks, all arrived: {bool(result.arrived.all())})")
+    print(f"  real-time loop, service calls only: {per_tick_ms:.3f} ms/tick -> "
+          f"{ticks * per_tick_ms / 1000:.0f} s CPU for {ticks:.0f} one-second ticks")
+    print(f"  real-time loop, wall clock:         {voyage_hours:.0f} h")
+    print(f"  Speed-up (30 s ticks) vs. CPU-only real-time work: {ticks * per_tick_ms / 1000 / batch_seconds:.0f}x")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,75 @@
+# scripts/benchmark_weather_cache.py
+# Fleet weather sweep through the shared grid cache: upstream MET requests and
+# wall time vs. one request per exact vessel position (previous behaviour),
+# with a fake MET upstream of fixed latency. Vessels cluster around ports, as
+# in the live AIS feed.
+# Run from project root: python -m scripts.benchmark_weather_cache [n_vessels]
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from backend.services import weather_service
+from backend.services.risk_engine import RiskEngine
+
+UPSTREAM_LATENCY_S = 0.02
+WORKERS = 16
+PORTS = [(60.39, 5.32), (58.97, 5.73), (63.43, 10.40), (59.91, 10.75), (62.47, 6.15)]
+FORECAST = {'properties': {'timeseries': [{'data': {'instant': {'details': {
+    'wind_speed': 8.0, 'wind_from_direction': 220.0, 'air_temperature': 9.0}}}}]}}
+
+
+class FakeMET:
+    def __init__(self):
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, lat, lon, if_modified_since=None):
+        with self.lock:
+            self.calls += 1
+        time.sleep(UPSTREAM_LATENCY_S)
+        return 200, FORECAST, {}
+
+
+def fleet_positions(n):
+    rng = np.random.default_rng(11)
+    ports = rng.integers(0, len(PORTS), n)
+    offsets = rng.normal(0.0, 0.08, (n, 2))
+    return [(PORTS[p][0] + dy, PORTS[p][1] + dx) for p, (dy, dx) in zip(ports, offsets)]
+
+
+def sweep(positions, fetch_one):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        results = list(pool.map(lambda pos: fetch_one(*pos), positions))
+    assert all(result is not None for result in results)
+    return time.perf_counter() - start
+
+
+def run(n_vessels):
+    logging.disable(logging.WARNING)
+    positions = fleet_positions(n_vessels)
+    engine = RiskEngine()
+
+    per_position = FakeMET()
+    legacy_s = sweep(positions, lambda lat, lon: per_position(lat, lon)[1])
+
+    grid = FakeMET()
+    weather_service.request_met_forecast = grid
+    weather_service.weather_cache.clear()
+    grid_s = sweep(positions, engine._fetch_weather_for_location)
+    stats = weather_service.weather_cache.stats()
+
+    print(f"Vessels: {n_vessels} | grid {weather_service.WEATHER_GRID_DEG}° | "
+          f"upstream latency {UPSTREAM_LATENCY_S * 1000:.0f} ms | {WORKERS} workers")
+    print(f"  per exact position: {per_position.calls:6d} MET requests  {legacy_s * 1000:8.0f} ms")
+    print(f"  shared grid cache:  {grid.calls:6d} MET requests  {grid_s * 1000:8.0f} ms "
+          f"({stats['hits']} hits, {stats['coalesced']} coalesced)")
+    print(f"  Upstream reduction: {per_position.calls / grid.calls:.0f}x")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,85 @@
+# scripts/benchmark_weather_swr.py
+# Dashboard threads reading weather for the port cities and vessel cells while
+# forecasts expire, against a stand-in MET upstream (UPSTREAM_MS per call).
+# Compares refreshing an expired cell in the request (stale_seconds=0) with
+# stale-while-revalidate plus the pre-warmer keeping the hot set fresh.
+# Run from project root: python -m scripts.benchmark_weather_swr [n_threads] [seconds]
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+
+import numpy as np
+
+from backend.services.weather_service import NORWEGIAN_CITIES, WeatherCache, WeatherPrewarmer
+
+UPSTREAM_MS = 300.0
+EXPIRES_SECONDS = 2.0
+THINK_MS = 20.0
+FORECAST = {'properties': {'timeseries': [{'time': '2026-10-16T12:00:00Z', 'data': {
+    'instant': {'details': {'air_temperature': 9.5, 'wind_speed': 7.2}}}}]}}
+
+# Port cities plus a few vessel positions along the coast
+HOT_POINTS = [(city['lat'], city['lon']) for city in NORWEGIAN_CITIES.values()] + \
+             [(60.0 + 0.2 * i, 4.9 + 0.1 * i) for i in range(10)]
+
+
+class StandInMET:
+    def __init__(self):
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, lat, lon, if_modified_since=None):
+        with self.lock:
+            self.calls += 1
+        time.sleep(UPSTREAM_MS / 1000)
+        return 200, FORECAST, {'Expires': formatdate(time.time() + EXPIRES_SECONDS, usegmt=True)}
+
+
+def timed(label, cache, met, n_threads, duration):
+    def dashboard(seed):
+        rng = np.random.default_rng(seed)
+        latencies = []
+        stop = time.monotonic() + duration
+        while time.monotonic() < stop:
+            lat, lon = HOT_POINTS[rng.integers(len(HOT_POINTS))]
+            start = time.perf_counter()
+            cache.lookup(lat, lon, met)
+            latencies.append((time.perf_counter() - start) * 1000)
+            time.sleep(THINK_MS / 1000)
+        return latencies
+
+    with ThreadPoolExecutor(max_workers=n_threads) as pool:
+        latencies = np.concatenate([np.asarray(part) for part in pool.map(dashboard, range(n_threads))])
+    p50, p99 = np.percentile(latencies, [50, 99])
+    slow = (latencies > UPSTREAM_MS / 2).mean()
+    print(f"  {label:<22} p50 {p50:7.2f} ms  p99 {p99:7.1f} ms  max {latencies.max():7.1f} ms | "
+          f"requests {len(latencies)}, waited on MET {slow:.1%} | upstream calls {met.calls}")
+
+
+def run(n_threads, duration):
+    print(f"Threads: {n_threads} | hot points: {len(HOT_POINTS)} | forecasts expire after {EXPIRES_SECONDS}s | "
+          f"upstream: {UPSTREAM_MS} ms | {duration}s per run")
+
+    met = StandInMET()
+    timed('refresh in request', WeatherCache(grid_deg=0.05, stale_seconds=0), met, n_threads, duration)
+
+    met = StandInMET()
+    cache = WeatherCache(grid_deg=0.05)
+    prewarmer = WeatherPrewarmer(cache, hot_points=lambda: HOT_POINTS, interval_seconds=0.5,
+                                 lead_seconds=1.0, fetch=met)
+    prewarmer.start()
+    while not prewarmer.stats['runs'] or cache.stats()['in_flight']:  # first pre-warm pass lands
+        time.sleep(0.05)
+    timed('stale-while-revalidate', cache, met, n_threads, duration)
+    prewarmer.stop()
+    stats = cache.stats()
+    print(f"  Cache: hits {stats['hits']}, stale {stats['stale']}, misses {stats['misses']}, "
+          f"coalesced {stats['coalesced']}, background refreshes {stats['background_refreshes']}, "
+          f"hit ratio {stats['hit_ratio']}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 8,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 6.0)